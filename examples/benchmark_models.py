@@ -0,0 +1,62 @@
+"""
+Comparativa de rendimiento de los modelos de MonteCarloSimulator.
+
+Mide el tiempo de cada kernel (GBM, Merton, GARCH, Heston) y, para los modelos
+dependientes de la trayectoria, compara el backend NumPy con el JIT de numba.
+
+Uso:
+    python examples/benchmark_models.py [n_simulaciones] [n_dias]
+"""
+import sys
+import time
+from pathlib import Path
+# Añadir el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+from src.simulation.models import GBMModel, MertonJumpModel, GARCHModel, HestonModel, HAS_NUMBA
+
+
+def medir(model, n_simulations, n_days, repeticiones=3):
+    """Devuelve el mejor tiempo (segundos) de varias repeticiones."""
+    rng = np.random.default_rng(0)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        model.simulate(100.0, n_simulations, n_days, rng)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def main():
+    n_simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 756
+    log_returns = np.random.default_rng(1).normal(0.0004, 0.015, 2500)
+
+    casos = [
+        ("GBM", GBMModel()),
+        ("Merton", MertonJumpModel()),
+        ("GARCH (numpy)", GARCHModel(backend="numpy")),
+        ("Heston (numpy)", HestonModel(backend="numpy")),
+    ]
+    if HAS_NUMBA:
+        casos += [
+            ("GARCH (numba)", GARCHModel(backend="numba")),
+            ("Heston (numba)", HestonModel(backend="numba")),
+        ]
+    else:
+        print("numba no está instalado: solo se mide el backend NumPy.\n")
+
+    print(f"{n_simulations} trayectorias x {n_days} días")
+    print("-" * 50)
+    for nombre, model in casos:
+        fitted = model.fit(log_returns)
+        # Calentamiento (compilación JIT incluida)
+        fitted.simulate(100.0, 10, 10, np.random.default_rng(0))
+        segundos = medir(fitted, n_simulations, n_days)
+        print(f"{nombre:<20} {segundos * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
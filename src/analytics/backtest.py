@@ -0,0 +1,259 @@
+"""
+Backtesting vectorizado de carteras sobre la matriz de cierres alineada (T, N).
+
+Una estrategia es una matriz de pesos objetivo (T, N): la fila t son los pesos
+decididos al cierre t, que se negocian lag barras después (1 por defecto, sin mirar
+al futuro). Una fila entera de NaN significa "no rebalancear": las posiciones se
+mantienen y sus pesos derivan con los precios. El resto de la cartera es efectivo.
+
+Todo se calcula con operaciones de arrays sobre todas las fechas y activos a la vez:
+entre dos rebalanceos las posiciones en títulos son constantes, así que el valor de
+cada activo es su peso inicial por el precio relativo al del inicio del tramo
+(indexación por el índice de la fila de inicio de cada tramo). La rentabilidad de
+cada barra, la rotación (suma de |peso objetivo - peso derivado|) y los costes
+(rotación x cost_bps) salen de esas matrices y la curva de capital es su producto
+acumulado.
+
+BacktestSweep evalúa una rejilla de parámetros de una estrategia en un pool de
+procesos, con los cierres en memoria compartida (como ParallelAnalytics): entre
+procesos solo viajan los parámetros y las métricas de cada combinación.
+"""
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.analytics.indicators import ffill_rows, rolling_rows
+from src.analytics.parallel import SharedArray, attach, series_metrics
+from src.utils.instrumentation import count, instrumented
+
+# Métricas de un backtest (mismas definiciones que PriceSeries sobre la curva de capital)
+METRICS = ("total_return", "annualized_return", "volatility", "max_drawdown", "turnover", "costs", "n_rebalances")
+
+
+@dataclass
+class BacktestResult:
+    """
+    Resultado de un backtest: posiciones (pesos tras negociar, T x N), rotación, costes
+    (en unidades de capital) y curva de capital por fecha.
+    """
+    dates: list
+    symbols: list
+    positions: np.ndarray
+    turnover: np.ndarray
+    costs: np.ndarray
+    equity: np.ndarray
+    initial_capital: float = 1.0
+
+    @property
+    def returns(self) -> np.ndarray:
+        """Rentabilidad de cada barra (neta de costes)."""
+        return np.r_[0.0, self.equity[1:] / self.equity[:-1] - 1] if len(self.equity) else self.equity.copy()
+
+    def metrics(self) -> Dict[str, float]:
+        days = np.asarray(self.dates, dtype="datetime64[D]").astype(np.int64)
+        values = _metrics(self.equity, days, self.turnover, self.costs, self.initial_capital)
+        return {name: float(value) for name, value in zip(METRICS, values)}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Curva de capital, rentabilidad, rotación y costes por fecha."""
+        return pd.DataFrame({"equity": self.equity, "returns": self.returns, "turnover": self.turnover,
+                             "costs": self.costs}, index=pd.Index(pd.to_datetime(self.dates), name="date"))
+
+    def positions_frame(self) -> pd.DataFrame:
+        """Pesos de cada activo tras negociar, por fecha."""
+        return pd.DataFrame(self.positions, index=pd.Index(pd.to_datetime(self.dates), name="date"),
+                            columns=self.symbols)
+
+
+def _metrics(equity, days, turnover, costs, initial_capital) -> np.ndarray:
+    """Vector de METRICS de una curva de capital (costes como fracción del capital inicial)."""
+    base = series_metrics(equity, days)
+    return np.r_[base[4:8], turnover.sum(), costs.sum() / initial_capital, np.count_nonzero(turnover)]
+
+
+def _run(closes: np.ndarray, weights: np.ndarray, cost_bps: float, lag: int, initial_capital: float):
+    """Posiciones, rotación, costes y capital de unos pesos objetivo sobre unos cierres (T, N)."""
+    T, N = closes.shape
+    prices = ffill_rows(closes)
+    available = ~np.isnan(prices)
+    targets = np.full((T, N), np.nan)
+    if T > lag:
+        targets[lag:] = weights[:T - lag]
+    rebalance = ~np.isnan(targets).all(axis=1)
+    # En una fila de rebalanceo, los NaN y los activos aún sin precio quedan a peso 0
+    targets = np.where(rebalance[:, None], np.nan_to_num(targets), 0.0)
+    untradable = (targets != 0) & ~available
+    if untradable.any():
+        count("backtest_untradable", int(untradable.sum()), stage="backtest")
+        targets[untradable] = 0.0
+    prices = np.where(available, prices, 1.0)
+
+    # Fila de inicio del tramo vigente en cada fecha (-1 antes del primer rebalanceo: todo efectivo)
+    segment = np.maximum.accumulate(np.where(rebalance, np.arange(T), -1))
+    previous = np.r_[-1, segment[:-1]]
+    padded_weights = np.vstack([targets, np.zeros((1, N))])
+    padded_prices = np.vstack([prices, np.ones((1, N))])
+
+    def grow(start):
+        """Valor por activo (y total con el efectivo) de 1 invertido al inicio del tramo start."""
+        w = padded_weights[start]
+        held = w * (prices / padded_prices[start])
+        return held, held.sum(axis=1) + (1.0 - w.sum(axis=1))
+
+    held, value = grow(segment)
+    drifted, drifted_value = grow(previous)  # antes de negociar: posiciones del tramo anterior
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gross = np.r_[1.0, drifted_value[1:] / value[:-1]]
+        turnover = np.where(rebalance, np.abs(targets - drifted / drifted_value[:, None]).sum(axis=1), 0.0)
+        positions = held / value[:, None]
+    cost_rate = turnover * cost_bps / 10_000
+    before_costs = initial_capital * np.cumprod(gross) * np.r_[1.0, np.cumprod(1.0 - cost_rate)[:-1]]
+    return positions, turnover, before_costs * cost_rate, before_costs * (1.0 - cost_rate)
+
+
+@instrumented("backtest")
+def backtest(dates, closes, weights, symbols: Optional[Sequence[str]] = None, cost_bps: float = 0.0,
+             lag: int = 1, initial_capital: float = 1.0) -> BacktestResult:
+    """
+    Backtest de unos pesos objetivo (T, N) sobre unos cierres (T, N) alineados por fecha
+    (p. ej. Portfolio.aligned_closes()). cost_bps es el coste en puntos básicos por unidad
+    de rotación; lag las barras entre la decisión y la negociación.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if closes.ndim != 2 or weights.shape != closes.shape or len(dates) != len(closes):
+        raise ValueError("closes y weights deben tener forma (n_fechas, n_activos) y una fecha por fila.")
+    if lag < 0:
+        raise ValueError("lag no puede ser negativo.")
+    symbols = list(symbols) if symbols is not None else [str(j) for j in range(closes.shape[1])]
+    positions, turnover, costs, equity = _run(closes, weights, cost_bps, lag, initial_capital)
+    return BacktestResult(list(dates), symbols, positions, turnover, costs, equity, initial_capital)
+
+
+# --- Estrategias de ejemplo: funciones (cierres, **parámetros) -> pesos objetivo (T, N) ---
+
+def signal_weights(signals: np.ndarray, gross: float = 1.0) -> np.ndarray:
+    """Pesos a partes iguales entre las señales activas de cada fila (+1 largo, -1 corto), con exposición bruta gross."""
+    signals = np.nan_to_num(np.asarray(signals, dtype=float))
+    active = np.abs(signals).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(active > 0, gross * signals / active, 0.0)
+
+
+def sma_crossover(closes: np.ndarray, fast: int = 20, slow: int = 50) -> np.ndarray:
+    """Largo a partes iguales en los activos con la media móvil rápida por encima de la lenta."""
+    prices = ffill_rows(np.asarray(closes, dtype=float))
+    with np.errstate(invalid="ignore"):
+        signals = rolling_rows(prices, int(fast)) > rolling_rows(prices, int(slow))
+    return signal_weights(signals)
+
+
+def momentum(closes: np.ndarray, lookback: int = 126, top: int = 10, every: int = 21) -> np.ndarray:
+    """Cada every barras, largo a partes iguales en los top activos con mayor rentabilidad en lookback barras."""
+    prices = ffill_rows(np.asarray(closes, dtype=float))
+    past = np.full_like(prices, np.nan)
+    past[lookback:] = prices[:-lookback] if lookback else prices
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = prices / past
+    score = np.where(np.isnan(ratio), -np.inf, ratio)
+    top = min(int(top), prices.shape[1])
+    rank = np.argsort(np.argsort(-score, axis=1, kind="stable"), axis=1)
+    weights = signal_weights((rank < top) & np.isfinite(score))
+    weights[np.arange(len(weights)) % every != 0] = np.nan
+    return weights
+
+
+def parameter_grid(grid: Dict[str, Sequence]) -> List[dict]:
+    """Todas las combinaciones de una rejilla {parámetro: valores}."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+# Estado de cada proceso trabajador del barrido (se rellena una vez en _init_worker)
+_worker = {}
+
+
+def _init_worker(closes_spec, days, strategy, options):
+    _worker.clear()
+    shm, closes = attach(closes_spec)
+    _worker.update(blocks=[shm], closes=closes, days=days, strategy=strategy, options=options)
+
+
+def _evaluate(combos):
+    """Métricas de cada (índice, parámetros) del bloque; los errores se devuelven por índice."""
+    closes, days, strategy, options = _worker["closes"], _worker["days"], _worker["strategy"], _worker["options"]
+    results, errors = [], {}
+    for i, params in combos:
+        try:
+            weights = np.asarray(strategy(closes, **params), dtype=np.float64)
+            if weights.shape != closes.shape:
+                raise ValueError(f"La estrategia devolvió pesos de forma {weights.shape}; se esperaba {closes.shape}")
+            _, turnover, costs, equity = _run(closes, weights, **options)
+            results.append((i, _metrics(equity, days, turnover, costs, options["initial_capital"])))
+        except Exception as e:
+            errors[i] = str(e)
+    return results, errors
+
+
+class BacktestSweep:
+    """
+    Barrido de una rejilla de parámetros de una estrategia en un pool de procesos.
+
+    strategy es una función de módulo (cierres (T, N), **parámetros) -> pesos (T, N),
+    p. ej. sma_crossover. processes=0 ejecuta todo en el propio proceso (mismo
+    resultado). Las combinaciones que fallan quedan con métricas NaN y su error en errors.
+    """
+    def __init__(self, strategy: Callable, processes=None, cost_bps: float = 0.0, lag: int = 1,
+                 initial_capital: float = 1.0, chunks_per_process=4):
+        self.strategy = strategy
+        self.processes = multiprocessing.cpu_count() if processes is None else processes
+        self.options = {"cost_bps": cost_bps, "lag": lag, "initial_capital": initial_capital}
+        self.chunks_per_process = chunks_per_process
+        self.errors = {}
+
+    @instrumented("backtest")
+    def run(self, dates, closes, grid) -> pd.DataFrame:
+        """
+        Métricas de cada combinación (una fila por combinación: sus parámetros y METRICS).
+        grid es un dict {parámetro: valores} o una lista de dicts de parámetros.
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        if closes.ndim != 2 or len(dates) != len(closes):
+            raise ValueError("closes debe tener forma (n_fechas, n_activos) y una fecha por fila.")
+        combos = parameter_grid(grid) if isinstance(grid, dict) else [dict(p) for p in grid]
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        metrics = np.full((len(combos), len(METRICS)), np.nan)
+        indexed = list(enumerate(combos))
+        n_chunks = max(1, self.processes * self.chunks_per_process)
+        chunks = [indexed[k::n_chunks] for k in range(n_chunks) if indexed[k::n_chunks]]
+        shared = SharedArray(closes.shape, source=closes)
+        initargs = (shared.spec, days, self.strategy, self.options)
+        try:
+            if self.processes:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=self.processes, mp_context=ctx,
+                                         initializer=_init_worker, initargs=initargs) as executor:
+                    results = list(executor.map(_evaluate, chunks))
+            else:
+                _init_worker(*initargs)
+                try:
+                    results = [_evaluate(c) for c in chunks]
+                finally:
+                    for block in _worker.pop("blocks", []):
+                        block.close()
+                    _worker.clear()
+        finally:
+            shared.close()
+        self.errors = {}
+        for rows, errors in results:
+            for i, values in rows:
+                metrics[i] = values
+            self.errors.update(errors)
+        count("backtest_combinations", len(combos), stage="backtest")
+        frame = pd.DataFrame(combos, index=range(len(combos)))
+        frame[list(METRICS)] = metrics
+        frame["n_rebalances"] = frame["n_rebalances"].astype("Int64")
+        return frame
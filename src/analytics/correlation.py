@@ -0,0 +1,183 @@
+"""
+Correlaciones y covarianzas de universos grandes sobre rendimientos logarítmicos
+alineados por fecha.
+
+Los rendimientos son una matriz (T, N) con NaN donde un activo no cotiza. Todo se
+calcula con productos de matrices sobre los datos con los NaN a cero y una máscara
+de observaciones válidas, lo que da exactamente la correlación "pairwise-complete"
+(cada par usa solo las fechas en las que ambos activos tienen dato).
+
+La matriz N×N puede generarse por bloques (tiles de block_size columnas), de modo
+que la memoria de trabajo es O(T·block_size + block_size²) y el resultado puede
+escribirse en un array en disco (np.memmap). top_k_pairs recorre los mismos bloques
+sin guardar la matriz completa.
+"""
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 512
+
+
+def log_returns(closes):
+    """
+    Rendimientos logarítmicos diarios de una matriz de cierres (T, N) alineada por
+    fecha (p. ej. Portfolio.aligned_closes). Si falta el cierre de un día, los
+    rendimientos que lo usan son NaN. Devuelve (T-1, N).
+    """
+    closes = np.asarray(closes, dtype=float)
+    if closes.ndim == 1:
+        closes = closes[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(np.where(closes > 0, closes, np.nan))
+    return np.diff(logs, axis=0)
+
+
+def ewma_weights(n_obs, halflife):
+    """Pesos exponenciales (el más reciente pesa 1) con la vida media indicada en días."""
+    if halflife <= 0:
+        raise ValueError("halflife debe ser positivo.")
+    decay = 0.5 ** (1.0 / halflife)
+    return decay ** np.arange(n_obs - 1, -1, -1, dtype=float)
+
+
+class _Prepared:
+    """Rendimientos centrados con NaN a cero, máscara y pesos, listos para los productos."""
+    def __init__(self, returns, halflife=None):
+        returns = np.asarray(returns, dtype=float)
+        if returns.ndim != 2:
+            raise ValueError("Los rendimientos deben ser una matriz (T, N).")
+        mask = np.isfinite(returns)
+        self.weights = np.ones(returns.shape[0]) if halflife is None else ewma_weights(returns.shape[0], halflife)
+        self.ddof = 1 if halflife is None else 0
+        # Centrar por la media de cada columna no cambia la covarianza y reduce la cancelación numérica
+        counts = mask.sum(axis=0)
+        means = np.divide(np.where(mask, returns, 0.0).sum(axis=0), counts, out=np.zeros(returns.shape[1]),
+                          where=counts > 0)
+        self.X = np.where(mask, returns - means, 0.0)
+        self.M = mask.astype(float)
+        self.n_assets = returns.shape[1]
+
+    def block(self, cols):
+        X, M = self.X[:, cols], self.M[:, cols]
+        return X, M, X * self.weights[:, None], M * self.weights[:, None]
+
+
+def _tile(prep, rows, cols, min_periods, kind):
+    """Correlación (o covarianza) pairwise-complete entre las columnas rows y cols."""
+    Xa, Ma, WXa, WMa = prep.block(rows)
+    Xb, Mb, _, _ = prep.block(cols)
+    n = Ma.T @ Mb                        # observaciones comunes de cada par
+    w = WMa.T @ Mb                       # peso total de las observaciones comunes
+    sa = WXa.T @ Mb                      # suma de a sobre las fechas comunes
+    sb = WMa.T @ Xb                      # suma de b sobre las fechas comunes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (WXa.T @ Xb - sa * sb / w) / (w - prep.ddof)
+        if kind == "cov":
+            out = cov
+        else:
+            var_a = ((WXa * Xa).T @ Mb - sa**2 / w) / (w - prep.ddof)
+            var_b = (WMa.T @ (Xb * Xb) - sb**2 / w) / (w - prep.ddof)
+            out = np.clip(cov / np.sqrt(var_a * var_b), -1.0, 1.0)
+    out[n < max(min_periods, prep.ddof + 1)] = np.nan
+    return out
+
+
+def _blocks(n, block_size):
+    block_size = max(1, int(block_size or n))
+    return [slice(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+
+
+def iter_correlation_tiles(returns, block_size=DEFAULT_BLOCK_SIZE, min_periods=2, halflife=None, kind="corr",
+                           upper=False):
+    """
+    Genera (filas, columnas, tile) con los bloques de la matriz N×N.
+    kind: "corr" o "cov". Con upper=True solo se generan los bloques con
+    columnas >= filas (la matriz es simétrica). halflife activa la variante EWMA.
+    """
+    if kind not in ("corr", "cov"):
+        raise ValueError(f"Tipo no válido: {kind}. Opciones: corr, cov")
+    prep = returns if isinstance(returns, _Prepared) else _Prepared(returns, halflife)
+    blocks = _blocks(prep.n_assets, block_size)
+    for i, rows in enumerate(blocks):
+        for cols in (blocks[i:] if upper else blocks):
+            yield rows, cols, _tile(prep, rows, cols, min_periods, kind)
+
+
+def correlation_matrix(returns, block_size=None, min_periods=2, halflife=None, out=None, kind="corr"):
+    """
+    Matriz de correlación (o covarianza con kind="cov") pairwise-complete N×N.
+    Con block_size se calcula por bloques; out permite pasar el array de destino
+    (p. ej. un np.memmap float32) para universos que no caben en memoria.
+    """
+    prep = _Prepared(returns, halflife)
+    n = prep.n_assets
+    if out is None:
+        out = np.empty((n, n))
+    for rows, cols, tile in iter_correlation_tiles(prep, block_size, min_periods, kind=kind, upper=True):
+        out[rows, cols] = tile
+        out[cols, rows] = tile.T
+    return out
+
+
+def covariance_matrix(returns, block_size=None, min_periods=2, halflife=None, out=None):
+    """Matriz de covarianza pairwise-complete (EWMA si se indica halflife)."""
+    return correlation_matrix(returns, block_size, min_periods, halflife, out, kind="cov")
+
+
+def cov_to_corr(cov):
+    """Convierte una matriz de covarianza en la de correlación."""
+    cov = np.asarray(cov, dtype=float)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.clip(cov / np.outer(std, std), -1.0, 1.0)
+
+
+def ledoit_wolf(returns):
+    """
+    Covarianza con shrinkage de Ledoit-Wolf hacia la identidad escalada.
+    Los datos ausentes se tratan como rendimiento igual a la media del activo.
+    Devuelve (covarianza, intensidad del shrinkage en [0, 1]).
+    """
+    X = _Prepared(returns).X
+    n, p = X.shape
+    if n < 2:
+        raise ValueError("No hay suficientes observaciones para estimar la covarianza.")
+    emp_cov = X.T @ X / n
+    mu = np.trace(emp_cov) / p
+    X2 = X**2
+    beta_ = (X2.T @ X2).sum() / n
+    delta_ = np.square(emp_cov).sum()
+    beta = (beta_ - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * np.trace(emp_cov) + p * mu**2) / p
+    shrinkage = 0.0 if delta <= 0 else float(min(max(beta, 0.0), delta) / delta)
+    cov = (1 - shrinkage) * emp_cov
+    cov[np.diag_indices(p)] += shrinkage * mu
+    return cov, shrinkage
+
+
+def top_k_pairs(returns, k=10, block_size=DEFAULT_BLOCK_SIZE, min_periods=2, halflife=None, absolute=False,
+                labels=None):
+    """
+    Los k pares (i, j) con mayor correlación (o mayor |correlación| con absolute=True),
+    sin materializar la matriz completa: se recorren los bloques del triángulo superior
+    y solo se conservan los k mejores candidatos. Devuelve [(i, j, corr)] ordenado de
+    mayor a menor, con etiquetas en lugar de índices si se pasan labels.
+    """
+    best_i = np.empty(0, dtype=int)
+    best_j = np.empty(0, dtype=int)
+    best_v = np.empty(0)
+    for rows, cols, tile in iter_correlation_tiles(returns, block_size, min_periods, halflife, upper=True):
+        ii, jj = np.meshgrid(np.arange(rows.start, rows.stop), np.arange(cols.start, cols.stop), indexing="ij")
+        keep = (jj > ii) & np.isfinite(tile)
+        values = tile[keep]
+        score = np.abs(values) if absolute else values
+        cand_i = np.concatenate([best_i, ii[keep]])
+        cand_j = np.concatenate([best_j, jj[keep]])
+        cand_v = np.concatenate([best_v, values])
+        cand_s = np.concatenate([np.abs(best_v) if absolute else best_v, score])
+        if len(cand_s) > k:
+            idx = np.argpartition(-cand_s, k - 1)[:k]
+            cand_i, cand_j, cand_v = cand_i[idx], cand_j[idx], cand_v[idx]
+        best_i, best_j, best_v = cand_i, cand_j, cand_v
+    order = np.argsort(-(np.abs(best_v) if absolute else best_v), kind="stable")
+    names = (lambda x: labels[x]) if labels is not None else int
+    return [(names(best_i[o]), names(best_j[o]), float(best_v[o])) for o in order]
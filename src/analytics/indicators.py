@@ -0,0 +1,409 @@
+"""
+Indicadores técnicos (EMA, SMA, RSI, MACD, Bollinger, ATR, OBV) de muchos tickers a la vez.
+
+Los datos se organizan en un Panel: una matriz (T, N) por campo OHLCV, con las fechas
+en filas, los tickers en columnas y NaN donde un ticker no tiene dato. Cada indicador
+se calcula para todas las columnas a la vez: las medias exponenciales con un filtro
+recursivo (scipy.signal.lfilter a lo largo de las filas) y las móviles con sumas
+acumuladas.
+
+IndicatorEngine memoiza los resultados intermedios: la EMA de 12 del MACD, la media
+móvil de Bollinger o el cierre rellenado se calculan una vez y se reutilizan en las
+siguientes peticiones. Cada intermedio sabe también calcular una fila nueva a partir
+de las anteriores, así que append(fecha, barra) actualiza todos los indicadores ya
+pedidos en O(N), sin recalcular el histórico; una barra con la misma fecha que la
+última la sustituye (barra intradía en curso).
+"""
+from typing import Dict, Iterable, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from src.utils.instrumentation import instrumented
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class Panel:
+    """Campos OHLCV como matrices (T, N) alineadas por fecha (filas) y ticker (columnas)."""
+    def __init__(self, dates, tickers, fields: Dict[str, np.ndarray]):
+        self.dates = np.asarray(dates)
+        self.tickers = list(tickers)
+        shape = (len(self.dates), len(self.tickers))
+        self.fields = {}
+        for name, values in fields.items():
+            values = np.asarray(values, dtype=float)
+            if values.shape != shape:
+                raise ValueError(f"El campo {name} tiene forma {values.shape}; se esperaba {shape}")
+            self.fields[name] = values
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.fields[name]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, key: str = "ticker", date_col: str = "date") -> "Panel":
+        """
+        Panel de un DataFrame en formato largo (el de los extractores: date, open, high,
+        low, close, volume, ticker). Las fechas y los tickers se ordenan; si una fecha
+        de un ticker se repite, gana la última fila.
+        """
+        dates = pd.to_datetime(df[date_col])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        rows, date_values = pd.factorize(dates, sort=True)
+        if key in df.columns:
+            cols, tickers = pd.factorize(df[key], sort=True)
+        else:
+            cols, tickers = np.zeros(len(df), dtype=np.int64), [""]
+        shape = (len(date_values), len(tickers))
+        fields = {}
+        for name in FIELDS:
+            if name in df.columns:
+                values = np.full(shape, np.nan)
+                values[rows, cols] = df[name].to_numpy(dtype=float, na_value=np.nan)
+                fields[name] = values
+        return cls(np.asarray(date_values), list(tickers), fields)
+
+    @classmethod
+    def from_series(cls, series: Iterable) -> "Panel":
+        """Panel de una lista de PriceSeries."""
+        frames = [pd.DataFrame({
+            "date": [p.date for p in s.data],
+            **{name: [getattr(p, name) for p in s.data] for name in FIELDS},
+        }).assign(ticker=s.symbol) for s in series]
+        return cls.from_frame(pd.concat(frames, ignore_index=True))
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        """Matriz (T, N) de un indicador como DataFrame con fechas en el índice y tickers en columnas."""
+        return pd.DataFrame(values, index=pd.Index(self.dates[:len(values)], name="date"), columns=self.tickers)
+
+
+class _Rows:
+    """Matriz que crece por filas (capacidad que se duplica) para añadir barras en O(N) amortizado."""
+    def __init__(self, values: np.ndarray):
+        self.data = np.ascontiguousarray(values, dtype=float)
+        self.n = len(values)
+
+    @property
+    def values(self) -> np.ndarray:
+        view = self.data[:self.n]
+        view.flags.writeable = False
+        return view
+
+    def append(self, row: np.ndarray) -> None:
+        if self.n == len(self.data):
+            grown = np.empty((max(16, 2 * len(self.data)),) + self.data.shape[1:])
+            grown[:self.n] = self.data[:self.n]
+            self.data = grown
+        self.data[self.n] = row
+        self.n += 1
+
+    def pop(self) -> None:
+        self.n -= 1
+
+
+def ffill_rows(values: np.ndarray) -> np.ndarray:
+    """Rellena hacia delante los NaN de cada columna (los anteriores al primer dato se quedan en NaN)."""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = values[index, np.arange(values.shape[1])]
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def ema_rows(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Media exponencial y_t = alpha x_t + (1 - alpha) y_{t-1} de cada columna, iniciada en su
+    primer dato (como pandas ewm(adjust=False)). Los NaN anteriores al primer dato se
+    mantienen; values no debe tener NaN después (usar ffill_rows).
+    """
+    if not len(values):
+        return values.copy()
+    valid = ~np.isnan(values)
+    started = np.maximum.accumulate(valid, axis=0)
+    x0 = values[valid.argmax(axis=0), np.arange(values.shape[1])]
+    x0 = np.where(started[-1], x0, 0.0)
+    # Antes del primer dato se repite ese valor: la recursión queda en él hasta que empieza la serie
+    x = np.where(started, values, x0)
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], x, axis=0, zi=((1.0 - alpha) * x0)[None, :])
+    out[~started] = np.nan
+    return out
+
+
+def rolling_rows(values: np.ndarray, window: int, kind: str = "mean") -> np.ndarray:
+    """
+    Media ("mean") o desviación típica poblacional ("std") móvil de window filas en cada
+    columna con sumas acumuladas (centradas por la media de la columna para limitar la
+    cancelación). NaN si la ventana tiene algún NaN.
+    """
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        center = np.nanmean(values, axis=0) if valid.any() else np.zeros(values.shape[1])
+    centered = np.where(valid, values - np.nan_to_num(center), 0.0)
+
+    def window_sum(x):
+        c = np.cumsum(x, axis=0)
+        out = c.copy()
+        out[window:] -= c[:-window]
+        return out
+
+    count = window_sum(valid.astype(float))
+    mean = window_sum(centered) / window
+    if kind == "mean":
+        out = mean + np.nan_to_num(center)
+    else:
+        out = np.sqrt(np.maximum(window_sum(centered * centered) / window - mean * mean, 0.0))
+    out[count < window] = np.nan
+    return out
+
+
+# --- Intermedios: clave (tipo, *argumentos) -> cálculo completo y cálculo de la fila t ---
+
+def _batch_ffill(engine, src):
+    return ffill_rows(engine.values(src))
+
+
+def _step_ffill(engine, t, src):
+    x, prev = engine.row(src, t), engine.row(("ffill", src), t - 1)
+    return np.where(np.isnan(x), prev, x)
+
+
+def _batch_ema(engine, src, alpha):
+    return ema_rows(engine.values(src), alpha)
+
+
+def _step_ema(engine, t, src, alpha):
+    x, prev = engine.row(src, t), engine.row(("ema", src, alpha), t - 1)
+    return np.where(np.isnan(prev), x, alpha * x + (1.0 - alpha) * prev)
+
+
+def _batch_count(engine, src):
+    return np.cumsum(~np.isnan(engine.values(src)), axis=0).astype(float)
+
+
+def _step_count(engine, t, src):
+    return np.nan_to_num(engine.row(("count", src), t - 1)) + ~np.isnan(engine.row(src, t))
+
+
+def _batch_rolling(engine, src, window, kind):
+    return rolling_rows(engine.values(src), window, kind)
+
+
+def _step_rolling(engine, t, src, window, kind):
+    if t + 1 < window:
+        return np.full(engine.n_tickers, np.nan)
+    x = engine.values(src)[t + 1 - window:t + 1]
+    return x.mean(axis=0) if kind == "mean" else x.std(axis=0)
+
+
+def _batch_diff(engine, src):
+    x = engine.values(src)
+    return np.vstack([np.full((min(1, len(x)), x.shape[1]), np.nan), np.diff(x, axis=0)])
+
+
+def _step_diff(engine, t, src):
+    return engine.row(src, t) - engine.row(src, t - 1)
+
+
+def _combine(kind, a, b, k=1.0):
+    """Operaciones elemento a elemento entre intermedios."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if kind == "add":
+            return a + k * b
+        if kind == "gain":
+            return np.maximum(a, 0.0)
+        if kind == "loss":
+            return np.maximum(-a, 0.0)
+        if kind == "rsi":
+            return np.where(b == 0, np.where(a == 0, 50.0, 100.0), 100.0 - 100.0 / (1.0 + a / b))
+        if kind == "true_range":
+            high, low, prev_close = a
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+            return np.where(np.isnan(high - low), np.nan, tr)
+    raise ValueError(f"Operación no válida: {kind}")
+
+
+def _batch_map(engine, kind, a, b=None, k=1.0):
+    return _combine(kind, engine.values(a), None if b is None else engine.values(b), k)
+
+
+def _step_map(engine, t, kind, a, b=None, k=1.0):
+    return _combine(kind, engine.row(a, t), None if b is None else engine.row(b, t), k)
+
+
+def _batch_true_range(engine, high, low, close):
+    c = engine.values(close)
+    prev = np.vstack([np.full((min(1, len(c)), c.shape[1]), np.nan), c[:-1]])
+    return _combine("true_range", (engine.values(high), engine.values(low), prev), None)
+
+
+def _step_true_range(engine, t, high, low, close):
+    prev = engine.row(close, t - 1)
+    return _combine("true_range", (engine.row(high, t), engine.row(low, t), prev), None)
+
+
+def _batch_obv(engine, close, volume):
+    c, v = engine.values(close), engine.values(volume)
+    step = np.zeros_like(c)
+    step[1:] = np.nan_to_num(np.sign(np.diff(c, axis=0)) * v[1:])
+    out = np.cumsum(step, axis=0)
+    out[np.isnan(c)] = np.nan
+    return out
+
+
+def _step_obv(engine, t, close, volume):
+    c, prev_c = engine.row(close, t), engine.row(close, t - 1)
+    prev = engine.row(("obv", close, volume), t - 1)
+    out = np.nan_to_num(prev) + np.nan_to_num(np.sign(c - prev_c) * engine.row(volume, t))
+    return np.where(np.isnan(c), np.nan, out)
+
+
+def _batch_mask(engine, src, count, periods):
+    return np.where(engine.values(count) >= periods, engine.values(src), np.nan)
+
+
+def _step_mask(engine, t, src, count, periods):
+    return np.where(engine.row(count, t) >= periods, engine.row(src, t), np.nan)
+
+
+RULES = {
+    "ffill": (_batch_ffill, _step_ffill),
+    "ema": (_batch_ema, _step_ema),
+    "count": (_batch_count, _step_count),
+    "rolling": (_batch_rolling, _step_rolling),
+    "diff": (_batch_diff, _step_diff),
+    "map": (_batch_map, _step_map),
+    "true_range": (_batch_true_range, _step_true_range),
+    "obv": (_batch_obv, _step_obv),
+    "mask": (_batch_mask, _step_mask),
+}
+
+
+class IndicatorEngine:
+    """
+    Indicadores de todos los tickers de un Panel con intermedios memoizados y
+    actualización incremental. Los resultados son matrices (T, N) de solo lectura.
+    """
+    def __init__(self, panel: Panel):
+        self.panel = panel
+        self.tickers = list(panel.tickers)
+        self.n_tickers = len(self.tickers)
+        self._dates = list(panel.dates)
+        # Claves en orden de cálculo: cada intermedio va después de aquellos de los que depende
+        self._rows: Dict[tuple, _Rows] = {("field", name): _Rows(values) for name, values in panel.fields.items()}
+
+    @property
+    def dates(self) -> np.ndarray:
+        return np.asarray(self._dates)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def values(self, key: tuple) -> np.ndarray:
+        """Matriz (T, N) de un intermedio; se calcula (con sus dependencias) la primera vez."""
+        rows = self._rows.get(key)
+        if rows is None:
+            if key[0] == "field":
+                raise ValueError(f"El panel no tiene el campo {key[1]}")
+            batch, _ = RULES[key[0]]
+            values = batch(self, *key[1:])
+            rows = self._rows[key] = _Rows(values)
+        return rows.values
+
+    def row(self, key: tuple, t: int) -> np.ndarray:
+        """Fila t de un intermedio ya calculado (NaN para t < 0: antes de la primera barra)."""
+        if t < 0:
+            return np.full(self.n_tickers, np.nan)
+        return self._rows[key].data[t]
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        """Matriz (T, N) de un indicador como DataFrame con fechas en el índice y tickers en columnas."""
+        return pd.DataFrame(values, index=pd.Index(self.dates[:len(values)], name="date"), columns=self.tickers)
+
+    def append(self, date, bar: Dict[str, Sequence[float]]) -> None:
+        """
+        Añade una barra (un valor por ticker y campo, NaN si un ticker no tiene dato) y
+        calcula su fila en todos los intermedios ya pedidos. Si date es la fecha de la
+        última barra, la sustituye.
+        """
+        if self._dates and pd.Timestamp(date) == pd.Timestamp(self._dates[-1]):
+            for rows in self._rows.values():
+                rows.pop()
+            self._dates.pop()
+        elif self._dates and pd.Timestamp(date) < pd.Timestamp(self._dates[-1]):
+            raise ValueError(f"Las barras se añaden en orden: {date} es anterior a {self._dates[-1]}")
+        t = len(self._dates)
+        self._dates.append(np.datetime64(pd.Timestamp(date).to_datetime64()))
+        for key, rows in self._rows.items():
+            if key[0] == "field":
+                value = bar.get(key[1], np.nan)
+                rows.append(np.broadcast_to(np.asarray(value, dtype=float), (self.n_tickers,)))
+            else:
+                rows.append(RULES[key[0]][1](self, t, *key[1:]))
+
+    # --- Indicadores ---
+
+    def price(self, field: str = "close") -> tuple:
+        """Clave del campo rellenado hacia delante (los huecos interiores toman el último dato)."""
+        return ("ffill", ("field", field))
+
+    def sma(self, window: int, field: str = "close") -> np.ndarray:
+        return self.values(("rolling", self.price(field), int(window), "mean"))
+
+    def ema(self, span: int, field: str = "close") -> np.ndarray:
+        return self.values(("ema", self.price(field), 2.0 / (span + 1)))
+
+    def rsi(self, window: int = 14, field: str = "close") -> np.ndarray:
+        """RSI de Wilder (medias exponenciales con alpha = 1/window de subidas y bajadas)."""
+        change = ("diff", self.price(field))
+        gains = ("ema", ("map", "gain", change), 1.0 / window)
+        losses = ("ema", ("map", "loss", change), 1.0 / window)
+        return self.values(("mask", ("map", "rsi", gains, losses), ("count", change), window))
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(línea MACD, señal, histograma)."""
+        price = self.price("close")
+        line = ("map", "add", ("ema", price, 2.0 / (fast + 1)), ("ema", price, 2.0 / (slow + 1)), -1.0)
+        sig = ("ema", line, 2.0 / (signal + 1))
+        return self.values(line), self.values(sig), self.values(("map", "add", line, sig, -1.0))
+
+    def bollinger(self, window: int = 20, k: float = 2.0, field: str = "close"
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(media móvil, banda superior, banda inferior) a k desviaciones típicas."""
+        mid = ("rolling", self.price(field), int(window), "mean")
+        std = ("rolling", self.price(field), int(window), "std")
+        return (self.values(mid), self.values(("map", "add", mid, std, float(k))),
+                self.values(("map", "add", mid, std, -float(k))))
+
+    def atr(self, window: int = 14) -> np.ndarray:
+        """Average True Range de Wilder."""
+        tr = ("true_range", self.price("high"), self.price("low"), self.price("close"))
+        return self.values(("mask", ("ema", tr, 1.0 / window), ("count", tr), window))
+
+    def obv(self) -> np.ndarray:
+        """On-Balance Volume: volumen acumulado con el signo de la variación del cierre."""
+        return self.values(("obv", self.price("close"), ("field", "volume")))
+
+    def latest(self) -> pd.DataFrame:
+        """Último valor de los indicadores por defecto de cada ticker (una fila por ticker)."""
+        line, sig, hist = self.macd()
+        mid, upper, lower = self.bollinger()
+        columns = {
+            "close": self.values(self.price("close")), "sma_20": self.sma(20), "ema_20": self.ema(20),
+            "rsi_14": self.rsi(14), "macd": line, "macd_signal": sig, "macd_hist": hist,
+            "bb_mid": mid, "bb_upper": upper, "bb_lower": lower,
+        }
+        if ("field", "high") in self._rows and ("field", "low") in self._rows:
+            columns["atr_14"] = self.atr(14)
+        if ("field", "volume") in self._rows:
+            columns["obv"] = self.obv()
+        if not len(self):
+            return pd.DataFrame(columns=list(columns), index=pd.Index(self.tickers, name="ticker"))
+        return pd.DataFrame({name: values[-1] for name, values in columns.items()},
+                            index=pd.Index(self.tickers, name="ticker"))
+
+
+@instrumented("indicators")
+def compute_indicators(df: pd.DataFrame, key: str = "ticker", date_col: str = "date") -> pd.DataFrame:
+    """Último valor de los indicadores por defecto de cada ticker de un DataFrame en formato largo."""
+    return IndicatorEngine(Panel.from_frame(df, key=key, date_col=date_col)).latest()
@@ -0,0 +1,139 @@
+"""
+Volatilidad implícita, griegas y superficies de volatilidad de cadenas de opciones.
+
+Las cadenas en formato largo (una fila por contrato, ver extractors/yahoo_options) de
+uno o muchos tickers se resuelven en una sola llamada vectorizada: todos los
+contratos a la vez, sin bucles por vencimiento ni por ticker.
+"""
+from datetime import date
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.simulation.black_scholes import greeks, implied_volatility
+from src.utils.instrumentation import instrumented
+
+DAYS_PER_YEAR = 365.0
+GREEKS = ("delta", "gamma", "vega", "theta", "rho")
+
+
+def market_prices(chain: pd.DataFrame) -> np.ndarray:
+    """Precio medio bid/ask si ambos son positivos; si no, el último precio negociado."""
+    last = chain["last_price"].to_numpy(dtype=float) if "last_price" in chain else np.full(len(chain), np.nan)
+    if "bid" not in chain or "ask" not in chain:
+        return last
+    bid = chain["bid"].to_numpy(dtype=float)
+    ask = chain["ask"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where((bid > 0) & (ask > 0), (bid + ask) / 2, last)
+
+
+@instrumented("options")
+def enrich_chain(chain: pd.DataFrame, rate: float = 0.0, dividend_yield=0.0, as_of=None,
+                 spot=None) -> pd.DataFrame:
+    """
+    Añade a la cadena el plazo en años (ACT/365 hasta el vencimiento), el precio de
+    mercado, la moneyness (strike / spot), la volatilidad implícita y las griegas de
+    Black-Scholes de cada contrato. spot es un escalar, un dict ticker -> precio o None
+    (columna underlying_price). dividend_yield admite también un dict por ticker.
+    """
+    as_of = np.datetime64(pd.Timestamp(as_of or date.today()).date(), "D")
+    out = chain.reset_index(drop=True).copy()
+    tickers = out["ticker"] if "ticker" in out else pd.Series("", index=out.index)
+    if spot is None:
+        S = out["underlying_price"].to_numpy(dtype=float)
+    elif isinstance(spot, dict):
+        S = tickers.map(spot).to_numpy(dtype=float, na_value=np.nan)
+    else:
+        S = np.full(len(out), float(spot))
+    q = (tickers.map(dividend_yield).fillna(0.0).to_numpy(dtype=float) if isinstance(dividend_yield, dict)
+         else float(dividend_yield))
+    K = out["strike"].to_numpy(dtype=float)
+    expiry = out["expiry"].to_numpy().astype("datetime64[D]")
+    T = (expiry - as_of).astype(float) / DAYS_PER_YEAR
+    price = market_prices(out)
+    kind = out["kind"].to_numpy(dtype=str)
+    iv = implied_volatility(price, S, K, T, kind, r=rate, q=q)
+    out["T"] = T
+    out["market_price"] = price
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["moneyness"] = K / S
+    out["iv"] = iv
+    for name, values in greeks(S, K, T, iv, kind, r=rate, q=q).items():
+        out[name] = values
+    return out
+
+
+def _otm(frame: pd.DataFrame) -> pd.DataFrame:
+    """Contratos con volatilidad implícita fuera del dinero: calls con strike >= spot y puts con strike < spot."""
+    frame = frame[np.isfinite(frame["iv"].to_numpy(dtype=float))]
+    call = frame["kind"].to_numpy() == "call"
+    above = frame["moneyness"].to_numpy(dtype=float) >= 1
+    return frame[call == above]
+
+
+def _grid_surface(frame: pd.DataFrame, grid, keys) -> pd.DataFrame:
+    """
+    Interpolación lineal de la volatilidad en la rejilla de moneyness para todos los
+    grupos (keys) a la vez: una sola ordenación por (grupo, moneyness) y un
+    searchsorted de todos los puntos de todos los grupos.
+    """
+    grid = np.asarray(grid, dtype=float)
+    index = pd.MultiIndex.from_frame(frame[keys]) if len(keys) > 1 else pd.Index(frame[keys[0]])
+    codes, groups = index.factorize(sort=True)
+    groups = groups.set_names(keys if len(keys) > 1 else keys[0])
+    x = frame["moneyness"].to_numpy(dtype=float)
+    y = frame["iv"].to_numpy(dtype=float)
+    if not len(x):
+        return pd.DataFrame(columns=grid, index=groups)
+    low = min(x.min(), grid.min())
+    width = max(x.max(), grid.max()) - low + 1
+    key = codes * width + (x - low)
+    order = np.argsort(key, kind="stable")
+    key, y, codes = key[order], y[order], codes[order]
+    group_ids = np.arange(len(groups))[:, None]
+    target = group_ids * width + (grid - low)
+    right = np.searchsorted(key, target)
+    left = right - 1
+    n = len(key)
+    right_ok = right < n
+    right_c = np.minimum(right, n - 1)
+    left_c = np.maximum(left, 0)
+    exact = right_ok & (key[right_c] == target) & (codes[right_c] == group_ids)
+    inside = (left >= 0) & right_ok & (codes[left_c] == group_ids) & (codes[right_c] == group_ids)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = (target - key[left_c]) / (key[right_c] - key[left_c])
+        values = np.where(inside, y[left_c] + weight * (y[right_c] - y[left_c]), np.nan)
+    values = np.where(exact, y[right_c], values)
+    return pd.DataFrame(values, index=groups, columns=grid)
+
+
+def volatility_surface(enriched: pd.DataFrame, ticker=None, otm_only: bool = True,
+                       moneyness: Optional[Sequence[float]] = None) -> pd.DataFrame:
+    """
+    Superficie de volatilidad implícita de un ticker: filas por vencimiento y columnas
+    por strike, o por moneyness si se da una rejilla (interpolación lineal en cada
+    vencimiento, NaN fuera del rango cotizado). Con otm_only se usan las calls con
+    strike >= spot y las puts con strike < spot (las más líquidas).
+    """
+    frame = enriched if ticker is None else enriched[enriched["ticker"] == ticker]
+    frame = _otm(frame) if otm_only else frame[np.isfinite(frame["iv"].to_numpy(dtype=float))]
+    if moneyness is None:
+        return frame.pivot_table(index="expiry", columns="strike", values="iv", aggfunc="mean").sort_index()
+    return _grid_surface(frame, moneyness, ["expiry"])
+
+
+def build_surfaces(chains: Dict[str, pd.DataFrame], rate: float = 0.0, dividend_yield=0.0, as_of=None,
+                   moneyness: Optional[Sequence[float]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Superficies de varios tickers: todas las cadenas se enriquecen en una única llamada
+    vectorizada y, con rejilla de moneyness, se interpolan todas a la vez.
+    """
+    frames = [chain for chain in chains.values() if len(chain)]
+    if not frames:
+        return {}
+    enriched = enrich_chain(pd.concat(frames, ignore_index=True), rate=rate, dividend_yield=dividend_yield,
+                            as_of=as_of)
+    if moneyness is None:
+        return {ticker: volatility_surface(group) for ticker, group in enriched.groupby("ticker", sort=False)}
+    surfaces = _grid_surface(_otm(enriched), moneyness, ["ticker", "expiry"])
+    return {ticker: surface.droplevel("ticker") for ticker, surface in surfaces.groupby(level="ticker", sort=False)}
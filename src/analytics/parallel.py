@@ -0,0 +1,237 @@
+"""
+Análisis por ticker en paralelo con procesos y memoria compartida.
+
+La matriz de cierres alineada por fecha (T, N) se copia una sola vez a un bloque de
+multiprocessing.shared_memory. Los procesos trabajadores se conectan a ese bloque al
+arrancar y escriben sus resultados (métricas y, opcionalmente, trayectorias de Monte
+Carlo) directamente en arrays de salida también compartidos, así que entre procesos
+solo viajan descriptores e índices de columnas, nunca DataFrames ni arrays grandes.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional
+import numpy as np
+from src.simulation.cache import SimulationCache
+from src.simulation.models import StochasticModel, GBMModel
+from src.simulation.montecarlo import MonteCarloSimulator
+from src.variables import TRADING_DAYS_PER_YEAR
+
+# Columnas de la matriz de métricas (una fila por ticker)
+METRICS = (
+    "n_obs", "last_close", "mean", "stdev", "total_return", "annualized_return", "volatility", "max_drawdown",
+    "mc_mean", "mc_p05", "mc_p50", "mc_p95",
+)
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Descriptor (picklable) de un array en memoria compartida."""
+    name: str
+    shape: tuple
+    dtype: str
+
+
+class SharedArray:
+    """Array numpy sobre un bloque de shared_memory creado (y liberado) por el proceso padre."""
+    def __init__(self, shape, dtype=np.float64, source=None):
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        if source is not None:
+            self.array[...] = source
+        self.spec = SharedArraySpec(self._shm.name, tuple(shape), dtype.str)
+
+    def close(self):
+        """Libera el bloque (las vistas numpy dejan de ser válidas)."""
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+def attach(spec: SharedArraySpec):
+    """Se conecta a un array compartido; devuelve (bloque, array). El bloque debe mantenerse vivo."""
+    shm = shared_memory.SharedMemory(name=spec.name)
+    return shm, np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+
+@dataclass
+class AnalyticsResult:
+    """Métricas (N, len(METRICS)) y trayectorias (N, keep_paths, n_days+1) o None, por ticker."""
+    symbols: list
+    metrics: np.ndarray
+    simulations: Optional[np.ndarray] = None
+
+    def metric(self, name):
+        return self.metrics[:, METRICS.index(name)]
+
+    def to_frame(self):
+        """Métricas como DataFrame (una fila por ticker)."""
+        import pandas as pd
+        frame = pd.DataFrame(self.metrics, index=self.symbols, columns=list(METRICS))
+        frame["n_obs"] = frame["n_obs"].astype(int)
+        return frame
+
+
+def series_metrics(closes, days):
+    """
+    Métricas de un ticker a partir de sus cierres válidos y sus fechas (días desde una
+    época común), con las mismas definiciones que PriceSeries.
+    """
+    out = np.full(8, np.nan)
+    n = len(closes)
+    out[0] = n
+    if n == 0:
+        return out
+    out[1] = closes[-1]
+    out[2] = closes.mean()
+    peaks = np.maximum.accumulate(closes)
+    out[7] = abs(min(0.0, ((closes - peaks) / peaks).min()))
+    if n < 2:
+        return out
+    out[3] = closes.std(ddof=1)
+    out[4] = closes[-1] / closes[0] - 1
+    span_days = days[-1] - days[0]
+    if span_days:
+        out[5] = (out[4] + 1) ** (365 / span_days) - 1
+    prev, curr = closes[:-1], closes[1:]
+    valid = prev > 0
+    log_ret = np.log(curr[valid] / prev[valid])
+    if len(log_ret) >= 2:
+        out[6] = log_ret.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    return out
+
+
+# Estado de cada proceso trabajador (se rellena una vez en _init_worker)
+_worker = {}
+
+
+def _init_worker(closes_spec, days, metrics_spec, paths_spec, simulator):
+    _worker.clear()
+    blocks = []
+    for key, spec in (("closes", closes_spec), ("metrics", metrics_spec), ("paths", paths_spec)):
+        if spec is None:
+            _worker[key] = None
+            continue
+        shm, arr = attach(spec)
+        blocks.append(shm)
+        _worker[key] = arr
+    _worker["blocks"] = blocks
+    _worker["days"] = days
+    if simulator is not None and simulator.seed is None:
+        # Sin semilla, el generador llega copiado (con el mismo estado) a cada proceso:
+        # cada trabajador necesita su propia secuencia para no repetir los choques
+        simulator.rng = np.random.default_rng(np.random.SeedSequence())
+    _worker["simulator"] = simulator
+
+
+def _analyze_columns(columns):
+    """Calcula métricas y Monte Carlo de las columnas indicadas y los escribe en los arrays compartidos."""
+    closes, metrics, paths = _worker["closes"], _worker["metrics"], _worker["paths"]
+    days, simulator = _worker["days"], _worker["simulator"]
+    errors = {}
+    for j in columns:
+        column = closes[:, j]
+        valid = ~np.isnan(column)
+        series, series_days = column[valid], days[valid]
+        metrics[j, :8] = series_metrics(series, series_days)
+        if simulator is None or len(series) < 2:
+            continue
+        try:
+            sims = simulator.simulate_closes(series)
+        except Exception as e:
+            errors[int(j)] = str(e)
+            continue
+        final = sims[:, -1]
+        metrics[j, 8] = final.mean()
+        metrics[j, 9:12] = np.percentile(final, [5, 50, 95])
+        if paths is not None:
+            paths[j] = sims[:paths.shape[1]]
+    return errors
+
+
+class ParallelAnalytics:
+    """
+    Métricas y Monte Carlo por ticker en un pool de procesos sobre memoria compartida.
+
+    processes=0 ejecuta todo en el propio proceso (mismo resultado). keep_paths es el
+    número de trayectorias por ticker que se devuelven (0 = solo las métricas, que ya
+    incluyen percentiles del precio final). Con seed, cada ticker usa el mismo
+    generador derivado que MonteCarloSimulator (sin ella, cada proceso el suyo); con una SimulationCache (cache) los
+    trabajadores leen y escriben su nivel de disco y, si se devuelven todas las
+    trayectorias, quedan también en su memoria para reutilizarlas (p. ej. en la cartera).
+    """
+    def __init__(self, processes=None, n_simulations=1000, n_days=252, model: StochasticModel = None, seed=None,
+                 keep_paths=0, monte_carlo=True, cache: SimulationCache = None, chunks_per_process=4):
+        self.processes = multiprocessing.cpu_count() if processes is None else processes
+        self.n_simulations = n_simulations
+        self.n_days = n_days
+        self.model = model if model is not None else GBMModel()
+        self.seed = seed
+        self.keep_paths = min(keep_paths, n_simulations)
+        self.monte_carlo = monte_carlo
+        self.cache = cache
+        self.chunks_per_process = chunks_per_process
+        self.errors = {}
+
+    def _simulator(self, worker=False):
+        if not self.monte_carlo:
+            return None
+        cache = self.cache
+        if worker:
+            # Los trabajadores solo comparten el nivel de disco (escrituras atómicas)
+            cache = None
+            if self.cache is not None and self.cache.disk_dir:
+                cache = SimulationCache(max_entries=0, disk_dir=self.cache.disk_dir,
+                                        max_disk_bytes=self.cache.max_disk_bytes)
+        return MonteCarloSimulator(self.n_simulations, self.n_days, model=self.model, seed=self.seed, cache=cache)
+
+    def run(self, symbols, dates, closes) -> AnalyticsResult:
+        """
+        symbols: N tickers; dates: T fechas; closes: matriz (T, N) alineada con NaN donde
+        no hay dato (p. ej. Portfolio.aligned_closes()).
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        if closes.ndim != 2 or closes.shape[1] != len(symbols):
+            raise ValueError("closes debe tener forma (n_fechas, n_tickers).")
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        n = len(symbols)
+        shared = [SharedArray(closes.shape, source=closes), SharedArray((n, len(METRICS)))]
+        shared[1].array[:] = np.nan
+        if self.monte_carlo and self.keep_paths:
+            shared.append(SharedArray((n, self.keep_paths, self.n_days + 1)))
+        specs = [s.spec for s in shared] + [None] * (3 - len(shared))
+        initargs = (specs[0], days, specs[1], specs[2], self._simulator(worker=True))
+        chunks = [c for c in np.array_split(np.arange(n), max(1, self.processes * self.chunks_per_process)) if len(c)]
+        try:
+            if self.processes:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=self.processes, mp_context=ctx,
+                                         initializer=_init_worker, initargs=initargs) as executor:
+                    results = list(executor.map(_analyze_columns, chunks))
+            else:
+                _init_worker(*initargs)
+                try:
+                    results = [_analyze_columns(c) for c in chunks]
+                finally:
+                    for block in _worker.pop("blocks", []):
+                        block.close()
+                    _worker.clear()
+            self.errors = {symbols[j]: e for errors in results for j, e in errors.items()}
+            metrics = shared[1].array.copy()
+            paths = shared[2].array.copy() if len(shared) > 2 else None
+        finally:
+            for s in shared:
+                s.close()
+        if paths is not None and self.cache is not None and self.seed is not None \
+                and self.keep_paths == self.n_simulations:
+            simulator = self._simulator()
+            for j, symbol in enumerate(symbols):
+                if not np.isnan(metrics[j, METRICS.index("mc_mean")]):
+                    column = closes[:, j]
+                    self.cache.put(simulator.cache_key(column[~np.isnan(column)]), paths[j], disk=False)
+            # La caché comparte las trayectorias: de solo lectura, como las que devuelve
+            paths.setflags(write=False)
+        return AnalyticsResult(list(symbols), metrics, paths)
@@ -0,0 +1,227 @@
+"""
+Motor de reportes de carteras en una sola pasada.
+
+Las métricas de todos los activos (número de puntos, media y desviación típica de
+los cierres) se calculan de una vez sobre un único array con los cierres de todos
+ellos concatenados (np.add.reduceat por segmentos). Las métricas de cada cartera se
+agregan a partir de esa tabla (media y varianza combinadas), sin volver a recorrer
+los datos, y los reportes se renderizan desde ella en markdown, HTML o JSON.
+
+ReportEngine guarda la tabla entre llamadas, de modo que un lote de cientos de
+carteras que comparten activos calcula cada activo una sola vez.
+"""
+import html
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+import numpy as np
+from src.simulation.cache import hash_array
+
+FORMATS = ("markdown", "html", "json")
+EXTENSIONS = {"markdown": "md", "html": "html", "json": "json"}
+# Cierres por bloque en asset_metrics (~512 KB de float64)
+CHUNK_POINTS = 65_536
+
+
+@dataclass
+class AssetRow:
+    """Métricas de un activo dentro de un reporte."""
+    symbol: str
+    n_points: int
+    mean: float
+    stdev: float
+
+
+@dataclass
+class PortfolioReport:
+    """Métricas precalculadas de una cartera, listas para renderizar."""
+    name: str
+    n_assets: int
+    mean: float
+    volatility: float
+    assets: List[AssetRow] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    def to_markdown(self) -> str:
+        lines = [
+            f"# Reporte de Cartera: {self.name}\n",
+            f"**Número de activos:** {self.n_assets}\n",
+            f"**Media de precios:** {self.mean:.2f}",
+            f"**Volatilidad:** {self.volatility:.2f}",
+        ]
+        lines += [f"**ADVERTENCIA:** {w}\n" for w in self.warnings]
+        lines.append("\n## Activos\n")
+        lines += [f"- **{a.symbol}**: {a.n_points} puntos, media={a.mean:.2f}, volatilidad={a.stdev:.2f}"
+                  for a in self.assets]
+        return "\n".join(lines)
+
+    def to_html(self) -> str:
+        e = html.escape
+        rows = "\n".join(
+            f"<tr><td>{e(a.symbol)}</td><td>{a.n_points}</td><td>{a.mean:.2f}</td><td>{a.stdev:.2f}</td></tr>"
+            for a in self.assets
+        )
+        warnings = "\n".join(f'<p class="warning"><strong>ADVERTENCIA:</strong> {e(w)}</p>' for w in self.warnings)
+        return (
+            f"<h1>Reporte de Cartera: {e(self.name)}</h1>\n"
+            f"<p><strong>Número de activos:</strong> {self.n_assets}</p>\n"
+            f"<p><strong>Media de precios:</strong> {self.mean:.2f}</p>\n"
+            f"<p><strong>Volatilidad:</strong> {self.volatility:.2f}</p>\n"
+            f"{warnings}\n"
+            "<h2>Activos</h2>\n"
+            "<table>\n<tr><th>Activo</th><th>Puntos</th><th>Media</th><th>Volatilidad</th></tr>\n"
+            f"{rows}\n</table>\n"
+        )
+
+    def to_dict(self) -> dict:
+        """Diccionario serializable a JSON (NaN se convierte en None)."""
+        def num(x):
+            return None if isinstance(x, float) and math.isnan(x) else x
+        return {
+            "name": self.name,
+            "n_assets": self.n_assets,
+            "mean": num(self.mean),
+            "volatility": num(self.volatility),
+            "warnings": list(self.warnings),
+            "assets": [{"symbol": a.symbol, "n_points": a.n_points, "mean": num(a.mean), "stdev": num(a.stdev)}
+                       for a in self.assets],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def render(self, fmt="markdown") -> str:
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de reporte no válido: {fmt}. Opciones: {', '.join(FORMATS)}")
+        return {"markdown": self.to_markdown, "html": self.to_html, "json": self.to_json}[fmt]()
+
+
+def _segment_metrics(assets, counts):
+    """(media, m2) de un grupo de activos con sus cierres concatenados en un único array."""
+    closes = np.fromiter((p.close for a in assets for p in a.data), dtype=float, count=int(counts.sum()))
+    means = np.full(len(counts), np.nan)
+    m2 = np.zeros(len(counts))
+    nonempty = counts > 0
+    if closes.size:
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        means[nonempty] = np.add.reduceat(closes, starts) / counts[nonempty]
+        closes -= np.repeat(means[nonempty], counts[nonempty])
+        np.square(closes, out=closes)
+        m2[nonempty] = np.add.reduceat(closes, starts)
+    return means, m2
+
+
+def asset_metrics(assets, chunk_points=CHUNK_POINTS):
+    """
+    Métricas de varios activos en una sola pasada vectorizada (por bloques de como
+    mucho chunk_points cierres, para acotar la memoria con universos grandes).
+    Devuelve (n, media, m2) por activo, con m2 = suma de desviaciones al cuadrado.
+    """
+    counts = np.array([len(a.data) for a in assets], dtype=np.int64)
+    means = np.empty(len(counts))
+    m2 = np.empty(len(counts))
+    start = 0
+    while start < len(counts):
+        # Al menos un activo por bloque aunque supere chunk_points
+        stop = start + max(1, int(np.searchsorted(np.cumsum(counts[start:]), chunk_points, side="right")))
+        means[start:stop], m2[start:stop] = _segment_metrics(assets[start:stop], counts[start:stop])
+        start = stop
+    return counts, means, m2
+
+
+class ReportEngine:
+    """
+    Genera reportes de carteras desde una tabla de métricas por activo compartida.
+    Un activo (PriceSeries) se identifica por la huella de sus cierres, como en
+    SimulationCache: si se editan, sustituyen o alargan sus datos, se vuelve a calcular.
+    """
+    def __init__(self):
+        self._rows: Dict[str, int] = {}
+        self._n = np.empty(0, dtype=np.int64)
+        self._mean = np.empty(0)
+        self._m2 = np.empty(0)
+
+    @staticmethod
+    def _key(asset) -> str:
+        return hash_array(np.fromiter((p.close for p in asset.data), dtype=float, count=len(asset.data)))
+
+    def _ensure(self, assets) -> Dict[int, int]:
+        """
+        Calcula en una pasada las métricas de los activos que aún no están en la tabla.
+        Devuelve la fila de cada activo por id() (válido solo mientras dura la llamada).
+        """
+        keys = {}
+        for asset in assets:
+            if id(asset) not in keys:
+                keys[id(asset)] = self._key(asset)
+        missing, seen = [], set()
+        for asset in assets:
+            key = keys[id(asset)]
+            if key not in self._rows and key not in seen:
+                seen.add(key)
+                missing.append(asset)
+        if missing:
+            n, mean, m2 = asset_metrics(missing)
+            offset = len(self._n)
+            for i, asset in enumerate(missing):
+                self._rows[keys[id(asset)]] = offset + i
+            self._n = np.concatenate([self._n, n])
+            self._mean = np.concatenate([self._mean, mean])
+            self._m2 = np.concatenate([self._m2, m2])
+        return {asset_id: self._rows[key] for asset_id, key in keys.items()}
+
+    def _build(self, portfolio, rows) -> PortfolioReport:
+        idx = np.array([rows[id(a)] for a in portfolio.assets], dtype=np.int64)
+        n, mean, m2 = self._n[idx], self._mean[idx], self._m2[idx]
+        total = int(n.sum())
+        has = n > 0
+        # Media y varianza combinadas de todos los cierres de la cartera
+        pooled_mean = float((n[has] * mean[has]).sum() / total) if total else float("nan")
+        if total > 1:
+            pooled_m2 = m2[has].sum() + (n[has] * (mean[has] - pooled_mean) ** 2).sum()
+            volatility = float(np.sqrt(pooled_m2 / (total - 1)))
+        else:
+            volatility = float("nan")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stdev = np.where(n > 1, np.sqrt(m2 / np.maximum(n - 1, 1)), np.nan)
+        warnings = [] if portfolio.assets else ["La cartera no contiene activos."]
+        warnings += [f"El activo {a.symbol} tiene pocos datos." for a, k in zip(portfolio.assets, n) if k < 2]
+        rows = [AssetRow(a.symbol, int(k), float(m), float(s))
+                for a, k, m, s in zip(portfolio.assets, n, mean, stdev)]
+        return PortfolioReport(portfolio.name, len(portfolio.assets), pooled_mean, volatility, rows, warnings)
+
+    def report(self, portfolio) -> PortfolioReport:
+        """Métricas de una cartera (reutiliza las de los activos ya calculados)."""
+        return self._build(portfolio, self._ensure(portfolio.assets))
+
+    def reports(self, portfolios) -> List[PortfolioReport]:
+        """Métricas de un lote de carteras: la unión de sus activos se calcula en una sola pasada."""
+        portfolios = list(portfolios)
+        rows = self._ensure([a for p in portfolios for a in p.assets])
+        return [self._build(p, rows) for p in portfolios]
+
+    def render_batch(self, portfolios, fmt="markdown") -> Dict[str, str]:
+        """Renderiza un lote de carteras: {nombre de la cartera: texto}."""
+        return {r.name: r.render(fmt) for r in self.reports(portfolios)}
+
+    def write_batch(self, portfolios, output_dir, formats=("markdown",)) -> List[str]:
+        """Escribe un fichero por cartera y formato en output_dir. Devuelve las rutas."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths, used = [], set()
+        for i, report in enumerate(self.reports(portfolios)):
+            stem = _safe_filename(report.name) or f"cartera_{i}"
+            if stem in used:
+                stem = f"{stem}_{i}"
+            used.add(stem)
+            for fmt in formats:
+                path = os.path.join(output_dir, f"{stem}.{EXTENSIONS.get(fmt, fmt)}")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(report.render(fmt))
+                paths.append(path)
+        return paths
+
+
+def _safe_filename(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name).strip("_")
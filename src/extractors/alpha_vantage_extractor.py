@@ -2,7 +2,9 @@
 import pandas as pd
 import requests
 from .base import BaseExtractor
+from src.utils.corporate_actions import action_table
 from src.utils.data_cleaning import clean_dataframe
+from src.utils.instrumentation import count
 from src.variables import ALPHA_VANTAGE_API_KEY
 
 class AlphaVantageExtractor(BaseExtractor):
@@ -19,6 +21,7 @@ class AlphaVantageExtractor(BaseExtractor):
             "apikey": ALPHA_VANTAGE_API_KEY
         }
         response = requests.get(self.BASE_URL, params=params)
+        count("bytes_downloaded", len(response.content), stage="download")
         data = response.json().get("Time Series (Daily)", {})
         rows = []
         for date, values in data.items():
@@ -35,3 +38,19 @@ class AlphaVantageExtractor(BaseExtractor):
         df = df[(df["date"] >= start) & (df["date"] <= end)]
         df = clean_dataframe(df)
         return df
+
+    def get_corporate_actions(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """Dividendos (importe bruto por fecha ex) y splits de los endpoints DIVIDENDS y SPLITS."""
+        frames = {}
+        for function, date_key, value_key in (("DIVIDENDS", "ex_dividend_date", "amount"),
+                                              ("SPLITS", "effective_date", "split_factor")):
+            response = requests.get(self.BASE_URL, params={"function": function, "symbol": ticker,
+                                                           "apikey": ALPHA_VANTAGE_API_KEY})
+            count("bytes_downloaded", len(response.content), stage="download")
+            rows = response.json().get("data", [])
+            frames[function] = pd.DataFrame({
+                "date": [row.get(date_key) for row in rows],
+                "amount": pd.to_numeric([row.get(value_key) for row in rows], errors="coerce"),
+            }).dropna()
+        table = action_table(frames["DIVIDENDS"], frames["SPLITS"].rename(columns={"amount": "ratio"}), ticker=ticker)
+        return table[(table["date"] >= pd.Timestamp(start)) & (table["date"] <= pd.Timestamp(end))].reset_index(drop=True)
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 import pandas as pd
+from src.utils.corporate_actions import action_table
 
 class BaseExtractor(ABC):
     """
     Clase base para extractores de datos bursátiles.
     Todos los extractores deben implementar el método get_historical_prices,
-    que devuelve un DataFrame estandarizado.
+    que devuelve un DataFrame estandarizado con precios sin ajustar, y pueden
+    implementar get_corporate_actions para que el pipeline los ajuste.
     """
     @abstractmethod
     def get_historical_prices(self, ticker: str, start: str, end: str) -> pd.DataFrame:
@@ -17,3 +19,10 @@ class BaseExtractor(ABC):
         Devuelve un diccionario {ticker: DataFrame}
         """
         return {ticker: self.get_historical_prices(ticker, start, end) for ticker in tickers}
+
+    def get_corporate_actions(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        Splits y dividendos del ticker en formato estándar (ver utils/corporate_actions).
+        Por defecto no hay acciones: los precios se usan tal cual.
+        """
+        return action_table(ticker=ticker)
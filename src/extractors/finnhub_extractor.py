@@ -1,8 +1,11 @@
 
+import logging
 import pandas as pd
 import requests
 from .base import BaseExtractor
+from src.utils.corporate_actions import action_table
 from src.utils.data_cleaning import clean_dataframe
+from src.utils.instrumentation import count
 from src.variables import FINNHUB_API_KEY
 
 class FinnhubExtractor(BaseExtractor):
@@ -10,6 +13,8 @@ class FinnhubExtractor(BaseExtractor):
     Extractor de datos históricos desde Finnhub.
     """
     BASE_URL = "https://finnhub.io/api/v1/stock/candle"
+    SPLITS_URL = "https://finnhub.io/api/v1/stock/split"
+    DIVIDENDS_URL = "https://finnhub.io/api/v1/stock/dividend"
 
     def get_historical_prices(self, ticker: str, start: str, end: str) -> pd.DataFrame:
         params = {
@@ -20,6 +25,7 @@ class FinnhubExtractor(BaseExtractor):
             'token': FINNHUB_API_KEY
         }
         response = requests.get(self.BASE_URL, params=params)
+        count("bytes_downloaded", len(response.content), stage="download")
         data = response.json()
         if data.get('s') != 'ok':
             return pd.DataFrame()
@@ -34,3 +40,28 @@ class FinnhubExtractor(BaseExtractor):
         df['ticker'] = ticker
         df = clean_dataframe(df)
         return df
+
+    def get_corporate_actions(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """Splits (toFactor / fromFactor) y dividendos (importe bruto) del ticker entre start y end."""
+        params = {'symbol': ticker, 'from': pd.Timestamp(start).date().isoformat(),
+                  'to': pd.Timestamp(end).date().isoformat(), 'token': FINNHUB_API_KEY}
+        rows = {}
+        for name, url in (("splits", self.SPLITS_URL), ("dividends", self.DIVIDENDS_URL)):
+            response = requests.get(url, params=params)
+            count("bytes_downloaded", len(response.content), stage="download")
+            data = response.json()
+            # Los endpoints no incluidos en el plan devuelven {"error": ...}
+            if not isinstance(data, list):
+                logging.warning(f"Finnhub sin {name} para {ticker}: {data}")
+                data = []
+            rows[name] = data
+        splits = pd.DataFrame({
+            'date': [row.get('date') for row in rows["splits"]],
+            'ratio': [row.get('toFactor', 1) / row.get('fromFactor', 1) if row.get('fromFactor') else None
+                      for row in rows["splits"]],
+        })
+        dividends = pd.DataFrame({
+            'date': [row.get('date') for row in rows["dividends"]],
+            'amount': [row.get('amount') for row in rows["dividends"]],
+        })
+        return action_table(dividends, splits, ticker=ticker)
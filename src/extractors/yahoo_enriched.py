@@ -1,21 +1,34 @@
+import logging
+import os
 import pandas as pd
 import yfinance as yf
 from .base import BaseExtractor
+from .yahoo_extractor import yahoo_actions
+from .yahoo_fundamentals import FundamentalsFetcher
+from .yahoo_options import CHAIN_COLUMNS, OptionChainFetcher, to_expiry_dict
+from src.analytics.options import enrich_chain
 from src.utils.data_cleaning import clean_dataframe
-from src.utils.output_manager import OutputManager
+from src.utils.fundamentals_store import FundamentalsStore
+from src.utils.options_store import OptionChainStore
+from src.utils.output_manager import get_output_manager
+from src.variables import (FUNDAMENTALS_MAX_AGE_DAYS, FUNDAMENTALS_STORE_DIR, OPTIONS_STORE_DIR,
+                           OPTIONS_WORKERS, RISK_FREE_RATE)
 
 class YahooEnrichedExtractor(BaseExtractor):
     """
     Extractor enriquecido de Yahoo Finance: precios, fundamentales, dividendos, splits, calendario, recomendaciones, estados financieros, ESG, noticias, opciones...
     """
-    def __init__(self):
-        self.output_manager = OutputManager()
+    @property
+    def output_manager(self):
+        # Carpeta de outputs compartida de la ejecución, creada al primer guardado
+        return get_output_manager()
 
     def get_historical_prices(self, ticker: str, start: str, end: str) -> dict:
         data = yf.Ticker(ticker)
         result = {}
         # Precios históricos
-        hist = data.history(start=start, end=end).reset_index()
+        # Sin ajustar por dividendos (con "Adj Close"); Yahoo ya los da ajustados por splits
+        hist = data.history(start=start, end=end, auto_adjust=False).reset_index()
         hist['ticker'] = ticker
         hist = hist.rename(columns={
             'Date': 'date', 'Open': 'open', 'High': 'high',
@@ -24,11 +37,11 @@ class YahooEnrichedExtractor(BaseExtractor):
         hist = clean_dataframe(hist)
         self.output_manager.save_dataframe(hist, f"{ticker}_historical.csv")
         result['historical'] = hist
-        # Info y fast_info
-        info = getattr(data, 'info', {})
-        fast = dict(getattr(data, 'fast_info', {})) if hasattr(data, 'fast_info') else {}
-        result['info'] = info
-        result['fast_info'] = fast
+        # Info, fast_info y estados financieros: instantánea diaria en el almacén versionado
+        # (los estados solo se piden si cambia su sello en info)
+        store_dir = FUNDAMENTALS_STORE_DIR or os.path.join(self.output_manager.base_path, "fundamentals")
+        fetcher = FundamentalsFetcher(FundamentalsStore(store_dir), FUNDAMENTALS_MAX_AGE_DAYS)
+        result.update(fetcher.fetch(ticker, data))
         # Dividendos, splits, acciones
         divs = getattr(data, 'dividends', pd.Series()).reset_index()
         splits = getattr(data, 'splits', pd.Series()).reset_index()
@@ -42,10 +55,6 @@ class YahooEnrichedExtractor(BaseExtractor):
         # Calendario
         cal = getattr(data, 'calendar', pd.DataFrame())
         result['calendar'] = cal
-        # Estados financieros
-        result['financials'] = getattr(data, 'financials', pd.DataFrame())
-        result['balancesheet'] = getattr(data, 'balancesheet', pd.DataFrame())
-        result['cashflow'] = getattr(data, 'cashflow', pd.DataFrame())
         # Earnings
         result['earnings'] = getattr(data, 'earnings', pd.DataFrame())
         result['quarterly_earnings'] = getattr(data, 'quarterly_earnings', pd.DataFrame())
@@ -55,21 +64,22 @@ class YahooEnrichedExtractor(BaseExtractor):
         result['sustainability'] = getattr(data, 'sustainability', pd.DataFrame())
         # Noticias
         result['news'] = getattr(data, 'news', [])
-        # Opciones
-        expirations = list(getattr(data, 'options', []))
-        result['options'] = {}
-        for exp in expirations[:3]:  # Solo las 3 primeras para no saturar
-            try:
-                chain = data.option_chain(exp)
-                result['options'][exp] = {'calls': chain.calls, 'puts': chain.puts}
-            except Exception:
-                continue
-        # Guardar info y fast_info
-        import json
-        self.output_manager.get_path(f"{ticker}_info.json")
-        with open(self.output_manager.get_path(f"{ticker}_info.json"), "w", encoding="utf-8") as f:
-            json.dump(info, f, ensure_ascii=False, indent=2)
-        self.output_manager.get_path(f"{ticker}_fast_info.json")
-        with open(self.output_manager.get_path(f"{ticker}_fast_info.json"), "w", encoding="utf-8") as f:
-            json.dump(fast, f, ensure_ascii=False, indent=2)
+        # Opciones: todos los vencimientos en paralelo (un yf.Ticker por hilo), con volatilidad
+        # implícita y griegas
+        try:
+            chain = OptionChainFetcher(OPTIONS_WORKERS).fetch(ticker)
+        except Exception as e:
+            logging.warning(f"Sin opciones para {ticker}: {e}")
+            chain = pd.DataFrame(columns=CHAIN_COLUMNS)
+        if len(chain):
+            if not hist.empty:
+                chain['underlying_price'] = chain['underlying_price'].fillna(float(hist['close'].iloc[-1]))
+            chain = enrich_chain(chain, rate=RISK_FREE_RATE)
+            store_dir = OPTIONS_STORE_DIR or os.path.join(self.output_manager.base_path, "options")
+            OptionChainStore(store_dir).put(ticker, chain)
+        result['option_chain'] = chain
+        result['options'] = to_expiry_dict(chain) if len(chain) else {}
         return result
+
+    def get_corporate_actions(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        return yahoo_actions(yf.Ticker(ticker), ticker, start, end)
@@ -1,19 +1,28 @@
+import os
 import pandas as pd
 import yfinance as yf
 from .base import BaseExtractor
+from .yahoo_fundamentals import FundamentalsFetcher
+from src.utils.corporate_actions import action_table
 from src.utils.data_cleaning import clean_dataframe
-from src.utils.output_manager import OutputManager
+from src.utils.fundamentals_store import FundamentalsStore
+from src.utils.output_manager import get_output_manager
+from src.variables import FUNDAMENTALS_MAX_AGE_DAYS, FUNDAMENTALS_STORE_DIR
 
 class YahooFinanceExtractor(BaseExtractor):
     """
     Extractor de datos históricos y fundamentales desde Yahoo Finance.
     """
-    def __init__(self):
-        self.output_manager = OutputManager()
+    @property
+    def output_manager(self):
+        # Carpeta de outputs compartida de la ejecución, creada al primer guardado
+        return get_output_manager()
 
     def get_historical_prices(self, ticker: str, start: str, end: str) -> pd.DataFrame:
         ticker_obj = yf.Ticker(ticker)
-        df = ticker_obj.history(start=start, end=end)
+        # Sin ajustar por dividendos (el ajuste lo hace el pipeline, utils/corporate_actions); con
+        # auto_adjust=False Yahoo devuelve igualmente OHLC y volumen ya ajustados por splits
+        df = ticker_obj.history(start=start, end=end, auto_adjust=False)
         df = df.reset_index()
         df['ticker'] = ticker
         # Estandarizar columnas
@@ -27,14 +36,10 @@ class YahooFinanceExtractor(BaseExtractor):
         return df
 
     def get_fundamentals(self, ticker: str) -> dict:
-        ticker_obj = yf.Ticker(ticker)
-        info = ticker_obj.info
-        # Guardar como JSON
-        import json
-        path = self.output_manager.get_path(f"{ticker}_fundamentals.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(info, f, ensure_ascii=False, indent=2)
-        return info
+        # Instantánea diaria en el almacén versionado (solo los campos que cambian)
+        store_dir = FUNDAMENTALS_STORE_DIR or os.path.join(self.output_manager.base_path, "fundamentals")
+        fetcher = FundamentalsFetcher(FundamentalsStore(store_dir), FUNDAMENTALS_MAX_AGE_DAYS)
+        return fetcher.fetch(ticker, yf.Ticker(ticker))["info"]
 
     def get_dividends(self, ticker: str) -> pd.DataFrame:
         ticker_obj = yf.Ticker(ticker)
@@ -49,3 +54,21 @@ class YahooFinanceExtractor(BaseExtractor):
         splits['ticker'] = ticker
         self.output_manager.save_dataframe(splits, f"{ticker}_splits.csv")
         return splits
+
+    def get_corporate_actions(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        return yahoo_actions(yf.Ticker(ticker), ticker, start, end)
+
+
+def yahoo_actions(ticker_obj, ticker: str, start: str, end: str) -> pd.DataFrame:
+    """
+    Tabla de acciones estándar entre start y end a partir de Ticker.actions. Los precios y
+    el volumen de Yahoo ya vienen ajustados por splits (también con auto_adjust=False), así
+    que solo se emiten los dividendos, que Yahoo publica divididos por los splits
+    posteriores: en la misma base que esos cierres. Aplicar los splits otra vez los
+    ajustaría dos veces.
+    """
+    actions = ticker_obj.actions
+    if actions is None or actions.empty:
+        return action_table(ticker=ticker)
+    table = action_table(actions.get("Dividends"), ticker=ticker)
+    return table[(table["date"] >= pd.Timestamp(start)) & (table["date"] <= pd.Timestamp(end))].reset_index(drop=True)
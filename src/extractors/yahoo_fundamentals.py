@@ -0,0 +1,72 @@
+"""
+Descarga de fundamentales de Yahoo Finance con almacén versionado.
+
+info se pide siempre (contiene los ratios de mercado y los sellos del proveedor);
+los estados financieros anuales solo se vuelven a pedir cuando cambia el cierre
+fiscal publicado (lastFiscalYearEnd) o su última descarga es más antigua que
+max_age_days. Lo no descargado se sirve desde el almacén.
+"""
+import logging
+from typing import Callable, Dict, Optional
+import pandas as pd
+from src.utils.fundamentals_store import FundamentalsStore, statement_frame
+from src.utils.instrumentation import count
+
+STATEMENTS = ("financials", "balancesheet", "cashflow")
+
+
+def provider_stamps(info: dict) -> Dict[str, object]:
+    """Sello del proveedor de cada estado financiero: el último cierre fiscal anual publicado."""
+    stamp = (info or {}).get("lastFiscalYearEnd")
+    return {section: stamp for section in STATEMENTS}
+
+
+def _fast_info(obj) -> dict:
+    try:
+        return dict(getattr(obj, "fast_info", None) or {})
+    except Exception as e:
+        logging.warning(f"fast_info no disponible: {e}")
+        return {}
+
+
+class FundamentalsFetcher:
+    """
+    Fundamentales de un ticker (info, fast_info y estados financieros) guardados como
+    instantánea diaria en store. ticker_factory crea el objeto de Yahoo de un símbolo
+    (yf.Ticker por defecto).
+    """
+    def __init__(self, store: FundamentalsStore, max_age_days: Optional[int] = 90,
+                 ticker_factory: Optional[Callable] = None):
+        self.store = store
+        self.max_age_days = max_age_days
+        if ticker_factory is None:
+            import yfinance as yf
+            ticker_factory = yf.Ticker
+        self.ticker_factory = ticker_factory
+
+    def fetch(self, ticker: str, ticker_obj=None, as_of=None) -> dict:
+        """
+        {info, fast_info, financials, balancesheet, cashflow} del ticker; los estados
+        cuyo sello no ha cambiado se reconstruyen desde el almacén sin pedirlos.
+        """
+        obj = ticker_obj if ticker_obj is not None else self.ticker_factory(ticker)
+        info = dict(getattr(obj, "info", None) or {})
+        fast = _fast_info(obj)
+        # Una sección vacía (fallo del proveedor) no se guarda: borraría los campos de la anterior
+        sections = {name: data for name, data in (("info", info), ("fast_info", fast)) if data}
+        stamps = provider_stamps(info)
+        stale = self.store.stale(ticker, stamps, as_of=as_of, max_age_days=self.max_age_days)
+        for section in stale:
+            data = getattr(obj, section, None)
+            if isinstance(data, pd.DataFrame) and not data.empty:
+                sections[section] = data
+        count("fundamentals_sections_fetched", len(stale), stage="fundamentals")
+        count("fundamentals_sections_skipped", len(STATEMENTS) - len(stale), stage="fundamentals")
+        if sections:
+            self.store.put(ticker, sections, as_of=as_of,
+                           stamps={s: stamps[s] for s in STATEMENTS if s in sections})
+        stored = self.store.latest(ticker)
+        result = {"info": info, "fast_info": fast}
+        for section in STATEMENTS:
+            result[section] = sections[section] if section in sections else statement_frame(stored.get(section, {}))
+        return result
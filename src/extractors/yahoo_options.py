@@ -0,0 +1,163 @@
+"""
+Descarga de cadenas de opciones completas de Yahoo Finance.
+
+Se piden todos los vencimientos de todos los tickers en un único pool de hilos (las
+peticiones son de red, no de CPU) y cada cadena se devuelve en formato largo: una
+fila por contrato con ticker, vencimiento, tipo, strike, precios y el precio del
+subyacente en el momento de la descarga.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.instrumentation import count
+
+# Columnas de Yahoo -> columnas del formato largo
+YAHOO_COLUMNS = {
+    "contractSymbol": "contract",
+    "strike": "strike",
+    "bid": "bid",
+    "ask": "ask",
+    "lastPrice": "last_price",
+    "volume": "volume",
+    "openInterest": "open_interest",
+    "impliedVolatility": "yahoo_iv",
+}
+CHAIN_COLUMNS = ["ticker", "expiry", "kind", "underlying_price"] + list(YAHOO_COLUMNS.values())
+
+
+def chain_frame(ticker: str, expiry, calls: pd.DataFrame, puts: pd.DataFrame,
+                underlying_price: float = np.nan) -> pd.DataFrame:
+    """Une calls y puts de un vencimiento en formato largo (columnas CHAIN_COLUMNS)."""
+    frames = []
+    for kind, frame in (("call", calls), ("put", puts)):
+        if frame is None or len(frame) == 0:
+            continue
+        out = pd.DataFrame({new: frame[old] if old in frame else np.nan for old, new in YAHOO_COLUMNS.items()})
+        out.insert(0, "ticker", ticker)
+        out.insert(1, "expiry", np.datetime64(pd.Timestamp(expiry).date(), "D"))
+        out.insert(2, "kind", kind)
+        out.insert(3, "underlying_price", float(underlying_price))
+        frames.append(out)
+    if not frames:
+        return pd.DataFrame(columns=CHAIN_COLUMNS)
+    chain = pd.concat(frames, ignore_index=True)
+    for col in ("strike", "bid", "ask", "last_price", "volume", "open_interest", "yahoo_iv"):
+        chain[col] = pd.to_numeric(chain[col], errors="coerce").astype(float)
+    return chain
+
+
+def _underlying_price(chain) -> float:
+    underlying = getattr(chain, "underlying", None) or {}
+    for key in ("regularMarketPrice", "postMarketPrice", "bid"):
+        value = underlying.get(key) if isinstance(underlying, dict) else None
+        if value:
+            return float(value)
+    return np.nan
+
+
+class OptionChainFetcher:
+    """
+    Cadenas de todos los vencimientos de uno o varios tickers en paralelo.
+    ticker_factory crea el objeto de Yahoo de un símbolo (yf.Ticker por defecto); solo
+    necesita los atributos options (vencimientos) y option_chain(vencimiento). Cada hilo
+    crea sus propios objetos: yf.Ticker guarda cachés y sesión que no son seguros entre hilos.
+    """
+    def __init__(self, max_workers: int = 16, ticker_factory: Optional[Callable] = None):
+        self.max_workers = max_workers
+        if ticker_factory is None:
+            import yfinance as yf
+            ticker_factory = yf.Ticker
+        self.ticker_factory = ticker_factory
+
+    def fetch(self, ticker: str, expirations: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Cadena completa de un ticker (todos sus vencimientos o solo expirations)."""
+        chains, errors = self.fetch_many([ticker], None if expirations is None else {ticker: list(expirations)})
+        if ticker in errors and ticker not in chains:
+            raise ValueError(f"No se pudieron descargar las opciones de {ticker}: {errors[ticker]}")
+        return chains.get(ticker, pd.DataFrame(columns=CHAIN_COLUMNS))
+
+    def fetch_many(self, tickers: Iterable[str], expirations: Optional[Dict[str, List[str]]] = None
+                   ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Cadenas de varios tickers: primero los vencimientos de cada ticker y después
+        todas las cadenas (ticker, vencimiento) en el mismo pool. Devuelve ({ticker:
+        cadena}, {ticker: error}); un vencimiento que falla se registra y se omite.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        errors: Dict[str, str] = {}
+        local = threading.local()
+
+        def ticker_object(ticker):
+            """Objeto de Yahoo del ticker para el hilo actual."""
+            objects = getattr(local, "objects", None)
+            if objects is None:
+                objects = local.objects = {}
+            if ticker not in objects:
+                objects[ticker] = self.ticker_factory(ticker)
+            return objects[ticker]
+
+        def list_expirations(ticker):
+            if expirations is not None and ticker in expirations:
+                return list(expirations[ticker])
+            return list(getattr(ticker_object(ticker), "options", []) or [])
+
+        def fetch_chain(job):
+            ticker, expiry = job
+            try:
+                chain = ticker_object(ticker).option_chain(expiry)
+            except Exception as e:
+                return e
+            return chain_frame(ticker, expiry, chain.calls, chain.puts, _underlying_price(chain))
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            listed = {}
+            for ticker, result in zip(tickers, pool.map(lambda t: _safe(list_expirations, t), tickers)):
+                if isinstance(result, Exception):
+                    errors[ticker] = str(result)
+                elif not result:
+                    errors[ticker] = "sin vencimientos de opciones"
+                else:
+                    listed[ticker] = result
+            jobs = [(ticker, expiry) for ticker, exps in listed.items() for expiry in exps]
+            results = list(pool.map(fetch_chain, jobs))
+        frames: Dict[str, List[pd.DataFrame]] = {t: [] for t in listed}
+        for (ticker, expiry), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logging.warning(f"Opciones de {ticker} con vencimiento {expiry}: {result}")
+                continue
+            frames[ticker].append(result)
+        count("option_chains_downloaded", sum(len(f) for f in frames.values()), stage="options")
+        chains = {}
+        for ticker, parts in frames.items():
+            if parts:
+                chains[ticker] = pd.concat(parts, ignore_index=True)
+            else:
+                errors[ticker] = "no se pudo descargar ningún vencimiento"
+        return chains, errors
+
+
+def _safe(func, *args):
+    try:
+        return func(*args)
+    except Exception as e:
+        return e
+
+
+def to_expiry_dict(chain: pd.DataFrame) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Formato por vencimiento {YYYY-MM-DD: {'calls': DataFrame, 'puts': DataFrame}} (el de
+    OptionPricer.price_chains) con los nombres de columna de Yahoo.
+    """
+    reverse = {new: old for old, new in YAHOO_COLUMNS.items()}
+    options = {}
+    for expiry, group in chain.groupby("expiry", sort=True):
+        key = pd.Timestamp(expiry).date().isoformat()
+        options[key] = {
+            f"{kind}s": group[group["kind"] == kind].drop(columns=["ticker", "expiry", "kind"])
+            .rename(columns=reverse).reset_index(drop=True)
+            for kind in ("call", "put")
+        }
+    return options
@@ -1,122 +1,270 @@
 import sys
+import os
+import json
+import time
+import argparse
 import logging
-import pandas as pd
-import matplotlib.pyplot as plt
+from dataclasses import dataclass, field, asdict, fields
+from typing import List, Optional
 import warnings
-from src.extractors.yahoo_enriched import YahooEnrichedExtractor
-from src.extractors.yahoo_extractor import YahooFinanceExtractor
-from src.extractors.alpha_vantage_extractor import AlphaVantageExtractor
-from src.extractors.finnhub_extractor import FinnhubExtractor
-from src.simulation.montecarlo import MonteCarloSimulator
-from src.utils.output_manager import OutputManager
-from src.variables import OUTPUTS_BASE_PATH, START_DATE, END_DATE, SYMBOLS as DEFAULT_SYMBOLS, PLOTS_PER_PNG as DEFAULT_PLOTS_PER_PNG, INCLUDE_MONTECARLO_TICKERS as DEFAULT_INCLUDE_MONTECARLO_TICKERS, USE_ADJUSTED_CLOSE as DEFAULT_USE_ADJUSTED_CLOSE
-from src.models.price_series import PriceSeries, PricePoint
-from src.models.portfolio import Portfolio
-import numpy as np
 from math import ceil
-import requests
-from src.variables import CIK
+from src.simulation.models import MODELS
+from src.utils.lazy import lazy_import, LazyClass
+from src.utils.output_manager import OutputManager, set_output_manager
+from src.utils.pipeline import Pipeline, Stage
+from src.utils.instrumentation import Instrumentation, get_instrumentation, set_instrumentation, span, count, ticker_context, load_hook
+from src.variables import OUTPUTS_BASE_PATH, START_DATE, END_DATE, SYMBOLS as DEFAULT_SYMBOLS, PLOTS_PER_PNG as DEFAULT_PLOTS_PER_PNG, INCLUDE_MONTECARLO_TICKERS as DEFAULT_INCLUDE_MONTECARLO_TICKERS, USE_ADJUSTED_CLOSE as DEFAULT_USE_ADJUSTED_CLOSE
+from src.variables import MONTECARLO_SEED, SIMULATION_CACHE_DIR, SIMULATION_CACHE_MAX_MB
+from src.variables import PIPELINE_FETCH_WORKERS, PIPELINE_ANALYZE_WORKERS, PIPELINE_QUEUE_SIZE, RENDER_WORKERS, ANALYTICS_WORKERS
+from src.variables import PLOT_WIDTH_PX, PLOT_FAN_CHART, METRICS_HOOK
+from src.variables import INCREMENTAL_RUNS, PRICE_CACHE_DIR, PRICE_CACHE_TTL_MINUTES
+from src.variables import VALIDATE_DATA, REPAIR_DATA, VALIDATION_JUMP_SIGMA, VALIDATION_STALE_BARS
+from src.variables import SEC_FILINGS, SEC_USER_AGENT, SEC_CACHE_DIR, SEC_WORKERS, SEC_FORMS, SEC_ITEMS
+from src.variables import INDICATORS
+
+# Dependencias pesadas: se importan al usarse por primera vez (arranque rápido, p. ej. --help)
+pd = lazy_import("pandas")
+matplotlib = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 
+# Cada extractor (y su dependencia: yfinance o requests) solo se importa si se elige
 EXTRACTORS = [
-    ("Yahoo Finance (enriquecido)", YahooEnrichedExtractor),
-    ("Yahoo Finance (básico)", YahooFinanceExtractor),
-    ("Alpha Vantage", AlphaVantageExtractor),
-    ("Finnhub", FinnhubExtractor)
+    ("Yahoo Finance (enriquecido)", LazyClass("src.extractors.yahoo_enriched", "YahooEnrichedExtractor")),
+    ("Yahoo Finance (básico)", LazyClass("src.extractors.yahoo_extractor", "YahooFinanceExtractor")),
+    ("Alpha Vantage", LazyClass("src.extractors.alpha_vantage_extractor", "AlphaVantageExtractor")),
+    ("Finnhub", LazyClass("src.extractors.finnhub_extractor", "FinnhubExtractor")),
 ]
+# Nombres cortos para elegir extractor desde la línea de comandos (índice en EXTRACTORS, base 1)
+EXTRACTOR_ALIASES = {
+    "yahoo_enriched": 1,
+    "yahoo": 2,
+    "alpha_vantage": 3,
+    "finnhub": 4,
+}
+
+# Códigos de salida del modo batch
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_FAILURE = 2
+
+
+# Opciones de RunConfig que cambian el contenido de gráficos y reportes (clave del manifiesto)
+ARTIFACT_CONFIG_FIELDS = ("start_date", "end_date", "plot_width_px", "fan_chart", "include_mc_tickers",
+                          "use_adjusted_close", "mc_simulations", "mc_days", "mc_model", "seed")
+
 
-def main():
-    
-    interactive = '-i' in sys.argv or '--interactive' in sys.argv
-    symbols = list(DEFAULT_SYMBOLS)
-    plots_per_png = DEFAULT_PLOTS_PER_PNG
-    include_mc_tickers = DEFAULT_INCLUDE_MONTECARLO_TICKERS
-    use_adjusted_close = DEFAULT_USE_ADJUSTED_CLOSE
-    start_date = START_DATE
-    end_date = END_DATE
-    # --- Prueba sencilla: extraer y mostrar datos con AlphaVantageExtractor ---
+@dataclass
+class RunConfig:
     """
-    Punto de entrada principal para Infobolsa Toolkit (Enriquecido).
-    Descarga, muestra y guarda datos bursátiles enriquecidos y visualizaciones para una lista de símbolos.
+    Configuración de una ejecución. Se construye a partir de variables.py,
+    un fichero de configuración JSON opcional y los argumentos de línea de comandos.
     """
+    symbols: List[str] = field(default_factory=lambda: list(DEFAULT_SYMBOLS))
+    extractor: Optional[str] = None
+    start_date: str = START_DATE
+    end_date: str = END_DATE
+    output_dir: str = OUTPUTS_BASE_PATH
+    plots: bool = True
+    plots_per_png: int = DEFAULT_PLOTS_PER_PNG
+    plot_width_px: int = PLOT_WIDTH_PX
+    fan_chart: bool = PLOT_FAN_CHART
+    include_mc_tickers: bool = DEFAULT_INCLUDE_MONTECARLO_TICKERS
+    use_adjusted_close: bool = DEFAULT_USE_ADJUSTED_CLOSE
+    mc_simulations: int = 200
+    mc_days: int = 252
+    mc_model: str = "gbm"
+    seed: Optional[int] = MONTECARLO_SEED
+    fetch_workers: int = PIPELINE_FETCH_WORKERS
+    analyze_workers: int = PIPELINE_ANALYZE_WORKERS
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    render_workers: int = RENDER_WORKERS
+    analytics_workers: int = ANALYTICS_WORKERS
+    incremental: bool = INCREMENTAL_RUNS
+    validate: bool = VALIDATE_DATA
+    repair_data: bool = REPAIR_DATA
+    sec_filings: bool = SEC_FILINGS
+    sec_items: List[str] = field(default_factory=lambda: list(SEC_ITEMS))
+    indicators: bool = INDICATORS
+    interactive: bool = False
+    batch: bool = False
 
 
-    print("\n" + "#"*70)
-    print("INFOTBOLSA TOOLKIT - ANÁLISIS DE MERCADOS BURSÁTILES")
-    print("#"*70 + "\n")
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description="Infobolsa Toolkit: descarga, análisis, simulación y reportes de tickers bursátiles."
+    )
+    parser.add_argument("-i", "--interactive", action="store_true", help="modo interactivo por consola")
+    parser.add_argument("--batch", action="store_true",
+                        help="modo no interactivo: sin input(), sin ventanas y con código de salida")
+    parser.add_argument("--config", help="fichero JSON con opciones (mismos nombres que RunConfig)")
+    parser.add_argument("--symbols", help="lista de tickers separada por comas")
+    parser.add_argument("--symbols-file", help="fichero con un ticker por línea (admite comentarios #)")
+    parser.add_argument("--extractor", help=f"extractor: número 1-{len(EXTRACTORS)} o {', '.join(EXTRACTOR_ALIASES)}")
+    parser.add_argument("--start", dest="start_date", help="fecha de inicio (YYYY-MM-DD)")
+    parser.add_argument("--end", dest="end_date", help="fecha de fin (YYYY-MM-DD)")
+    parser.add_argument("--output-dir", help="carpeta base de outputs")
+    parser.add_argument("--no-plots", dest="plots", action="store_false", default=None, help="no generar gráficos")
+    parser.add_argument("--plots-per-png", type=int, help="gráficos por PNG")
+    parser.add_argument("--plot-width-px", type=int, help="ancho en píxeles al que se reducen las series largas")
+    parser.add_argument("--fan-chart", action="store_true", help="Monte Carlo como bandas de percentiles")
+    parser.add_argument("--no-montecarlo", dest="include_mc_tickers", action="store_false", default=None,
+                        help="no simular Monte Carlo por ticker")
+    parser.add_argument("--mc-simulations", type=int, help="trayectorias de Monte Carlo")
+    parser.add_argument("--mc-days", type=int, help="horizonte de Monte Carlo en días")
+    parser.add_argument("--mc-model", choices=sorted(MODELS), help="modelo de Monte Carlo")
+    parser.add_argument("--seed", type=int, help="semilla de Monte Carlo")
+    parser.add_argument("--fetch-workers", type=int, help="descargas concurrentes")
+    parser.add_argument("--analyze-workers", type=int, help="hilos de análisis")
+    parser.add_argument("--queue-size", type=int, help="tamaño máximo de las colas entre etapas")
+    parser.add_argument("--render-workers", type=int, help="procesos de renderizado (0 = en el proceso principal)")
+    parser.add_argument("--analytics-workers", type=int,
+                        help="procesos para métricas y Monte Carlo por ticker (0 = hilos del pipeline)")
+    parser.add_argument("--no-adjusted-close", dest="use_adjusted_close", action="store_false", default=None,
+                        help="usar precios sin ajustar por splits y dividendos")
+    parser.add_argument("--no-validate", dest="validate", action="store_false", default=None,
+                        help="no validar la calidad de los históricos")
+    parser.add_argument("--repair-data", action="store_true", help="reparar las barras que incumplen las reglas")
+    parser.add_argument("--sec-filings", action="store_true",
+                        help="descargar de SEC EDGAR los metadatos de 10-K/10-Q de los tickers (requiere SEC_USER_AGENT)")
+    parser.add_argument("--sec-items", help="Items a extraer del último filing de cada formulario (p. ej. 1A,7)")
+    parser.add_argument("--indicators", action="store_true",
+                        help="calcular indicadores técnicos de todos los tickers (indicators.csv)")
+    parser.add_argument("--no-incremental", dest="incremental", action="store_false", default=None,
+                        help="volver a descargar y regenerar todo aunque las entradas no hayan cambiado")
+    return parser
+
 
-    if interactive:
-        print("[MODO INTERACTIVO]")
-        print("\nTickers cargados:", ', '.join(symbols))
-        while True:
-            resp = input("¿Quieres agregar algún ticker más? (s/n): ").strip().lower()
-            if resp == 's':
-                while True:
-                    print("\n1. Agregar ticker\n2. Continuar")
-                    op = input("Elige opción: ").strip()
-                    if op == '1':
-                        new_ticker = input("Introduce el símbolo del nuevo ticker: ").strip().upper()
-                        if new_ticker and new_ticker not in symbols:
-                            symbols.append(new_ticker)
-                            print(f"Ticker {new_ticker} agregado. Tickers actuales: {', '.join(symbols)}")
-                        else:
-                            print("Ticker vacío o ya existente.")
-                    elif op == '2':
-                        break
+def read_symbols_file(path):
+    """Lee tickers de un fichero: uno por línea o separados por comas; '#' inicia un comentario."""
+    symbols = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for token in line.replace(",", " ").split():
+                symbol = token.strip().upper()
+                if symbol and symbol not in symbols:
+                    symbols.append(symbol)
+    return symbols
+
+
+def load_config(argv=None) -> RunConfig:
+    """
+    Construye la RunConfig: valores por defecto < fichero --config < argumentos.
+    """
+    args = build_parser().parse_args(argv)
+    config = RunConfig()
+    known = {f.name for f in fields(RunConfig)}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            data = json.load(f)
+        unknown = set(data) - known - {"symbols_file"}
+        if unknown:
+            raise ValueError(f"Opciones desconocidas en {args.config}: {', '.join(sorted(unknown))}")
+        if "symbols_file" in data:
+            config.symbols = read_symbols_file(data.pop("symbols_file"))
+        for key, value in data.items():
+            setattr(config, key, value)
+    if args.symbols_file:
+        config.symbols = read_symbols_file(args.symbols_file)
+    if args.symbols:
+        config.symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    for key, value in vars(args).items():
+        if key in known and key != "symbols" and value is not None and value is not False:
+            setattr(config, key, value)
+    if args.plots is False:
+        config.plots = False
+    if args.include_mc_tickers is False:
+        config.include_mc_tickers = False
+    if args.incremental is False:
+        config.incremental = False
+    if args.use_adjusted_close is False:
+        config.use_adjusted_close = False
+    if args.validate is False:
+        config.validate = False
+    if args.sec_items:
+        config.sec_items = [i.strip().upper() for i in args.sec_items.split(",") if i.strip()]
+    return config
+
+
+def resolve_extractor(choice):
+    """Devuelve la clase de extractor a partir de un número (1-N) o un alias."""
+    key = str(choice).strip().lower()
+    idx = EXTRACTOR_ALIASES.get(key)
+    if idx is None and key.isdigit():
+        idx = int(key)
+    if idx is None or not 1 <= idx <= len(EXTRACTORS):
+        raise ValueError(f"Extractor no válido: {choice}")
+    return EXTRACTORS[idx - 1][1]
+
+
+def interactive_setup(config: RunConfig):
+    """Permite modificar la configuración por consola (modo -i)."""
+    symbols = config.symbols
+    print("[MODO INTERACTIVO]")
+    print("\nTickers cargados:", ', '.join(symbols))
+    while True:
+        resp = input("¿Quieres agregar algún ticker más? (s/n): ").strip().lower()
+        if resp == 's':
+            while True:
+                print("\n1. Agregar ticker\n2. Continuar")
+                op = input("Elige opción: ").strip()
+                if op == '1':
+                    new_ticker = input("Introduce el símbolo del nuevo ticker: ").strip().upper()
+                    if new_ticker and new_ticker not in symbols:
+                        symbols.append(new_ticker)
+                        print(f"Ticker {new_ticker} agregado. Tickers actuales: {', '.join(symbols)}")
                     else:
-                        print("Opción no válida.")
-                break
-            elif resp == 'n':
-                break
-            else:
-                print("Por favor, responde 's' o 'n'.")
-        print("\nConfiguración de visualización:")
-        try:
-            plots_per_png = int(input(f"¿Cuántos gráficos por PNG/pop-up? [por defecto {DEFAULT_PLOTS_PER_PNG}]: ") or DEFAULT_PLOTS_PER_PNG)
-        except Exception:
-            plots_per_png = DEFAULT_PLOTS_PER_PNG
-        try:
-            include_mc_tickers = input(f"¿Incluir Monte Carlo para cada ticker? (s/n, por defecto {'s' if DEFAULT_INCLUDE_MONTECARLO_TICKERS else 'n'}): ").strip().lower()
-            if include_mc_tickers == 'n':
-                include_mc_tickers = False
-            else:
-                include_mc_tickers = True
-        except Exception:
-            include_mc_tickers = DEFAULT_INCLUDE_MONTECARLO_TICKERS
-        try:
-            use_adjusted_close = input(f"¿Usar precios ajustados (adjusted close)? (s/n, por defecto {'s' if DEFAULT_USE_ADJUSTED_CLOSE else 'n'}): ").strip().lower()
-            if use_adjusted_close == 'n':
-                use_adjusted_close = False
-            else:
-                use_adjusted_close = True
-        except Exception:
-            use_adjusted_close = DEFAULT_USE_ADJUSTED_CLOSE
-        # Elegir periodo
-        print("\nPeriodo de análisis:")
-        try:
-            start_date_in = input(f"Fecha de inicio (YYYYMMDD, por defecto {START_DATE.replace('-','')}): ").strip()
-            if start_date_in:
-                start_date = f"{start_date_in[:4]}-{start_date_in[4:6]}-{start_date_in[6:]}"
-        except Exception:
-            pass
-        try:
-            end_date_in = input(f"Fecha de fin (YYYYMMDD, por defecto {END_DATE.replace('-','')}): ").strip()
-            if end_date_in:
-                end_date = f"{end_date_in[:4]}-{end_date_in[4:6]}-{end_date_in[6:]}"
-        except Exception:
-            pass
-        print("\nConfiguración final:")
-        print("Tickers:", ', '.join(symbols))
-        print(f"Gráficos por PNG/pop-up: {plots_per_png}")
-        print(f"Monte Carlo por ticker: {'Sí' if include_mc_tickers else 'No'}")
-        print(f"Usar precios ajustados: {'Sí' if use_adjusted_close else 'No'}")
-        print(f"Periodo: {start_date} a {end_date}")
-        print("\n" + "-"*70 + "\n")
-    else:
-        print("[MODO NO INTERACTIVO]")
-        print("Tickers cargados:", ', '.join(symbols))
-        print("\n" + "-"*70 + "\n")
+                        print("Ticker vacío o ya existente.")
+                elif op == '2':
+                    break
+                else:
+                    print("Opción no válida.")
+            break
+        elif resp == 'n':
+            break
+        else:
+            print("Por favor, responde 's' o 'n'.")
+    print("\nConfiguración de visualización:")
+    try:
+        config.plots_per_png = int(input(f"¿Cuántos gráficos por PNG/pop-up? [por defecto {DEFAULT_PLOTS_PER_PNG}]: ") or DEFAULT_PLOTS_PER_PNG)
+    except Exception:
+        config.plots_per_png = DEFAULT_PLOTS_PER_PNG
+    try:
+        include_mc_tickers = input(f"¿Incluir Monte Carlo para cada ticker? (s/n, por defecto {'s' if DEFAULT_INCLUDE_MONTECARLO_TICKERS else 'n'}): ").strip().lower()
+        config.include_mc_tickers = include_mc_tickers != 'n'
+    except Exception:
+        config.include_mc_tickers = DEFAULT_INCLUDE_MONTECARLO_TICKERS
+    try:
+        use_adjusted_close = input(f"¿Usar precios ajustados (adjusted close)? (s/n, por defecto {'s' if DEFAULT_USE_ADJUSTED_CLOSE else 'n'}): ").strip().lower()
+        config.use_adjusted_close = use_adjusted_close != 'n'
+    except Exception:
+        config.use_adjusted_close = DEFAULT_USE_ADJUSTED_CLOSE
+    # Elegir periodo
+    print("\nPeriodo de análisis:")
+    try:
+        start_date_in = input(f"Fecha de inicio (YYYYMMDD, por defecto {START_DATE.replace('-','')}): ").strip()
+        if start_date_in:
+            config.start_date = f"{start_date_in[:4]}-{start_date_in[4:6]}-{start_date_in[6:]}"
+    except Exception:
+        pass
+    try:
+        end_date_in = input(f"Fecha de fin (YYYYMMDD, por defecto {END_DATE.replace('-','')}): ").strip()
+        if end_date_in:
+            config.end_date = f"{end_date_in[:4]}-{end_date_in[4:6]}-{end_date_in[6:]}"
+    except Exception:
+        pass
+    print("\nConfiguración final:")
+    print("Tickers:", ', '.join(symbols))
+    print(f"Gráficos por PNG/pop-up: {config.plots_per_png}")
+    print(f"Monte Carlo por ticker: {'Sí' if config.include_mc_tickers else 'No'}")
+    print(f"Usar precios ajustados: {'Sí' if config.use_adjusted_close else 'No'}")
+    print(f"Periodo: {config.start_date} a {config.end_date}")
+    print("\n" + "-"*70 + "\n")
+
 
+def choose_extractor_interactively():
     print("Seleccione el extractor de datos:")
     for idx, (name, _) in enumerate(EXTRACTORS, 1):
         print(f"  {idx}. {name}")
@@ -128,112 +276,398 @@ def main():
         except Exception:
             pass
         print("Opción no válida. Intente de nuevo.")
-    extractor_class = EXTRACTORS[opt-1][1]
+    return EXTRACTORS[opt-1][1]
+
+
+def main(argv=None):
+    """
+    Punto de entrada principal para Infobolsa Toolkit (Enriquecido).
+    Descarga, muestra y guarda datos bursátiles enriquecidos y visualizaciones para una lista de símbolos.
+    Devuelve el código de salida (0 = todo correcto, 1 = fallos parciales, 2 = sin datos o error).
+    """
+    try:
+        config = load_config(argv)
+        extractor_class = resolve_extractor(config.extractor) if config.extractor else None
+    except (OSError, ValueError) as e:
+        logging.error(f"Configuración no válida: {e}")
+        return EXIT_FAILURE
+    if config.batch and extractor_class is None:
+        logging.error("El modo batch requiere --extractor (o 'extractor' en el fichero de configuración).")
+        return EXIT_FAILURE
+
+    print("\n" + "#"*70)
+    print("INFOTBOLSA TOOLKIT - ANÁLISIS DE MERCADOS BURSÁTILES")
+    print("#"*70 + "\n")
+
+    if config.interactive and not config.batch:
+        interactive_setup(config)
+    else:
+        print("[MODO BATCH]" if config.batch else "[MODO NO INTERACTIVO]")
+        print("Tickers cargados:", ', '.join(config.symbols))
+        print("\n" + "-"*70 + "\n")
+
+    if extractor_class is None:
+        extractor_class = choose_extractor_interactively()
+    if config.batch:
+        # Backend sin ventanas: nunca se bloquea esperando a la pantalla
+        plt.switch_backend("Agg")
     extractor = extractor_class()
+    summary = run(config, extractor)
+    return summary["exit_code"]
+
 
-    output_manager = OutputManager()
+def run(config: RunConfig, extractor, metrics_hooks=None):
+    """
+    Ejecuta el análisis completo con una configuración y un extractor ya elegidos.
+    Devuelve el resumen de la ejecución (también se guarda como run_summary.json).
+    Los tiempos y contadores por etapa y ticker se guardan en run_report.json y se
+    entregan a metrics_hooks (funciones que reciben el informe) y al hook METRICS_HOOK.
+    """
+    started = time.time()
+    instrumentation = Instrumentation()
+    for hook in metrics_hooks or []:
+        instrumentation.add_hook(hook)
+    if METRICS_HOOK:
+        try:
+            instrumentation.add_hook(load_hook(METRICS_HOOK))
+        except (ImportError, AttributeError, ValueError) as e:
+            logging.error(f"No se pudo cargar METRICS_HOOK: {e}")
+    previous_instrumentation = set_instrumentation(instrumentation)
+    # Una sola carpeta de outputs por ejecución, compartida con los extractores
+    output_manager = OutputManager(config.output_dir)
+    previous_output_manager = set_output_manager(output_manager)
+    try:
+        summary = _run(config, extractor, output_manager)
+    finally:
+        set_instrumentation(previous_instrumentation)
+        set_output_manager(previous_output_manager)
+    report_path = output_manager.get_path("run_report.json")
+    summary["outputs"].append(report_path)
+    summary = write_run_summary(summary, config, output_manager, started)
+    instrumentation.emit(instrumentation.write_report(report_path))
+    return summary
+
+
+def _run(config: RunConfig, extractor, output_manager):
+    """Cuerpo de run(); devuelve el resumen sin completar."""
+    # Dependencias de las etapas de análisis y render (importadas solo al ejecutar)
+    import numpy as np
+    from datetime import date
+    from src.simulation.montecarlo import MonteCarloSimulator
+    from src.simulation.cache import SimulationCache
+    from src.simulation.models import get_model
+    from src.models.portfolio import Portfolio
+    from src.utils.manifest import RunManifest, content_hash
+    from src.utils.price_cache import PriceCache
+    from src.analytics.correlation import log_returns, correlation_matrix, top_k_pairs, DEFAULT_BLOCK_SIZE
+    from src.analytics.parallel import ParallelAnalytics
+    from src.utils.completeness import find_gaps
+    from src.utils.validation import Validator, default_rules
+    from src.utils.corporate_actions import adjust_ohlcv
+    from src.utils.trading_calendar import to_days
+    from src.visualizations.render import (
+        RenderService, render_figure, draw_history_group, draw_paths_group, draw_simulation, draw_correlation,
+    )
+    show = not config.batch and matplotlib.get_backend().lower() != "agg"
+    verbose = not config.batch
+    # Sin semilla configurada se sortea una para toda la ejecución: las simulaciones por ticker se
+    # siguen reutilizando en la de la cartera, pero solo con semilla explícita van a disco
+    seed = config.seed if config.seed is not None else int(np.random.SeedSequence().entropy)
+    # Caché compartida: las simulaciones por ticker se reutilizan en la de la cartera
+    simulation_dir = SIMULATION_CACHE_DIR or os.path.join(config.output_dir, ".cache", "simulations")
+    persistent = SIMULATION_CACHE_MAX_MB > 0 and config.seed is not None
+    simulation_cache = SimulationCache(disk_dir=simulation_dir if persistent else None,
+                                       max_disk_bytes=SIMULATION_CACHE_MAX_MB * 1024**2)
+    with span("model"):
+        model = get_model(config.mc_model)
     warnings.filterwarnings("ignore")
-    all_price_series = []
+    summary = {"symbols_ok": [], "symbols_failed": {}, "outputs": [], "montecarlo_seed": seed}
+
+    # Sin pantalla, los gráficos se dibujan fuera del hilo principal en un pool de procesos
+    render_service = None if show else RenderService(processes=config.render_workers)
+
+    # Re-ejecuciones incrementales: históricos cacheados y artefactos con las mismas entradas
+    manifest = RunManifest(os.path.join(config.output_dir, "run_manifest.json")) if config.incremental else None
+    price_cache = None
+    if config.incremental:
+        price_cache = PriceCache(PRICE_CACHE_DIR or os.path.join(config.output_dir, ".cache", "prices"),
+                                 ttl_minutes=PRICE_CACHE_TTL_MINUTES)
+    config_fingerprint = {name: getattr(config, name) for name in ARTIFACT_CONFIG_FIELDS}
+    validator = Validator(default_rules(VALIDATION_JUMP_SIGMA, VALIDATION_STALE_BARS)) if config.validate else None
+    pending_artifacts = {}
+
+    def artifact_key(filename, *inputs):
+        """Clave de un artefacto: nombre, configuración relevante y huellas de sus entradas."""
+        return content_hash(filename, config_fingerprint, *inputs)
 
+    def reuse(filename, key):
+        """Enlaza el artefacto de una ejecución anterior si su clave no ha cambiado."""
+        if manifest is None or key is None:
+            return None
+        path = manifest.reuse(filename, key, output_manager.get_path(filename))
+        if path is not None:
+            count("artifacts_reused", stage="manifest")
+            summary["outputs"].append(path)
+        return path
+
+    def render(filename, figsize, draw, *args, key=None, **kwargs):
+        path = output_manager.get_path(filename)
+        if render_service is not None:
+            if reuse(filename, key) is not None:
+                return
+            pending_artifacts[path] = (filename, key)
+            render_service.submit(render_figure, path, figsize, draw, *args, **kwargs)
+            return
+        with span("render"):
+            fig = plt.figure(figsize=figsize)
+            draw(fig, *args, **kwargs)
+        summary["outputs"].append(output_manager.save_plot(plt, filename))
+        if manifest is not None:
+            manifest.record(filename, key, path)
+        plt.show()
+        plt.close("all")
 
     # Agrupar tickers para gráficos
+    symbols = list(dict.fromkeys(config.symbols))
+    plots_per_png = max(1, config.plots_per_png)
     n_groups = ceil(len(symbols) / plots_per_png)
     symbol_groups = [symbols[i*plots_per_png:(i+1)*plots_per_png] for i in range(n_groups)]
-    all_price_series = []
-    all_hists = {}
-    for group in symbol_groups:
-        print_separator()
-        print_title(f"Gráficos para: {', '.join(group)}")
-        # --- Descargar y procesar datos de cada ticker del grupo ---
-        group_price_series = []
-        group_hists = {}
-        for symbol in group:
-            print_separator()
-            print_title(f"Procesando símbolo: {symbol}")
-            logging.info(f"Descargando y mostrando datos de: {symbol}")
+    group_of = {symbol: g for g, group in enumerate(symbol_groups) for symbol in group}
+
+    # --- Etapa 1: descarga (concurrente, limitada por la red) ---
+    def download(symbol, start, end):
+        with span("download"):
+            hist = fetch_history(extractor, symbol, start, end)
+        if isinstance(hist, pd.DataFrame):
+            count("rows_downloaded", len(hist), stage="download")
+        return hist
+
+    def fetch_actions(symbol):
+        """Splits y dividendos del ticker (cacheados como los históricos); None si no se ajusta."""
+        get_actions = getattr(extractor, "get_corporate_actions", None)
+        if not config.use_adjusted_close or get_actions is None:
+            return None
+        source = f"{type(extractor).__name__}.actions"
+        actions = price_cache.get(source, symbol, config.start_date, config.end_date) if price_cache else None
+        if actions is None:
             try:
-                if hasattr(extractor, 'get_all_data'):
-                    result = extractor.get_all_data(symbol, start=start_date, end=end_date)
-                    hist = result['historical'] if isinstance(result, dict) and 'historical' in result else result
-                else:
-                    result = extractor.get_historical_prices(symbol, start=start_date, end=end_date)
-                    hist = result['historical'] if isinstance(result, dict) and 'historical' in result else result
-                if isinstance(hist, pd.DataFrame) and not hist.empty:
-                    # Mostrar columnas y primeras filas para depuración
-                    print(f"[INFO] Columnas recibidas para {symbol}: {list(hist.columns)}")
-                    print(f"[INFO] Primeras y ultimas filas para {symbol}:")
-                    print(hist.head(10))
-                    print("....../n")
-                    print(hist.tail(10))
-                    # Adaptar formato si falta 'date'
-                    if 'date' not in hist.columns:
-                        # Buscar columna de fecha alternativa
-                        date_col = None
-                        for col in hist.columns:
-                            if col.lower() in ['timestamp', 'datetime', 'fecha']:
-                                date_col = col
-                                break
-                        if date_col:
-                            hist = hist.rename(columns={date_col: 'date'})
-                        else:
-                            print(f"[ERROR] El DataFrame de {symbol} no tiene columna 'date'. Columnas encontradas: {list(hist.columns)}")
-                            continue
-                    # EDA: resumen estadístico
-                    print("\nResumen estadístico (describe):")
-                    print(hist.describe().T)
-                    print("\nDistribución de precios de cierre:")
-                    print(hist['close'].describe()) 
-                    #Si tienes CIK, descarga informes 10-K y 10-Q desde SEC EDGAR, descomenta esto
-                    #print(f"\n[INFO] Descargando informes 10-K y 10-Q desde SEC EDGAR para {symbol}...")
-                    #fetch_sec_filings(symbol, "10-K")
-                    #fetch_sec_filings(symbol, "10-Q")
-
-                    # --- Gráficos de precios y Monte Carlo agrupados ---
-                    group_hists[symbol] = hist
-                    price_points = [PricePoint(
-                        date=row['date'],
-                        open=row['open'],
-                        high=row['high'],
-                        low=row['low'],
-                        close=row['close'],
-                        volume=row['volume']
-                    ) for _, row in hist.iterrows()]
-                    ps = PriceSeries(symbol=symbol, currency="USD", data=price_points)
-                    group_price_series.append(ps)
-                    all_price_series.append(ps)
-                else:
-                    print(f"No hay datos históricos para {symbol}.")
+                with span("download"):
+                    actions = get_actions(symbol, config.start_date, config.end_date)
             except Exception as e:
-                print("\n" + "!"*60)
-                logging.error(f"Error al obtener datos de {symbol}: {e}")
-                print("!"*60 + "\n")
-                continue
+                logging.warning(f"Sin acciones corporativas de {symbol}, se usan precios sin ajustar: {e}")
+                return None
+            if price_cache is not None:
+                price_cache.put(source, symbol, config.start_date, config.end_date, actions)
+        return actions
+
+    def fetch(symbol):
+        logging.info(f"Descargando datos de: {symbol}")
+        try:
+            with ticker_context(symbol):
+                if price_cache is None:
+                    return {"symbol": symbol, "hist": download(symbol, config.start_date, config.end_date),
+                            "actions": fetch_actions(symbol)}
+                # Solo se descargan las sesiones que faltan en el histórico cacheado
+                hist, ranges = price_cache.fetch_incremental(
+                    type(extractor).__name__, symbol, config.start_date, config.end_date,
+                    lambda start, end: download(symbol, start, end))
+                if ranges:
+                    count("download_requests", len(ranges), stage="download")
+                else:
+                    count("price_cache_hits", stage="download")
+                if isinstance(hist, pd.DataFrame):
+                    # El extractor guarda cada rango descargado en el mismo CSV: se sustituye por el histórico completo
+                    output_manager.save_dataframe(hist, f"{symbol}_historical.csv")
+            return {"symbol": symbol, "hist": hist, "actions": fetch_actions(symbol)}
+        except Exception as e:
+            print("\n" + "!"*60)
+            logging.error(f"Error al obtener datos de {symbol}: {e}")
+            print("!"*60 + "\n")
+            return {"symbol": symbol, "error": str(e)}
+
+    # --- Etapa 2: análisis (EDA, conversión y Monte Carlo por ticker) ---
+    def analyze(record):
+        if "error" in record:
+            return record
+        with ticker_context(record["symbol"]):
+            return analyze_record(record)
+
+    def analyze_record(record):
+        symbol, hist, actions = record["symbol"], record.pop("hist"), record.pop("actions", None)
+        try:
+            if not isinstance(hist, pd.DataFrame) or hist.empty:
+                print(f"No hay datos históricos para {symbol}.")
+                record["error"] = "sin datos históricos"
+                return record
+            hist = normalize_date_column(hist)
+            if hist is None:
+                record["error"] = "sin columna 'date'"
+                return record
+            if verbose:
+                print(describe_history(symbol, hist))
+            # Los 10-K/10-Q de SEC EDGAR se consultan para todos los tickers a la vez al final (--sec-filings)
+            if actions is not None:
+                # Precios ajustados por splits y dividendos antes de validar (un split no es un salto)
+                with span("adjust"):
+                    hist = adjust_ohlcv(hist, actions)
+            if validator is not None:
+                # Barras imposibles o sospechosas: puntuación, cuarentena y, si se pide, reparación
+                with span("validate"):
+                    hist, record["quality"] = validator.validate(hist, repair=config.repair_data)
+            record["hist"] = hist
+            record["input_hash"] = content_hash(hist)
+            with span("to_price_series"):
+                record["series"] = to_price_series(symbol, hist)
+            # Con analytics_workers el Monte Carlo por ticker se hace después, en procesos
+            if config.plots and config.include_mc_tickers and not config.analytics_workers:
+                sim = MonteCarloSimulator(n_simulations=config.mc_simulations, n_days=config.mc_days, model=model,
+                                          seed=seed, cache=simulation_cache)
+                record["simulations"] = sim.simulate_price_series(record["series"])
+        except Exception as e:
+            logging.error(f"Error al analizar {symbol}: {e}")
+            record["error"] = str(e)
+        return record
+
+    # --- Etapa 3: render/escritura (hilo principal) según se completan los grupos ---
+    def render_group(group, records, history=True, montecarlo=True):
+        # Cada subgráfico ocupa una parte del ancho total de referencia
+        width_px = max(1, config.plot_width_px // max(1, min(len(group), plots_per_png)))
+        if history:
+            print_separator()
+            print_title(f"Gráficos para: {', '.join(group)}")
+        ok = [records[s] for s in group if s in records and "error" not in records[s]]
+        if not config.plots or not ok:
+            return
         # --- Gráficos agrupados de precios históricos ---
-        if group_hists:
-            plt.figure(figsize=(6*len(group_hists), 4))
-            for idx, (symbol, hist) in enumerate(group_hists.items()):
-                plt.subplot(1, len(group_hists), idx+1)
-                plt.plot(hist['date'], hist['close'], label=f"{symbol} Close")
-                plt.title(f"{symbol} - Precio histórico")
-                plt.xlabel("Fecha"); plt.ylabel("Precio")
-                plt.legend(); plt.tight_layout()
-            output_manager.save_plot(plt, f"{'_'.join(group)}_historical_grouped.png")
-            plt.show()
+        if history:
+            series = [(r["symbol"], pd.to_datetime(r["hist"]['date']).to_numpy(), r["hist"]['close'].to_numpy())
+                      for r in ok]
+            filename = f"{'_'.join(group)}_historical_grouped.png"
+            render(filename, (6*len(ok), 4), draw_history_group, series, width_px=width_px,
+                   key=artifact_key(filename, width_px, [(r["symbol"], r["input_hash"]) for r in ok]))
         # --- Gráficos agrupados de Monte Carlo ---
-        if include_mc_tickers and group_price_series:
-            plt.figure(figsize=(6*len(group_price_series), 4))
-            for idx, ps in enumerate(group_price_series):
-                sim = MonteCarloSimulator(n_simulations=200, n_days=252)
-                simulations = sim.simulate_price_series(ps)
-                plt.subplot(1, len(group_price_series), idx+1)
-                for i in range(min(100, simulations.shape[0])):
-                    plt.plot(simulations[i], color="blue", alpha=0.1)
-                plt.title(f"{ps.symbol} - Monte Carlo")
-                plt.xlabel("Días"); plt.ylabel("Precio simulado")
-                plt.tight_layout()
-            output_manager.save_plot(plt, f"{'_'.join([ps.symbol for ps in group_price_series])}_montecarlo_grouped.png")
-            plt.show()
-        all_hists.update(group_hists)
+        with_sims = [r for r in ok if "simulations" in r]
+        if montecarlo and with_sims:
+            # El fan chart usa todas las trayectorias; el spaghetti plot solo las 100 primeras
+            items = [(r["symbol"], r["simulations"] if config.fan_chart else r["simulations"][:100]) for r in with_sims]
+            filename = f"{'_'.join([r['symbol'] for r in with_sims])}_montecarlo_grouped.png"
+            # Sin semilla las simulaciones no son reproducibles y el gráfico se regenera siempre
+            key = None if config.seed is None else artifact_key(
+                filename, width_px, [(r["symbol"], r["input_hash"]) for r in with_sims])
+            render(filename, (6*len(with_sims), 4), draw_paths_group, items, width_px=width_px,
+                   fan=config.fan_chart, key=key)
+
+    pipeline = Pipeline([
+        Stage("fetch", fetch, workers=config.fetch_workers, queue_size=config.queue_size),
+        Stage("analyze", analyze, workers=config.analyze_workers, queue_size=config.queue_size),
+    ], output_queue_size=config.queue_size)
+    records = {}
+    pending = {}
+    for record in pipeline.iter(symbols):
+        symbol = record["symbol"]
+        records[symbol] = record
+        g = group_of[symbol]
+        pending.setdefault(g, {})[symbol] = record
+        if len(pending[g]) == len(symbol_groups[g]):
+            render_group(symbol_groups[g], pending.pop(g), montecarlo=not config.analytics_workers)
+    # Grupos incompletos (un ticker perdido por un error inesperado del pipeline)
+    for g in sorted(pending):
+        render_group(symbol_groups[g], pending[g], montecarlo=not config.analytics_workers)
+
+    all_price_series = []
+    for symbol in symbols:
+        record = records.get(symbol, {"error": "no procesado"})
+        if "error" in record:
+            summary["symbols_failed"][symbol] = record["error"]
+        else:
+            summary["symbols_ok"].append(symbol)
+            all_price_series.append(record["series"])
+
+    # --- Calidad de los datos: puntuación por ticker y filas en cuarentena ---
+    reports = [records[s]["quality"] for s in summary["symbols_ok"] if "quality" in records[s]]
+    if reports:
+        summary["data_quality"] = {s: round(records[s]["quality"].score(), 6) for s in summary["symbols_ok"]}
+        quarantine = pd.concat([r.quarantine for r in reports], ignore_index=True)
+        if not quarantine.empty:
+            logging.warning(f"{len(quarantine)} barras no superan la validación (ver quarantine.csv).")
+            summary["outputs"].append(output_manager.save_dataframe(quarantine, "quarantine.csv"))
+
+    # --- Sesiones ausentes por ticker según el calendario de la NYSE ---
+    if summary["symbols_ok"]:
+        frames = [pd.DataFrame({"ticker": s, "date": records[s]["hist"]["date"]}) for s in summary["symbols_ok"]]
+        last_session = min(to_days(config.end_date) - 1, np.datetime64(date.today(), "D") - 1)
+        # Cada ticker desde su primera barra: las sesiones anteriores a su salida a bolsa no faltan
+        with span("completeness"):
+            completeness = find_gaps(pd.concat(frames, ignore_index=True), end=last_session)
+        summary["missing_sessions"] = completeness.to_dict()["missing_sessions"]
+        if not completeness.complete:
+            logging.warning(f"Sesiones ausentes: {summary['missing_sessions']}")
+            summary["outputs"].append(output_manager.save_dataframe(completeness.gaps, "data_gaps.csv"))
+
+    # --- Indicadores técnicos de todos los tickers a la vez (matrices fecha x ticker) ---
+    if config.indicators and summary["symbols_ok"]:
+        from src.analytics.indicators import compute_indicators
+        frames = [records[s]["hist"].assign(ticker=s) for s in summary["symbols_ok"]]
+        indicators = compute_indicators(pd.concat(frames, ignore_index=True))
+        summary["indicators"] = len(indicators)
+        summary["outputs"].append(output_manager.save_dataframe(indicators.reset_index(), "indicators.csv"))
+
+    # --- Metadatos de 10-K/10-Q de todos los tickers desde SEC EDGAR (en paralelo, 10 peticiones/s) ---
+    if config.sec_filings and summary["symbols_ok"]:
+        from src.utils.sec_edgar import EdgarClient
+        sec_dir = SEC_CACHE_DIR or os.path.join(config.output_dir, ".cache", "sec")
+        try:
+            client = EdgarClient(SEC_USER_AGENT, cache_dir=sec_dir, max_workers=SEC_WORKERS)
+            with span("sec"):
+                filings, errors = client.filings_many(summary["symbols_ok"], forms=SEC_FORMS)
+        except Exception as e:
+            logging.error(f"Error al consultar SEC EDGAR: {e}")
+        else:
+            for symbol, error in errors.items():
+                logging.warning(f"Sin filings SEC para {symbol}: {error}")
+            frame = EdgarClient.to_frame(filings)
+            summary["sec_filings"] = {s: int(n) for s, n in frame["ticker"].value_counts(sort=False).items()}
+            summary["outputs"].append(output_manager.save_dataframe(frame, "sec_filings.csv"))
+            if config.sec_items and filings:
+                # Items del último filing de cada formulario, extraídos en streaming a gzip (reutilizables)
+                from src.utils.sec_documents import FilingProcessor
+                latest = {}
+                for filing in filings:  # los filings de cada ticker vienen del más reciente al más antiguo
+                    latest.setdefault((filing.ticker, filing.form), filing)
+                latest = list(latest.values())
+                processor = FilingProcessor(client, os.path.join(sec_dir, "filings"), items=config.sec_items,
+                                            max_workers=SEC_WORKERS)
+                with span("sec"):
+                    results, _ = processor.process_many(latest)
+                extracted = {r.accession_number: r for r in results}
+                rows = [{"ticker": f.ticker, "form": f.form, "accession_number": f.accession_number,
+                         "item": item, "path": path}
+                        for f in latest if f.accession_number in extracted
+                        for item, path in extracted[f.accession_number].items.items()]
+                summary["sec_items"] = len(rows)
+                summary["outputs"].append(output_manager.save_dataframe(pd.DataFrame(rows), "sec_items.csv"))
+
+    # --- Métricas y Monte Carlo por ticker en procesos, sobre los cierres en memoria compartida ---
+    if config.analytics_workers and all_price_series:
+        dates, closes = Portfolio(name="", assets=all_price_series).aligned_closes()
+        mc_plots = config.plots and config.include_mc_tickers
+        analytics = ParallelAnalytics(
+            processes=config.analytics_workers, n_simulations=config.mc_simulations, n_days=config.mc_days,
+            model=model, seed=seed, keep_paths=config.mc_simulations if mc_plots else 0,
+            monte_carlo=config.include_mc_tickers, cache=simulation_cache)
+        with span("analytics"):
+            result = analytics.run(summary["symbols_ok"], dates, closes)
+        for symbol, error in analytics.errors.items():
+            logging.error(f"Error en el Monte Carlo de {symbol}: {error}")
+        summary["outputs"].append(output_manager.save_dataframe(
+            result.to_frame().rename_axis("symbol").reset_index(), "ticker_metrics.csv"))
+        if result.simulations is not None:
+            simulated = ~np.isnan(result.metric("mc_mean"))
+            for j, symbol in enumerate(result.symbols):
+                if simulated[j]:
+                    records[symbol]["simulations"] = result.simulations[j]
+            for group in symbol_groups:
+                render_group(group, records, history=False)
 
 
     # --- Análisis de Portfolio completo ---
@@ -245,50 +679,148 @@ def main():
             name="Portfolio de Infobolsa",
             assets=all_price_series
         )
-        portfolio.report(show=True)
-        report_text = portfolio.report(show=False)
-        with open(output_manager.get_path("portfolio_report.md"), "w") as f:
-            f.write(report_text)
+        portfolio_inputs = [(s, records[s]["input_hash"]) for s in summary["symbols_ok"]]
+        report_key = artifact_key("portfolio_report.md", portfolio_inputs)
+        report_path = reuse("portfolio_report.md", report_key)
+        if report_path is not None:
+            with open(report_path, encoding="utf-8") as f:
+                print(f.read())
+        else:
+            with span("report"):
+                report_text = portfolio.report(show=True)
+            report_path = output_manager.save_text(report_text, "portfolio_report.md")
+            summary["outputs"].append(report_path)
+            if manifest is not None:
+                manifest.record("portfolio_report.md", report_key, report_path)
         print_separator()
-        portfolio_sims = portfolio.monte_carlo_simulation(n_simulations=200, n_days=252)
-        plt.figure(figsize=(12, 6))
-        for i in range(min(100, portfolio_sims.shape[0])):
-            plt.plot(portfolio_sims[i], color="purple", alpha=0.1)
-        plt.title("Portfolio - Simulación Monte Carlo (252 días)")
-        plt.xlabel("Días")
-        plt.ylabel("Valor total de la cartera")
-        plt.tight_layout()
-        output_manager.save_plot(plt, "portfolio_montecarlo.png")
-        plt.show()
+        with span("portfolio_montecarlo"):
+            portfolio_sims = portfolio.monte_carlo_simulation(
+                n_simulations=config.mc_simulations, n_days=config.mc_days, model=model, seed=seed,
+                cache=simulation_cache)
+        if config.plots:
+            render("portfolio_montecarlo.png", (12, 6), draw_simulation,
+                   portfolio_sims if config.fan_chart else portfolio_sims[:100],
+                   f"Portfolio - Simulación Monte Carlo ({config.mc_days} días)", ylabel="Valor total de la cartera",
+                   width_px=config.plot_width_px, fan=config.fan_chart,
+                   key=None if config.seed is None else artifact_key("portfolio_montecarlo.png", portfolio_inputs))
         print_separator()
-        print_title("Matriz de correlación de precios de cierre")
-        # Construir DataFrame de precios de cierre
-        close_data = {}
-        for ps in all_price_series:
-            close_data[ps.symbol] = [pp.close for pp in ps.data]
-        max_len = max(len(lst) for lst in close_data.values())
-        for k in close_data:
-            if len(close_data[k]) < max_len:
-                close_data[k] += [float('nan')] * (max_len - len(close_data[k]))
-        close_df = pd.DataFrame(close_data)
-        corr = close_df.corr()
+        print_title("Matriz de correlación de rendimientos logarítmicos")
+        # Rendimientos alineados por fecha; cada par usa solo las fechas comunes
+        _, closes = portfolio.aligned_closes()
+        returns = log_returns(closes)
+        symbols = [ps.symbol for ps in all_price_series]
+        with span("correlation"):
+            corr = pd.DataFrame(correlation_matrix(returns, block_size=DEFAULT_BLOCK_SIZE), index=symbols, columns=symbols)
         print(corr)
-        plt.figure(figsize=(8, 6))
-        im = plt.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1)
-        plt.colorbar(im, fraction=0.046, pad=0.04)
-        plt.xticks(range(len(corr.columns)), corr.columns, rotation=45)
-        plt.yticks(range(len(corr.index)), corr.index)
-        plt.title("Matriz de correlación de precios de cierre")
-        plt.tight_layout()
-        output_manager.save_plot(plt, "correlation_matrix.png")
-        plt.show()
+        if len(symbols) > 1:
+            print("\nPares más correlacionados:")
+            for a, b, value in top_k_pairs(returns, k=5, labels=symbols):
+                print(f"  {a} - {b}: {value:.3f}")
+        if config.plots:
+            render("correlation_matrix.png", (8, 6), draw_correlation, corr.to_numpy(), symbols,
+                   "Matriz de correlación de rendimientos logarítmicos",
+                   key=artifact_key("correlation_matrix.png", portfolio_inputs))
         print_separator()
         print_title("Análisis de cartera completado y guardado.")
 
+    if render_service is not None:
+        paths, errors = render_service.close()
+        summary["outputs"].extend(paths)
+        # Los renderizados se miden en los procesos del pool; aquí se suman al informe
+        for path, wall_s, cpu_s in render_service.timings:
+            written = os.path.getsize(path) if os.path.exists(path) else 0
+            get_instrumentation().record("render", wall_s, cpu_s, bytes_written=written)
+        for e in errors:
+            logging.error(f"Error al renderizar un gráfico: {e}")
+        if manifest is not None:
+            for path in paths:
+                if path in pending_artifacts:
+                    manifest.record(*pending_artifacts[path], path)
+    if manifest is not None:
+        for symbol, record in records.items():
+            if "input_hash" in record:
+                manifest.set_input(symbol, record["input_hash"])
+        manifest.save()
+        summary["artifacts_reused"] = len(manifest.reused)
     print_separator()
-    print(f"Todos los datos y gráficos han sido guardados en la carpeta de outputs ({OUTPUTS_BASE_PATH}).\n")
+    print(f"Todos los datos y gráficos han sido guardados en la carpeta de outputs ({output_manager.base_dir}).\n")
+    return summary
+
+
+def fetch_history(extractor, symbol, start_date, end_date):
+    """Descarga el histórico de un ticker con el extractor (admite resultados enriquecidos en dict)."""
+    if hasattr(extractor, 'get_all_data'):
+        result = extractor.get_all_data(symbol, start=start_date, end=end_date)
+    else:
+        result = extractor.get_historical_prices(symbol, start=start_date, end=end_date)
+    return result['historical'] if isinstance(result, dict) and 'historical' in result else result
+
+
+def normalize_date_column(hist):
+    """Renombra la columna de fecha alternativa a 'date'; devuelve None si no existe ninguna."""
+    if 'date' in hist.columns:
+        return hist
+    # Buscar columna de fecha alternativa
+    for col in hist.columns:
+        if col.lower() in ['timestamp', 'datetime', 'fecha']:
+            return hist.rename(columns={col: 'date'})
+    print(f"[ERROR] El DataFrame no tiene columna 'date'. Columnas encontradas: {list(hist.columns)}")
+    return None
 
 
+def describe_history(symbol, hist):
+    """Texto de EDA de un ticker (se imprime de una vez para no mezclarse entre hilos)."""
+    lines = [
+        "\n" + "="*80 + "\n",
+        "\n" + "#"*40, f"Procesando símbolo: {symbol}", "#"*40 + "\n",
+        f"[INFO] Columnas recibidas para {symbol}: {list(hist.columns)}",
+        f"[INFO] Primeras y ultimas filas para {symbol}:",
+        str(hist.head(10)),
+        "....../n",
+        str(hist.tail(10)),
+        # EDA: resumen estadístico
+        "\nResumen estadístico (describe):",
+        str(hist.describe().T),
+        "\nDistribución de precios de cierre:",
+        str(hist['close'].describe()),
+    ]
+    return "\n".join(lines)
+
+
+def to_price_series(symbol, hist):
+    """Convierte un DataFrame estandarizado en PriceSeries."""
+    from src.models.price_series import PriceSeries, PricePoint
+    price_points = [PricePoint(
+        date=row['date'],
+        open=row['open'],
+        high=row['high'],
+        low=row['low'],
+        close=row['close'],
+        volume=row['volume']
+    ) for _, row in hist.iterrows()]
+    return PriceSeries(symbol=symbol, currency="USD", data=price_points)
+
+
+def write_run_summary(summary, config, output_manager, started):
+    """Completa el resumen de la ejecución, lo guarda en run_summary.json y lo devuelve."""
+    if not summary["symbols_ok"]:
+        summary["exit_code"] = EXIT_FAILURE
+    elif summary["symbols_failed"]:
+        summary["exit_code"] = EXIT_PARTIAL
+    else:
+        summary["exit_code"] = EXIT_OK
+    summary["elapsed_s"] = round(time.time() - started, 3)
+    summary["output_dir"] = output_manager.base_dir
+    summary["config"] = asdict(config)
+    path = output_manager.get_path("run_summary.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    logging.info(
+        f"Resumen: {len(summary['symbols_ok'])} tickers correctos, {len(summary['symbols_failed'])} con errores, "
+        f"{len(summary['outputs'])} ficheros generados en {summary['elapsed_s']}s (código {summary['exit_code']})."
+    )
+    return summary
+
 
 def print_separator():
     print("\n" + "="*80 + "\n")
@@ -300,4 +832,4 @@ def print_title(title):
 
 # Entrypoint
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,7 +2,9 @@ from dataclasses import dataclass, field
 from typing import List
 from .price_series import PriceSeries
 import statistics
+import numpy as np
 from src.simulation.montecarlo import MonteCarloSimulator
+from src.analytics.report import ReportEngine
 @dataclass
 class Portfolio:
     name: str
@@ -22,6 +24,20 @@ class Portfolio:
                 date_values[p.date] += p.close
         return dict(sorted(date_values.items()))
 
+    def aligned_closes(self):
+        """
+        Alinea los cierres de todos los activos por fecha.
+        Devuelve (fechas, matriz) donde la matriz tiene forma (n_fechas, n_activos)
+        y NaN en las fechas en las que un activo no tiene dato.
+        """
+        dates = sorted({p.date for asset in self.assets for p in asset.data})
+        index = {d: i for i, d in enumerate(dates)}
+        closes = np.full((len(dates), len(self.assets)), np.nan)
+        for j, asset in enumerate(self.assets):
+            rows = [index[p.date] for p in asset.data]
+            closes[rows, j] = [p.close for p in asset.data]
+        return dates, closes
+
     def mean(self):
         """Media de los valores de cierre de todos los activos."""
         closes = []
@@ -38,35 +54,38 @@ class Portfolio:
             return float('nan')
         return statistics.stdev(closes)
 
-    def monte_carlo_simulation(self, n_simulations=1000, n_days=252, mu_sigma_dict=None):
+    def monte_carlo_simulation(self, n_simulations=1000, n_days=252, mu_sigma_dict=None, model=None, seed=None, cache=None):
         """
         Realiza una simulación de Monte Carlo de la cartera usando MonteCarloSimulator.
+        model permite elegir el modelo estocástico (GBM por defecto). Con seed y cache
+        se reutilizan las simulaciones por activo ya calculadas.
         Devuelve un array (n_simulations, n_days+1) con el valor total simulado de la cartera.
         """
-       
-        sim = MonteCarloSimulator(n_simulations=n_simulations, n_days=n_days)
+        sim = MonteCarloSimulator(n_simulations=n_simulations, n_days=n_days, model=model, seed=seed, cache=cache)
         return sim.simulate_portfolio(self, mu_sigma_dict)
 
-    def report(self, show=True):
+    def backtest(self, weights, cost_bps=0.0, lag=1, initial_capital=1.0):
+        """
+        Backtest vectorizado de unos pesos objetivo (n_fechas, n_activos) alineados con
+        aligned_closes(); una fila de NaN mantiene las posiciones. Devuelve un BacktestResult
+        con posiciones, rotación, costes, curva de capital y métricas.
+        """
+        from src.analytics.backtest import backtest
+        dates, closes = self.aligned_closes()
+        if callable(weights):
+            weights = weights(closes)
+        return backtest(dates, closes, weights, symbols=[a.symbol for a in self.assets], cost_bps=cost_bps,
+                        lag=lag, initial_capital=initial_capital)
+
+    def report(self, show=True, fmt="markdown", engine: ReportEngine = None):
         """
-        Genera un reporte en formato markdown con análisis relevante de la cartera.
+        Genera un reporte con análisis relevante de la cartera (markdown, html o json).
+        Las métricas se calculan en una sola pasada con ReportEngine; pasar un engine
+        compartido reutiliza las de los activos ya calculados en otras carteras.
         Si show=True, imprime el reporte por pantalla.
         """
-        lines = []
-        lines.append(f"# Reporte de Cartera: {self.name}\n")
-        lines.append(f"**Número de activos:** {len(self.assets)}\n")
-        lines.append(f"**Media de precios:** {self.mean():.2f}")
-        lines.append(f"**Volatilidad:** {self.volatility():.2f}")
-        # Advertencias
-        if len(self.assets) == 0:
-            lines.append("**ADVERTENCIA:** La cartera no contiene activos.\n")
-        for asset in self.assets:
-            if len(asset.data) < 2:
-                lines.append(f"**ADVERTENCIA:** El activo {asset.symbol} tiene pocos datos.\n")
-        lines.append("\n## Activos\n")
-        for asset in self.assets:
-            lines.append(f"- **{asset.symbol}**: {len(asset.data)} puntos, media={asset.mean():.2f}, volatilidad={asset.stdev():.2f}")
-        report = "\n".join(lines)
+        engine = engine if engine is not None else ReportEngine()
+        report = engine.report(self).render(fmt)
         if show:
             print(report)
         return report
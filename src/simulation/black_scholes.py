@@ -0,0 +1,150 @@
+"""
+Black-Scholes vectorizado para cadenas de opciones completas.
+
+Todas las funciones reciben arrays (o escalares que se difunden) de spot, strike,
+plazo en años, tipo libre de riesgo y rentabilidad por dividendo continuos, y el tipo
+de cada contrato ("call"/"put" o un array booleano is_call). La volatilidad implícita
+se resuelve para toda la cadena a la vez con Newton protegido por un intervalo
+(bisección cuando el paso de Newton sale del intervalo o la vega es casi nula), de
+modo que el número de iteraciones lo marca el contrato más lento y no el número de
+contratos.
+"""
+import numpy as np
+from scipy.special import ndtr
+
+# Intervalo de búsqueda de la volatilidad implícita (anual)
+IV_LOWER = 1e-4
+IV_UPPER = 10.0
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def _is_call(kind) -> np.ndarray:
+    """Array booleano de calls a partir de "call"/"put", un array de esos textos o un array booleano."""
+    kind = np.asarray(kind)
+    if kind.dtype == bool:
+        return kind
+    valid = np.isin(kind, ("call", "put"))
+    if not valid.all():
+        raise ValueError(f"Tipo de opción no válido: {kind[~valid].ravel()[0]}. Opciones: call, put")
+    return kind == "call"
+
+
+def _inputs(S, K, T, r, q, kind, *extra):
+    """Arrays float difundidos a una forma común, más el array booleano is_call."""
+    return np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (S, K, T, r, q) + extra), _is_call(kind))
+
+
+def _d1_d2(S, K, T, r, q, sigma):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_t
+    return d1, d1 - vol_t
+
+
+def _price(S, K, T, r, q, sigma, is_call):
+    d1, d2 = _d1_d2(S, K, T, r, q, sigma)
+    fwd_s, fwd_k = S * np.exp(-q * T), K * np.exp(-r * T)
+    sign = np.where(is_call, 1.0, -1.0)
+    return sign * (fwd_s * ndtr(sign * d1) - fwd_k * ndtr(sign * d2))
+
+
+def _vega(S, K, T, r, q, sigma):
+    d1, _ = _d1_d2(S, K, T, r, q, sigma)
+    return S * np.exp(-q * T) * np.exp(-0.5 * d1 * d1) / SQRT_2PI * np.sqrt(T)
+
+
+def bs_price(S, K, T, sigma, kind="call", r=0.0, q=0.0) -> np.ndarray:
+    """Precio Black-Scholes (con dividendo continuo q) de cada contrato."""
+    S, K, T, r, q, sigma, is_call = _inputs(S, K, T, r, q, kind, sigma)
+    return _price(S, K, T, r, q, sigma, is_call)
+
+
+def greeks(S, K, T, sigma, kind="call", r=0.0, q=0.0) -> dict:
+    """
+    Griegas analíticas de cada contrato: delta, gamma, vega (por 1.0 de volatilidad),
+    theta (por año) y rho (por 1.0 de tipo). NaN donde sigma o T no son positivos.
+    """
+    S, K, T, r, q, sigma, is_call = _inputs(S, K, T, r, q, kind, sigma)
+    d1, d2 = _d1_d2(S, K, T, r, q, sigma)
+    disc_q, disc_r = np.exp(-q * T), np.exp(-r * T)
+    sqrt_t = np.sqrt(T)
+    pdf = np.exp(-0.5 * d1 * d1) / SQRT_2PI
+    sign = np.where(is_call, 1.0, -1.0)
+    nd1, nd2 = ndtr(sign * d1), ndtr(sign * d2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = disc_q * pdf / (S * sigma * sqrt_t)
+        theta = (-S * disc_q * pdf * sigma / (2 * sqrt_t)
+                 + sign * (q * S * disc_q * nd1 - r * K * disc_r * nd2))
+    out = {
+        "delta": sign * disc_q * nd1,
+        "gamma": gamma,
+        "vega": S * disc_q * pdf * sqrt_t,
+        "theta": theta,
+        "rho": sign * K * T * disc_r * nd2,
+    }
+    invalid = ~((sigma > 0) & (T > 0))
+    if invalid.any():
+        for values in out.values():
+            values[invalid] = np.nan
+    return out
+
+
+def price_bounds(S, K, T, kind="call", r=0.0, q=0.0):
+    """(mínimo, máximo) sin arbitraje del precio de cada contrato europeo."""
+    S, K, T, r, q, is_call = _inputs(S, K, T, r, q, kind)
+    fwd_s, fwd_k = S * np.exp(-q * T), K * np.exp(-r * T)
+    lower = np.maximum(np.where(is_call, fwd_s - fwd_k, fwd_k - fwd_s), 0.0)
+    return lower, np.where(is_call, fwd_s, fwd_k)
+
+
+def implied_volatility(price, S, K, T, kind="call", r=0.0, q=0.0, tol=1e-8, max_iter=100) -> np.ndarray:
+    """
+    Volatilidad implícita de cada contrato (NaN si el precio está fuera de los límites
+    sin arbitraje, el plazo no es positivo o no converge en max_iter iteraciones).
+    Solo se itera sobre los contratos que aún no han convergido.
+    """
+    S, K, T, r, q, price, is_call = _inputs(S, K, T, r, q, kind, price)
+    shape = S.shape
+    S, K, T, r, q, price, is_call = (a.ravel() for a in (S, K, T, r, q, price, is_call))
+    iv = np.full(S.shape, np.nan)
+    with np.errstate(invalid="ignore"):
+        lower, upper = price_bounds(S, K, T, is_call, r, q)
+        ok = (T > 0) & (S > 0) & (K > 0) & (price > lower) & (price < upper)
+    active = np.flatnonzero(ok)
+    if not active.size:
+        return iv.reshape(shape)
+    S, K, T, r, q, price, is_call = (a[active] for a in (S, K, T, r, q, price, is_call))
+    lo = np.full(active.size, IV_LOWER)
+    hi = np.full(active.size, IV_UPPER)
+    # Punto de partida: aproximación de Brenner-Subrahmanyam sobre el valor temporal
+    time_value = price - lower[active]
+    sigma = np.clip(np.sqrt(2 * np.pi / T) * time_value / S, 0.05, 2.0)
+    # Precisión alcanzable en el precio (la vega de los contratos muy dentro o fuera del dinero es casi nula)
+    floor = 1e-13 * price
+    for _ in range(max_iter):
+        diff = _price(S, K, T, r, q, sigma, is_call) - price
+        vega = _vega(S, K, T, r, q, sigma)
+        # Convergencia: error de sigma (diff / vega) por debajo de tol, o diff en el límite numérico
+        done = (np.abs(diff) <= tol * vega) | (np.abs(diff) <= floor)
+        # El precio crece con sigma: el signo de diff acota el intervalo
+        above = diff > 0
+        hi = np.where(above, sigma, hi)
+        lo = np.where(above, lo, sigma)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = sigma - diff / vega
+        inside = (newton > lo) & (newton < hi) & (vega > 1e-12 * S)
+        step = np.where(inside, newton, 0.5 * (lo + hi))
+        # Intervalo ya más estrecho que la tolerancia: se acepta el punto medio
+        narrow = ~done & (hi - lo <= 1e-12 * hi)
+        step = np.where(done, sigma, step)
+        finished = done | narrow
+        if finished.any():
+            iv[active[finished]] = step[finished]
+            keep = ~finished
+            active = active[keep]
+            if not active.size:
+                break
+            S, K, T, r, q, price, is_call, lo, hi, step, floor = (
+                a[keep] for a in (S, K, T, r, q, price, is_call, lo, hi, step, floor))
+        sigma = step
+    return iv.reshape(shape)
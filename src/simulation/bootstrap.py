@@ -0,0 +1,101 @@
+"""
+Simulación no paramétrica (bootstrap histórico) para series de precios y carteras.
+
+En lugar de suponer un GBM con mu y sigma constantes, remuestrea los rendimientos
+logarítmicos históricos. El muestreo se hace con una única extracción de índices
+para todas las trayectorias y días, seguida de un gather y una suma acumulada.
+"""
+import numpy as np
+from src.models.price_series import PriceSeries
+
+
+class BootstrapSimulator:
+    """
+    Simulador bootstrap de la evolución de un activo o cartera.
+
+    Métodos disponibles:
+    - "iid": cada día se elige un rendimiento histórico al azar.
+    - "circular": bloques de longitud fija block_size, envolviendo al final de la muestra.
+    - "stationary": bloques de longitud geométrica de media block_size (Politis-Romano).
+
+    Los métodos por bloques conservan la agrupación de volatilidad y, en carteras,
+    la correlación entre activos (todos los activos comparten los mismos índices).
+    """
+    METHODS = ("iid", "circular", "stationary")
+
+    def __init__(self, n_simulations=1000, n_days=252, method="stationary", block_size=20, seed=None):
+        if method not in self.METHODS:
+            raise ValueError(f"Método de bootstrap no válido: {method}. Opciones: {', '.join(self.METHODS)}")
+        if block_size < 1:
+            raise ValueError("block_size debe ser mayor o igual que 1.")
+        self.n_simulations = n_simulations
+        self.n_days = n_days
+        self.method = method
+        self.block_size = block_size
+        self.rng = np.random.default_rng(seed)
+
+    def sample_indices(self, n_obs):
+        """
+        Genera la matriz (n_simulations, n_days) de índices sobre n_obs rendimientos históricos.
+        """
+        n, d = self.n_simulations, self.n_days
+        if self.method == "iid" or self.block_size == 1:
+            return self.rng.integers(0, n_obs, size=(n, d))
+        if self.method == "circular":
+            b = self.block_size
+            n_blocks = -(-d // b)
+            starts = self.rng.integers(0, n_obs, size=(n, n_blocks, 1))
+            idx = (starts + np.arange(b)) % n_obs
+            return idx.reshape(n, n_blocks * b)[:, :d]
+        # Bootstrap estacionario: un bloque nuevo empieza con probabilidad 1/block_size
+        new_block = self.rng.random((n, d)) < 1.0 / self.block_size
+        new_block[:, 0] = True
+        starts = self.rng.integers(0, n_obs, size=(n, d))
+        pos = np.arange(d)
+        block_pos = np.where(new_block, pos, 0)
+        np.maximum.accumulate(block_pos, axis=1, out=block_pos)
+        idx = np.take_along_axis(starts, block_pos, axis=1)
+        idx += pos - block_pos
+        idx %= n_obs
+        return idx
+
+    def _paths(self, log_returns, idx, S0):
+        """Construye las trayectorias de precio a partir de los índices remuestreados."""
+        paths = np.empty((idx.shape[0], idx.shape[1] + 1))
+        paths[:, 0] = 0.0
+        paths[:, 1:] = log_returns[idx]
+        np.cumsum(paths, axis=1, out=paths)
+        np.exp(paths, out=paths)
+        paths *= S0
+        return paths
+
+    def simulate_price_series(self, price_series: PriceSeries):
+        """
+        Simula trayectorias de precios remuestreando los rendimientos históricos del activo.
+        Devuelve un array (n_simulations, n_days+1) con las simulaciones.
+        """
+        closes = np.array([p.close for p in price_series.data], dtype=float)
+        if len(closes) < 2:
+            raise ValueError("No hay suficientes datos para simular.")
+        log_returns = np.diff(np.log(closes))
+        idx = self.sample_indices(len(log_returns))
+        return self._paths(log_returns, idx, closes[-1])
+
+    def simulate_portfolio(self, portfolio):
+        """
+        Simula la evolución de una cartera remuestreando conjuntamente los rendimientos
+        de todos los activos en las fechas comunes, de modo que se conserva la correlación.
+        Devuelve un array (n_simulations, n_days+1) con el valor total de la cartera.
+        """
+        _, closes = portfolio.aligned_closes()
+        complete = closes[~np.isnan(closes).any(axis=1)]
+        if complete.shape[0] < 2:
+            raise ValueError("No hay suficientes fechas comunes para simular la cartera.")
+        log_returns = np.diff(np.log(complete), axis=0)
+        idx = self.sample_indices(log_returns.shape[0])
+        total = np.zeros((self.n_simulations, self.n_days + 1))
+        for j, asset in enumerate(portfolio.assets):
+            # Se parte del último cierre propio de cada activo, como en MonteCarloSimulator
+            S0 = asset.data[-1].close
+            total += self._paths(log_returns[:, j], idx, S0)
+        return total
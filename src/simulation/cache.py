@@ -0,0 +1,148 @@
+"""
+Caché de resultados de simulación direccionada por contenido.
+
+La clave es una huella (sha256) de los cierres de entrada, el modelo y sus
+parámetros, el horizonte, el número de trayectorias y la semilla. Tiene un nivel
+en memoria (LRU) y un nivel opcional en disco con límite de tamaño.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+CACHE_VERSION = 1
+
+
+def hash_array(values) -> str:
+    """Huella sha256 de un array numérico (se normaliza a float64)."""
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.sha256(arr.tobytes()).hexdigest()
+
+
+def simulation_key(closes_hash: str, model, n_days: int, n_simulations: int, seed) -> str:
+    """Construye la clave de caché de una simulación."""
+    payload = {
+        "version": CACHE_VERSION,
+        "closes": closes_hash,
+        "model": type(model).__name__,
+        "params": model.params(),
+        "n_days": int(n_days),
+        "n_simulations": int(n_simulations),
+        "seed": seed,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SimulationCache:
+    """
+    Caché de arrays de simulación con un nivel LRU en memoria y otro opcional en disco.
+    Los arrays devueltos son de solo lectura para que no se pueda alterar la caché. Se
+    puede compartir entre hilos (los de análisis del pipeline).
+    """
+    def __init__(self, max_entries=64, disk_dir=None, max_disk_bytes=512 * 1024**2):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # Se envía a los procesos de ParallelAnalytics: el lock no se serializa
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def get(self, key):
+        """Devuelve el array guardado para key o None si no está en caché."""
+        with self._lock:
+            arr = self._memory.get(key)
+            if arr is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return arr
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                arr = np.load(path)
+                os.utime(path)  # marca de uso para la expulsión LRU en disco
+            except (OSError, ValueError):
+                arr = None
+            if arr is not None:
+                with self._lock:
+                    self.hits += 1
+                return self._remember(key, arr)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, arr, disk=True):
+        """
+        Guarda arr en la caché (memoria y, si está configurado y disk=True, disco).
+        disk=False sirve para arrays que otro proceso ya ha guardado en el disco compartido.
+        """
+        arr = self._remember(key, np.asarray(arr))
+        if self.disk_dir and disk:
+            path = self._disk_path(key)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    np.save(f, arr)
+                os.replace(tmp, path)
+                with self._lock:
+                    self._evict_disk()
+            except OSError as e:
+                logging.warning(f"No se pudo guardar la simulación en caché de disco: {e}")
+        return arr
+
+    def _remember(self, key, arr):
+        arr.setflags(write=False)
+        with self._lock:
+            self._memory[key] = arr
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return arr
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".npy"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # ya expulsado por otro proceso
+                pass
+            total -= size
+
+    def clear(self):
+        """Vacía la caché en memoria y en disco."""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".npy"):
+                    os.remove(os.path.join(self.disk_dir, name))
@@ -0,0 +1,261 @@
+"""
+Modelos estocásticos para MonteCarloSimulator.
+
+Cada modelo es un kernel que simula todas las trayectorias a la vez y devuelve un
+array (n_simulations, n_days+1). GBM y Merton se vectorizan por completo (una
+extracción de números aleatorios y una suma acumulada). GARCH y Heston dependen
+de la trayectoria: se vectorizan sobre las simulaciones y, si numba está
+instalado, usan un kernel compilado JIT (backend "numba").
+"""
+import importlib.util
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+import numpy as np
+
+# numba es opcional y su importación es lenta: solo se importa al compilar el primer kernel
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+BACKENDS = ("auto", "numpy", "numba")
+
+
+def _paths_from_log_increments(S0, increments):
+    """Convierte incrementos logarítmicos (n, d) en trayectorias de precio (n, d+1)."""
+    paths = np.empty((increments.shape[0], increments.shape[1] + 1))
+    paths[:, 0] = 0.0
+    paths[:, 1:] = increments
+    np.cumsum(paths, axis=1, out=paths)
+    np.exp(paths, out=paths)
+    paths *= S0
+    return paths
+
+
+def _resolve_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no válido: {backend}. Opciones: {', '.join(BACKENDS)}")
+    if backend == "numba" and not HAS_NUMBA:
+        raise ValueError("El backend 'numba' requiere tener numba instalado.")
+    if backend == "auto":
+        return "numba" if HAS_NUMBA else "numpy"
+    return backend
+
+
+class StochasticModel(ABC):
+    """
+    Clase base para los modelos de MonteCarloSimulator.
+    Los parámetros a None se estiman a partir de los rendimientos logarítmicos
+    diarios en fit(); todos los parámetros están expresados en unidades diarias.
+    """
+    @abstractmethod
+    def fit(self, log_returns: np.ndarray) -> "StochasticModel":
+        """Devuelve una copia del modelo con los parámetros que falten estimados."""
+
+    @abstractmethod
+    def simulate(self, S0: float, n_simulations: int, n_days: int, rng: np.random.Generator) -> np.ndarray:
+        """Simula las trayectorias de precio partiendo de S0."""
+
+    def with_params(self, **params):
+        """Devuelve una copia con los parámetros indicados (se ignoran los None y los desconocidos)."""
+        names = {f.name for f in fields(self)}
+        updates = {k: v for k, v in params.items() if v is not None and k in names}
+        return replace(self, **updates) if updates else self
+
+    def params(self) -> dict:
+        """Parámetros del modelo como diccionario."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass
+class GBMModel(StochasticModel):
+    """Movimiento browniano geométrico (el modelo original de MonteCarloSimulator)."""
+    mu: Optional[float] = None
+    sigma: Optional[float] = None
+
+    def fit(self, log_returns):
+        return replace(
+            self,
+            mu=np.mean(log_returns) if self.mu is None else self.mu,
+            sigma=np.std(log_returns) if self.sigma is None else self.sigma,
+        )
+
+    def simulate(self, S0, n_simulations, n_days, rng):
+        increments = rng.standard_normal((n_simulations, n_days))
+        increments *= self.sigma
+        increments += self.mu - 0.5 * self.sigma**2
+        return _paths_from_log_increments(S0, increments)
+
+
+@dataclass
+class MertonJumpModel(StochasticModel):
+    """
+    Difusión con saltos de Merton: GBM más saltos log-normales con llegada de Poisson.
+    jump_intensity es la probabilidad media de salto por día.
+    """
+    mu: Optional[float] = None
+    sigma: Optional[float] = None
+    jump_intensity: Optional[float] = None
+    jump_mean: Optional[float] = None
+    jump_std: Optional[float] = None
+    jump_threshold: float = 3.0
+
+    def fit(self, log_returns):
+        log_returns = np.asarray(log_returns, dtype=float)
+        # Se consideran saltos los rendimientos a más de jump_threshold desviaciones
+        deviation = np.abs(log_returns - log_returns.mean())
+        is_jump = deviation > self.jump_threshold * log_returns.std()
+        diffusive = log_returns[~is_jump] if (~is_jump).sum() > 1 else log_returns
+        jumps = log_returns[is_jump]
+        return replace(
+            self,
+            mu=np.mean(diffusive) if self.mu is None else self.mu,
+            sigma=np.std(diffusive) if self.sigma is None else self.sigma,
+            jump_intensity=is_jump.mean() if self.jump_intensity is None else self.jump_intensity,
+            jump_mean=(jumps.mean() if len(jumps) else 0.0) if self.jump_mean is None else self.jump_mean,
+            jump_std=(jumps.std() if len(jumps) > 1 else 0.0) if self.jump_std is None else self.jump_std,
+        )
+
+    def simulate(self, S0, n_simulations, n_days, rng):
+        shape = (n_simulations, n_days)
+        n_jumps = rng.poisson(self.jump_intensity, shape)
+        # Compensación para que la deriva esperada no dependa de los saltos
+        k = np.exp(self.jump_mean + 0.5 * self.jump_std**2) - 1
+        increments = rng.standard_normal(shape)
+        increments *= self.sigma
+        increments += self.mu - 0.5 * self.sigma**2 - self.jump_intensity * k
+        increments += n_jumps * self.jump_mean
+        increments += np.sqrt(n_jumps) * self.jump_std * rng.standard_normal(shape)
+        return _paths_from_log_increments(S0, increments)
+
+
+def _garch_loop(Z, mu, omega, alpha, beta, v0):
+    n, d = Z.shape
+    increments = np.empty((n, d))
+    for i in range(n):
+        v = v0
+        for t in range(d):
+            eps = np.sqrt(v) * Z[i, t]
+            increments[i, t] = mu - 0.5 * v + eps
+            v = omega + alpha * eps * eps + beta * v
+    return increments
+
+
+def _heston_loop(Z1, Z2, mu, kappa, theta, xi, rho, v0):
+    n, d = Z1.shape
+    increments = np.empty((n, d))
+    rho_c = np.sqrt(1.0 - rho * rho)
+    for i in range(n):
+        v = v0
+        for t in range(d):
+            vp = v if v > 0.0 else 0.0
+            sv = np.sqrt(vp)
+            increments[i, t] = mu - 0.5 * vp + sv * Z1[i, t]
+            v = v + kappa * (theta - vp) + xi * sv * (rho * Z1[i, t] + rho_c * Z2[i, t])
+    return increments
+
+
+_JIT_KERNELS = {}
+
+
+def _jit(kernel):
+    """Versión compilada con numba de kernel (se compila y se cachea en el primer uso)."""
+    compiled = _JIT_KERNELS.get(kernel)
+    if compiled is None:
+        import numba
+        compiled = _JIT_KERNELS[kernel] = numba.njit(cache=True)(kernel)
+    return compiled
+
+
+@dataclass
+class GARCHModel(StochasticModel):
+    """
+    Volatilidad GARCH(1,1): v_t = omega + alpha * eps_{t-1}^2 + beta * v_{t-1}.
+    omega se estima por targeting de varianza si no se indica.
+    """
+    mu: Optional[float] = None
+    omega: Optional[float] = None
+    alpha: float = 0.08
+    beta: float = 0.90
+    v0: Optional[float] = None
+    backend: str = "auto"
+
+    def fit(self, log_returns):
+        if self.alpha + self.beta >= 1:
+            raise ValueError("GARCH(1,1) requiere alpha + beta < 1.")
+        var = np.var(log_returns)
+        return replace(
+            self,
+            mu=np.mean(log_returns) if self.mu is None else self.mu,
+            omega=var * (1 - self.alpha - self.beta) if self.omega is None else self.omega,
+            v0=var if self.v0 is None else self.v0,
+        )
+
+    def simulate(self, S0, n_simulations, n_days, rng):
+        Z = rng.standard_normal((n_simulations, n_days))
+        if _resolve_backend(self.backend) == "numba":
+            increments = _jit(_garch_loop)(Z, self.mu, self.omega, self.alpha, self.beta, self.v0)
+            return _paths_from_log_increments(S0, increments)
+        # Vectorizado sobre las trayectorias; solo se itera sobre los días
+        v = np.full(n_simulations, float(self.v0))
+        increments = Z
+        for t in range(n_days):
+            eps = np.sqrt(v) * Z[:, t]
+            increments[:, t] = self.mu - 0.5 * v + eps
+            v = self.omega + self.alpha * eps * eps + self.beta * v
+        return _paths_from_log_increments(S0, increments)
+
+
+@dataclass
+class HestonModel(StochasticModel):
+    """
+    Volatilidad estocástica tipo Heston (Euler con truncamiento completo).
+    Parámetros diarios: kappa (reversión), theta (varianza de largo plazo),
+    xi (volatilidad de la varianza) y rho (correlación precio-varianza).
+    """
+    mu: Optional[float] = None
+    kappa: float = 2.0 / 252
+    theta: Optional[float] = None
+    xi: float = 0.5 / 252
+    rho: float = -0.7
+    v0: Optional[float] = None
+    backend: str = "auto"
+
+    def fit(self, log_returns):
+        var = np.var(log_returns)
+        recent = np.var(log_returns[-20:]) if len(log_returns) >= 20 else var
+        return replace(
+            self,
+            mu=np.mean(log_returns) if self.mu is None else self.mu,
+            theta=var if self.theta is None else self.theta,
+            v0=recent if self.v0 is None else self.v0,
+        )
+
+    def simulate(self, S0, n_simulations, n_days, rng):
+        Z1 = rng.standard_normal((n_simulations, n_days))
+        Z2 = rng.standard_normal((n_simulations, n_days))
+        if _resolve_backend(self.backend) == "numba":
+            increments = _jit(_heston_loop)(Z1, Z2, self.mu, self.kappa, self.theta, self.xi, self.rho, self.v0)
+            return _paths_from_log_increments(S0, increments)
+        rho_c = np.sqrt(1.0 - self.rho**2)
+        v = np.full(n_simulations, float(self.v0))
+        increments = np.empty((n_simulations, n_days))
+        for t in range(n_days):
+            vp = np.maximum(v, 0.0)
+            sv = np.sqrt(vp)
+            increments[:, t] = self.mu - 0.5 * vp + sv * Z1[:, t]
+            v = v + self.kappa * (self.theta - vp) + self.xi * sv * (self.rho * Z1[:, t] + rho_c * Z2[:, t])
+        return _paths_from_log_increments(S0, increments)
+
+
+MODELS = {
+    "gbm": GBMModel,
+    "merton": MertonJumpModel,
+    "garch": GARCHModel,
+    "heston": HestonModel,
+}
+
+
+def get_model(name: str, **params) -> StochasticModel:
+    """Crea un modelo a partir de su nombre ("gbm", "merton", "garch", "heston")."""
+    try:
+        return MODELS[name.lower()](**params)
+    except KeyError:
+        raise ValueError(f"Modelo no válido: {name}. Opciones: {', '.join(MODELS)}") from None
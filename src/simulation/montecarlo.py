@@ -3,14 +3,28 @@ Simulación de Monte Carlo para series de precios y carteras.
 """
 import numpy as np
 from src.models.price_series import PriceSeries
+from src.simulation.models import StochasticModel, GBMModel
+from src.simulation.cache import SimulationCache, hash_array, simulation_key
+from src.utils.instrumentation import span
 
 class MonteCarloSimulator:
     """
     Simulador de Monte Carlo para la evolución de un activo o cartera.
+    model es un StochasticModel (GBM por defecto); los parámetros que no se
+    indiquen en el modelo se estiman de la serie histórica.
+
+    Con seed, cada activo usa un generador derivado de la semilla y de sus datos,
+    por lo que el resultado solo depende de las entradas y puede guardarse en una
+    SimulationCache (cache) para reutilizarlo, p. ej. al simular la cartera.
     """
-    def __init__(self, n_simulations=1000, n_days=252):
+    def __init__(self, n_simulations=1000, n_days=252, model: StochasticModel = None, seed=None,
+                 cache: SimulationCache = None):
         self.n_simulations = n_simulations
         self.n_days = n_days
+        self.model = model if model is not None else GBMModel()
+        self.seed = seed
+        self.cache = cache
+        self.rng = np.random.default_rng(seed)
 
     def simulate_price_series(self, price_series: PriceSeries, mu=None, sigma=None):
         """
@@ -18,23 +32,44 @@ class MonteCarloSimulator:
         Si mu y sigma no se pasan, se calculan de la serie histórica.
         Devuelve un array (n_simulations, n_days+1) con las simulaciones.
         """
-        closes = [p.close for p in price_series.data]
+        return self.simulate_closes([p.close for p in price_series.data], mu, sigma)
+
+    def simulate_closes(self, closes, mu=None, sigma=None):
+        """
+        Como simulate_price_series, a partir de los cierres (ordenados por fecha).
+        Con la misma semilla, los mismos cierres dan las mismas trayectorias.
+        """
         if len(closes) < 2:
             raise ValueError("No hay suficientes datos para simular.")
+        model = self.model.with_params(mu=mu, sigma=sigma)
+        rng = self.rng
+        key = None
+        if self.seed is not None:
+            closes_hash = hash_array(closes)
+            rng = np.random.default_rng([self.seed, int(closes_hash[:16], 16)])
+            if self.cache is not None:
+                key = self.cache_key(closes, mu, sigma, closes_hash)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
         log_returns = np.diff(np.log(closes))
-        if mu is None:
-            mu = np.mean(log_returns)
-        if sigma is None:
-            sigma = np.std(log_returns)
         S0 = closes[-1]
-        dt = 1
-        simulations = np.zeros((self.n_simulations, self.n_days+1))
-        simulations[:, 0] = S0
-        for t in range(1, self.n_days+1):
-            Z = np.random.standard_normal(self.n_simulations)
-            simulations[:, t] = simulations[:, t-1] * np.exp((mu - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
+        with span("model_fit"):
+            model = model.fit(log_returns)
+        with span("montecarlo"):
+            simulations = model.simulate(S0, self.n_simulations, self.n_days, rng)
+        if key is not None:
+            simulations = self.cache.put(key, simulations)
         return simulations
 
+    def cache_key(self, closes, mu=None, sigma=None, closes_hash=None):
+        """Clave de caché de la simulación de unos cierres (None si no hay semilla)."""
+        if self.seed is None:
+            return None
+        model = self.model.with_params(mu=mu, sigma=sigma)
+        closes_hash = closes_hash or hash_array(closes)
+        return simulation_key(closes_hash, model, self.n_days, self.n_simulations, self.seed)
+
     def simulate_portfolio(self, portfolio, mu_sigma_dict=None):
         """
         Simula la evolución de una cartera sumando las simulaciones de cada activo.
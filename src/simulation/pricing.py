@@ -0,0 +1,253 @@
+"""
+Valoración de opciones y payoffs sobre trayectorias simuladas.
+
+Los payoffs son reducciones vectorizadas sobre la matriz de trayectorias
+(n_simulations, n_days+1). La valoración puede hacerse por bloques (chunk_size)
+acumulando sumas, de modo que no hace falta tener todas las trayectorias en memoria.
+Las griegas se calculan por bump-and-reprice con números aleatorios comunes.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+from src.analytics.options import market_prices
+from src.models.price_series import PriceSeries
+from src.simulation.models import StochasticModel, GBMModel
+from src.variables import TRADING_DAYS_PER_YEAR
+
+KINDS = ("call", "put")
+
+
+def _intrinsic(underlying, strike, kind):
+    """max(S-K, 0) o max(K-S, 0); admite un vector de strikes (devuelve (n, k))."""
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de opción no válido: {kind}. Opciones: {', '.join(KINDS)}")
+    K = np.asarray(strike, dtype=float)
+    S = underlying[:, None] if K.ndim else underlying
+    return np.maximum(S - K, 0.0) if kind == "call" else np.maximum(K - S, 0.0)
+
+
+@dataclass
+class EuropeanOption:
+    """Opción europea sobre el precio final."""
+    strike: float
+    kind: str = "call"
+
+    def __call__(self, paths):
+        return _intrinsic(paths[:, -1], self.strike, self.kind)
+
+
+@dataclass
+class AsianOption:
+    """Opción asiática sobre la media (aritmética o geométrica) de la trayectoria."""
+    strike: float
+    kind: str = "call"
+    average: str = "arithmetic"
+
+    def __call__(self, paths):
+        if self.average == "geometric":
+            avg = np.exp(np.log(paths[:, 1:]).mean(axis=1))
+        else:
+            avg = paths[:, 1:].mean(axis=1)
+        return _intrinsic(avg, self.strike, self.kind)
+
+
+@dataclass
+class BarrierOption:
+    """
+    Opción con barrera (vigilancia diaria).
+    barrier_type: "up-and-out", "up-and-in", "down-and-out" o "down-and-in".
+    """
+    strike: float
+    barrier: float
+    kind: str = "call"
+    barrier_type: str = "up-and-out"
+
+    def __call__(self, paths):
+        direction, _, knock = self.barrier_type.partition("-and-")
+        if direction == "up":
+            hit = paths.max(axis=1) >= self.barrier
+        elif direction == "down":
+            hit = paths.min(axis=1) <= self.barrier
+        else:
+            raise ValueError(f"Tipo de barrera no válido: {self.barrier_type}")
+        alive = ~hit if knock == "out" else hit
+        values = _intrinsic(paths[:, -1], self.strike, self.kind)
+        return values * (alive[:, None] if values.ndim == 2 else alive)
+
+
+@dataclass
+class LookbackOption:
+    """
+    Opción lookback. Sin strike es de strike flotante (S_T - min o max - S_T);
+    con strike es de strike fijo sobre el máximo (call) o el mínimo (put).
+    """
+    kind: str = "call"
+    strike: Optional[float] = None
+
+    def __call__(self, paths):
+        if self.strike is None:
+            if self.kind == "call":
+                return paths[:, -1] - paths.min(axis=1)
+            return paths.max(axis=1) - paths[:, -1]
+        extreme = paths.max(axis=1) if self.kind == "call" else paths.min(axis=1)
+        return _intrinsic(extreme, self.strike, self.kind)
+
+
+@dataclass
+class PricingResult:
+    """Precio descontado, error estándar de Monte Carlo y griegas (si se pidieron)."""
+    price: float
+    stderr: float
+    n_paths: int
+    greeks: dict = field(default_factory=dict)
+
+
+class _Accumulator:
+    """Media y error estándar acumulados por bloques (sumas y sumas de cuadrados)."""
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, values):
+        self.n += values.shape[0]
+        self.total = self.total + values.sum(axis=0)
+        self.total_sq = self.total_sq + np.square(values).sum(axis=0)
+
+    def result(self):
+        mean = self.total / self.n
+        var = np.maximum(self.total_sq / self.n - mean**2, 0.0)
+        return mean, np.sqrt(var / max(self.n - 1, 1))
+
+
+class OptionPricer:
+    """
+    Valora payoffs con Monte Carlo sobre un StochasticModel.
+
+    rate es el tipo libre de riesgo anual (compuesto continuo). Con risk_neutral=True
+    la deriva del modelo se sustituye por el tipo libre de riesgo. Un payoff es
+    cualquier función que reciba la matriz de trayectorias y devuelva un valor por
+    trayectoria (o una columna por strike); las clases de este módulo son ejemplos.
+    """
+    def __init__(self, model: StochasticModel = None, rate=0.0, n_simulations=10000,
+                 chunk_size=None, seed=0, risk_neutral=True):
+        self.model = model if model is not None else GBMModel()
+        self.rate = rate
+        self.n_simulations = n_simulations
+        self.chunk_size = chunk_size or n_simulations
+        self.seed = seed
+        self.risk_neutral = risk_neutral
+
+    def fit(self, price_series: PriceSeries):
+        """Devuelve (S0, modelo calibrado) a partir de la serie histórica."""
+        closes = [p.close for p in price_series.data]
+        if len(closes) < 2:
+            raise ValueError("No hay suficientes datos para simular.")
+        model = self.model.fit(np.diff(np.log(closes)))
+        if self.risk_neutral:
+            model = model.with_params(mu=self.rate / TRADING_DAYS_PER_YEAR)
+        return closes[-1], model
+
+    def discount(self, n_days):
+        return np.exp(-self.rate * n_days / TRADING_DAYS_PER_YEAR)
+
+    def _run(self, model, S0, n_days, evaluators):
+        """
+        Simula por bloques con una semilla fija (números aleatorios comunes entre
+        llamadas) y acumula cada evaluador: función paths -> valores.
+        """
+        rng = np.random.default_rng(self.seed)
+        accumulators = [_Accumulator() for _ in evaluators]
+        remaining = self.n_simulations
+        while remaining > 0:
+            m = min(self.chunk_size, remaining)
+            paths = model.simulate(S0, m, n_days, rng)
+            for acc, evaluate in zip(accumulators, evaluators):
+                acc.add(evaluate(paths))
+            remaining -= m
+        return [acc.result() for acc in accumulators]
+
+    def price(self, underlying, payoff: Callable, n_days: int, greeks=False, bump=0.01):
+        """
+        Valora payoff a n_days días. underlying es una PriceSeries (se calibra el
+        modelo) o un precio inicial S0 (se usa el modelo tal cual, ya calibrado).
+        Con greeks=True añade delta y gamma (bump relativo de S0 sobre las mismas
+        trayectorias) y vega (bump relativo de la volatilidad anualizada re-simulando con
+        la misma semilla), por 1.0 de volatilidad anual como black_scholes.greeks.
+        """
+        if isinstance(underlying, PriceSeries):
+            S0, model = self.fit(underlying)
+        else:
+            S0, model = float(underlying), self.model
+            if self.risk_neutral:
+                model = model.with_params(mu=self.rate / TRADING_DAYS_PER_YEAR)
+        df = self.discount(n_days)
+        evaluators = [payoff]
+        if greeks:
+            # Todos los modelos son multiplicativos en S0: escalar las trayectorias
+            # equivale a simular desde S0*(1±bump) con los mismos números aleatorios.
+            evaluators += [lambda p: payoff(p * (1 + bump)), lambda p: payoff(p * (1 - bump))]
+        results = self._run(model, S0, n_days, evaluators)
+        mean, stderr = results[0]
+        result = PricingResult(price=df * mean, stderr=df * stderr, n_paths=self.n_simulations)
+        if greeks:
+            up, down = df * results[1][0], df * results[2][0]
+            h = S0 * bump
+            result.greeks["delta"] = (up - down) / (2 * h)
+            result.greeks["gamma"] = (up - 2 * result.price + down) / h**2
+            sigma = getattr(model, "sigma", None)
+            if sigma:
+                # sigma del modelo es diaria: se mueve la anual y se divide por su incremento
+                d_sigma = sigma * np.sqrt(TRADING_DAYS_PER_YEAR) * bump
+                d_sigma_daily = d_sigma / np.sqrt(TRADING_DAYS_PER_YEAR)
+                up_v = self._run(model.with_params(sigma=sigma + d_sigma_daily), S0, n_days, [payoff])[0][0]
+                down_v = self._run(model.with_params(sigma=sigma - d_sigma_daily), S0, n_days, [payoff])[0][0]
+                result.greeks["vega"] = df * (up_v - down_v) / (2 * d_sigma)
+            else:
+                result.greeks["vega"] = float("nan")
+        return result
+
+    def price_chains(self, price_series: PriceSeries, options: dict, valuation_date=None):
+        """
+        Compara precios de modelo y de mercado para cadenas de opciones con el formato
+        de YahooEnrichedExtractor: {vencimiento: {'calls': DataFrame, 'puts': DataFrame}}.
+        Se simula una sola vez hasta el vencimiento más lejano y cada vencimiento se
+        valora sobre el tramo correspondiente de las mismas trayectorias.
+        """
+        valuation_date = valuation_date or date.today()
+        S0, model = self.fit(price_series)
+        jobs = []
+        for expiry, chain in options.items():
+            n_days = int(np.busday_count(valuation_date, pd.Timestamp(expiry).date()))
+            if n_days <= 0:
+                continue
+            for kind, key in (("call", "calls"), ("put", "puts")):
+                frame = chain.get(key)
+                if frame is None or len(frame) == 0:
+                    continue
+                jobs.append((expiry, kind, n_days, frame))
+        if not jobs:
+            return pd.DataFrame(columns=["expiry", "kind", "strike", "market_price", "model_price", "stderr", "diff"])
+        max_days = max(n for _, _, n, _ in jobs)
+        evaluators = [
+            (lambda p, n=n_days, k=kind, K=frame["strike"].to_numpy(dtype=float): _intrinsic(p[:, n], K, k))
+            for _, kind, n_days, frame in jobs
+        ]
+        results = self._run(model, S0, max_days, evaluators)
+        frames = []
+        for (expiry, kind, n_days, frame), (mean, stderr) in zip(jobs, results):
+            df = self.discount(n_days)
+            out = pd.DataFrame({
+                "expiry": expiry,
+                "kind": kind,
+                "strike": frame["strike"].to_numpy(dtype=float),
+                # Las cadenas llegan con los nombres de Yahoo (to_expiry_dict)
+                "market_price": market_prices(frame.rename(columns={"lastPrice": "last_price"})),
+                "model_price": df * mean,
+                "stderr": df * stderr,
+            })
+            out["diff"] = out["model_price"] - out["market_price"]
+            frames.append(out)
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,164 @@
+"""
+Detección de sesiones ausentes en históricos de precios.
+
+Compara las fechas de cada ticker con las sesiones de un calendario de mercado
+(festivos incluidos) y devuelve los huecos como rangos de sesiones consecutivas.
+Para todo un DataFrame largo (varios tickers) se trabaja con una matriz booleana
+tickers x sesiones, por bloques de tickers, y los rangos salen de las transiciones
+de esa matriz (sin bucles por fila).
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.trading_calendar import TradingCalendar, get_calendar, to_days
+
+# Tickers por bloque de la matriz tickers x sesiones
+DEFAULT_BLOCK_SIZE = 512
+
+
+@dataclass
+class CompletenessReport:
+    """
+    Huecos por ticker (gaps: ticker, start, end, sessions) y cobertura (coverage:
+    ticker, first, last, expected, present, missing, off_calendar, completeness).
+    off_calendar cuenta las filas en fechas que no son sesión (fines de semana, festivos).
+    """
+    calendar: str
+    gaps: pd.DataFrame
+    coverage: pd.DataFrame
+    warnings: List[str] = field(default_factory=list)
+
+    def missing_ranges(self, ticker) -> List[Tuple[np.datetime64, np.datetime64]]:
+        """Rangos (primera, última sesión ausente) de un ticker."""
+        rows = self.gaps[self.gaps["ticker"] == ticker]
+        return list(zip(rows["start"].to_numpy().astype("datetime64[D]"), rows["end"].to_numpy().astype("datetime64[D]")))
+
+    @property
+    def complete(self) -> bool:
+        return self.gaps.empty
+
+    def to_dict(self) -> dict:
+        """Resumen serializable: sesiones ausentes por ticker."""
+        missing = self.coverage.set_index("ticker")["missing"]
+        return {"calendar": self.calendar, "missing_sessions": {str(t): int(n) for t, n in missing.items() if n}}
+
+
+def _runs(missing: np.ndarray):
+    """(fila, primera columna, columna siguiente a la última) de cada tramo de True en una matriz 2D."""
+    padded = np.zeros((missing.shape[0], missing.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = missing
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, stops = np.nonzero(edges == -1)
+    return rows, starts, stops
+
+
+def find_gaps(df: pd.DataFrame, calendar: Optional[TradingCalendar] = None, key: str = "ticker",
+              date_col: str = "date", start=None, end=None, block_size: int = DEFAULT_BLOCK_SIZE) -> CompletenessReport:
+    """
+    Sesiones ausentes de cada ticker de df entre start y end (incluidos). Sin start/end,
+    cada ticker se comprueba entre su primera y su última fecha (solo huecos interiores).
+    Si df no tiene columna key se trata como un único ticker.
+    """
+    calendar = calendar or get_calendar()
+    days = to_days(df[date_col])
+    if key in df.columns:
+        codes, tickers = pd.factorize(df[key], sort=True)
+    else:
+        codes, tickers = np.zeros(len(df), dtype=np.int64), pd.Index([None])
+    n_tickers = len(tickers)
+    valid = ~np.isnat(days) & (codes >= 0)
+    days, codes = days[valid], codes[valid]
+    lo = to_days(start) if start is not None else (days.min() if days.size else None)
+    hi = to_days(end) if end is not None else (days.max() if days.size else None)
+    sessions = calendar.sessions(lo, hi) if lo is not None and hi is not None else np.empty(0, dtype="datetime64[D]")
+    n_sessions = len(sessions)
+
+    on_calendar = calendar.is_session(days)
+    column = np.searchsorted(sessions, days)
+    in_window = on_calendar & (days >= sessions[0]) & (days <= sessions[-1]) if n_sessions else np.zeros(len(days), bool)
+    # Sesiones esperadas por ticker: la ventana completa o de su primera a su última sesión
+    first = np.zeros(n_tickers, dtype=np.int64)
+    last = np.full(n_tickers, n_sessions - 1, dtype=np.int64)
+    if start is None:
+        first[:] = n_sessions
+        np.minimum.at(first, codes[in_window], column[in_window])
+    if end is None:
+        last[:] = -1
+        np.maximum.at(last, codes[in_window], column[in_window])
+    expected = np.maximum(last - first + 1, 0)
+    present = np.bincount(codes[in_window], minlength=n_tickers)
+
+    gap_rows, gap_starts, gap_stops = [], [], []
+    present_expected = np.zeros(n_tickers, dtype=np.int64)
+    positions = np.arange(n_sessions)
+    for block in range(0, n_tickers, block_size):
+        stop = min(block + block_size, n_tickers)
+        mask = in_window & (codes >= block) & (codes < stop)
+        matrix = np.zeros((stop - block, n_sessions), dtype=bool)
+        matrix[codes[mask] - block, column[mask]] = True
+        window = (positions >= first[block:stop, None]) & (positions <= last[block:stop, None])
+        present_expected[block:stop] = (matrix & window).sum(axis=1)
+        np.logical_not(matrix, out=matrix)
+        matrix &= window
+        rows, starts, stops = _runs(matrix)
+        gap_rows.append(rows + block)
+        gap_starts.append(starts)
+        gap_stops.append(stops)
+    rows = np.concatenate(gap_rows) if gap_rows else np.empty(0, dtype=np.int64)
+    starts = np.concatenate(gap_starts) if gap_starts else np.empty(0, dtype=np.int64)
+    stops = np.concatenate(gap_stops) if gap_stops else np.empty(0, dtype=np.int64)
+
+    gaps = pd.DataFrame({
+        "ticker": np.asarray(tickers)[rows] if len(rows) else np.empty(0, dtype=object),
+        "start": sessions[starts] if len(rows) else np.empty(0, dtype="datetime64[D]"),
+        "end": sessions[stops - 1] if len(rows) else np.empty(0, dtype="datetime64[D]"),
+        "sessions": stops - starts,
+    })
+    first_date = np.full(n_tickers, np.datetime64("NaT"), dtype="datetime64[D]")
+    last_date = first_date.copy()
+    if days.size:
+        first_date[:] = np.datetime64("9999-12-31")
+        last_date[:] = np.datetime64("0001-01-01")
+        np.minimum.at(first_date, codes, days)
+        np.maximum.at(last_date, codes, days)
+    seen = np.bincount(codes, minlength=n_tickers) > 0
+    first_date[~seen] = np.datetime64("NaT")
+    last_date[~seen] = np.datetime64("NaT")
+    coverage = pd.DataFrame({
+        "ticker": np.asarray(tickers),
+        "first": first_date,
+        "last": last_date,
+        "expected": expected,
+        "present": present_expected,
+        "missing": expected - present_expected,
+        "off_calendar": np.bincount(codes[~on_calendar], minlength=n_tickers),
+    })
+    with np.errstate(invalid="ignore", divide="ignore"):
+        coverage["completeness"] = np.where(expected > 0, present_expected / np.maximum(expected, 1), np.nan)
+    warnings = [f"El ticker {t} no tiene datos en el rango." for t, n in zip(tickers, present) if n == 0]
+    return CompletenessReport(calendar.name, gaps, coverage, warnings)
+
+
+def missing_session_ranges(dates, start, end, calendar: Optional[TradingCalendar] = None,
+                           covered: Sequence[Tuple] = ()) -> List[Tuple[np.datetime64, np.datetime64]]:
+    """
+    Rangos (primera, última sesión) de las sesiones entre start y end (incluidos) que
+    no están en dates ni dentro de algún rango de covered (rangos ya consultados a la
+    fuente, aunque no devolviera datos, p. ej. antes de la salida a bolsa).
+    """
+    calendar = calendar or get_calendar()
+    sessions = calendar.sessions(start, end)
+    if not len(sessions):
+        return []
+    have = np.zeros(len(sessions), dtype=bool)
+    days = to_days(dates) if len(dates) else np.empty(0, dtype="datetime64[D]")
+    column = np.searchsorted(sessions, days)
+    hit = column < len(sessions)
+    hit[hit] = sessions[column[hit]] == days[hit]
+    have[column[hit]] = True
+    for a, b in covered:
+        have[np.searchsorted(sessions, to_days(a)):np.searchsorted(sessions, to_days(b), side="right")] = True
+    _, starts, stops = _runs(~have[None, :])
+    return [(sessions[a], sessions[b - 1]) for a, b in zip(starts, stops)]
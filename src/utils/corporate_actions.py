@@ -0,0 +1,199 @@
+"""
+Ajuste de precios por acciones corporativas (splits y dividendos).
+
+Las acciones de cualquier fuente se normalizan a una tabla común (ACTION_COLUMNS:
+ticker, fecha ex, dividendo bruto por acción en la moneda de su fecha y ratio del
+split, p. ej. 4.0 para un 4:1). El ajuste es hacia atrás, como el "Adj Close" de
+Yahoo: cada barra anterior a una fecha ex se multiplica por el factor del evento
+(1 - dividendo / cierre anterior) / split, y el volumen por el split.
+
+Los factores de todo un universo (formato largo, muchos tickers) se obtienen en una
+pasada: claves enteras (ticker, día), sumas acumuladas de log-factores por ticker y
+un searchsorted por barra; el ajuste es una multiplicación por columna. El factor
+aplicado a cada barra se guarda en adj_factor, así que el precio sin ajustar se
+recupera siempre (close / adj_factor): al llegar acciones nuevas solo se aplican
+sus factores (y se deshacen los de las acciones que han desaparecido o cambiado)
+sobre el histórico ya ajustado, sin volver a los datos en bruto.
+"""
+import logging
+from typing import Optional
+import numpy as np
+import pandas as pd
+from src.utils.instrumentation import count, instrumented
+from src.utils.trading_calendar import to_days
+
+ACTION_COLUMNS = ["ticker", "date", "dividend", "split"]
+PRICE_COLUMNS = ("open", "high", "low", "close")
+FACTOR_COLUMN = "adj_factor"
+
+
+def _as_series(data, names) -> pd.Series:
+    """Serie fecha -> valor a partir de una Serie indexada por fecha o un DataFrame con columna de fecha."""
+    if data is None:
+        return pd.Series(dtype=float)
+    if isinstance(data, pd.DataFrame):
+        date_col = next((c for c in data.columns if str(c).lower() in ("date", "fecha", "ex_date")), None)
+        value_col = next((c for c in data.columns if c in names), None)
+        if value_col is None:
+            raise ValueError(f"Tabla de acciones sin columna de valor ({', '.join(names)}): {list(data.columns)}")
+        index = data[date_col] if date_col is not None else data.index
+        return pd.Series(pd.to_numeric(data[value_col], errors="coerce").to_numpy(dtype=float), index=index)
+    return pd.to_numeric(data, errors="coerce").astype(float)
+
+
+def action_table(dividends=None, splits=None, ticker: Optional[str] = None,
+                 split_adjusted_dividends: bool = False) -> pd.DataFrame:
+    """
+    Tabla de acciones estándar (ACTION_COLUMNS, una fila por ticker y fecha ex) a
+    partir de dividendos y splits por fecha (Series como Ticker.dividends de yfinance o
+    DataFrames con columna de fecha y de valor). Los splits 0 o 1 y los dividendos 0 se
+    descartan. split_adjusted_dividends indica que los importes ya vienen divididos por
+    los splits posteriores y se devuelven a su importe bruto (para precios sin ajustar por
+    splits; los de Yahoo ya lo están, ver yahoo_actions).
+    """
+    div = _as_series(dividends, ("dividend", "Dividends", "amount"))
+    spl = _as_series(splits, ("split", "Stock Splits", "ratio"))
+    div = pd.Series(div.to_numpy(dtype=float), index=to_days(div.index)) if len(div) else pd.Series(dtype=float)
+    spl = pd.Series(spl.to_numpy(dtype=float), index=to_days(spl.index)) if len(spl) else pd.Series(dtype=float)
+    div = div[div > 0].groupby(level=0).sum()
+    spl = spl[(spl > 0) & (spl != 1)].groupby(level=0).prod()
+    if split_adjusted_dividends and len(div) and len(spl):
+        # Producto de los splits posteriores a cada dividendo
+        split_days = spl.index.to_numpy().astype("datetime64[D]")
+        after = np.r_[np.cumprod(spl.to_numpy()[::-1])[::-1], 1.0]
+        div = div * after[np.searchsorted(split_days, div.index.to_numpy().astype("datetime64[D]"), side="right")]
+    days = np.union1d(div.index.to_numpy().astype("datetime64[D]"),
+                      spl.index.to_numpy().astype("datetime64[D]")).astype("datetime64[D]")
+    table = pd.DataFrame({
+        "ticker": ticker,
+        "date": days,
+        "dividend": div.reindex(days).fillna(0.0).to_numpy(dtype=float),
+        "split": spl.reindex(days).fillna(1.0).to_numpy(dtype=float),
+    }, columns=ACTION_COLUMNS)
+    return table
+
+
+def _difference(actions: pd.DataFrame, other: pd.DataFrame) -> pd.DataFrame:
+    """Acciones de actions que no están (con los mismos importes) en other."""
+    if not len(other) or not len(actions):
+        return actions
+    merged = actions.merge(other.assign(_seen=True), on=ACTION_COLUMNS, how="left")
+    return actions[merged["_seen"].isna().to_numpy()]
+
+
+def _codes(bars: pd.DataFrame, actions: pd.DataFrame, key: str):
+    """
+    Códigos de ticker comunes a barras y acciones. Sin ticker en las barras o en las
+    acciones todo es un único grupo (solo se admite si las barras son de un ticker).
+    """
+    if key not in bars.columns or actions["ticker"].isna().all():
+        if key in bars.columns and bars[key].nunique() > 1:
+            raise ValueError("Acciones sin ticker para un histórico con varios tickers")
+        return np.zeros(len(bars), dtype=np.int64), np.zeros(len(actions), dtype=np.int64)
+    codes, uniques = pd.factorize(bars[key])
+    # Las acciones de tickers que no están en las barras quedan con código -1
+    return codes.astype(np.int64), pd.Index(uniques).get_indexer(actions["ticker"]).astype(np.int64)
+
+
+def _log_factors(bars: pd.DataFrame, events: pd.DataFrame, sign: np.ndarray, key: str, date_col: str):
+    """
+    Log del factor de precio y de volumen de cada barra por los eventos (sign = +1 aplica,
+    -1 deshace). Los dividendos usan el cierre sin ajustar de la última barra anterior a
+    la fecha ex del mismo ticker.
+    """
+    bar_codes, event_codes = _codes(bars, events, key)
+    known = event_codes >= 0
+    if not known.all():
+        events, sign, event_codes = events[known], sign[known], event_codes[known]
+    n = len(bars)
+    if not len(events):
+        return np.zeros(n), np.zeros(n)
+    bar_days = to_days(bars[date_col]).astype(np.int64)
+    event_days = to_days(events["date"]).astype(np.int64)
+    low = min(bar_days.min(), event_days.min())
+    width = max(bar_days.max(), event_days.max()) - low + 2
+    bar_keys = bar_codes * width + (bar_days - low)
+    event_keys = event_codes * width + (event_days - low)
+
+    split = events["split"].to_numpy(dtype=float)
+    dividend = events["dividend"].to_numpy(dtype=float)
+    ratio = np.ones(len(events))
+    paying = dividend > 0
+    if paying.any():
+        # Los históricos suelen venir ya ordenados por (ticker, fecha): entonces no se ordena
+        if n > 1 and not (bar_keys[1:] >= bar_keys[:-1]).all():
+            order = np.argsort(bar_keys, kind="stable")
+            sorted_keys = bar_keys[order]
+        else:
+            order, sorted_keys = np.arange(n), bar_keys
+        prev = np.searchsorted(sorted_keys, event_keys[paying], side="left") - 1
+        prev_c = np.maximum(prev, 0)
+        rows = order[prev_c]
+        same = (prev >= 0) & (bar_codes[rows] == event_codes[paying])
+        close = bars["close"].to_numpy(dtype=float, na_value=np.nan)[rows]
+        if FACTOR_COLUMN in bars.columns:
+            close = close / bars[FACTOR_COLUMN].to_numpy(dtype=float)[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            div_ratio = np.where(same, 1.0 - dividend[paying] / close, 1.0)
+        bad = ~(div_ratio > 0)
+        if bad.any():
+            logging.warning(f"{int(bad.sum())} dividendos sin cierre anterior válido o mayores que él; se ignoran")
+            count("actions_ignored", int(bad.sum()), stage="adjust")
+            div_ratio[bad] = 1.0
+        ratio[paying] = div_ratio
+    log_price = sign * (np.log(ratio) - np.log(split))
+    log_volume = sign * np.log(split)
+
+    # Eventos ordenados por (ticker, día) y sumas acumuladas: el factor de una barra es el
+    # producto de los eventos de su ticker con fecha ex posterior a la suya
+    order = np.argsort(event_keys, kind="stable")
+    event_keys = event_keys[order]
+    cum_price = np.r_[0.0, np.cumsum(log_price[order])]
+    cum_volume = np.r_[0.0, np.cumsum(log_volume[order])]
+    first = np.searchsorted(event_keys, bar_keys, side="right")
+    end = np.searchsorted(event_keys, (np.arange(bar_codes.max() + 1) + 1) * width, side="left")[bar_codes]
+    return cum_price[end] - cum_price[first], cum_volume[end] - cum_volume[first]
+
+
+@instrumented("adjust")
+def adjust_ohlcv(bars: pd.DataFrame, actions: pd.DataFrame, applied: Optional[pd.DataFrame] = None,
+                 key: str = "ticker", date_col: str = "date") -> pd.DataFrame:
+    """
+    OHLCV (uno o varios tickers) ajustado por las acciones corporativas de actions, con
+    el factor aplicado a cada barra en adj_factor. Si bars ya está ajustado (tiene
+    adj_factor), applied son las acciones con las que se ajustó: solo se aplican las
+    nuevas y se deshacen las que ya no están o han cambiado. Las barras nuevas sin
+    ajustar se pueden añadir con adj_factor 1 si son posteriores a todas las acciones.
+    """
+    actions = actions if actions is not None else action_table()
+    if FACTOR_COLUMN in bars.columns and applied is None:
+        raise ValueError(f"El histórico ya está ajustado ({FACTOR_COLUMN}): indique las acciones aplicadas (applied)")
+    if applied is not None and len(applied):
+        added, removed = _difference(actions, applied), _difference(applied, actions)
+    else:
+        added, removed = actions, actions.iloc[:0]
+    events = pd.concat([added, removed], ignore_index=True) if len(removed) else added.reset_index(drop=True)
+    sign = np.r_[np.ones(len(added)), -np.ones(len(removed))]
+    out = bars.copy()
+    if FACTOR_COLUMN not in out.columns:
+        out[FACTOR_COLUMN] = 1.0
+    if not len(events) or not len(bars):
+        return out
+    count("actions_applied", len(added), stage="adjust")
+    count("actions_undone", len(removed), stage="adjust")
+    log_price, log_volume = _log_factors(bars, events, sign, key, date_col)
+    price_factor = np.exp(log_price)
+    for col in PRICE_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].to_numpy(dtype=float, na_value=np.nan) * price_factor
+    if "volume" in out.columns:
+        out["volume"] = out["volume"].to_numpy(dtype=float, na_value=np.nan) * np.exp(log_volume)
+    out[FACTOR_COLUMN] = out[FACTOR_COLUMN].to_numpy(dtype=float) * price_factor
+    return out
+
+
+def unadjust_ohlcv(bars: pd.DataFrame, actions: pd.DataFrame, key: str = "ticker",
+                   date_col: str = "date") -> pd.DataFrame:
+    """Deshace el ajuste de adjust_ohlcv (precios y volumen en bruto, sin adj_factor)."""
+    raw = adjust_ohlcv.__wrapped__(bars, actions.iloc[:0], applied=actions, key=key, date_col=date_col)
+    return raw.drop(columns=FACTOR_COLUMN)
@@ -1,15 +1,130 @@
+import numpy as np
 import pandas as pd
+from src.utils.instrumentation import instrumented
 
+# Mayor valor representable en float32 (los float64 fuera de rango no se reducen)
+F32_MAX = float(np.finfo(np.float32).max)
+# Columnas de recuento que el downcast pasa a entero; el resto (precios) se queda en float
+INTEGER_COLUMNS = ('volume',)
+
+@instrumented("clean")
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Limpia un DataFrame: elimina duplicados, rellena valores faltantes y ordena por fecha.
+    Si contiene varios tickers (columna 'ticker'), se limpia con clean_universe para que
+    los rellenos no pasen valores de un ticker a otro.
     """
+    if 'ticker' in df.columns and df['ticker'].nunique(dropna=False) > 1:
+        return clean_universe.__wrapped__(df, downcast=False)
     df = df.drop_duplicates()
     df = df.sort_values('date')
     # Rellenar valores faltantes con forward fill, luego backward fill si quedan (sin usar método deprecated)
     df = df.ffill().bfill()
     return df
 
+@instrumented("clean")
+def clean_universe(df: pd.DataFrame, key: str = 'ticker', date_col: str = 'date', downcast: bool = True,
+                   integer_columns: tuple = INTEGER_COLUMNS) -> pd.DataFrame:
+    """
+    Limpia en una pasada un DataFrame con muchos tickers (formato largo):
+    - elimina duplicados por (ticker, fecha), conservando la primera fila,
+    - ordena por ticker y fecha con una única ordenación de claves enteras,
+    - rellena los faltantes (forward fill y luego backward fill) dentro de cada ticker,
+    - con downcast, el ticker pasa a category, las columnas de integer_columns (volumen)
+      al tipo entero más pequeño que las representa y los demás float64 a float32. Los
+      precios nunca se pasan a entero: un cierre en unidades enteras (yenes) en uint16
+      desbordaría al restar dos cierres.
+    Cada columna se copia una sola vez (reordenada) y, si el DataFrame ya estaba
+    ordenado y sin duplicados, se reutilizan las columnas sin faltantes. El resultado
+    tiene un índice nuevo (0..n-1).
+    """
+    n = len(df)
+    ticker_codes, tickers = pd.factorize(df[key], sort=True)
+    date_codes, date_values = pd.factorize(df[date_col], sort=True)
+    # Clave entera (ticker, fecha); los faltantes (código -1) quedan los primeros de su nivel
+    width = len(date_values) + 1
+    keys = ticker_codes.astype(np.int64)
+    del ticker_codes
+    keys += 1
+    keys *= width
+    keys += date_codes
+    keys += 1
+    del date_codes
+    if n > 1 and not (keys[1:] > keys[:-1]).all():
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        keep = np.empty(n, dtype=bool)
+        keep[0] = True
+        np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+        rows = order[keep]
+        keys = keys[keep]
+        del order, keep
+    else:
+        rows = None  # ya ordenado y sin duplicados
+    groups = keys // width
+    del keys
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(groups) else np.empty(0, dtype=np.int64)
+    ends = np.r_[starts[1:] - 1, len(groups) - 1] if len(groups) else starts
+
+    columns = {}
+    for col in df.columns:
+        if col == key and downcast:
+            columns[col] = pd.Categorical.from_codes(groups - 1, categories=tickers)
+            continue
+        series = df[col]
+        values = series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+        if rows is not None:
+            values = values.take(rows)
+        if col not in (key, date_col):
+            values = fill_within_groups(values, starts, ends)
+        if downcast and isinstance(values, np.ndarray):
+            values = _downcast(values, integral=col in integer_columns)
+        columns[col] = values
+    return pd.DataFrame(columns, copy=False)
+
+def fill_within_groups(values, starts, ends):
+    """Forward fill y luego backward fill dentro de cada grupo de filas contiguas [start, end]."""
+    missing = pd.isna(values)
+    if not missing.any():
+        return values
+    positions = np.arange(len(values))
+    # Forward fill: índice del último valor válido del grupo (o el inicio del grupo)
+    source = np.where(missing, 0, positions)
+    source[starts] = starts
+    np.maximum.accumulate(source, out=source)
+    still_missing = missing[source]
+    if still_missing.any():
+        # Backward fill de los faltantes iniciales: siguiente valor válido del grupo
+        following = np.where(missing, len(values), positions)
+        following[ends] = ends
+        following = np.minimum.accumulate(following[::-1])[::-1]
+        source = np.where(still_missing, following, source)
+    return values.take(source)
+
+def _downcast(values: np.ndarray, integral: bool = False) -> np.ndarray:
+    """
+    Reduce el tipo de un array numérico. Con integral (volúmenes), los enteros y los floats
+    enteros y sin faltantes pasan al menor tipo entero válido; en cualquier caso, los
+    float64 pasan a float32 si caben en su rango. Sin integral los enteros no se tocan.
+    """
+    if not len(values) or values.dtype.kind not in "iuf":
+        return values
+    if values.dtype.kind in "iu" and not integral:
+        return values
+    if values.dtype.kind == "f":
+        low, high = np.nanmin(values), np.nanmax(values)
+        if np.isnan(low):
+            return values.astype(np.float32)
+        if not (np.isfinite(low) and np.isfinite(high)):
+            return values
+        if integral and low >= 0 and high < 2**63 and not np.isnan(values).any() and (values == np.floor(values)).all():
+            values = values.astype(np.int64)
+        elif values.dtype == np.float64 and max(-low, high) <= F32_MAX:
+            return values.astype(np.float32)
+        else:
+            return values
+    return pd.to_numeric(values, downcast="unsigned" if values.min() >= 0 else "integer")
+
 def check_temporal_consistency(df: pd.DataFrame) -> bool:
     """
     Verifica que las fechas sean consistentes y no haya gaps grandes.
@@ -0,0 +1,309 @@
+"""
+Almacén versionado de fundamentales (info, fast_info y estados financieros).
+
+Cada ticker tiene un registro JSON-lines compacto con una instantánea por fecha: la
+primera con todos los campos y las siguientes solo con los campos que cambian
+("set") o desaparecen ("unset") en cada sección. Los estados financieros se aplanan
+a campos "<partida>|<YYYY-MM-DD>", de modo que un periodo nuevo añade sus partidas y
+los ya publicados no se repiten. Un índice por campo (posiciones de las instantáneas
+que lo cambian) y los desplazamientos de cada línea responden "¿cuál era el PER el
+día X?" leyendo una sola línea del registro.
+
+Rutas: <root>/<TICKER>/log.jsonl (fuente de verdad), index.json y latest.json (estado
+más reciente, sellos del proveedor y fecha de descarga de cada sección); los dos
+últimos se reconstruyen desde el registro si faltan o no cuadran con él.
+"""
+import json
+import math
+import os
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+SECTIONS = ("info", "fast_info", "financials", "balancesheet", "cashflow")
+STATEMENT_SEPARATOR = "|"
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _day(as_of) -> str:
+    return pd.Timestamp(as_of if as_of is not None else date.today()).date().isoformat()
+
+
+def to_json_value(value):
+    """Valor serializable a JSON (None para NaN/NaT; los escalares de numpy y fechas se convierten)."""
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, (np.generic, int, float)):
+        value = value.item() if isinstance(value, np.generic) else value
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    if isinstance(value, (pd.Timestamp, date, np.datetime64)):
+        return None if pd.isna(value) else pd.Timestamp(value).isoformat()
+    return json.loads(_dumps(value))
+
+
+def flatten_section(data) -> Dict[str, object]:
+    """
+    Campos planos de una sección: un dict se copia con valores JSON y un estado
+    financiero (filas = partidas, columnas = fechas de cierre) pasa a
+    {"<partida>|<YYYY-MM-DD>": valor}. Los valores nulos se omiten.
+    """
+    if data is None:
+        return {}
+    if isinstance(data, pd.DataFrame):
+        flat = {}
+        for col in data.columns:
+            period = pd.Timestamp(col).date().isoformat()
+            for item, value in data[col].items():
+                value = to_json_value(value)
+                if value is not None:
+                    flat[f"{item}{STATEMENT_SEPARATOR}{period}"] = value
+        return flat
+    flat = {str(k): to_json_value(v) for k, v in dict(data).items()}
+    return {k: v for k, v in flat.items() if v is not None}
+
+
+def statement_frame(flat: Dict[str, object]) -> pd.DataFrame:
+    """Inversa de flatten_section para estados financieros: partidas x fechas (la más reciente primero)."""
+    cells: Dict[str, Dict[pd.Timestamp, object]] = {}
+    for key, value in flat.items():
+        item, _, period = key.rpartition(STATEMENT_SEPARATOR)
+        cells.setdefault(item, {})[pd.Timestamp(period)] = value
+    frame = pd.DataFrame.from_dict(cells, orient="index")
+    return frame[sorted(frame.columns, reverse=True)].astype(float) if len(frame.columns) else frame
+
+
+def diff_sections(old: Dict[str, Dict], new: Dict[str, Dict]):
+    """({sección: campos cambiados o nuevos}, {sección: campos eliminados}) de old a new."""
+    changed, removed = {}, {}
+    for section, fields in new.items():
+        previous = old.get(section, {})
+        set_ = {k: v for k, v in fields.items() if k not in previous or previous[k] != v}
+        unset = sorted(k for k in previous if k not in fields)
+        if set_:
+            changed[section] = set_
+        if unset:
+            removed[section] = unset
+    return changed, removed
+
+
+class FundamentalsStore:
+    """Instantáneas diferenciales de fundamentales por ticker y fecha."""
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def _path(self, ticker: str, name: str) -> str:
+        return os.path.join(self._dir(ticker), name)
+
+    def _write_json(self, path: str, data) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps(data))
+        os.replace(tmp, path)
+
+    def _read_line(self, ticker: str, offset: int) -> dict:
+        with open(self._path(ticker, "log.jsonl"), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _rebuild(self, ticker: str):
+        """Índice y estado más reciente recorriendo el registro completo."""
+        index = {"dates": [], "offsets": [], "fields": {}}
+        latest = {"state": {}, "stamps": {}, "fetched": {}}
+        path = self._path(ticker, "log.jsonl")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                offset = 0
+                for raw in iter(f.readline, b""):
+                    if raw.strip():
+                        self._apply(index, latest, json.loads(raw), offset)
+                    offset += len(raw)
+        return index, latest
+
+    @staticmethod
+    def _apply(index: dict, latest: dict, entry: dict, offset: int) -> None:
+        """Incorpora una línea del registro al índice y al estado más reciente."""
+        position = len(index["dates"])
+        index["dates"].append(entry["date"])
+        index["offsets"].append(offset)
+        for kind in ("set", "unset"):
+            for section, fields in entry.get(kind, {}).items():
+                positions = index["fields"].setdefault(section, {})
+                state = latest["state"].setdefault(section, {})
+                for field in fields:
+                    if not positions.get(field) or positions[field][-1] != position:
+                        positions.setdefault(field, []).append(position)
+                    if kind == "set":
+                        state[field] = fields[field]
+                    else:
+                        state.pop(field, None)
+        for section, stamp in entry.get("fetched", {}).items():
+            latest["stamps"][section] = stamp
+            latest["fetched"][section] = entry["date"]
+
+    def _load(self, ticker: str):
+        """(índice, estado más reciente); se reconstruyen si faltan o no cuadran con el registro."""
+        log = self._path(ticker, "log.jsonl")
+        if not os.path.exists(log):
+            return {"dates": [], "offsets": [], "fields": {}}, {"state": {}, "stamps": {}, "fetched": {}}
+        try:
+            with open(self._path(ticker, "index.json"), encoding="utf-8") as f:
+                index = json.load(f)
+            with open(self._path(ticker, "latest.json"), encoding="utf-8") as f:
+                latest = json.load(f)
+            if index.get("size") == os.path.getsize(log) and latest.get("date") == index["dates"][-1]:
+                return index, latest
+        except (OSError, ValueError, KeyError, IndexError):
+            pass
+        return self._rebuild(ticker)
+
+    def put(self, ticker: str, sections: Dict[str, object], as_of=None,
+            stamps: Optional[Dict[str, object]] = None) -> dict:
+        """
+        Guarda la instantánea de as_of (hoy por defecto). sections son los datos
+        descargados ({sección: dict o DataFrame}); las secciones que no se dan se
+        arrastran sin cambios. stamps son los sellos del proveedor de las secciones
+        descargadas (ver stale). Una segunda instantánea del mismo día se fusiona con la
+        primera. Devuelve la línea escrita en el registro.
+        """
+        day = _day(as_of)
+        index, latest = self._load(ticker)
+        if index["dates"] and day < index["dates"][-1]:
+            raise ValueError(f"Las instantáneas de {ticker} se añaden en orden: {day} es anterior a "
+                             f"{index['dates'][-1]}")
+        new = {name: flatten_section(data) for name, data in sections.items()}
+        changed, removed = diff_sections(latest["state"], new)
+        entry = {"date": day, "set": changed, "unset": removed,
+                 "fetched": {name: to_json_value((stamps or {}).get(name)) for name in sections}}
+        path = self._path(ticker, "log.jsonl")
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        if index["dates"] and index["dates"][-1] == day:
+            # Mismo día: se compone con la última línea (cambios respecto a la instantánea anterior)
+            entry = self._merge(self._read_line(ticker, index["offsets"][-1]), entry)
+            with open(path, "r+b") as f:
+                f.truncate(index["offsets"][-1])
+            self._drop_last(index)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write((_dumps(entry) + "\n").encode("utf-8"))
+        self._apply(index, latest, entry, offset)
+        index["size"] = os.path.getsize(path)
+        latest["date"] = day
+        self._write_json(self._path(ticker, "index.json"), index)
+        self._write_json(self._path(ticker, "latest.json"), latest)
+        return entry
+
+    @staticmethod
+    def _drop_last(index: dict) -> None:
+        """Quita la última instantánea del índice (el estado se corrige al aplicar la línea fusionada)."""
+        position = len(index["dates"]) - 1
+        index["dates"].pop()
+        index["offsets"].pop()
+        for positions in index["fields"].values():
+            for field in [f for f, p in positions.items() if p[-1] == position]:
+                positions[field].pop()
+                if not positions[field]:
+                    del positions[field]
+
+    @staticmethod
+    def _merge(first: dict, second: dict) -> dict:
+        merged = {"date": first["date"], "set": {}, "unset": {}, "fetched": {**first.get("fetched", {}),
+                                                                              **second.get("fetched", {})}}
+        for section in set(first.get("set", {})) | set(first.get("unset", {})) | set(second.get("set", {})) \
+                | set(second.get("unset", {})):
+            set_ = {**first.get("set", {}).get(section, {}), **second.get("set", {}).get(section, {})}
+            unset = set(first.get("unset", {}).get(section, [])) | set(second.get("unset", {}).get(section, []))
+            unset -= set(second.get("set", {}).get(section, {}))
+            for field in second.get("unset", {}).get(section, []):
+                set_.pop(field, None)
+            if set_:
+                merged["set"][section] = set_
+            if unset:
+                merged["unset"][section] = sorted(unset)
+        return merged
+
+    def stale(self, ticker: str, stamps: Dict[str, object], as_of=None,
+              max_age_days: Optional[int] = None) -> List[str]:
+        """
+        Secciones de stamps que hay que volver a descargar: sin sello del proveedor, con
+        un sello distinto del guardado o descargadas hace más de max_age_days días.
+        """
+        _, latest = self._load(ticker)
+        day = pd.Timestamp(_day(as_of))
+        out = []
+        for section, stamp in stamps.items():
+            stamp = to_json_value(stamp)
+            fetched = latest["fetched"].get(section)
+            fresh = (stamp is not None and section in latest["stamps"] and latest["stamps"][section] == stamp
+                     and (max_age_days is None or (day - pd.Timestamp(fetched)).days <= max_age_days))
+            if not fresh:
+                out.append(section)
+        return out
+
+    def dates(self, ticker: str) -> List[str]:
+        """Fechas (YYYY-MM-DD) de las instantáneas de un ticker, de la más antigua a la más reciente."""
+        return list(self._load(ticker)[0]["dates"])
+
+    def tickers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(t for t in os.listdir(self.root) if os.path.exists(self._path(t, "log.jsonl")))
+
+    def latest(self, ticker: str) -> Dict[str, Dict[str, object]]:
+        """Estado más reciente: {sección: campos}."""
+        return self._load(ticker)[1]["state"]
+
+    def snapshot(self, ticker: str, as_of=None, sections: Optional[Iterable[str]] = None
+                 ) -> Dict[str, Dict[str, object]]:
+        """Estado en as_of (el más reciente si es None) reconstruido aplicando los cambios en orden."""
+        index, latest = self._load(ticker)
+        wanted = set(sections) if sections is not None else None
+        if as_of is None or (index["dates"] and _day(as_of) >= index["dates"][-1]):
+            state = latest["state"]
+            return {s: dict(f) for s, f in state.items() if wanted is None or s in wanted}
+        limit = bisect_right(index["dates"], _day(as_of))
+        state: Dict[str, Dict[str, object]] = {}
+        with open(self._path(ticker, "log.jsonl"), "rb") as f:
+            for _ in range(limit):
+                entry = json.loads(f.readline())
+                for section, fields in entry.get("set", {}).items():
+                    if wanted is None or section in wanted:
+                        state.setdefault(section, {}).update(fields)
+                for section, fields in entry.get("unset", {}).items():
+                    for field in fields:
+                        state.get(section, {}).pop(field, None)
+        return state
+
+    def value(self, ticker: str, field: str, as_of=None, section: str = "info"):
+        """
+        Valor de un campo en as_of (el último conocido si es None): búsqueda binaria en
+        el índice y lectura de la única línea que lo fijó. None si no existía.
+        """
+        index, latest = self._load(ticker)
+        if as_of is None:
+            return latest["state"].get(section, {}).get(field)
+        position = bisect_right(index["dates"], _day(as_of)) - 1
+        positions = index["fields"].get(section, {}).get(field, [])
+        j = bisect_right(positions, position) - 1
+        if position < 0 or j < 0:
+            return None
+        entry = self._read_line(ticker, index["offsets"][positions[j]])
+        return entry.get("set", {}).get(section, {}).get(field)
+
+    def history(self, ticker: str, field: str, section: str = "info") -> pd.Series:
+        """Valores de un campo en cada instantánea que lo cambió (NaN/None cuando desaparece)."""
+        index, _ = self._load(ticker)
+        positions = index["fields"].get(section, {}).get(field, [])
+        values = [self._read_line(ticker, index["offsets"][p]).get("set", {}).get(section, {}).get(field)
+                  for p in positions]
+        return pd.Series(values, index=pd.DatetimeIndex([index["dates"][p] for p in positions], name="date"),
+                         name=field)
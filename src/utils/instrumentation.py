@@ -0,0 +1,189 @@
+"""
+Instrumentación de ejecuciones: tiempos por etapa y por ticker, contadores y memoria.
+
+Los módulos marcan su trabajo con span("etapa") (o el decorador instrumented) y
+suman contadores con count("bytes_downloaded", n). Todo se acumula en la
+Instrumentation activa (una por ejecución, ver set_instrumentation); el ticker
+en curso se toma de ticker_context, que es por hilo, así que los hilos del
+pipeline no se mezclan. Al final, report() produce un dict serializable a JSON
+y emit() lo entrega a los hooks registrados (p. ej. un sistema de métricas).
+"""
+import contextvars
+import functools
+import importlib
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_ticker = contextvars.ContextVar("instrumentation_ticker", default=None)
+
+
+def peak_rss_bytes():
+    """Pico de memoria residente del proceso en bytes (None si no se puede medir)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KiB y macOS en bytes
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _new_stats():
+    return {"count": 0, "wall_s": 0.0, "cpu_s": 0.0}
+
+
+class Instrumentation:
+    """
+    Acumulador de spans y contadores de una ejecución. Es seguro entre hilos.
+    Cada span suma count, wall_s (tiempo real) y cpu_s (CPU del hilo) en su etapa
+    y, si hay ticker en curso, también en la entrada del ticker.
+    """
+    def __init__(self):
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.tickers = {}
+        self.counters = {}
+        self.hooks = []
+
+    def _targets(self, stage, ticker):
+        targets = [self.stages.setdefault(stage, _new_stats())]
+        if ticker is not None:
+            targets.append(self.tickers.setdefault(ticker, {}).setdefault(stage, _new_stats()))
+        return targets
+
+    def record(self, stage, wall_s, cpu_s=0.0, ticker=None, **counters):
+        """Registra una medida ya tomada (p. ej. en otro proceso) con contadores opcionales."""
+        with self._lock:
+            for stats in self._targets(stage, ticker):
+                stats["count"] += 1
+                stats["wall_s"] += wall_s
+                stats["cpu_s"] += cpu_s
+                for name, value in counters.items():
+                    stats[name] = stats.get(name, 0) + value
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def count(self, name, value=1, stage=None, ticker=None):
+        """Suma value al contador name (global, y en la etapa/ticker si se indican)."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if stage is not None:
+                for stats in self._targets(stage, ticker):
+                    stats[name] = stats.get(name, 0) + value
+
+    @contextmanager
+    def span(self, stage, ticker=None):
+        """Mide el bloque como una ejecución de la etapa stage."""
+        ticker = ticker if ticker is not None else _ticker.get()
+        t0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield self
+        finally:
+            self.record(stage, time.perf_counter() - t0, time.thread_time() - cpu0, ticker)
+
+    def add_hook(self, hook: Callable[[dict], None]):
+        """Registra una función que recibirá el informe en emit()."""
+        self.hooks.append(hook)
+
+    def report(self) -> dict:
+        """Informe serializable a JSON con totales, etapas, tickers y contadores."""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "wall_s": round(time.perf_counter() - self._t0, 6),
+                "cpu_s": round(time.process_time() - self._cpu0, 6),
+                "peak_rss_bytes": peak_rss_bytes(),
+                "counters": dict(self.counters),
+                "stages": {name: _rounded(stats) for name, stats in self.stages.items()},
+                "tickers": {t: {name: _rounded(stats) for name, stats in stages.items()}
+                            for t, stages in self.tickers.items()},
+            }
+
+    def write_report(self, path) -> dict:
+        """Guarda el informe como JSON en path y lo devuelve."""
+        report = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+    def emit(self, report=None):
+        """Entrega el informe a cada hook; un hook que falla no interrumpe la ejecución."""
+        report = report if report is not None else self.report()
+        for hook in self.hooks:
+            try:
+                hook(report)
+            except Exception as e:
+                logging.error(f"Error en el hook de métricas {hook!r}: {e}")
+        return report
+
+
+def _rounded(stats):
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+_active = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    return _active
+
+
+def set_instrumentation(instrumentation: Instrumentation) -> Instrumentation:
+    """Activa instrumentation para los span/count siguientes y devuelve la anterior."""
+    global _active
+    previous, _active = _active, instrumentation
+    return previous
+
+
+def span(stage, ticker=None):
+    """Span sobre la Instrumentation activa."""
+    return _active.span(stage, ticker)
+
+
+def count(name, value=1, stage=None):
+    """Contador sobre la Instrumentation activa (se asigna al ticker en curso si se indica stage)."""
+    _active.count(name, value, stage, _ticker.get())
+
+
+@contextmanager
+def ticker_context(ticker):
+    """Asigna los spans del bloque (en este hilo) al ticker indicado."""
+    token = _ticker.set(ticker)
+    try:
+        yield
+    finally:
+        _ticker.reset(token)
+
+
+def instrumented(stage):
+    """Decorador: cada llamada a la función es un span de la etapa stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_hook(spec: str) -> Callable[[dict], None]:
+    """Carga un hook a partir de 'paquete.modulo:funcion'."""
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"Hook de métricas no válido: '{spec}'. Formato: paquete.modulo:funcion")
+    hook = getattr(importlib.import_module(module_name), attr)
+    if not callable(hook):
+        raise ValueError(f"El hook de métricas '{spec}' no es invocable.")
+    return hook
@@ -0,0 +1,76 @@
+"""
+Carga diferida de módulos y clases.
+
+pandas, matplotlib, yfinance o numba tardan cientos de milisegundos en importarse.
+lazy_import y LazyClass devuelven un sustituto que importa el módulo real la
+primera vez que se usa uno de sus atributos, de modo que un proceso solo paga
+por las dependencias de la etapa o del extractor que realmente utiliza.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """Sustituto de un módulo que lo importa al acceder al primer atributo."""
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            # importlib ya serializa las importaciones concurrentes del mismo módulo
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "cargado" if self.__dict__["_module"] is not None else "sin cargar"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Devuelve un LazyModule para name (p. ej. pd = lazy_import("pandas"))."""
+    return LazyModule(name)
+
+
+class LazyClass:
+    """
+    Referencia diferida a una clase (module:name). Llamarla crea una instancia de la
+    clase real, y el acceso a atributos (p. ej. hasattr(..., 'get_historical_prices'))
+    se delega en ella; el módulo solo se importa en ese momento.
+    """
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+        self._cls = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Importa el módulo (una sola vez) y devuelve la clase real."""
+        if self._cls is None:
+            with self._lock:
+                if self._cls is None:
+                    self._cls = getattr(importlib.import_module(self.module), self.name)
+        return self._cls
+
+    @property
+    def loaded(self) -> bool:
+        return self._cls is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") or attr in ("module", "name", "_cls", "_lock"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<LazyClass {self.module}.{self.name}>"
@@ -0,0 +1,129 @@
+"""
+Manifiesto de ejecuciones para re-ejecuciones incrementales.
+
+Guarda la huella (sha256) de los datos de entrada de cada ticker y, para cada
+artefacto (gráfico, reporte), la clave de las entradas con las que se generó y
+dónde quedó. En la siguiente ejecución, un artefacto con la misma clave no se
+vuelve a generar: se enlaza (hard link o, si no se puede, symlink) en la nueva
+carpeta de outputs o, como último recurso, se referencia la ruta existente.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(*parts) -> str:
+    """
+    Huella sha256 de una secuencia de partes: DataFrames (por contenido, sin índice),
+    arrays, bytes, o cualquier valor serializable a JSON.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(",".join(map(str, part.columns)).encode("utf-8"))
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def link_artifact(src: str, dst: str) -> str:
+    """
+    Hace que dst apunte al contenido de src sin copiarlo (hard link y, si no se puede,
+    symlink). Si ninguno es posible devuelve src, que se usa como referencia.
+    """
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return dst
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return dst
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(src), dst)
+        return dst
+    except OSError:
+        return src
+
+
+class RunManifest:
+    """
+    Manifiesto JSON persistente entre ejecuciones (normalmente en la carpeta base de outputs).
+    inputs: {nombre: huella}; artifacts: {nombre: {"key", "path", "size"}}.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.inputs = {}
+        self.artifacts = {}
+        self.reused = []
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.inputs = data.get("inputs", {})
+                    self.artifacts = data.get("artifacts", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"Manifiesto ilegible ({path}), se regenerará todo: {e}")
+
+    def _resolve(self, stored):
+        return stored if os.path.isabs(stored) else os.path.join(os.path.dirname(self.path), stored)
+
+    def set_input(self, name: str, digest: str) -> bool:
+        """Registra la huella de una entrada. Devuelve True si ha cambiado desde la ejecución anterior."""
+        changed = self.inputs.get(name) != digest
+        self.inputs[name] = digest
+        return changed
+
+    def lookup(self, name: str, key: str) -> Optional[str]:
+        """Ruta del artefacto generado con la misma clave, si sigue existiendo intacto."""
+        entry = self.artifacts.get(name)
+        if not key or not entry or entry.get("key") != key:
+            return None
+        path = self._resolve(entry["path"])
+        if not os.path.isfile(path) or os.path.getsize(path) != entry.get("size"):
+            return None
+        return path
+
+    def reuse(self, name: str, key: str, dst: str) -> Optional[str]:
+        """
+        Si el artefacto no ha cambiado, lo enlaza en dst y devuelve la ruta resultante
+        (dst, o la original si no se pudo enlazar). Devuelve None si hay que regenerarlo.
+        """
+        previous = self.lookup(name, key)
+        if previous is None:
+            return None
+        path = link_artifact(previous, dst)
+        self.record(name, key, path)
+        self.reused.append(path)
+        return path
+
+    def record(self, name: str, key: str, path: str):
+        """Registra un artefacto recién generado (o reutilizado) con su clave."""
+        if not key or not os.path.isfile(path):
+            return
+        base = os.path.dirname(os.path.abspath(self.path))
+        stored = os.path.relpath(os.path.abspath(path), base)
+        self.artifacts[name] = {"key": key, "path": stored, "size": os.path.getsize(path)}
+
+    def save(self):
+        """Guarda el manifiesto de forma atómica."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "inputs": self.inputs, "artifacts": self.artifacts},
+                      f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,72 @@
+"""
+Almacén columnar de cadenas de opciones.
+
+Cada instantánea (ticker, fecha) se guarda como un .npz comprimido con un array por
+columna: leer solo unas columnas (p. ej. strike, expiry e iv para una superficie) no
+descomprime el resto, y los tipos (datetime64, float, texto) se conservan sin pasar
+por CSV. Rutas: <root>/<TICKER>/<YYYY-MM-DD>.npz.
+"""
+import os
+import re
+from datetime import date
+from typing import List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})\.npz$")
+
+
+def _to_array(series: pd.Series) -> np.ndarray:
+    """Columna como array sin objetos (los textos pasan a unicode de ancho fijo)."""
+    if series.dtype.kind in "biufcmM":
+        return series.to_numpy()
+    return series.fillna("").astype(str).to_numpy(dtype=str)
+
+
+class OptionChainStore:
+    """Instantáneas de cadenas de opciones por ticker y fecha de captura."""
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def path(self, ticker: str, as_of) -> str:
+        return os.path.join(self._dir(ticker), f"{pd.Timestamp(as_of).date().isoformat()}.npz")
+
+    def put(self, ticker: str, chain: pd.DataFrame, as_of=None) -> str:
+        """Guarda la cadena (sustituye la instantánea del mismo día) y devuelve la ruta."""
+        path = self.path(ticker, as_of or date.today())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp, **{str(col): _to_array(chain[col]) for col in chain.columns})
+        os.replace(tmp, path)
+        return path
+
+    def snapshots(self, ticker: str) -> List[str]:
+        """Fechas (YYYY-MM-DD) de las instantáneas de un ticker, de la más antigua a la más reciente."""
+        try:
+            names = os.listdir(self._dir(ticker))
+        except FileNotFoundError:
+            return []
+        return sorted(m.group(1) for m in map(SNAPSHOT_PATTERN.match, names) if m)
+
+    def tickers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(t for t in os.listdir(self.root) if self.snapshots(t))
+
+    def get(self, ticker: str, as_of=None, columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Instantánea más reciente en as_of o antes (la última si as_of es None), con todas
+        las columnas o solo columns. None si no hay ninguna.
+        """
+        snapshots = self.snapshots(ticker)
+        if as_of is not None:
+            limit = pd.Timestamp(as_of).date().isoformat()
+            snapshots = [s for s in snapshots if s <= limit]
+        if not snapshots:
+            return None
+        with np.load(self.path(ticker, snapshots[-1]), allow_pickle=False) as data:
+            names = list(columns) if columns is not None else list(data.files)
+            return pd.DataFrame({name: data[name] for name in names})
@@ -1,25 +1,76 @@
 import os
+import threading
 from datetime import datetime
 from src.variables import OUTPUTS_BASE_PATH, OUTPUTS_DATE_FORMAT
+from src.utils.instrumentation import span, count
 
 class OutputManager:
     """
     Gestiona la creación de carpetas y guardado de archivos de datos y gráficos.
     """
-    def __init__(self):
+    def __init__(self, base_path=None):
         now = datetime.now().strftime(OUTPUTS_DATE_FORMAT)
-        self.base_dir = os.path.join(OUTPUTS_BASE_PATH, now)
+        # Carpeta de outputs (--output-dir); los almacenes persistentes cuelgan de ella, no de base_dir
+        self.base_path = base_path or OUTPUTS_BASE_PATH
+        self.base_dir = os.path.join(self.base_path, now)
         os.makedirs(self.base_dir, exist_ok=True)
 
     def get_path(self, filename: str) -> str:
         return os.path.join(self.base_dir, filename)
 
     def save_dataframe(self, df, filename: str):
-        path = self.get_path(filename)
-        df.to_csv(path, index=False)
+        path = unlink_target(self.get_path(filename))
+        with span("write"):
+            df.to_csv(path, index=False)
+        count("bytes_written", os.path.getsize(path), stage="write")
         return path
 
     def save_plot(self, plt, filename: str):
-        path = self.get_path(filename)
-        plt.savefig(path)
+        path = unlink_target(self.get_path(filename))
+        with span("write"):
+            plt.savefig(path)
+        count("bytes_written", os.path.getsize(path), stage="write")
         return path
+
+    def save_text(self, text: str, filename: str):
+        path = unlink_target(self.get_path(filename))
+        with span("write"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        count("bytes_written", os.path.getsize(path), stage="write")
+        return path
+
+
+def unlink_target(path: str) -> str:
+    """
+    Borra path si ya existe antes de reescribirlo: puede ser un hard link a un artefacto de
+    otra ejecución (RunManifest) y escribir encima cambiaría también el original.
+    """
+    if os.path.lexists(path):
+        os.remove(path)
+    return path
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_output_manager() -> OutputManager:
+    """
+    OutputManager compartido de la ejecución. Se crea (y con él su carpeta) la primera
+    vez que alguien necesita escribir, no al importar módulos ni al crear extractores.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = OutputManager()
+    return _shared
+
+
+def set_output_manager(output_manager) -> OutputManager:
+    """Fija el OutputManager compartido (p. ej. el de la ejecución en curso) y devuelve el anterior."""
+    global _shared
+    with _shared_lock:
+        previous, _shared = _shared, output_manager
+    return previous
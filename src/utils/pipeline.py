@@ -0,0 +1,108 @@
+"""
+Pipeline por etapas conectadas con colas acotadas.
+
+Cada etapa tiene su propio número de hilos trabajadores. Las colas tienen tamaño
+máximo, de modo que una etapa rápida se bloquea (backpressure) cuando la siguiente
+no da abasto, y todas las etapas trabajan a la vez: el tiempo total tiende al de la
+etapa más lenta en lugar de a la suma de todas.
+
+Los resultados de la última etapa se consumen con iter() desde el hilo que llama,
+que actúa como etapa final (p. ej. render/escritura, que con pyplot debe ir en el
+hilo principal).
+"""
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """
+    Etapa del pipeline. func recibe un elemento y devuelve el elemento para la
+    siguiente etapa (o None para descartarlo). queue_size acota la cola de entrada.
+    """
+    name: str
+    func: Callable
+    workers: int = 1
+    queue_size: int = 8
+
+
+class Pipeline:
+    """
+    Ejecuta una secuencia de Stage sobre un iterable de elementos.
+    Los errores no previstos de una etapa se registran en errors y el elemento se descarta.
+    """
+    def __init__(self, stages: List[Stage], output_queue_size=8):
+        if not stages:
+            raise ValueError("El pipeline necesita al menos una etapa.")
+        self.stages = stages
+        self.output_queue_size = output_queue_size
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable) -> list:
+        """Procesa items y devuelve la lista de resultados de la última etapa."""
+        return list(self.iter(items))
+
+    def iter(self, items: Iterable) -> Iterator:
+        """Procesa items y va devolviendo los resultados de la última etapa según terminan."""
+        queues = [queue.Queue(maxsize=max(1, stage.queue_size)) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=max(1, self.output_queue_size)))
+        for i, stage in enumerate(self.stages):
+            n_workers = max(1, stage.workers)
+            # El siguiente consumidor es otra etapa o el propio iterador (un único consumidor)
+            n_next = max(1, self.stages[i + 1].workers) if i + 1 < len(self.stages) else 1
+            remaining = [n_workers]
+            for w in range(n_workers):
+                threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[i], queues[i + 1], n_next, remaining),
+                    name=f"{stage.name}-{w}",
+                    daemon=True,
+                ).start()
+        threading.Thread(target=self._produce, args=(items, queues[0], max(1, self.stages[0].workers)),
+                         name="producer", daemon=True).start()
+        out_q = queues[-1]
+        while True:
+            item = out_q.get()
+            if item is _STOP:
+                return
+            yield item
+
+    def _produce(self, items, out_q, n_next):
+        try:
+            for item in items:
+                out_q.put(item)
+        except Exception as e:
+            logging.error(f"Error generando elementos del pipeline: {e}")
+            with self._lock:
+                self.errors.append(("producer", None, e))
+        finally:
+            for _ in range(n_next):
+                out_q.put(_STOP)
+
+    def _worker(self, stage, in_q, out_q, n_next, remaining):
+        while True:
+            item = in_q.get()
+            if item is _STOP:
+                break
+            try:
+                out = stage.func(item)
+            except Exception as e:
+                logging.error(f"Error en la etapa '{stage.name}': {e}")
+                with self._lock:
+                    self.errors.append((stage.name, item, e))
+                continue
+            if out is not None:
+                out_q.put(out)
+        # El último trabajador de la etapa avisa a todos los consumidores siguientes
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(n_next):
+                out_q.put(_STOP)
@@ -0,0 +1,202 @@
+"""
+Caché en disco de históricos de precios descargados.
+
+La clave es (fuente, símbolo, inicio, fin). Un rango que termina antes de hoy ya
+no cambia, así que su entrada no caduca; si el rango incluye el día de hoy la
+entrada vale ttl_minutes (los datos del día todavía se mueven).
+
+Además, cada (fuente, símbolo) guarda su histórico acumulado y los rangos ya
+consultados. fetch_incremental compara ese histórico con el calendario de sesiones
+y solo vuelve a pedir a la fuente las sesiones que faltan.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import date
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.completeness import missing_session_ranges
+from src.utils.trading_calendar import TradingCalendar, get_calendar, to_days
+
+# 2: los históricos de Yahoo se guardan sin ajustar (el ajuste se hace al leerlos)
+# 3: las acciones de Yahoo ya no incluyen splits (sus precios ya vienen ajustados por ellos)
+PRICE_CACHE_VERSION = 3
+# Máximo de peticiones por huecos; si hay más, se pide un único rango que los cubre todos
+MAX_GAP_REQUESTS = 8
+
+
+class PriceCache:
+    """DataFrames de históricos guardados como pickle en cache_dir."""
+    def __init__(self, cache_dir, ttl_minutes=60):
+        self.cache_dir = cache_dir
+        self.ttl_minutes = ttl_minutes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source: str, symbol: str, start, end) -> str:
+        payload = {"version": PRICE_CACHE_VERSION, "source": source, "symbol": symbol,
+                   "start": str(start), "end": str(end)}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def is_fresh(self, path, end) -> bool:
+        """Un rango cerrado (fin anterior a hoy) siempre es válido; uno abierto caduca a los ttl_minutes."""
+        try:
+            if pd.Timestamp(end).date() < date.today():
+                return True
+        except (TypeError, ValueError):
+            pass
+        return time.time() - os.path.getmtime(path) < self.ttl_minutes * 60
+
+    def get(self, source: str, symbol: str, start, end) -> Optional[pd.DataFrame]:
+        path = self._path(self.key(source, symbol, start, end))
+        if os.path.exists(path) and self.is_fresh(path, end):
+            try:
+                df = pd.read_pickle(path)
+            except Exception as e:
+                logging.warning(f"Entrada de la caché de precios ilegible ({path}): {e}")
+            else:
+                self.hits += 1
+                return df
+        self.misses += 1
+        return None
+
+    def put(self, source: str, symbol: str, start, end, df: pd.DataFrame) -> str:
+        """Guarda df de forma atómica (fichero temporal + rename) y devuelve la ruta."""
+        path = self._path(self.key(source, symbol, start, end))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+        return path
+
+    def _history_path(self, source: str, symbol: str) -> str:
+        payload = {"version": PRICE_CACHE_VERSION, "source": source, "symbol": symbol}
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "history", f"{key}.pkl")
+
+    def get_history(self, source: str, symbol: str) -> Optional[dict]:
+        """Histórico acumulado de un símbolo: {"data": DataFrame, "covered": [(inicio, fin), ...]}."""
+        path = self._history_path(source, symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            logging.warning(f"Histórico de la caché de precios ilegible ({path}): {e}")
+            return None
+
+    def put_history(self, source: str, symbol: str, data: pd.DataFrame, covered) -> str:
+        """Guarda el histórico acumulado y los rangos de sesiones ya consultados (de forma atómica)."""
+        path = self._history_path(source, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle({"data": data, "covered": _merge_ranges(covered)}, tmp)
+        os.replace(tmp, path)
+        return path
+
+    def fetch_incremental(self, source: str, symbol: str, start, end, fetch: Callable[[str, str], pd.DataFrame],
+                          calendar: Optional[TradingCalendar] = None, date_col: str = "date",
+                          max_requests: int = MAX_GAP_REQUESTS) -> Tuple[object, List[tuple]]:
+        """
+        Histórico de [start, end) (fin exclusivo, como yfinance) descargando solo lo que falta.
+        fetch(inicio, fin) descarga un rango (fechas YYYY-MM-DD, fin exclusivo).
+        Devuelve (datos, rangos descargados); sin rangos, los datos salen enteros de la caché.
+        Se exigen las sesiones hasta ayer: la de hoy puede no haberse cerrado todavía. Las
+        sesiones ya consultadas sin datos antes o después del histórico no se vuelven a pedir;
+        un rango cuya descarga no devuelve filas (error o límite de peticiones del proveedor)
+        no cuenta como consultado y se vuelve a pedir en la siguiente llamada.
+        """
+        cached = self.get(source, symbol, start, end)
+        if cached is not None:
+            return cached, []
+        calendar = calendar or get_calendar()
+        start_day, end_day = to_days(start), to_days(end)
+        today = np.datetime64(date.today(), "D")
+        required_end = min(end_day - 1, today - 1)
+        history = self.get_history(source, symbol)
+        if history is None:
+            data = fetch(str(start_day), str(end_day))
+            if _has_rows(data, date_col):
+                covered = [(start_day, required_end)]
+                self.put_history(source, symbol, data, covered)
+                self._put_complete(source, symbol, start, end, data, covered, calendar, date_col,
+                                   to_days(data[date_col]))
+            return data, [(start_day, required_end)]
+        data = history["data"]
+        ranges = missing_session_ranges(to_days(data[date_col]), start_day, required_end, calendar,
+                                        _excused(history["covered"], to_days(data[date_col])))
+        if len(ranges) > max_requests:
+            ranges = [(ranges[0][0], ranges[-1][1])]
+        parts, covered = [data], list(history["covered"])
+        for first, last in ranges:
+            part = fetch(str(first), str(last + 1))
+            if _has_rows(part, date_col):
+                parts.append(part)
+                covered.append((first, last))
+            else:
+                logging.warning(f"Sin datos de {symbol} entre {first} y {last}; se volverán a pedir")
+        if ranges:
+            data = _merge_frames(parts, date_col)
+            self.put_history(source, symbol, data, covered)
+        else:
+            self.hits += 1
+        days = to_days(data[date_col])
+        result = data[(days >= start_day) & (days < end_day)].reset_index(drop=True)
+        self._put_complete(source, symbol, start, end, result, covered, calendar, date_col, days)
+        return result, ranges
+
+    def _put_complete(self, source, symbol, start, end, result, covered, calendar, date_col, history_days):
+        """
+        Guarda el resultado de un rango solo si no le falta ninguna sesión exigida (un rango
+        cerrado no caduca: uno truncado por un fallo se serviría para siempre).
+        """
+        start_day, end_day = to_days(start), to_days(end)
+        required_end = min(end_day - 1, np.datetime64(date.today(), "D") - 1)
+        if not missing_session_ranges(to_days(result[date_col]), start_day, required_end, calendar,
+                                      _excused(covered, history_days)):
+            self.put(source, symbol, start, end, result)
+
+
+def _has_rows(data, date_col) -> bool:
+    return isinstance(data, pd.DataFrame) and not data.empty and date_col in data.columns
+
+
+def _excused(covered, days) -> list:
+    """
+    Partes de los rangos ya consultados fuera de los datos (antes de la salida a bolsa,
+    después de la exclusión): sus sesiones no se exigen. Los huecos interiores sí.
+    """
+    if not len(days):
+        return []
+    first, last = days.min(), days.max()
+    return [piece for a, b in covered
+            for piece in ((a, min(b, first - 1)), (max(a, last + 1), b)) if piece[0] <= piece[1]]
+
+
+def _merge_frames(parts, date_col) -> pd.DataFrame:
+    """Une históricos: una fila por fecha (gana la más reciente) y ordenados por fecha."""
+    merged = pd.concat(parts, ignore_index=True)
+    days = to_days(merged[date_col])
+    keep = ~pd.Series(days).duplicated(keep="last").to_numpy()
+    merged, days = merged[keep], days[keep]
+    return merged.iloc[np.argsort(days, kind="stable")].reset_index(drop=True)
+
+
+def _merge_ranges(ranges) -> list:
+    """Fusiona rangos (inicio, fin) de fechas solapados o contiguos."""
+    merged = []
+    for first, last in sorted((to_days(a), to_days(b)) for a, b in ranges):
+        if last < first:
+            continue
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
@@ -0,0 +1,378 @@
+"""
+Procesado en streaming de presentaciones completas de SEC EDGAR (<accession>.txt).
+
+Una presentación es un SGML con un bloque <DOCUMENT> por documento (el formulario,
+los anexos EX-*, gráficos uuencoded, XBRL...). El fichero se descarga por bloques a
+disco y se recorre línea a línea (con longitud máxima), así que la memoria no depende
+de su tamaño: los documentos no pedidos se saltan sin decodificarlos, el texto de los
+pedidos se extrae del HTML con un parser incremental y los Items del formulario
+principal (Item 1A, Item 7...) se escriben directamente a ficheros gzip.
+"""
+import codecs
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Sequence, Tuple
+from src.utils.instrumentation import count
+
+CHUNK_SIZE = 1 << 16
+# Longitud máxima de línea leída de una vez (las líneas más largas se procesan por trozos)
+MAX_LINE = 1 << 16
+# Longitud máxima de una línea de texto extraído (los párrafos más largos se entregan partidos)
+MAX_TEXT_LINE = 1 << 20
+# Encabezado de un Item ("Item 1A.", "ITEM 7 -", "ITEM 7A QUANTITATIVE..."), no una frase que
+# empieza por "Item 1A risks..."; solo en líneas cortas
+ITEM_PATTERN = re.compile(r"^(?i:item)\s+(\d{1,2}[A-Za-z]?)(?:\s*[.:\u2013\u2014-]|\s*$|\s+[A-Z\"\u201c(])")
+MAX_HEADING_CHARS = 200
+# Etiquetas HTML que separan líneas de texto
+BLOCK_TAGS = frozenset({"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "title"})
+# Contenido HTML que no es texto del documento (la cabecera oculta del XBRL en línea)
+SKIP_TAGS = frozenset({"script", "style", "ix:header"})
+HEADER_TAGS = {b"<TYPE>": "type", b"<SEQUENCE>": "sequence", b"<FILENAME>": "filename", b"<DESCRIPTION>": "description"}
+
+
+@dataclass(frozen=True)
+class DocumentHeader:
+    """Cabecera de un <DOCUMENT> de la presentación."""
+    type: str = ""
+    sequence: int = 0
+    filename: str = ""
+    description: str = ""
+
+
+@dataclass
+class ExtractionResult:
+    """Ficheros gzip extraídos de una presentación: Items (por número) y documentos (por tipo)."""
+    accession_number: str
+    items: Dict[str, str] = field(default_factory=dict)
+    documents: Dict[str, str] = field(default_factory=dict)
+    bytes_downloaded: int = 0
+    cached: bool = False
+
+    def read(self, item: str) -> str:
+        with gzip.open(self.items[item.upper()], "rt", encoding="utf-8") as f:
+            return f.read()
+
+
+def iter_lines(f, max_line: int = MAX_LINE):
+    """(línea en bytes, empieza línea) de un fichero binario, en trozos de como mucho max_line bytes."""
+    at_start = True
+    while True:
+        line = f.readline(max_line)
+        if not line:
+            return
+        yield line, at_start
+        at_start = line.endswith(b"\n")
+
+
+class TextSink:
+    """
+    Recibe texto por trozos y lo entrega por líneas a on_line. Las líneas sin salto
+    más largas que max_chars se entregan partidas (no pueden ser encabezados).
+    """
+    def __init__(self, on_line, max_chars: int = MAX_TEXT_LINE):
+        self.on_line = on_line
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        while text:
+            newline = text.find("\n")
+            if newline < 0:
+                self._parts.append(text)
+                self._size += len(text)
+                if self._size > self.max_chars:
+                    self.on_line("".join(self._parts), heading=False)
+                    self._parts, self._size = [], 0
+                return
+            self._parts.append(text[:newline])
+            self.break_line()
+            text = text[newline + 1:]
+
+    def break_line(self):
+        line = "".join(self._parts)
+        self._parts, self._size = [], 0
+        self.on_line(line, heading=True)
+
+    def close(self):
+        if self._parts:
+            self.break_line()
+
+
+class HtmlText(HTMLParser):
+    """Texto de un documento HTML recibido por trozos: las etiquetas de bloque separan líneas."""
+    def __init__(self, sink: TextSink):
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            self.sink.break_line()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.sink.break_line()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in BLOCK_TAGS:
+            self.sink.break_line()
+
+    def handle_data(self, data):
+        if not self._skip:
+            # En HTML los saltos de línea del código son espacios
+            self.sink.write(data.replace("\r", " ").replace("\n", " "))
+
+    def close(self):
+        super().close()
+        self.sink.close()
+
+
+class SectionWriter:
+    """
+    Reparte las líneas de texto del formulario principal en Items. Cada aparición de un
+    Item pedido se escribe a un gzip temporal; se conserva la más larga (el índice del
+    principio del documento también nombra los Items, pero con una línea cada uno).
+    """
+    def __init__(self, out_dir: str, items: Sequence[str]):
+        self.out_dir = out_dir
+        self.wanted = {item.upper() for item in items}
+        self.best: Dict[str, Tuple[int, str]] = {}
+        self._item = None
+        self._file = None
+        self._path = None
+        self._chars = 0
+        self._serial = 0
+
+    def on_line(self, line: str, heading: bool = True):
+        text = " ".join(line.split())
+        match = ITEM_PATTERN.match(text) if heading and len(text) <= MAX_HEADING_CHARS else None
+        if match:
+            self._finish()
+            self._item = match.group(1).upper()
+            if self._item in self.wanted:
+                self._serial += 1
+                path = os.path.join(self.out_dir, f".item_{self._item}.{self._serial}.tmp.gz")
+                self._file = gzip.open(path, "wt", encoding="utf-8")
+                self._path = path
+        if self._file is not None and text:
+            self._file.write(text + "\n")
+            self._chars += len(text) + 1
+
+    def _finish(self):
+        if self._file is None:
+            return
+        self._file.close()
+        current = self.best.get(self._item)
+        if current is None or self._chars > current[0]:
+            if current is not None:
+                os.remove(current[1])
+            self.best[self._item] = (self._chars, self._path)
+        else:
+            os.remove(self._path)
+        self._file, self._chars = None, 0
+
+    def close(self) -> Dict[str, str]:
+        """Cierra el Item en curso y mueve los elegidos a item_<n>.txt.gz."""
+        self._finish()
+        paths = {}
+        for item, (_, tmp) in self.best.items():
+            path = os.path.join(self.out_dir, f"item_{item}.txt.gz")
+            os.replace(tmp, path)
+            paths[item] = path
+        return paths
+
+
+class DocumentWriter:
+    """Texto de un documento completo a un fichero gzip."""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path + ".tmp", "wt", encoding="utf-8")
+
+    def on_line(self, line: str, heading: bool = True):
+        text = line.replace("\xa0", " ").rstrip()
+        if text:
+            self._file.write(text + "\n")
+
+    def close(self) -> str:
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+        return self.path
+
+
+def _is_html(line: bytes) -> bool:
+    head = line.lstrip()[:16].lower()
+    return head.startswith((b"<html", b"<!doctype", b"<?xml", b"<xbrl", b"<xml", b"<head", b"<body", b"<div", b"<p"))
+
+
+def extract(path: str, out_dir: str, items: Sequence[str] = (), documents: Sequence[str] = (),
+            max_line: int = MAX_LINE) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Recorre la presentación en path una sola vez. Los Items se buscan en el primer
+    documento (el formulario principal); documents son tipos (p. ej. "EX-21") cuyo texto
+    completo se guarda. Devuelve ({item: ruta}, {tipo: ruta}).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    wanted_documents = {d.upper() for d in documents}
+    item_paths, document_paths = {}, {}
+    header: Dict[str, str] = {}
+    in_document = in_text = False
+    target = parser = decoder = sink = None
+    first_line = True
+    n_documents = 0
+    with open(path, "rb") as f:
+        for line, at_start in iter_lines(f, max_line):
+            if at_start and line.startswith(b"<"):
+                tag = line.split(b">", 1)[0] + b">"
+                if tag == b"<DOCUMENT>":
+                    in_document, header = True, {}
+                    continue
+                if tag == b"</DOCUMENT>":
+                    in_document = False
+                    continue
+                if in_document and not in_text and tag in HEADER_TAGS:
+                    header[HEADER_TAGS[tag]] = line[len(tag):].decode("latin-1").strip()
+                    continue
+                if in_document and tag == b"<TEXT>":
+                    in_text, first_line = True, True
+                    n_documents += 1
+                    doc = DocumentHeader(header.get("type", "").upper(), int(header.get("sequence") or n_documents),
+                                         header.get("filename", ""), header.get("description", ""))
+                    target = None
+                    if n_documents == 1 and items:
+                        target = SectionWriter(out_dir, items)
+                    elif doc.type in wanted_documents and doc.type not in document_paths:
+                        name = re.sub(r"[^A-Za-z0-9_.-]", "_", doc.type)
+                        target = DocumentWriter(os.path.join(out_dir, f"{name}.txt.gz"))
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace") if target else None
+                    continue
+                if in_text and tag == b"</TEXT>":
+                    in_text = False
+                    if parser is not None:
+                        parser.close()
+                    elif sink is not None:
+                        sink.close()
+                    if isinstance(target, SectionWriter):
+                        item_paths = target.close()
+                    elif target is not None:
+                        document_paths[doc.type] = target.close()
+                    target = parser = decoder = sink = None
+                    continue
+            if not in_text or target is None:
+                continue  # documentos no pedidos (anexos, binarios uuencoded, XBRL): sin decodificar
+            if first_line:
+                if not line.strip():
+                    continue
+                first_line = False
+                sink = TextSink(target.on_line)
+                parser = HtmlText(sink) if _is_html(line) else None
+            text = decoder.decode(line)
+            if parser is not None:
+                parser.feed(text)
+            else:
+                sink.write(text.replace("\r", ""))
+    if isinstance(target, SectionWriter):  # presentación truncada dentro del formulario
+        item_paths = target.close()
+    return item_paths, document_paths
+
+
+def download(client, url: str, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """Descarga url a path por bloques (fichero temporal + rename). Devuelve los bytes escritos."""
+    response = client.get(url, stream=True)
+    written = 0
+    # Temporal único por llamada: varios hilos pueden descargar a la misma carpeta
+    fd, tmp = tempfile.mkstemp(suffix=".part", prefix=os.path.basename(path) + ".", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp, path)
+    finally:
+        response.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    count("sec_bytes_downloaded", written, stage="sec")
+    return written
+
+
+class FilingProcessor:
+    """
+    Descarga y extrae presentaciones completas. Cada presentación va a
+    out_dir/<cik>/<accession>/ con un extraction.json; si ya existe con los mismos
+    items y documentos, no se vuelve a descargar. keep_raw conserva el .txt descargado.
+    """
+    def __init__(self, client, out_dir: str, items: Sequence[str] = ("1A", "7"), documents: Sequence[str] = (),
+                 keep_raw: bool = False, max_workers: int = 4, chunk_size: int = CHUNK_SIZE):
+        self.client = client
+        self.out_dir = out_dir
+        self.items = tuple(item.upper() for item in items)
+        self.documents = tuple(d.upper() for d in documents)
+        self.keep_raw = keep_raw
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    def folder(self, filing) -> str:
+        return os.path.join(self.out_dir, str(filing.cik), filing.accession_number.replace("-", ""))
+
+    def process(self, filing) -> ExtractionResult:
+        folder = self.folder(filing)
+        manifest = os.path.join(folder, "extraction.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("requested") == {"items": list(self.items), "documents": list(self.documents)}:
+                return ExtractionResult(filing.accession_number, data["items"], data["documents"], cached=True)
+        os.makedirs(folder, exist_ok=True)
+        raw = os.path.join(folder, f"{filing.accession_number}.txt")
+        size = download(self.client, filing.text_url, raw, self.chunk_size)
+        try:
+            items, documents = extract(raw, folder, self.items, self.documents)
+        finally:
+            if not self.keep_raw:
+                os.remove(raw)
+        result = ExtractionResult(filing.accession_number, items, documents, size)
+        missing = set(self.items) - set(items)
+        if missing:
+            logging.info(f"{filing.ticker} {filing.form} {filing.accession_number}: sin Items {', '.join(sorted(missing))}")
+        data = {k: v for k, v in asdict(result).items() if k in ("items", "documents")}
+        data["requested"] = {"items": list(self.items), "documents": list(self.documents)}
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", prefix="extraction.", dir=folder)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, manifest)
+        return result
+
+    def process_many(self, filings: Iterable) -> Tuple[List[ExtractionResult], Dict[str, str]]:
+        """
+        Procesa presentaciones en paralelo (las peticiones comparten el límite del cliente).
+        Cada número de acceso se procesa una vez: dos hilos sobre la misma carpeta se pisarían.
+        """
+        filings = list({f.accession_number: f for f in filings}.values())
+
+        def run(filing):
+            try:
+                return self.process(filing)
+            except Exception as e:
+                return e
+
+        results, errors = [], {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(filings) or 1))) as pool:
+            for filing, result in zip(filings, pool.map(run, filings)):
+                if isinstance(result, Exception):
+                    logging.error(f"Error al procesar {filing.accession_number} ({filing.ticker}): {result}")
+                    errors[filing.accession_number] = str(result)
+                else:
+                    results.append(result)
+        return results, errors
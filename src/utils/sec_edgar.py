@@ -0,0 +1,267 @@
+"""
+Cliente de SEC EDGAR.
+
+- CikIndex: mapa ticker -> CIK (diccionario) a partir de company_tickers_exchange.json,
+  guardado en disco y refrescado cuando caduca.
+- RateLimiter: espaciado de peticiones compartido entre hilos (la SEC admite como
+  máximo 10 peticiones por segundo y exige un User-Agent con contacto).
+- EdgarClient: submissions de muchos tickers en paralelo (hilos) bajo ese límite, con
+  reintentos ante 429/5xx, y los filings devueltos como registros Filing.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+from src.utils.instrumentation import count
+
+TICKERS_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik:010d}.json"
+ARCHIVES_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{folder}/{name}"
+# Límite de la SEC: 10 peticiones por segundo por cliente
+SEC_MAX_REQUESTS_PER_SECOND = 10
+# Códigos HTTP que se reintentan (límite superado o error temporal del servidor)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """Garantiza al menos 1/rate segundos entre peticiones consecutivas (seguro entre hilos)."""
+    def __init__(self, rate: float = SEC_MAX_REQUESTS_PER_SECOND, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate debe ser positivo.")
+        self.interval = 1.0 / rate
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Bloquea hasta el siguiente hueco libre (los huecos se reservan en orden de llegada)."""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+@dataclass(frozen=True)
+class CikEntry:
+    cik: int
+    name: str
+    exchange: str
+
+
+@dataclass(frozen=True)
+class Filing:
+    """Metadatos de un filing de EDGAR (fechas como str YYYY-MM-DD)."""
+    ticker: str
+    cik: int
+    form: str
+    accession_number: str
+    filing_date: str
+    report_date: str
+    primary_document: str
+
+    @property
+    def folder_url(self) -> str:
+        return ARCHIVES_URL.format(cik=self.cik, folder=self.accession_number.replace("-", ""), name="")
+
+    @property
+    def url(self) -> str:
+        """Documento principal (HTML) del filing."""
+        return self.folder_url + self.primary_document
+
+    @property
+    def text_url(self) -> str:
+        """Presentación completa (SGML con todos los documentos)."""
+        return self.folder_url + f"{self.accession_number}.txt"
+
+
+class CikIndex:
+    """
+    Mapa ticker -> CikEntry. Se carga de cache_path si existe y tiene menos de
+    ttl_hours; si no, se descarga con fetch (función sin argumentos que devuelve el
+    JSON de company_tickers_exchange) y se guarda. Los tickers se normalizan a
+    mayúsculas y con '-' en vez de '.' (BRK.B -> BRK-B), como en EDGAR.
+    """
+    def __init__(self, cache_path: Optional[str], fetch, ttl_hours: float = 24.0):
+        self.cache_path = cache_path
+        self.fetch = fetch
+        self.ttl_hours = ttl_hours
+        self._entries: Optional[Dict[str, CikEntry]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(ticker: str) -> str:
+        return ticker.strip().upper().replace(".", "-")
+
+    @staticmethod
+    def parse(payload: dict) -> Dict[str, CikEntry]:
+        """Índice a partir del JSON de la SEC (formato {fields, data})."""
+        fields = payload["fields"]
+        cik, name, ticker, exchange = (fields.index(f) for f in ("cik", "name", "ticker", "exchange"))
+        entries = {}
+        for row in payload["data"]:
+            if row[ticker]:
+                # Si un ticker aparece dos veces se conserva la primera entrada (la de la SEC)
+                entries.setdefault(CikIndex.normalize(row[ticker]),
+                                   CikEntry(int(row[cik]), row[name] or "", row[exchange] or ""))
+        return entries
+
+    def _is_fresh(self) -> bool:
+        return (self.cache_path is not None and os.path.exists(self.cache_path)
+                and time.time() - os.path.getmtime(self.cache_path) < self.ttl_hours * 3600)
+
+    def refresh(self) -> Dict[str, CikEntry]:
+        """Descarga el mapa, lo guarda de forma atómica y lo deja cargado."""
+        payload = self.fetch()
+        entries = self.parse(payload)
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.cache_path)
+        self._entries = entries
+        return entries
+
+    @property
+    def entries(self) -> Dict[str, CikEntry]:
+        with self._lock:
+            if self._entries is None:
+                if self._is_fresh():
+                    try:
+                        with open(self.cache_path, encoding="utf-8") as f:
+                            self._entries = self.parse(json.load(f))
+                    except (OSError, ValueError, KeyError) as e:
+                        logging.warning(f"Índice de CIK en caché ilegible ({self.cache_path}): {e}")
+                if self._entries is None:
+                    self.refresh()
+            return self._entries
+
+    def get(self, ticker: str) -> Optional[CikEntry]:
+        return self.entries.get(self.normalize(ticker))
+
+    def cik(self, ticker: str) -> Optional[int]:
+        entry = self.get(ticker)
+        return entry.cik if entry else None
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class EdgarClient:
+    """
+    Cliente de EDGAR. user_agent es obligatorio para la SEC ("Nombre contacto@dominio").
+    session es un requests.Session (o un objeto con get(url, headers, timeout, stream));
+    max_workers son los hilos de las consultas en bloque, todas bajo el mismo RateLimiter.
+    """
+    def __init__(self, user_agent: str, cache_dir: Optional[str] = None, max_workers: int = 8,
+                 rate: float = SEC_MAX_REQUESTS_PER_SECOND, ttl_hours: float = 24.0, session=None,
+                 timeout: float = 30.0, retries: int = 3):
+        if not user_agent:
+            raise ValueError("La SEC exige un User-Agent con nombre y correo de contacto (SEC_USER_AGENT).")
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+        self.limiter = RateLimiter(rate)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        cache_path = os.path.join(cache_dir, "company_tickers_exchange.json") if cache_dir else None
+        self.index = CikIndex(cache_path, lambda: self.get_json(TICKERS_URL), ttl_hours)
+
+    def get(self, url: str, stream: bool = False):
+        """GET respetando el límite de peticiones; reintenta 429/5xx con espera creciente."""
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            response = self.session.get(url, headers=self.headers, timeout=self.timeout, stream=stream)
+            count("sec_requests", 1, stage="sec")
+            if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, url: str) -> dict:
+        return self.get(url).json()
+
+    def cik(self, ticker: str) -> Optional[int]:
+        return self.index.cik(ticker)
+
+    def submissions(self, cik: int) -> dict:
+        return self.get_json(SUBMISSIONS_URL.format(cik=int(cik)))
+
+    @staticmethod
+    def parse_filings(ticker: str, cik: int, submissions: dict, forms: Optional[Sequence[str]] = None,
+                      limit: Optional[int] = None) -> List[Filing]:
+        """Filings recientes de submissions (más recientes primero), filtrados por tipo de formulario."""
+        recent = submissions.get("filings", {}).get("recent", {})
+        columns = [recent.get(name, []) for name in
+                   ("form", "accessionNumber", "filingDate", "reportDate", "primaryDocument")]
+        wanted = set(forms) if forms else None
+        filings = []
+        for form, accession, filed, reported, document in zip(*columns):
+            if wanted is None or form in wanted:
+                filings.append(Filing(ticker, int(cik), form, accession, filed, reported or "", document or ""))
+                if limit is not None and len(filings) >= limit:
+                    break
+        return filings
+
+    def filings(self, ticker: str, forms: Optional[Sequence[str]] = ("10-K", "10-Q"),
+                limit: Optional[int] = None) -> List[Filing]:
+        """Filings de un ticker; ValueError si no tiene CIK en EDGAR."""
+        cik = self.cik(ticker)
+        if cik is None:
+            raise ValueError(f"No se encontró CIK para {ticker} en SEC.")
+        return self.parse_filings(ticker, cik, self.submissions(cik), forms, limit)
+
+    def filings_many(self, tickers: Iterable[str], forms: Optional[Sequence[str]] = ("10-K", "10-Q"),
+                     limit: Optional[int] = None) -> Tuple[List[Filing], Dict[str, str]]:
+        """
+        Filings de muchos tickers en paralelo. Devuelve (filings en el orden de tickers,
+        errores por ticker). Los tickers que comparten CIK (clases de acciones) se
+        consultan una sola vez.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        errors: Dict[str, str] = {}
+        ciks = {}
+        for ticker in tickers:
+            cik = self.cik(ticker)
+            if cik is None:
+                errors[ticker] = "sin CIK en SEC"
+            else:
+                ciks[ticker] = cik
+        unique = list(dict.fromkeys(ciks.values()))
+
+        def fetch(cik):
+            try:
+                return self.submissions(cik)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(unique) or 1))) as pool:
+            results = dict(zip(unique, pool.map(fetch, unique)))
+        filings = []
+        for ticker, cik in ciks.items():
+            result = results[cik]
+            if isinstance(result, Exception):
+                logging.error(f"Descarga filings SEC para {ticker}: {result}")
+                errors[ticker] = str(result)
+            else:
+                filings.extend(self.parse_filings(ticker, cik, result, forms, limit))
+        return filings, errors
+
+    @staticmethod
+    def to_frame(filings: Sequence[Filing]) -> pd.DataFrame:
+        """DataFrame de filings con las URLs del documento principal y de la presentación completa."""
+        columns = list(Filing.__dataclass_fields__) + ["url", "text_url"]
+        return pd.DataFrame([{**asdict(f), "url": f.url, "text_url": f.text_url} for f in filings], columns=columns)
@@ -0,0 +1,165 @@
+"""
+Calendarios de sesiones bursátiles.
+
+TradingCalendar genera los festivos de un mercado por reglas (fechas fijas con su
+traslado al día laborable, n-ésimo día de la semana del mes, Viernes Santo) más una
+lista de cierres extraordinarios, y responde con arrays datetime64[D] vectorizados
+(np.busdaycalendar): sesiones de un rango, si unas fechas son sesión, etc.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Tuple
+import numpy as np
+
+
+def easter(year: int) -> date:
+    """Domingo de Pascua (calendario gregoriano, algoritmo anónimo de Meeus/Jones/Butcher)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-ésimo día de la semana (0 = lunes) del mes; n = -1 es el último."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(day: date, saturday_to_friday=True):
+    """Traslado de un festivo en fin de semana: sábado al viernes anterior, domingo al lunes."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1) if saturday_to_friday else None
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+# Reglas de festivos de la NYSE: nombre -> (primer año en vigor, función año -> fecha o None)
+NYSE_HOLIDAYS: Dict[str, Tuple[int, Callable[[int], date]]] = {
+    # Si el 1 de enero cae en sábado, la NYSE no cierra el viernes anterior
+    "Año Nuevo": (1900, lambda y: observed(date(y, 1, 1), saturday_to_friday=False)),
+    "Martin Luther King": (1998, lambda y: nth_weekday(y, 1, 0, 3)),
+    "Día de los Presidentes": (1971, lambda y: nth_weekday(y, 2, 0, 3)),
+    "Viernes Santo": (1900, lambda y: easter(y) - timedelta(days=2)),
+    "Memorial Day": (1971, lambda y: nth_weekday(y, 5, 0, -1)),
+    "Juneteenth": (2022, lambda y: observed(date(y, 6, 19))),
+    "Día de la Independencia": (1900, lambda y: observed(date(y, 7, 4))),
+    "Día del Trabajo": (1900, lambda y: nth_weekday(y, 9, 0, 1)),
+    "Acción de Gracias": (1942, lambda y: nth_weekday(y, 11, 3, 4)),
+    "Navidad": (1900, lambda y: observed(date(y, 12, 25))),
+}
+
+# Cierres extraordinarios de la NYSE (duelos nacionales, 11-S, huracán Sandy)
+NYSE_SPECIAL_CLOSURES = (
+    "1994-04-27", "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14", "2004-06-11", "2007-01-02",
+    "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09",
+)
+
+
+class TradingCalendar:
+    """
+    Calendario de sesiones de un mercado (lunes a viernes menos festivos y cierres).
+    Las fechas se aceptan como str, date, Timestamp o datetime64 y se devuelven como
+    datetime64[D].
+    """
+    def __init__(self, name: str, holidays=NYSE_HOLIDAYS, special_closures: Iterable[str] = (),
+                 weekmask: str = "1111100"):
+        self.name = name
+        self.holiday_rules = dict(holidays)
+        self.special_closures = np.array(sorted(special_closures), dtype="datetime64[D]")
+        self.weekmask = weekmask
+        self._cached = None
+
+    def holidays(self, start_year: int, end_year: int) -> np.ndarray:
+        """Festivos y cierres extraordinarios (datetime64[D], ordenados) de los años indicados."""
+        days = []
+        for year in range(start_year, end_year + 1):
+            for first_year, rule in self.holiday_rules.values():
+                day = rule(year) if year >= first_year else None
+                if day is not None:
+                    days.append(day)
+        holidays = np.array(days, dtype="datetime64[D]")
+        years = self.special_closures.astype("datetime64[Y]").astype(int) + 1970
+        extra = self.special_closures[(years >= start_year) & (years <= end_year)]
+        return np.unique(np.concatenate([holidays, extra]))
+
+    def _calendar(self, first, last) -> np.busdaycalendar:
+        """np.busdaycalendar que cubre (al menos) los años de first a last."""
+        start_year = int(first.astype("datetime64[Y]").astype(int)) + 1970
+        end_year = int(last.astype("datetime64[Y]").astype(int)) + 1970
+        cached = self._cached  # ((primer año, último año), calendario): se sustituye de una vez
+        if cached is not None and cached[0][0] <= start_year and end_year <= cached[0][1]:
+            return cached[1]
+        if cached is not None:
+            start_year, end_year = min(start_year, cached[0][0]), max(end_year, cached[0][1])
+        busdaycal = np.busdaycalendar(weekmask=self.weekmask, holidays=self.holidays(start_year, end_year))
+        self._cached = ((start_year, end_year), busdaycal)
+        return busdaycal
+
+    def sessions(self, start, end) -> np.ndarray:
+        """Sesiones entre start y end (ambos incluidos)."""
+        start, end = to_days(start), to_days(end)
+        if end < start:
+            return np.empty(0, dtype="datetime64[D]")
+        days = np.arange(start, end + 1, dtype="datetime64[D]")
+        return days[np.is_busday(days, busdaycal=self._calendar(start, end))]
+
+    def is_session(self, dates) -> np.ndarray:
+        """Máscara booleana de las fechas que son sesión."""
+        dates = to_days(dates)
+        if dates.size == 0:
+            return np.zeros(dates.shape, dtype=bool)
+        return np.is_busday(dates, busdaycal=self._calendar(dates.min(), dates.max()))
+
+    def session_count(self, start, end) -> int:
+        """Número de sesiones entre start y end (ambos incluidos)."""
+        start, end = to_days(start), to_days(end)
+        if end < start:
+            return 0
+        return int(np.busday_count(start, end + 1, busdaycal=self._calendar(start, end)))
+
+    def previous_session(self, day) -> np.datetime64:
+        """Última sesión en day o antes."""
+        day = to_days(day)
+        return np.busday_offset(day, 0, roll="backward", busdaycal=self._calendar(day - 10, day))
+
+    def __repr__(self):
+        return f"<TradingCalendar {self.name}>"
+
+
+def to_days(values):
+    """Convierte una fecha o una colección de fechas a datetime64[D] (se ignora la zona horaria)."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[D]")
+    import pandas as pd
+    if isinstance(values, (str, date, np.datetime64)) or not hasattr(values, "__len__"):
+        ts = pd.Timestamp(values)
+        return np.datetime64(ts.tz_localize(None) if ts.tzinfo else ts, "D")
+    dates = pd.to_datetime(pd.Series(values).reset_index(drop=True))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy().astype("datetime64[D]")
+
+
+CALENDARS = {
+    "NYSE": lambda: TradingCalendar("NYSE", NYSE_HOLIDAYS, NYSE_SPECIAL_CLOSURES),
+}
+
+
+@lru_cache(maxsize=None)
+def get_calendar(name: str = "NYSE") -> TradingCalendar:
+    """Calendario de un mercado por nombre (compartido entre llamadas)."""
+    try:
+        return CALENDARS[name.upper()]()
+    except KeyError:
+        raise ValueError(f"Calendario no válido: {name}. Opciones: {', '.join(CALENDARS)}") from None
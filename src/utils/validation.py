@@ -0,0 +1,381 @@
+"""
+Validación de calidad de datos OHLCV.
+
+Cada regla es una máscara vectorizada sobre todo el DataFrame (uno o varios tickers):
+barras con low > high, precios no positivos, volumen negativo, saltos de n sigmas
+(con una escala robusta por ticker: mediana y MAD), cierres repetidos, etc. El
+resultado es una puntuación de calidad por ticker, la cuarentena de filas marcadas
+(con las reglas que incumplen) y, opcionalmente, una copia reparada del DataFrame.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.data_cleaning import fill_within_groups
+from src.utils.instrumentation import instrumented, count
+from src.utils.trading_calendar import to_days
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+# Reparaciones: corregir high/low, anular y rellenar con el valor anterior del ticker, eliminar la fila o nada
+REPAIRS = ("fix_ohlc", "fill", "drop", "none")
+# Constante que convierte la MAD en una estimación de la desviación típica (normal)
+MAD_SCALE = 1.4826
+
+
+class Bars:
+    """
+    Columnas OHLCV como arrays float64 ordenados por (ticker, fecha), con el grupo
+    (índice en labels) de cada fila y sus límites. order es None si el DataFrame ya
+    venía ordenado.
+    """
+    def __init__(self, df: pd.DataFrame, key: str = "ticker", date_col: str = "date"):
+        n = len(df)
+        if key in df.columns:
+            codes, labels = pd.factorize(df[key])
+            self.labels = np.asarray(labels)
+        else:
+            codes, self.labels = np.zeros(n, dtype=np.int64), np.array([None] if n else [], dtype=object)
+        self.order = None
+        if n > 1:
+            days = to_days(df[date_col]) if date_col in df.columns else None
+            grouped = (codes[1:] >= codes[:-1]).all()
+            same = codes[1:] == codes[:-1]
+            if not grouped or (days is not None and (days[1:][same] < days[:-1][same]).any()):
+                self.order = np.lexsort((days, codes)) if days is not None else np.argsort(codes, kind="stable")
+                codes = codes[self.order]
+        self.n = n
+        self.group = codes
+        self.n_groups = int(codes.max()) + 1 if n else 0
+        self.starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if n else np.empty(0, dtype=np.int64)
+        self.ends = np.r_[self.starts[1:] - 1, n - 1] if n else self.starts
+        self.first = np.zeros(n, dtype=bool)
+        self.first[self.starts] = True
+        self.columns = {name: self._column(df, name) for name in PRICE_COLUMNS + ("volume",)}
+        self._returns = None
+        # Resultados intermedios compartidos entre reglas (p. ej. saltos y picos)
+        self.cache = {}
+
+    def _column(self, df, name):
+        if name not in df.columns:
+            return np.full(self.n, np.nan)
+        values = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        return values[self.order] if self.order is not None else values
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def log_returns(self) -> np.ndarray:
+        """Rendimiento logarítmico del cierre respecto a la barra anterior del mismo ticker (NaN si no hay)."""
+        if self._returns is None:
+            close = self.close
+            r = np.full(self.n, np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r[1:] = np.log(close[1:] / close[:-1])
+            r[self.first] = np.nan
+            r[~np.isfinite(r)] = np.nan
+            self._returns = r
+        return self._returns
+
+    def to_original(self, mask: np.ndarray) -> np.ndarray:
+        """Lleva un array en orden (ticker, fecha) al orden de filas del DataFrame original."""
+        if self.order is None:
+            return mask
+        out = np.empty_like(mask)
+        out[self.order] = mask
+        return out
+
+
+def group_median(values, groups, n_groups):
+    """
+    Mediana de values (finitos) por grupo (NaN en los grupos sin valores). Se ordena una
+    sola vez la clave values + grupo * ancho, más rápida que un lexsort de dos claves.
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    median = np.full(n_groups, np.nan)
+    if not len(values):
+        return median, counts
+    low = values.min()
+    width = 2 * (values.max() - low) + 1
+    order = np.argsort((values - low) + groups * width)
+    values = values[order]
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+    lo = starts[has] + (counts[has] - 1) // 2
+    hi = starts[has] + counts[has] // 2
+    median[has] = (values[lo] + values[hi]) / 2
+    return median, counts
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Regla de calidad: check(bars) devuelve la máscara de filas que la incumplen (en el
+    orden de bars). repair es una de REPAIRS; columns, las columnas que anula "fill".
+    """
+    name: str
+    check: Callable[[Bars], np.ndarray]
+    repair: str = "none"
+    columns: Tuple[str, ...] = PRICE_COLUMNS
+    weight: float = 1.0
+    description: str = ""
+
+    def __post_init__(self):
+        if self.repair not in REPAIRS:
+            raise ValueError(f"Reparación no válida: {self.repair}. Opciones: {', '.join(REPAIRS)}")
+
+
+def missing_prices() -> Rule:
+    def check(bars):
+        return np.isnan(bars.close)
+    return Rule("missing_close", check, repair="fill", columns=("close",),
+                description="Cierre ausente")
+
+
+def ohlc_consistency(tolerance: float = 1e-9) -> Rule:
+    def check(bars):
+        slack = tolerance * np.abs(bars.high)
+        high, low = bars.high + slack, bars.low - slack
+        with np.errstate(invalid="ignore"):
+            bad = bars.low > high
+            for values in (bars.open, bars.close):
+                bad |= (values > high) | (values < low)
+        return bad
+    return Rule("ohlc_inconsistent", check, repair="fix_ohlc",
+                description="low > high, o apertura/cierre fuera del rango [low, high]")
+
+
+def positive_prices() -> Rule:
+    def check(bars):
+        bad = np.zeros(bars.n, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for name in PRICE_COLUMNS:
+                bad |= bars.columns[name] <= 0
+        return bad
+    return Rule("non_positive_price", check, repair="fill", weight=2.0,
+                description="Precio cero o negativo")
+
+
+def non_negative_volume() -> Rule:
+    def check(bars):
+        with np.errstate(invalid="ignore"):
+            return bars.volume < 0
+    return Rule("negative_volume", check, repair="fill", columns=("volume",),
+                description="Volumen negativo")
+
+
+def _robust_z(bars, min_obs):
+    """Rendimientos estandarizados por ticker con mediana y MAD (NaN si el ticker tiene pocos datos)."""
+    r = bars.log_returns()
+    valid = ~np.isnan(r)
+    groups = bars.group[valid]
+    median, counts = group_median(r[valid], groups, bars.n_groups)
+    deviation = np.abs(r[valid] - median[groups])
+    mad, _ = group_median(deviation, groups, bars.n_groups)
+    # Suelo de la escala: series casi deterministas (MAD ~ 0) no marcan cualquier variación
+    scale = np.maximum(MAD_SCALE * mad, 1e-6)
+    z = np.full(bars.n, np.nan)
+    z[valid] = (r[valid] - median[groups]) / scale[groups]
+    z[counts[bars.group] < min_obs] = np.nan
+    return z
+
+
+def _spikes(bars, n_sigma, min_obs):
+    """(máscara de saltos, máscara de picos): un pico es un salto que se revierte en la barra siguiente."""
+    key = ("spikes", n_sigma, min_obs)
+    if key not in bars.cache:
+        bars.cache[key] = _find_spikes(bars, n_sigma, min_obs)
+    return bars.cache[key]
+
+
+def _find_spikes(bars, n_sigma, min_obs):
+    z = _robust_z(bars, min_obs)
+    with np.errstate(invalid="ignore"):
+        jump = np.abs(z) > n_sigma
+    spike = np.zeros(bars.n, dtype=bool)
+    spike[:-1] = jump[:-1] & jump[1:] & (np.sign(z[:-1]) != np.sign(z[1:])) & ~bars.first[1:]
+    # El rendimiento de vuelta de un pico no es un salto propio
+    back = np.zeros(bars.n, dtype=bool)
+    back[1:] = spike[:-1]
+    return jump & ~spike & ~back, spike
+
+
+def price_spikes(n_sigma: float = 10.0, min_obs: int = 20) -> Rule:
+    def check(bars):
+        return _spikes(bars, n_sigma, min_obs)[1]
+    return Rule("price_spike", check, repair="fill", weight=2.0,
+                description=f"Salto de más de {n_sigma:g} sigmas que se revierte en la barra siguiente")
+
+
+def price_jumps(n_sigma: float = 10.0, min_obs: int = 20) -> Rule:
+    def check(bars):
+        return _spikes(bars, n_sigma, min_obs)[0]
+    return Rule("price_jump", check, repair="none",
+                description=f"Salto de más de {n_sigma:g} sigmas que no se revierte (¿split sin ajustar?)")
+
+
+def stale_closes(max_repeats: int = 5) -> Rule:
+    def check(bars):
+        close = bars.close
+        same = np.zeros(bars.n, dtype=bool)
+        same[1:] = (close[1:] == close[:-1]) & ~bars.first[1:]
+        # Longitud del tramo de cierres iguales al que pertenece cada fila
+        run = np.cumsum(~same)
+        lengths = np.bincount(run)
+        return same & (lengths[run] > max_repeats)
+    return Rule("stale_close", check, repair="none", weight=0.5,
+                description=f"Cierre repetido más de {max_repeats} barras seguidas")
+
+
+def default_rules(jump_sigma: float = 10.0, stale_bars: int = 5, min_obs: int = 20) -> List[Rule]:
+    """Reglas por defecto (en el orden en que se aplican las reparaciones)."""
+    return [
+        missing_prices(),
+        ohlc_consistency(),
+        positive_prices(),
+        non_negative_volume(),
+        price_spikes(jump_sigma, min_obs),
+        price_jumps(jump_sigma, min_obs),
+        stale_closes(stale_bars),
+    ]
+
+
+@dataclass
+class ValidationReport:
+    """
+    flags: máscara de bits por fila (bit i = rules[i]) en el orden del DataFrame.
+    scores: por ticker, filas, filas marcadas, incumplimientos por regla y puntuación
+    entre 0 y 1 (1 - suma de pesos de las filas marcadas / filas; el peso de una fila es
+    el de su regla más grave relativo al mayor peso).
+    """
+    rules: List[str]
+    flags: np.ndarray
+    scores: pd.DataFrame
+    quarantine: pd.DataFrame
+    repaired: Dict[str, int] = field(default_factory=dict)
+
+    def mask(self, rule: str) -> np.ndarray:
+        return (self.flags >> self.rules.index(rule)) & 1 == 1
+
+    @property
+    def flagged(self) -> np.ndarray:
+        return self.flags != 0
+
+    def score(self, ticker=None) -> float:
+        if ticker is None:
+            rows = self.scores["rows"].sum()
+            return float(1 - self.scores["weighted"].sum() / rows) if rows else float("nan")
+        return float(self.scores.set_index("ticker").loc[ticker, "score"])
+
+    def to_dict(self) -> dict:
+        return {
+            "scores": {str(t): round(float(s), 6) for t, s in zip(self.scores["ticker"], self.scores["score"])},
+            "violations": {rule: int(self.scores[rule].sum()) for rule in self.rules if self.scores[rule].sum()},
+            "repaired": dict(self.repaired),
+        }
+
+
+class Validator:
+    """Aplica un conjunto de reglas a DataFrames OHLCV (formato de los extractores)."""
+    def __init__(self, rules: Optional[Sequence[Rule]] = None, key: str = "ticker", date_col: str = "date"):
+        self.rules = list(rules) if rules is not None else default_rules()
+        if len(self.rules) > 16:
+            raise ValueError("Como máximo 16 reglas por validador.")
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Los nombres de las reglas deben ser únicos.")
+        self.key = key
+        self.date_col = date_col
+
+    def validate(self, df: pd.DataFrame, repair: bool = False) -> Tuple[pd.DataFrame, ValidationReport]:
+        """
+        Evalúa todas las reglas. Devuelve (DataFrame, informe): el original si repair=False
+        o una copia reparada (filas eliminadas y columnas corregidas) si repair=True.
+        """
+        bars = Bars(df, self.key, self.date_col)
+        masks = [np.asarray(rule.check(bars), dtype=bool) for rule in self.rules]
+        flags = np.zeros(bars.n, dtype=np.uint16)
+        # Peso de cada fila: el de su regla más grave, relativo al mayor peso (0 = limpia, 1 = peor)
+        weights = np.zeros(bars.n)
+        max_weight = max((r.weight for r in self.rules), default=1.0) or 1.0
+        for i, (rule, mask) in enumerate(zip(self.rules, masks)):
+            flags[mask] |= np.uint16(1 << i)
+            weights[mask] = np.maximum(weights[mask], rule.weight / max_weight)
+        report = ValidationReport(
+            rules=[r.name for r in self.rules],
+            flags=bars.to_original(flags),
+            scores=self._scores(df, bars, masks, weights),
+            quarantine=pd.DataFrame(),
+        )
+        report.quarantine = self._quarantine(df, report)
+        for rule, mask in zip(self.rules, masks):
+            if mask.any():
+                count(f"violations.{rule.name}", int(mask.sum()), stage="validate")
+        if repair:
+            df = self._repair(df, bars, masks, report)
+        return df, report
+
+    def _scores(self, df, bars, masks, weights) -> pd.DataFrame:
+        n_groups = bars.n_groups
+        rows = np.bincount(bars.group, minlength=n_groups)
+        scores = pd.DataFrame({"ticker": bars.labels[:n_groups], "rows": rows})
+        any_flag = np.zeros(bars.n, dtype=bool)
+        for rule, mask in zip(self.rules, masks):
+            scores[rule.name] = np.bincount(bars.group, weights=mask, minlength=n_groups).astype(np.int64)
+            any_flag |= mask
+        scores["flagged"] = np.bincount(bars.group, weights=any_flag, minlength=n_groups).astype(np.int64)
+        scores["weighted"] = np.bincount(bars.group, weights=weights, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores["score"] = np.where(rows > 0, 1 - scores["weighted"] / np.maximum(rows, 1), np.nan)
+        return scores
+
+    def _quarantine(self, df, report) -> pd.DataFrame:
+        rows = np.flatnonzero(report.flagged)
+        quarantine = df.iloc[rows].copy()
+        flags = report.flags[rows]
+        labels = np.full(len(rows), "", dtype=object)
+        for i, name in enumerate(report.rules):
+            hit = (flags >> i) & 1 == 1
+            labels[hit] = labels[hit] + (name + ",")
+        quarantine["rules"] = [label.rstrip(",") for label in labels]
+        return quarantine
+
+    def _repair(self, df, bars, masks, report) -> pd.DataFrame:
+        columns = {name: values.copy() for name, values in bars.columns.items() if name in df.columns}
+        drop = np.zeros(bars.n, dtype=bool)
+        nulled = set()
+        for rule, mask in zip(self.rules, masks):
+            if rule.repair == "none" or not mask.any():
+                continue
+            report.repaired[rule.name] = int(mask.sum())
+            if rule.repair == "drop":
+                drop |= mask
+            elif rule.repair == "fix_ohlc":
+                stacked = np.vstack([columns.get(c, bars.columns[c])[mask] for c in PRICE_COLUMNS])
+                with np.errstate(invalid="ignore"):
+                    if "high" in columns:
+                        columns["high"][mask] = np.nanmax(stacked, axis=0)
+                    if "low" in columns:
+                        columns["low"][mask] = np.nanmin(stacked, axis=0)
+            elif rule.repair == "fill":
+                for name in rule.columns:
+                    if name in columns:
+                        columns[name][mask] = np.nan
+                        nulled.add(name)
+        for name in nulled:
+            columns[name] = fill_within_groups(columns[name], bars.starts, bars.ends)
+        repaired = df.assign(**{name: bars.to_original(values).astype(df[name].dtype, copy=False)
+                                if df[name].dtype.kind == "f" else bars.to_original(values)
+                                for name, values in columns.items()})
+        if drop.any():
+            repaired = repaired[~bars.to_original(drop)]
+        return repaired
+
+
+@instrumented("validate")
+def validate_ohlcv(df: pd.DataFrame, rules: Optional[Sequence[Rule]] = None, repair: bool = False,
+                   key: str = "ticker", date_col: str = "date") -> Tuple[pd.DataFrame, ValidationReport]:
+    """Atajo de Validator(rules).validate(df, repair)."""
+    return Validator(rules, key, date_col).validate(df, repair=repair)
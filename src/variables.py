@@ -33,11 +33,45 @@ SYMBOLS = ["AAPL", "MSFT","NFLX","DIS"]
 # Número máximo de gráficos por archivo PNG (por ejemplo, 4 = 4 gráficos juntos)
 PLOTS_PER_PNG = 4
 
+# Ancho de referencia (píxeles) de los gráficos: las series más largas se reducen a este ancho
+PLOT_WIDTH_PX = int(os.getenv("PLOT_WIDTH_PX", "1200"))
+
+# ¿Dibujar Monte Carlo como bandas de percentiles (fan chart) en lugar de trayectorias? (True/False)
+PLOT_FAN_CHART = False
+
 # ¿Incluir simulación Monte Carlo para cada ticker individual? (True/False)
 INCLUDE_MONTECARLO_TICKERS = True
 
-# ¿Usar precios ajustados (adjusted close)? (True/False)
-USE_ADJUSTED_CLOSE = True
+# ¿Usar precios ajustados por splits y dividendos (adjusted close)? (True/False)
+USE_ADJUSTED_CLOSE = os.getenv("USE_ADJUSTED_CLOSE", "true").lower() not in ("0", "false", "no")
+
+# Semilla de Monte Carlo (vacía = aleatoria, por defecto, sorteada una vez por ejecución y guardada
+# en run_summary.json). Solo con semilla (o --seed) las simulaciones son reproducibles y se cachean en disco.
+_MONTECARLO_SEED = os.getenv("MONTECARLO_SEED", "")
+MONTECARLO_SEED = int(_MONTECARLO_SEED) if _MONTECARLO_SEED else None
+# Paralelismo del pipeline descarga -> análisis -> render (hilos por etapa y tamaño de colas)
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "4"))
+PIPELINE_ANALYZE_WORKERS = int(os.getenv("PIPELINE_ANALYZE_WORKERS", "2"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+# Procesos para renderizar gráficos fuera de pantalla (0 = en el proceso principal)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+# Procesos para métricas y Monte Carlo por ticker sobre memoria compartida (0 = hilos del pipeline)
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", "0"))
+
+# Validación de calidad de los históricos (reglas OHLCV) y reparación automática de las barras marcadas
+VALIDATE_DATA = os.getenv("VALIDATE_DATA", "true").lower() not in ("0", "false", "no")
+REPAIR_DATA = os.getenv("REPAIR_DATA", "false").lower() not in ("0", "false", "no")
+VALIDATION_JUMP_SIGMA = float(os.getenv("VALIDATION_JUMP_SIGMA", "10"))
+VALIDATION_STALE_BARS = int(os.getenv("VALIDATION_STALE_BARS", "5"))
+
+# Hook opcional que recibe el informe de instrumentación (run_report.json), formato "paquete.modulo:funcion"
+METRICS_HOOK = os.getenv("METRICS_HOOK", "")
+
+# Re-ejecuciones incrementales: reutilizar descargas cacheadas y artefactos cuyas entradas no cambian
+INCREMENTAL_RUNS = os.getenv("INCREMENTAL_RUNS", "true").lower() not in ("0", "false", "no")
+# Caché de históricos descargados (vacío = <carpeta de outputs>/.cache/prices) y validez de rangos abiertos
+PRICE_CACHE_DIR = os.getenv("PRICE_CACHE_DIR", "")
+PRICE_CACHE_TTL_MINUTES = int(os.getenv("PRICE_CACHE_TTL_MINUTES", "60"))
 # Nombres de variables de entorno para API keys
 API_ENV_VARS = {
     "ALPHAVANTAGE": "ALPHAVANTAGE_API_KEY",
@@ -58,6 +92,30 @@ CIK = os.getenv("CIK", "")
 OUTPUTS_BASE_PATH = os.getenv("OUTPUTS_BASE_PATH", "outputs")
 # Formato de subcarpeta por fecha/hora
 OUTPUTS_DATE_FORMAT = "%Y-%m-%d_%H%M"
+# Caché en disco de simulaciones (vacía = <carpeta de outputs>/.cache/simulations) y su tamaño
+# máximo en MB (0 = solo memoria)
+SIMULATION_CACHE_DIR = os.getenv("SIMULATION_CACHE_DIR", "")
+SIMULATION_CACHE_MAX_MB = int(os.getenv("SIMULATION_CACHE_MAX_MB", "512"))
+# SEC EDGAR: User-Agent obligatorio ("Nombre contacto@dominio"), caché del índice de CIK
+# (vacío = <carpeta de outputs>/.cache/sec), hilos de descarga y formularios del barrido por ticker
+SEC_USER_AGENT = os.getenv("SEC_USER_AGENT", "")
+SEC_CACHE_DIR = os.getenv("SEC_CACHE_DIR", "")
+SEC_WORKERS = int(os.getenv("SEC_WORKERS", "8"))
+SEC_FORMS = tuple(f.strip() for f in os.getenv("SEC_FORMS", "10-K,10-Q").split(",") if f.strip())
+SEC_FILINGS = os.getenv("SEC_FILINGS", "false").lower() not in ("0", "false", "no")
+# Items que se extraen del último filing de cada formulario por ticker (vacío = no descargar los filings)
+SEC_ITEMS = tuple(i.strip().upper() for i in os.getenv("SEC_ITEMS", "").split(",") if i.strip())
+# Opciones: hilos de descarga (todos los vencimientos de todos los tickers), almacén columnar de
+# cadenas (vacía = <carpeta de outputs>/options) y tipo libre de riesgo anual para la volatilidad implícita
+OPTIONS_WORKERS = int(os.getenv("OPTIONS_WORKERS", "16"))
+OPTIONS_STORE_DIR = os.getenv("OPTIONS_STORE_DIR", "")
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.0"))
+# Fundamentales: almacén versionado (vacío = <carpeta de outputs>/fundamentals) y antigüedad
+# máxima en días de los estados financieros antes de volver a pedirlos aunque su sello no cambie
+FUNDAMENTALS_STORE_DIR = os.getenv("FUNDAMENTALS_STORE_DIR", "")
+FUNDAMENTALS_MAX_AGE_DAYS = int(os.getenv("FUNDAMENTALS_MAX_AGE_DAYS", "90"))
+# Indicadores técnicos (SMA, EMA, RSI, MACD, Bollinger, ATR, OBV) de todos los tickers en indicators.csv
+INDICATORS = os.getenv("INDICATORS", "false").lower() not in ("0", "false", "no")
 
 
 
@@ -95,5 +153,35 @@ __all__ = [
     "SYMBOLS",
     "PLOTS_PER_PNG",
     "INCLUDE_MONTECARLO_TICKERS",
+    "PLOT_WIDTH_PX",
+    "PLOT_FAN_CHART",
     "USE_ADJUSTED_CLOSE",
+    "MONTECARLO_SEED",
+    "SIMULATION_CACHE_DIR",
+    "SIMULATION_CACHE_MAX_MB",
+    "PIPELINE_FETCH_WORKERS",
+    "PIPELINE_ANALYZE_WORKERS",
+    "PIPELINE_QUEUE_SIZE",
+    "RENDER_WORKERS",
+    "ANALYTICS_WORKERS",
+    "VALIDATE_DATA",
+    "REPAIR_DATA",
+    "VALIDATION_JUMP_SIGMA",
+    "VALIDATION_STALE_BARS",
+    "METRICS_HOOK",
+    "INCREMENTAL_RUNS",
+    "PRICE_CACHE_DIR",
+    "PRICE_CACHE_TTL_MINUTES",
+    "SEC_USER_AGENT",
+    "SEC_CACHE_DIR",
+    "SEC_WORKERS",
+    "SEC_FORMS",
+    "SEC_FILINGS",
+    "SEC_ITEMS",
+    "OPTIONS_WORKERS",
+    "OPTIONS_STORE_DIR",
+    "RISK_FREE_RATE",
+    "FUNDAMENTALS_STORE_DIR",
+    "FUNDAMENTALS_MAX_AGE_DAYS",
+    "INDICATORS",
 ]
@@ -0,0 +1,142 @@
+"""
+Reducción de puntos para gráficos de series largas y de trayectorias simuladas.
+
+Un gráfico de N píxeles de ancho no puede mostrar más de unos pocos puntos por
+píxel, así que dibujar millones de vértices solo cuesta tiempo. Aquí se eligen
+los puntos que se dibujan:
+- minmax: mínimo y máximo de cada cubo de píxel (conserva picos y caídas, vectorizado).
+- lttb: Largest-Triangle-Three-Buckets (conserva la forma visual de la serie).
+- fan chart: bandas de percentiles en lugar de trayectorias individuales.
+"""
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _as_float(x):
+    """
+    Convierte fechas (datetime64 o listas de date/datetime, como las de PriceSeries) a
+    números para poder calcular áreas.
+    """
+    x = np.asarray(x)
+    if x.dtype == object:
+        x = x.astype("datetime64[ns]")
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Índices del primer, último, mínimo y máximo punto de cada uno de n_buckets cubos.
+    y puede ser 1-D (n,) o 2-D (filas, n); en 2-D se decima cada fila (p. ej. cada
+    trayectoria) y se devuelve un array (filas, k). Los índices salen ordenados.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.shape[-1]
+    if n <= 2 * n_buckets:
+        idx = np.arange(n)
+        return idx if y.ndim == 1 else np.broadcast_to(idx, y.shape).copy()
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    # Se rellena repitiendo el último valor para poder hacer reshape en cubos iguales
+    padded = np.concatenate([y, np.repeat(y[..., -1:], pad, axis=-1)], axis=-1) if pad else y
+    buckets = padded.reshape(y.shape[:-1] + (n_buckets, size))
+    offsets = np.arange(n_buckets) * size
+    mins = np.minimum(buckets.argmin(axis=-1) + offsets, n - 1)
+    maxs = np.minimum(buckets.argmax(axis=-1) + offsets, n - 1)
+    ends = np.broadcast_to(np.array([0, n - 1]), y.shape[:-1] + (2,))
+    idx = np.sort(np.concatenate([ends, mins, maxs], axis=-1), axis=-1)
+    if y.ndim == 1:
+        return np.unique(idx)
+    return idx
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Índices elegidos por Largest-Triangle-Three-Buckets (n_out puntos, 1-D).
+    El coste es O(n): un bucle por cubo con operaciones vectorizadas dentro.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = _as_float(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Media del cubo siguiente (o el último punto)
+        nxt_start, nxt_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        if nxt_start < nxt_end:
+            cx, cy = xf[nxt_start:nxt_end].mean(), y[nxt_start:nxt_end].mean()
+        else:
+            cx, cy = xf[-1], y[-1]
+        bx, by = xf[start:end], y[start:end]
+        area = np.abs((xf[a] - cx) * (by - y[a]) - (xf[a] - bx) * (cy - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def decimate(x, y, width_px, method="minmax"):
+    """
+    Devuelve (x, y) reducidos para un gráfico de width_px píxeles de ancho.
+    method: "minmax" (por defecto) o "lttb". Si ya hay pocos puntos no se toca nada.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if not width_px or len(y) <= 2 * width_px:
+        return x, y
+    if method == "lttb":
+        idx = lttb_indices(x, y, 2 * width_px)
+    elif method == "minmax":
+        idx = minmax_indices(y, width_px)
+    else:
+        raise ValueError(f"Método de decimación no válido: {method}")
+    return x[idx], y[idx]
+
+
+def decimate_paths(paths, width_px):
+    """
+    Reduce cada trayectoria (filas de paths) con min/max por cubo de píxel.
+    Devuelve (x, y) con forma (n_trayectorias, k).
+    """
+    paths = np.asarray(paths)
+    x = np.broadcast_to(np.arange(paths.shape[1]), paths.shape)
+    if not width_px or paths.shape[1] <= 2 * width_px:
+        return x, paths
+    idx = minmax_indices(paths, width_px)
+    return idx, np.take_along_axis(paths, idx, axis=1)
+
+
+def fan_chart_bands(paths, percentiles=DEFAULT_PERCENTILES, width_px=None):
+    """
+    Percentiles por día de una matriz de trayectorias (n, d).
+    Con width_px se calculan como mucho width_px columnas equiespaciadas.
+    Devuelve (x, bandas) con bandas de forma (len(percentiles), k).
+    """
+    paths = np.asarray(paths)
+    d = paths.shape[1]
+    if width_px and d > width_px:
+        cols = np.unique(np.linspace(0, d - 1, width_px).astype(int))
+    else:
+        cols = np.arange(d)
+    return cols, np.percentile(paths[:, cols], percentiles, axis=0)
+
+
+def draw_fan_chart(ax, paths, color="blue", percentiles=DEFAULT_PERCENTILES, width_px=None):
+    """
+    Dibuja un fan chart: bandas simétricas de percentiles sombreadas y la mediana.
+    percentiles debe ser simétrico y con número impar de elementos (la mediana en el centro).
+    """
+    x, bands = fan_chart_bands(paths, percentiles, width_px)
+    k = len(percentiles)
+    for i in range(k // 2):
+        ax.fill_between(x, bands[i], bands[k - 1 - i], color=color, alpha=0.15 + 0.15 * i, linewidth=0,
+                        label=f"P{percentiles[i]}-P{percentiles[k - 1 - i]}")
+    ax.plot(x, bands[k // 2], color=color, linewidth=1.5, label="Mediana")
+    ax.legend(loc="upper left", fontsize="small")
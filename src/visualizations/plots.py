@@ -1,11 +1,13 @@
 import matplotlib.pyplot as plt
-from src.utils.output_manager import OutputManager
+from src.utils.output_manager import get_output_manager
+from src.visualizations.render import draw_paths
+from src.visualizations.decimation import decimate
+from src.variables import PLOT_WIDTH_PX
 
-output_manager = OutputManager()
-
-def plot_price_series(price_series, show=True):
+def plot_price_series(price_series, show=True, width_px=PLOT_WIDTH_PX):
     dates = [p.date for p in price_series.data]
     closes = [p.close for p in price_series.data]
+    dates, closes = decimate(dates, closes, width_px)
     plt.figure(figsize=(10, 4))
     plt.plot(dates, closes, label=price_series.symbol)
     plt.title(f"Precio histórico: {price_series.symbol}")
@@ -14,21 +16,21 @@ def plot_price_series(price_series, show=True):
     plt.legend()
     plt.tight_layout()
     filename = f"{price_series.symbol}_historical_plot.png"
-    output_manager.save_plot(plt, filename)
+    get_output_manager().save_plot(plt, filename)
     if show:
         plt.show()
     plt.close()
 
-def plot_portfolio_simulation(simulation_result, n_simulations=100, title="Simulación Monte Carlo de Cartera", show=True):
-    plt.figure(figsize=(10, 4))
-    for i in range(min(n_simulations, simulation_result.shape[0])):
-        plt.plot(simulation_result[i], color="blue", alpha=0.1)
+def plot_portfolio_simulation(simulation_result, n_simulations=100, title="Simulación Monte Carlo de Cartera", show=True,
+                              width_px=PLOT_WIDTH_PX, fan=False):
+    fig = plt.figure(figsize=(10, 4))
+    draw_paths(fig.gca(), simulation_result, color="blue", alpha=0.1, max_paths=n_simulations, width_px=width_px, fan=fan)
     plt.title(title)
     plt.xlabel("Días")
     plt.ylabel("Valor simulado")
     plt.tight_layout()
     filename = f"portfolio_montecarlo_plot.png"
-    output_manager.save_plot(plt, filename)
+    get_output_manager().save_plot(plt, filename)
     if show:
         plt.show()
     plt.close()
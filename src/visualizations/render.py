@@ -0,0 +1,170 @@
+"""
+Servicio de renderizado de gráficos fuera de pantalla.
+
+Usa la API orientada a objetos de matplotlib (Figure + FigureCanvasAgg), sin el
+estado global de pyplot, por lo que los gráficos pueden dibujarse en paralelo en
+un pool de procesos. Las trayectorias de Monte Carlo se dibujan como una única
+LineCollection rasterizada en lugar de una llamada a plot por trayectoria.
+
+Las funciones draw_* rellenan una Figure ya creada (sirven también para figuras
+de pyplot que se quieren mostrar en pantalla); render_figure crea la figura Agg,
+la dibuja con una función draw_* y guarda el PNG, y es la que se envía al pool.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from src.utils.output_manager import unlink_target
+from src.visualizations.decimation import decimate, decimate_paths, draw_fan_chart
+
+
+def paths_collection(paths, color="blue", alpha=0.1, max_paths=100, linewidth=1.0, width_px=None):
+    """
+    LineCollection rasterizada con hasta max_paths trayectorias (filas de paths).
+    Con width_px cada trayectoria se reduce a min/max por cubo de píxel.
+    """
+    x, y = decimate_paths(np.asarray(paths)[:max_paths], width_px)
+    segments = np.stack([x, y], axis=-1)
+    return LineCollection(segments, colors=color, alpha=alpha, linewidths=linewidth, rasterized=True)
+
+
+def draw_paths(ax, paths, color="blue", alpha=0.1, max_paths=100, width_px=None, fan=False):
+    """
+    Dibuja trayectorias en ax y ajusta los límites. Con fan=True dibuja bandas de
+    percentiles calculadas sobre todas las trayectorias en lugar de líneas sueltas.
+    """
+    if fan:
+        draw_fan_chart(ax, paths, color=color, width_px=width_px)
+        return
+    ax.add_collection(paths_collection(paths, color=color, alpha=alpha, max_paths=max_paths, width_px=width_px))
+    ax.autoscale_view()
+
+
+def draw_history_group(fig, series, width_px=None):
+    """
+    series: lista de (símbolo, fechas, cierres). Un subgráfico por ticker.
+    Con width_px cada serie se reduce al ancho en píxeles de su subgráfico.
+    """
+    axes = fig.subplots(1, len(series), squeeze=False)[0]
+    for ax, (symbol, dates, closes) in zip(axes, series):
+        dates, closes = decimate(dates, closes, width_px)
+        ax.plot(dates, closes, label=f"{symbol} Close")
+        ax.set_title(f"{symbol} - Precio histórico")
+        ax.set_xlabel("Fecha"); ax.set_ylabel("Precio")
+        ax.legend()
+    fig.tight_layout()
+
+
+def draw_paths_group(fig, items, color="blue", width_px=None, fan=False):
+    """items: lista de (símbolo, simulaciones). Un subgráfico de Monte Carlo por ticker."""
+    axes = fig.subplots(1, len(items), squeeze=False)[0]
+    for ax, (symbol, simulations) in zip(axes, items):
+        draw_paths(ax, simulations, color=color, width_px=width_px, fan=fan)
+        ax.set_title(f"{symbol} - Monte Carlo")
+        ax.set_xlabel("Días"); ax.set_ylabel("Precio simulado")
+    fig.tight_layout()
+
+
+def draw_simulation(fig, simulations, title, ylabel="Valor simulado", color="purple", width_px=None, fan=False):
+    """Trayectorias de una única simulación (p. ej. la cartera)."""
+    ax = fig.subplots()
+    draw_paths(ax, simulations, color=color, width_px=width_px, fan=fan)
+    ax.set_title(title)
+    ax.set_xlabel("Días")
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+
+
+def draw_correlation(fig, corr, labels, title="Matriz de correlación de precios de cierre"):
+    """Mapa de calor de una matriz de correlación."""
+    ax = fig.subplots()
+    im = ax.imshow(np.asarray(corr), cmap='coolwarm', vmin=-1, vmax=1)
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45)
+    ax.set_yticks(range(len(labels)))
+    ax.set_yticklabels(labels)
+    ax.set_title(title)
+    fig.tight_layout()
+
+
+def render_figure(path, figsize, draw, *args, **kwargs):
+    """
+    Crea una Figure Agg de tamaño figsize, la rellena con draw(fig, *args, **kwargs)
+    y la guarda en path. Es la función que se ejecuta en los procesos del pool.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, *args, **kwargs)
+    fig.savefig(unlink_target(path))
+    return path
+
+
+def _timed_call(render_fn, *args, **kwargs):
+    """Ejecuta render_fn y devuelve (resultado, tiempo real, tiempo de CPU) medidos en el proceso que dibuja."""
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    result = render_fn(*args, **kwargs)
+    return result, time.perf_counter() - t0, time.process_time() - cpu0
+
+
+class RenderService:
+    """
+    Ejecuta renderizados (normalmente render_figure) en un pool de procesos (backend Agg).
+    Con processes=0 se renderiza en el propio proceso, de forma síncrona.
+    timings guarda (ruta, tiempo real, tiempo de CPU) de cada renderizado terminado.
+    """
+    def __init__(self, processes=2):
+        self.processes = processes
+        self._executor = None
+        if processes:
+            # spawn evita heredar por fork el estado de hilos y de pyplot del proceso principal
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=processes, mp_context=ctx)
+        self._futures = []
+        self.timings = []
+
+    def submit(self, render_fn, *args, **kwargs) -> Future:
+        """
+        Encola un renderizado y devuelve su Future. El Future resuelve a (ruta del PNG, tiempo
+        real, tiempo de CPU); wait() devuelve solo las rutas.
+        """
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(_timed_call(render_fn, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._executor.submit(_timed_call, render_fn, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Espera a todos los renderizados pendientes. Devuelve (rutas, errores)."""
+        paths, errors = [], []
+        for future in self._futures:
+            try:
+                path, wall_s, cpu_s = future.result()
+                paths.append(path)
+                self.timings.append((path, wall_s, cpu_s))
+            except Exception as e:
+                errors.append(e)
+        self._futures = []
+        return paths, errors
+
+    def close(self):
+        """Espera los pendientes, cierra el pool y devuelve (rutas, errores)."""
+        result = self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
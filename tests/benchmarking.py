@@ -0,0 +1,116 @@
+"""
+Utilidades para los benchmarks: medición de tiempo y memoria pico, y comparación
+con la línea base guardada en tests/benchmark_baseline.json.
+"""
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+# Margen absoluto para que las mediciones muy cortas no fallen por ruido
+MIN_WALL_SLACK = 0.02  # segundos
+MIN_MEMORY_SLACK = 1024 * 1024  # bytes
+
+
+def measure(fn, repeat=3):
+    """
+    Ejecuta fn y devuelve (mejor tiempo en segundos, memoria pico en bytes).
+    El tiempo se mide sin tracemalloc (que ralentiza); la memoria en una ejecución aparte.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+_IMPORT_SCRIPT = """
+import sys, time, tracemalloc
+if sys.argv[2] == "memory":
+    tracemalloc.start()
+t0 = time.perf_counter()
+__import__(sys.argv[1])
+wall = time.perf_counter() - t0
+peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+print(wall, peak)
+"""
+
+
+def measure_import(module, repeat=3):
+    """
+    Tiempo de importación de module en un intérprete nuevo (sin módulos ya cargados).
+    Devuelve (mejor tiempo en segundos, memoria pico en bytes), como measure.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run(mode):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT, module, mode], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.split()
+        return float(out[0]), int(out[1])
+
+    best = min(run("time")[0] for _ in range(repeat))
+    return best, run("memory")[1]
+
+
+class BenchmarkRecorder:
+    """
+    Registra los resultados de los benchmarks y los compara con la línea base.
+    Solo con update=True (--update-benchmarks) se reescribe la línea base; los
+    benchmarks sin entrada previa quedan en missing y se informan como "sin línea base".
+    """
+    def __init__(self, path=BASELINE_PATH, tolerance=1.5, update=False):
+        self.path = path
+        self.tolerance = tolerance
+        self.update = update
+        self.baseline = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.baseline = json.load(f).get("benchmarks", {})
+        self.results = {}
+        self.missing = []
+
+    def check(self, name, wall, peak):
+        """Guarda la medición y devuelve la lista de regresiones respecto a la línea base."""
+        self.results[name] = {"wall_s": round(wall, 6), "peak_bytes": int(peak)}
+        base = self.baseline.get(name)
+        if base is None and not self.update:
+            self.missing.append(name)
+        if self.update or base is None:
+            return []
+        problems = []
+        max_wall = base["wall_s"] * self.tolerance + MIN_WALL_SLACK
+        if wall > max_wall:
+            problems.append(f"{name}: tiempo {wall:.4f}s > {max_wall:.4f}s (base {base['wall_s']:.4f}s)")
+        max_peak = base["peak_bytes"] * self.tolerance + MIN_MEMORY_SLACK
+        if peak > max_peak:
+            problems.append(f"{name}: memoria {peak} B > {int(max_peak)} B (base {base['peak_bytes']} B)")
+        return problems
+
+    def save(self):
+        """Con update, escribe la línea base con las mediciones actuales (conserva las demás)."""
+        if not self.update or not self.results:
+            return
+        merged = {**self.baseline, **self.results}
+        if merged == self.baseline:
+            return
+        payload = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "benchmarks": dict(sorted(merged.items())),
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
@@ -4,6 +4,24 @@ Configuración compartida para pytest (fixtures comunes, marcadores, etc.).
 import pytest
 
 
+def pytest_addoption(parser):
+    """
+    Opciones para la suite de benchmarks (tests marcados con 'benchmark').
+    """
+    parser.addoption(
+        "--run-benchmarks", action="store_true", default=False,
+        help="ejecuta los benchmarks de rendimiento y los compara con la línea base"
+    )
+    parser.addoption(
+        "--update-benchmarks", action="store_true", default=False,
+        help="reescribe tests/benchmark_baseline.json con las mediciones actuales"
+    )
+    parser.addoption(
+        "--benchmark-tolerance", type=float, default=1.5,
+        help="factor máximo permitido sobre la línea base antes de considerar regresión"
+    )
+
+
 def pytest_configure(config):
     """
     Registra marcadores personalizados para pytest.
@@ -14,4 +32,44 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "slow: marca tests que pueden tardar mucho tiempo"
     )
+    config.addinivalue_line(
+        "markers", "benchmark: marca benchmarks de rendimiento (requieren --run-benchmarks)"
+    )
 
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Omite los benchmarks salvo que se pida explícitamente con --run-benchmarks.
+    """
+    if config.getoption("--run-benchmarks") or config.getoption("--update-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="usa --run-benchmarks para ejecutar los benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request):
+    """
+    Registro de benchmarks de la sesión; guarda la línea base al terminar.
+    """
+    from tests.benchmarking import BenchmarkRecorder
+    recorder = BenchmarkRecorder(
+        tolerance=request.config.getoption("--benchmark-tolerance"),
+        update=request.config.getoption("--update-benchmarks"),
+    )
+    request.config.benchmark_recorder = recorder
+    yield recorder
+    recorder.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """
+    Lista los benchmarks sin línea base (no se añaden salvo con --update-benchmarks).
+    """
+    recorder = getattr(config, "benchmark_recorder", None)
+    if recorder is not None and recorder.missing:
+        terminalreporter.write_sep("-", "benchmarks sin línea base (usa --update-benchmarks)")
+        for name in recorder.missing:
+            terminalreporter.write_line(name)
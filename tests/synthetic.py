@@ -0,0 +1,103 @@
+"""
+Generadores de datos sintéticos para los benchmarks (series, carteras, DataFrames OHLCV y cadenas de opciones).
+"""
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from src.models.price_series import PriceSeries, PricePoint
+from src.models.portfolio import Portfolio
+
+
+def make_closes(n_points, seed=0, S0=100.0, mu=0.0003, sigma=0.015):
+    """Cierres sintéticos siguiendo un paseo aleatorio log-normal."""
+    rng = np.random.default_rng(seed)
+    return S0 * np.exp(np.cumsum(rng.normal(mu, sigma, n_points)))
+
+
+def make_price_series(n_points, symbol="SYN", seed=0, start=date(1990, 1, 1)):
+    """PriceSeries sintética con n_points puntos diarios consecutivos."""
+    closes = make_closes(n_points, seed=seed)
+    one_day = timedelta(days=1)
+    data = []
+    d = start
+    for c in closes.tolist():
+        data.append(PricePoint(d, c, c * 1.01, c * 0.99, c, 1_000_000.0))
+        d += one_day
+    return PriceSeries(symbol=symbol, currency="USD", data=data)
+
+
+def make_portfolio(n_assets, n_points=252, seed=0):
+    """Portfolio sintético con n_assets activos sobre las mismas fechas."""
+    assets = [make_price_series(n_points, symbol=f"SYN{i}", seed=seed + i) for i in range(n_assets)]
+    return Portfolio(name=f"Cartera sintética ({n_assets})", assets=assets)
+
+
+def make_ohlcv_frame(n_rows, n_tickers=10, nan_fraction=0.01, duplicate_fraction=0.01, seed=0):
+    """
+    DataFrame OHLCV con el formato de los extractores (date, open, high, low, close,
+    volume, ticker), con filas duplicadas, NaN dispersos y orden aleatorio.
+    """
+    rng = np.random.default_rng(seed)
+    per_ticker = max(1, n_rows // n_tickers)
+    dates = pd.date_range("1990-01-01", periods=per_ticker, freq="B")
+    closes = make_closes(per_ticker * n_tickers, seed=seed)
+    df = pd.DataFrame({
+        "date": np.tile(dates.values, n_tickers),
+        "open": closes,
+        "high": closes * 1.01,
+        "low": closes * 0.99,
+        "close": closes,
+        "volume": rng.integers(1_000, 1_000_000, per_ticker * n_tickers).astype(float),
+        "ticker": np.repeat([f"SYN{i}" for i in range(n_tickers)], per_ticker),
+    })
+    for col in ("open", "high", "low", "close", "volume"):
+        df.loc[rng.random(len(df)) < nan_fraction, col] = np.nan
+    dups = df.sample(frac=duplicate_fraction, random_state=seed)
+    df = pd.concat([df, dups], ignore_index=True)
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def make_option_chains(n_tickers, n_expiries=20, n_strikes=50, as_of="2024-01-02", seed=0):
+    """
+    Cadenas de opciones en formato largo (una por ticker) con precios Black-Scholes de
+    una sonrisa de volatilidad y un bid/ask alrededor.
+    """
+    from src.simulation.black_scholes import bs_price
+    rng = np.random.default_rng(seed)
+    expiries = np.datetime64(as_of, "D") + np.round(np.geomspace(7, 900, n_expiries)).astype(int)
+    T = np.repeat((expiries - np.datetime64(as_of, "D")).astype(float) / 365, n_strikes)
+    chains = {}
+    for i in range(n_tickers):
+        spot, vol = rng.uniform(20, 500), rng.uniform(0.15, 0.6)
+        strikes = np.tile(spot * np.linspace(0.5, 1.5, n_strikes), n_expiries)
+        sigma = vol + 0.3 * np.log(strikes / spot) ** 2
+        frames = []
+        for kind in ("call", "put"):
+            price = bs_price(spot, strikes, T, sigma, kind)
+            frames.append(pd.DataFrame({
+                "ticker": f"SYN{i}", "expiry": np.repeat(expiries, n_strikes), "kind": kind,
+                "underlying_price": spot, "strike": strikes, "bid": price * 0.99, "ask": price * 1.01,
+                "last_price": price,
+            }))
+        chains[f"SYN{i}"] = pd.concat(frames, ignore_index=True)
+    return chains
+
+
+def make_corporate_actions(df, dividends_per_year=4, splits_per_ticker=3, seed=0):
+    """
+    Tabla de acciones (formato de utils/corporate_actions) para los tickers de un DataFrame
+    de make_ohlcv_frame: dividendos periódicos del 0.5% del precio y algunos splits 2:1 o 3:1.
+    """
+    rng = np.random.default_rng(seed)
+    first, last = pd.Timestamp(df["date"].min()), pd.Timestamp(df["date"].max())
+    div_dates = pd.date_range(first, last, freq=pd.DateOffset(months=12 // dividends_per_year))[1:]
+    frames = []
+    for ticker in pd.unique(df["ticker"]):
+        split_dates = pd.DatetimeIndex(rng.choice(div_dates, splits_per_ticker, replace=False)) + pd.Timedelta(days=1)
+        frames.append(pd.DataFrame({
+            "ticker": ticker,
+            "date": div_dates.append(split_dates),
+            "dividend": np.r_[np.full(len(div_dates), 0.5), np.zeros(splits_per_ticker)],
+            "split": np.r_[np.ones(len(div_dates)), rng.choice([2.0, 3.0], splits_per_ticker)],
+        }))
+    return pd.concat(frames, ignore_index=True)
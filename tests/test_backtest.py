@@ -0,0 +1,96 @@
+"""
+Tests unitarios para el backtesting vectorizado y el barrido de parámetros en paralelo.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.analytics.backtest import BacktestSweep, backtest, momentum, sma_crossover
+from src.models.price_series import PriceSeries, PricePoint
+from tests.synthetic import make_portfolio
+
+
+@pytest.fixture(scope="module")
+def portfolio():
+    return make_portfolio(5, n_points=300)
+
+
+class TestBacktest:
+    """Tests de posiciones, rotación, costes y curva de capital."""
+
+    def test_daily_rebalance_matches_weighted_returns(self, portfolio):
+        """Rebalanceando cada día, la rentabilidad es la suma de los pesos de la víspera por las de los activos."""
+        dates, closes = portfolio.aligned_closes()
+        weights = np.tile([0.4, 0.3, 0.2, 0.1, 0.0], (len(dates), 1))
+        result = backtest(dates, closes, weights)
+        asset_returns = pd.DataFrame(closes).pct_change().fillna(0.0).to_numpy()
+        expected = (np.roll(weights, 1, axis=0) * asset_returns).sum(axis=1)
+        expected[:2] = 0.0  # la primera decisión se negocia al cierre de la segunda barra
+        np.testing.assert_allclose(result.returns, expected, atol=1e-14)
+        np.testing.assert_allclose(result.positions[1], weights[0])
+
+    def test_hold_rows_drift_and_costs(self, portfolio):
+        """Con filas de NaN las posiciones derivan con los precios; el coste es la rotación por cost_bps."""
+        dates, closes = portfolio.aligned_closes()
+        weights = np.full(closes.shape, np.nan)
+        weights[0] = [0.5, 0.5, 0.0, 0.0, 0.0]
+        weights[150] = [0.0, 0.0, 0.5, 0.5, 0.0]
+        result = backtest(dates, closes, weights, cost_bps=10, initial_capital=1000.0)
+        held = 0.5 * (closes[1:152, :2] / closes[1, :2]).sum(axis=1)
+        np.testing.assert_allclose(result.equity[1:151], 1000.0 * 0.999 * held[:-1])
+        drifted = 0.5 * closes[151, :2] / closes[1, :2] / held[-1]
+        assert result.turnover[1] == pytest.approx(1.0)
+        assert result.turnover[151] == pytest.approx(1.0 + drifted.sum())
+        assert np.count_nonzero(result.turnover) == 2
+        assert result.costs[1] == pytest.approx(1.0)
+        np.testing.assert_allclose(result.positions[151], [0.0, 0.0, 0.5, 0.5, 0.0])
+
+    def test_metrics_match_price_series(self, portfolio):
+        """Las métricas de la curva de capital coinciden con las de PriceSeries sobre esa curva."""
+        result = portfolio.backtest(lambda closes: sma_crossover(closes, fast=10, slow=30), cost_bps=5)
+        curve = PriceSeries("EQ", "USD", [PricePoint(d, v, v, v, v, 0.0)
+                                          for d, v in zip(result.dates, result.equity)])
+        metrics = result.metrics()
+        for name in ("total_return", "annualized_return", "volatility", "max_drawdown"):
+            assert metrics[name] == pytest.approx(getattr(curve, name)())
+        assert metrics["costs"] == pytest.approx(result.costs.sum())
+        assert result.positions_frame().columns.tolist() == [a.symbol for a in portfolio.assets]
+
+    def test_assets_without_price_are_not_traded(self):
+        """Un activo sin cotización todavía queda a peso 0 y su peso no se invierte."""
+        dates = pd.bdate_range("2024-01-01", periods=6)
+        closes = np.array([[10, np.nan], [11, np.nan], [12, 20], [12, 22], [13, 22], [13, 24]], dtype=float)
+        result = backtest(dates, closes, np.full(closes.shape, 0.5), lag=0)
+        np.testing.assert_allclose(result.positions[:2], [[0.5, 0.0], [0.5, 0.0]])
+        assert result.equity[1] == pytest.approx(1.05)
+
+    def test_shape_mismatch_raises(self, portfolio):
+        """Pesos y cierres con formas distintas son un error."""
+        dates, closes = portfolio.aligned_closes()
+        with pytest.raises(ValueError):
+            backtest(dates, closes, np.zeros((len(dates), 2)))
+
+
+class TestBacktestSweep:
+    """Tests del barrido de rejillas de parámetros."""
+
+    def test_sweep_matches_single_backtests(self, portfolio):
+        """Cada fila del barrido (en procesos o no) tiene las métricas de su backtest individual."""
+        dates, closes = portfolio.aligned_closes()
+        grid = {"fast": [5, 10], "slow": [30, 60]}
+        serial = BacktestSweep(sma_crossover, processes=0, cost_bps=5).run(dates, closes, grid)
+        parallel = BacktestSweep(sma_crossover, processes=2, cost_bps=5).run(dates, closes, grid)
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert serial[["fast", "slow"]].values.tolist() == [[5, 30], [5, 60], [10, 30], [10, 60]]
+        single = backtest(dates, closes, sma_crossover(closes, fast=10, slow=60), cost_bps=5).metrics()
+        row = serial.iloc[3]
+        for name, value in single.items():
+            assert row[name] == pytest.approx(value)
+
+    def test_failed_combinations(self, portfolio):
+        """Una combinación que falla queda con métricas NaN y su error, sin detener el resto."""
+        dates, closes = portfolio.aligned_closes()
+        sweep = BacktestSweep(momentum, processes=0)
+        frame = sweep.run(dates, closes, [{"lookback": 20, "top": 2}, {"lookback": 20, "bogus": 1}])
+        assert not np.isnan(frame.loc[0, "total_return"])
+        assert np.isnan(frame.loc[1, "total_return"])
+        assert list(sweep.errors) == [1]
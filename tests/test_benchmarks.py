@@ -0,0 +1,194 @@
+"""
+Benchmarks de rendimiento (tiempo y memoria pico) de modelos, simulación y limpieza.
+
+No se ejecutan por defecto:
+    python -m pytest tests/test_benchmarks.py --run-benchmarks
+    python -m pytest tests/test_benchmarks.py --update-benchmarks   # regenerar la línea base
+"""
+import pytest
+import pandas as pd
+from src.simulation.montecarlo import MonteCarloSimulator
+from src.utils.data_cleaning import clean_dataframe, clean_universe
+from src.utils.validation import validate_ohlcv
+from src.utils.corporate_actions import adjust_ohlcv
+from src.analytics.options import build_surfaces
+from src.analytics.indicators import IndicatorEngine, Panel
+from src.analytics.backtest import BacktestSweep, backtest, sma_crossover
+from src.models.portfolio import Portfolio
+from src.analytics.report import ReportEngine
+from tests.benchmarking import measure, measure_import
+from tests.synthetic import (make_price_series, make_portfolio, make_ohlcv_frame, make_option_chains,
+                             make_corporate_actions)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.slow]
+
+
+@pytest.fixture(scope="module", params=[1_000, 100_000, 1_000_000], ids=lambda n: f"{n}pts")
+def series(request):
+    return make_price_series(request.param)
+
+
+@pytest.fixture(scope="module", params=[10, 100, 1000], ids=lambda n: f"{n}assets")
+def portfolio(request):
+    return make_portfolio(request.param)
+
+
+@pytest.fixture(scope="module")
+def simulation_series():
+    return make_price_series(2_500)
+
+
+def run_benchmark(recorder, name, fn, repeat=3):
+    wall, peak = measure(fn, repeat=repeat)
+    problems = recorder.check(name, wall, peak)
+    assert not problems, "Regresión de rendimiento:\n" + "\n".join(problems)
+
+
+class TestPriceSeriesBenchmarks:
+    """Métricas de PriceSeries con 1k, 100k y 1M puntos."""
+
+    @pytest.mark.parametrize("metric", ["mean", "stdev", "total_return", "annualized_return", "volatility", "max_drawdown"])
+    def test_metric(self, benchmark_recorder, series, metric):
+        fn = getattr(series, metric)
+        run_benchmark(benchmark_recorder, f"price_series.{metric}[{len(series.data)}]", fn)
+
+
+class TestPortfolioBenchmarks:
+    """Agregación y reporte de Portfolio con 10, 100 y 1000 activos."""
+
+    def test_total_value_by_date(self, benchmark_recorder, portfolio):
+        run_benchmark(benchmark_recorder, f"portfolio.total_value_by_date[{len(portfolio.assets)}]",
+                      portfolio.total_value_by_date)
+
+    def test_report(self, benchmark_recorder, portfolio):
+        run_benchmark(benchmark_recorder, f"portfolio.report[{len(portfolio.assets)}]",
+                      lambda: portfolio.report(show=False))
+
+    def test_report_batch(self, benchmark_recorder, portfolio):
+        """100 carteras solapadas de 10 activos sobre el mismo universo."""
+        n = len(portfolio.assets)
+        batch = [Portfolio(f"P{i}", [portfolio.assets[(i + k) % n] for k in range(10)]) for i in range(100)]
+        run_benchmark(benchmark_recorder, f"report_engine.render_batch[100x10 de {n}]",
+                      lambda: ReportEngine().render_batch(batch))
+
+
+class TestMonteCarloBenchmarks:
+    """MonteCarloSimulator sobre una rejilla de trayectorias y días."""
+
+    @pytest.mark.parametrize("n_simulations", [1_000, 10_000])
+    @pytest.mark.parametrize("n_days", [252, 1_260])
+    def test_simulate_price_series(self, benchmark_recorder, simulation_series, n_simulations, n_days):
+        sim = MonteCarloSimulator(n_simulations=n_simulations, n_days=n_days)
+        run_benchmark(benchmark_recorder, f"montecarlo.simulate_price_series[{n_simulations}x{n_days}]",
+                      lambda: sim.simulate_price_series(simulation_series))
+
+
+class TestDataCleaningBenchmarks:
+    """clean_dataframe sobre DataFrames grandes."""
+
+    @pytest.mark.parametrize("n_rows", [100_000, 1_000_000])
+    def test_clean_dataframe(self, benchmark_recorder, n_rows):
+        df = make_ohlcv_frame(n_rows)
+        run_benchmark(benchmark_recorder, f"data_cleaning.clean_dataframe[{n_rows}]",
+                      lambda: clean_dataframe(df), repeat=2)
+
+    def test_clean_universe(self, benchmark_recorder):
+        """1M filas de 100 tickers: deduplicado, orden y relleno por ticker con downcast."""
+        df = make_ohlcv_frame(1_000_000, n_tickers=100)
+        run_benchmark(benchmark_recorder, "data_cleaning.clean_universe[1000000x100]",
+                      lambda: clean_universe(df), repeat=2)
+
+
+class TestValidationBenchmarks:
+    """Reglas de calidad OHLCV sobre DataFrames grandes de muchos tickers."""
+
+    @pytest.mark.parametrize("repair", [False, True], ids=["check", "repair"])
+    def test_validate_ohlcv(self, benchmark_recorder, repair):
+        df = make_ohlcv_frame(1_000_000, n_tickers=100)
+        run_benchmark(benchmark_recorder, f"validation.validate_ohlcv[1000000x100,{'repair' if repair else 'check'}]",
+                      lambda: validate_ohlcv(df, repair=repair), repeat=2)
+
+
+class TestAdjustmentBenchmarks:
+    """Ajuste por splits y dividendos de un universo completo."""
+
+    def test_adjust_ohlcv(self, benchmark_recorder):
+        """1M filas de 100 tickers con ~150 dividendos y 3 splits por ticker."""
+        df = make_ohlcv_frame(1_000_000, n_tickers=100)
+        actions = make_corporate_actions(df)
+        run_benchmark(benchmark_recorder, "corporate_actions.adjust_ohlcv[1000000x100]",
+                      lambda: adjust_ohlcv(df, actions), repeat=2)
+
+    def test_adjust_ohlcv_incremental(self, benchmark_recorder):
+        """Un split nuevo en cada ticker sobre el universo ya ajustado."""
+        df = make_ohlcv_frame(1_000_000, n_tickers=100)
+        applied = make_corporate_actions(df)
+        adjusted = adjust_ohlcv(df, applied)
+        new = applied.groupby("ticker").tail(1).assign(date=pd.Timestamp(df["date"].max()), dividend=0.0,
+                                                       split=2.0)
+        actions = pd.concat([applied, new], ignore_index=True)
+        run_benchmark(benchmark_recorder, "corporate_actions.adjust_ohlcv[1000000x100,incremental]",
+                      lambda: adjust_ohlcv(adjusted, actions, applied=applied), repeat=2)
+
+
+class TestIndicatorBenchmarks:
+    """Indicadores técnicos de un universo completo y actualización con una barra nueva."""
+
+    def test_latest(self, benchmark_recorder):
+        """2.500 sesiones x 1.000 tickers: SMA, EMA, RSI, MACD, Bollinger, ATR y OBV."""
+        panel = Panel.from_frame(make_ohlcv_frame(2_500_000, n_tickers=1_000, duplicate_fraction=0.0))
+        run_benchmark(benchmark_recorder, "indicators.latest[2500x1000]",
+                      lambda: IndicatorEngine(panel).latest(), repeat=2)
+
+    def test_append(self, benchmark_recorder):
+        """100 barras nuevas sobre los indicadores ya calculados del mismo universo."""
+        panel = Panel.from_frame(make_ohlcv_frame(2_500_000, n_tickers=1_000, duplicate_fraction=0.0))
+        bar = {name: panel[name][-1] for name in panel.fields}
+        engine = IndicatorEngine(panel)
+        engine.latest()
+
+        def append():
+            for _ in range(100):
+                engine.append(pd.Timestamp(engine.dates[-1]) + pd.Timedelta(days=1), bar)
+
+        run_benchmark(benchmark_recorder, "indicators.append[2500x1000,100]", append, repeat=2)
+
+
+class TestBacktestBenchmarks:
+    """Backtest de una cartera grande y barrido de parámetros de una estrategia."""
+
+    def test_backtest(self, benchmark_recorder):
+        """10 años diarios x 500 activos con rebalanceo diario y costes."""
+        dates, closes = make_portfolio(500, n_points=2_520).aligned_closes()
+        weights = sma_crossover(closes, fast=20, slow=100)
+        run_benchmark(benchmark_recorder, "backtest.backtest[2520x500]",
+                      lambda: backtest(dates, closes, weights, cost_bps=5))
+
+    def test_sweep(self, benchmark_recorder):
+        """100 combinaciones de medias móviles sobre 10 años x 50 activos, en el proceso principal."""
+        dates, closes = make_portfolio(50, n_points=2_520).aligned_closes()
+        grid = {"fast": range(5, 55, 5), "slow": range(60, 260, 20)}
+        sweep = BacktestSweep(sma_crossover, processes=0, cost_bps=5)
+        run_benchmark(benchmark_recorder, "backtest.sweep[2520x50,100]",
+                      lambda: sweep.run(dates, closes, grid), repeat=2)
+
+
+class TestOptionsBenchmarks:
+    """Volatilidad implícita, griegas y superficies de una lista de seguimiento completa."""
+
+    def test_build_surfaces(self, benchmark_recorder):
+        """200 tickers x 20 vencimientos x 50 strikes x call/put = 400.000 contratos."""
+        chains = make_option_chains(200)
+        run_benchmark(benchmark_recorder, "options.build_surfaces[200x20x50]",
+                      lambda: build_surfaces(chains, as_of="2024-01-02", moneyness=[0.8, 0.9, 1.0, 1.1, 1.2]),
+                      repeat=2)
+
+
+class TestImportBenchmarks:
+    """Tiempo de arranque: importación de los módulos de entrada en un intérprete nuevo."""
+
+    @pytest.mark.parametrize("module", ["src.main", "src.simulation.montecarlo", "src.utils.pipeline"])
+    def test_import_time(self, benchmark_recorder, module):
+        wall, peak = measure_import(module)
+        problems = benchmark_recorder.check(f"import.{module}", wall, peak)
+        assert not problems, "Regresión de rendimiento:\n" + "\n".join(problems)
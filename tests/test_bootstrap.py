@@ -0,0 +1,88 @@
+"""
+Tests unitarios para el módulo BootstrapSimulator.
+"""
+import pytest
+import numpy as np
+from datetime import date, timedelta
+from src.simulation.bootstrap import BootstrapSimulator
+from src.models.price_series import PriceSeries, PricePoint
+from src.models.portfolio import Portfolio
+
+
+def make_series(symbol, closes, start=date(2023, 1, 1)):
+    data = [
+        PricePoint(start + timedelta(days=i), c, c, c, c, 1000.0)
+        for i, c in enumerate(closes)
+    ]
+    return PriceSeries(symbol=symbol, currency="USD", data=data)
+
+
+@pytest.fixture
+def sample_price_series():
+    """Fixture con una serie de precios de ejemplo."""
+    return make_series("AAPL", [100.0, 102.0, 101.0, 105.0, 104.0, 108.0, 110.0])
+
+
+class TestBootstrapSimulator:
+    """Tests para la clase BootstrapSimulator."""
+
+    @pytest.mark.parametrize("method", ["iid", "circular", "stationary"])
+    def test_simulate_price_series_shape(self, sample_price_series, method):
+        """Test de forma y valor inicial de las simulaciones."""
+        sim = BootstrapSimulator(n_simulations=50, n_days=30, method=method, block_size=3, seed=1)
+        simulations = sim.simulate_price_series(sample_price_series)
+        assert simulations.shape == (50, 31)
+        assert np.allclose(simulations[:, 0], 110.0)
+        assert np.all(simulations > 0)
+
+    @pytest.mark.parametrize("method", ["iid", "circular", "stationary"])
+    def test_indices_in_range(self, method):
+        """Los índices remuestreados deben estar dentro de la muestra histórica."""
+        sim = BootstrapSimulator(n_simulations=200, n_days=100, method=method, block_size=5, seed=0)
+        idx = sim.sample_indices(7)
+        assert idx.shape == (200, 100)
+        assert idx.min() >= 0 and idx.max() < 7
+
+    def test_circular_blocks_are_consecutive(self):
+        """En bootstrap circular los índices avanzan de uno en uno dentro de cada bloque."""
+        sim = BootstrapSimulator(n_simulations=20, n_days=12, method="circular", block_size=4, seed=0)
+        idx = sim.sample_indices(50)
+        blocks = idx.reshape(20, 3, 4)
+        assert np.all(np.diff(blocks, axis=2) % 50 == 1)
+
+    def test_steps_are_historical_returns(self, sample_price_series):
+        """Cada paso simulado corresponde a un rendimiento histórico."""
+        sim = BootstrapSimulator(n_simulations=10, n_days=20, method="iid", seed=3)
+        simulations = sim.simulate_price_series(sample_price_series)
+        closes = np.array([p.close for p in sample_price_series.data])
+        historical = np.diff(np.log(closes))
+        steps = np.diff(np.log(simulations), axis=1)
+        assert np.all(np.isclose(steps[..., None], historical).any(axis=-1))
+
+    def test_seed_reproducible(self, sample_price_series):
+        """La misma semilla produce las mismas trayectorias."""
+        a = BootstrapSimulator(n_simulations=5, n_days=10, seed=42).simulate_price_series(sample_price_series)
+        b = BootstrapSimulator(n_simulations=5, n_days=10, seed=42).simulate_price_series(sample_price_series)
+        assert np.array_equal(a, b)
+
+    def test_invalid_method(self):
+        """Un método desconocido debe lanzar error."""
+        with pytest.raises(ValueError, match="Método de bootstrap no válido"):
+            BootstrapSimulator(method="foo")
+
+    def test_simulate_price_series_single_point(self):
+        """Test de simulación con un solo punto (debe lanzar error)."""
+        sim = BootstrapSimulator(n_simulations=10, n_days=5)
+        with pytest.raises(ValueError, match="No hay suficientes datos"):
+            sim.simulate_price_series(make_series("TEST", [100.0]))
+
+    def test_simulate_portfolio_preserves_correlation(self):
+        """Dos activos idénticos remuestreados conjuntamente deben moverse igual."""
+        closes = [100.0, 101.0, 99.0, 103.0, 102.0, 106.0]
+        portfolio = Portfolio(name="Test", assets=[make_series("A", closes), make_series("B", closes)])
+        sim = BootstrapSimulator(n_simulations=30, n_days=15, method="stationary", block_size=2, seed=7)
+        total = sim.simulate_portfolio(portfolio)
+        single = BootstrapSimulator(n_simulations=30, n_days=15, method="stationary", block_size=2, seed=7)
+        one = single.simulate_price_series(make_series("A", closes))
+        assert total.shape == (30, 16)
+        assert np.allclose(total, 2 * one)
@@ -0,0 +1,143 @@
+"""
+Tests unitarios para el calendario de sesiones, la detección de huecos y la descarga incremental.
+"""
+from datetime import date, timedelta
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.completeness import find_gaps, missing_session_ranges
+from src.utils.price_cache import PriceCache
+from src.utils.trading_calendar import get_calendar, easter
+
+
+@pytest.fixture
+def calendar():
+    return get_calendar("NYSE")
+
+
+class TestTradingCalendar:
+    """Tests del calendario de la NYSE."""
+
+    @pytest.mark.parametrize("year, sessions", [(2022, 251), (2023, 250), (2024, 252), (2025, 250)])
+    def test_sessions_per_year(self, calendar, year, sessions):
+        assert len(calendar.sessions(f"{year}-01-01", f"{year}-12-31")) == sessions
+        assert calendar.session_count(f"{year}-01-01", f"{year}-12-31") == sessions
+
+    def test_holidays(self, calendar):
+        holidays = calendar.holidays(2022, 2024).astype(str)
+        assert "2024-03-29" in holidays  # Viernes Santo
+        assert "2023-06-19" in holidays  # Juneteenth
+        assert "2022-12-26" in holidays  # Navidad trasladada al lunes
+        assert "2021-12-31" not in holidays  # Año Nuevo en sábado: no se traslada
+        assert easter(2025) == date(2025, 4, 20)
+
+    def test_is_session_and_previous(self, calendar):
+        mask = calendar.is_session(["2024-07-04", "2024-07-05", "2024-07-06"])
+        assert mask.tolist() == [False, True, False]
+        assert str(calendar.previous_session("2024-12-25")) == "2024-12-24"
+
+    def test_unknown_calendar(self):
+        with pytest.raises(ValueError):
+            get_calendar("XYZ")
+
+
+class TestCompleteness:
+    """Tests de sesiones ausentes por ticker."""
+
+    @pytest.fixture
+    def frame(self, calendar):
+        sessions = calendar.sessions("2024-01-01", "2024-03-31")
+        return pd.concat([
+            pd.DataFrame({"date": sessions[np.r_[0:10, 15:len(sessions)]], "ticker": "AAA"}),
+            pd.DataFrame({"date": sessions[5:], "ticker": "BBB"}),
+            pd.DataFrame({"date": [np.datetime64("2024-01-06")], "ticker": "CCC"}),
+        ], ignore_index=True)
+
+    def test_interior_gaps(self, frame):
+        report = find_gaps(frame)
+        assert len(report.gaps) == 1
+        assert report.missing_ranges("AAA") == [(np.datetime64("2024-01-17"), np.datetime64("2024-01-23"))]
+        coverage = report.coverage.set_index("ticker")
+        assert coverage.loc["AAA", "missing"] == 5
+        assert coverage.loc["CCC", "off_calendar"] == 1
+        assert report.warnings == ["El ticker CCC no tiene datos en el rango."]
+
+    def test_fixed_window(self, frame):
+        report = find_gaps(frame, start="2024-01-01", end="2024-03-31")
+        assert report.to_dict()["missing_sessions"] == {"AAA": 5, "BBB": 5, "CCC": 61}
+        assert report.missing_ranges("BBB") == [(np.datetime64("2024-01-02"), np.datetime64("2024-01-08"))]
+
+    def test_blocks_match(self, frame):
+        full = find_gaps(frame, start="2024-01-01", end="2024-03-31")
+        blocked = find_gaps(frame, start="2024-01-01", end="2024-03-31", block_size=1)
+        pd.testing.assert_frame_equal(full.gaps, blocked.gaps)
+
+    def test_missing_session_ranges_with_covered(self, frame):
+        dates = frame.loc[frame["ticker"] == "AAA", "date"]
+        ranges = missing_session_ranges(dates, "2024-01-01", "2024-04-05", covered=[("2024-04-01", "2024-04-02")])
+        assert ranges == [(np.datetime64("2024-01-17"), np.datetime64("2024-01-23")),
+                          (np.datetime64("2024-04-03"), np.datetime64("2024-04-05"))]
+
+
+class TestIncrementalFetch:
+    """Tests de la descarga de solo las sesiones ausentes a través de PriceCache."""
+
+    def test_only_missing_sessions_are_fetched(self, tmp_path, calendar):
+        sessions = calendar.sessions("2024-01-01", "2024-06-30")
+        available = np.delete(sessions, np.s_[20:25])  # la fuente no tenía esas sesiones la primera vez
+        calls = []
+
+        def fetch(start, end):
+            calls.append((start, end))
+            source = sessions if len(calls) > 1 else available
+            days = source[(source >= np.datetime64(start)) & (source < np.datetime64(end))]
+            return pd.DataFrame({"date": days.astype("datetime64[ns]"), "close": np.arange(len(days), dtype=float)})
+
+        cache = PriceCache(tmp_path, ttl_minutes=0)
+        first, ranges = cache.fetch_incremental("src", "AAA", "2024-01-01", "2024-04-01", fetch, calendar)
+        assert calls == [("2024-01-01", "2024-04-01")]
+        assert len(first) == len(available[available < np.datetime64("2024-04-01")])
+        # Un rango más largo: solo se piden el hueco y las sesiones nuevas
+        second, ranges = cache.fetch_incremental("src", "AAA", "2024-01-01", "2024-07-01", fetch, calendar)
+        assert ranges == [(sessions[20], sessions[24]), (np.datetime64("2024-04-01"), np.datetime64("2024-06-28"))]
+        assert calls[1:] == [(str(sessions[20]), str(sessions[24] + 1)), ("2024-04-01", "2024-06-29")]
+        assert len(second) == len(sessions)
+        assert second["date"].is_monotonic_increasing
+        # Sin huecos no se vuelve a descargar nada
+        third, ranges = cache.fetch_incremental("src", "AAA", "2024-02-01", "2024-07-01", fetch, calendar)
+        assert ranges == [] and len(calls) == 3
+        assert third["date"].iloc[0] == pd.Timestamp("2024-02-01")
+
+    def test_covered_ranges_are_not_refetched(self, tmp_path, calendar):
+        """Sesiones ya consultadas sin datos (p. ej. antes de la salida a bolsa) no se vuelven a pedir."""
+        calls = []
+
+        def fetch(start, end):
+            calls.append((start, end))
+            days = calendar.sessions("2024-03-01", date.fromisoformat(end) - timedelta(days=1))
+            return pd.DataFrame({"date": days, "close": 1.0})
+
+        cache = PriceCache(tmp_path, ttl_minutes=0)
+        cache.fetch_incremental("src", "IPO", "2024-01-01", "2024-05-01", fetch, calendar)
+        _, ranges = cache.fetch_incremental("src", "IPO", "2024-01-01", "2024-05-01", fetch, calendar)
+        assert len(calls) == 1
+
+    def test_failed_fetch_is_retried(self, tmp_path, calendar):
+        """Un rango que la fuente devuelve vacío (error, límite de peticiones) se vuelve a pedir y no se cachea."""
+        sessions = calendar.sessions("2024-01-01", "2024-02-29")
+        failing = [True]
+
+        def fetch(start, end):
+            if start >= "2024-02-01" and failing[0]:
+                return pd.DataFrame()
+            days = sessions[(sessions >= np.datetime64(start)) & (sessions < np.datetime64(end))]
+            return pd.DataFrame({"date": days.astype("datetime64[ns]"), "close": 1.0})
+
+        cache = PriceCache(tmp_path, ttl_minutes=0)
+        cache.fetch_incremental("src", "AAA", "2024-01-01", "2024-02-01", fetch, calendar)
+        partial, _ = cache.fetch_incremental("src", "AAA", "2024-01-01", "2024-03-01", fetch, calendar)
+        assert len(partial) == len(sessions[sessions < np.datetime64("2024-02-01")])
+        failing[0] = False
+        full, ranges = cache.fetch_incremental("src", "AAA", "2024-01-01", "2024-03-01", fetch, calendar)
+        assert ranges == [(np.datetime64("2024-02-01"), np.datetime64("2024-02-29"))]
+        assert len(full) == len(sessions)
@@ -0,0 +1,145 @@
+"""
+Tests unitarios para el ajuste de precios por splits y dividendos.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.extractors import yahoo_extractor
+from src.extractors.yahoo_extractor import YahooFinanceExtractor, yahoo_actions
+from src.utils.corporate_actions import action_table, adjust_ohlcv, unadjust_ohlcv
+from src.utils.output_manager import OutputManager, set_output_manager
+from tests.synthetic import make_corporate_actions, make_ohlcv_frame
+
+DATES = pd.bdate_range("2024-01-01", periods=10)
+
+
+def make_bars(ticker="AAA"):
+    """Diez sesiones: 100 antes de un split 4:1 el 6.º día y 25 después."""
+    close = np.r_[np.full(5, 100.0), np.full(5, 25.0)]
+    return pd.DataFrame({"date": DATES, "open": close, "high": close * 1.01, "low": close * 0.99,
+                         "close": close, "volume": np.r_[np.full(5, 1000.0), np.full(5, 4000.0)],
+                         "ticker": ticker})
+
+
+class TestActionTable:
+    """Tests de la normalización de acciones de cada fuente."""
+
+    def test_yahoo_series(self):
+        """Splits 0 se descartan y los dividendos ajustados por splits vuelven a su importe bruto."""
+        index = pd.DatetimeIndex(["2019-05-10", "2020-08-31", "2020-11-06"]).tz_localize("America/New_York")
+        table = action_table(pd.Series([0.1925, 0.0, 0.205], index=index),
+                             pd.Series([0.0, 4.0, 0.0], index=index), ticker="AAPL",
+                             split_adjusted_dividends=True)
+        assert list(table["dividend"]) == pytest.approx([0.77, 0.0, 0.205])
+        assert list(table["split"]) == [1.0, 4.0, 1.0]
+        assert (table["ticker"] == "AAPL").all()
+
+    def test_frames_with_date_column(self):
+        """Las tablas con columna de fecha (Alpha Vantage, Finnhub) se combinan por fecha ex."""
+        table = action_table(pd.DataFrame({"date": ["2024-01-02", "2024-01-02"], "amount": [0.2, 0.3]}),
+                             pd.DataFrame({"date": ["2024-01-02"], "ratio": [2.0]}), ticker="X")
+        assert len(table) == 1
+        assert table.loc[0, "dividend"] == pytest.approx(0.5)
+        assert table.loc[0, "split"] == 2.0
+        assert action_table(ticker="X").empty
+
+
+class FakeYahooTicker:
+    """
+    Ticker de yfinance con la forma real de history(auto_adjust=False) y actions: un split
+    4:1 el 6.º día (OHLC y volumen ya ajustados por él) y un dividendo bruto de 0,96 antes
+    del split el 4.º día (publicado como 0,24, dividido por el split posterior).
+    """
+    def __init__(self):
+        index = pd.DatetimeIndex(DATES, name="Date").tz_localize("America/New_York")
+        close = np.r_[100.0, 101.0, 102.0, 101.5, 101.0, 99.0, 100.0, 101.0, 102.0, 103.0]
+        adj_close = close * np.where(np.arange(10) < 3, 1 - 0.24 / close[2], 1.0)
+        self.frame = pd.DataFrame({
+            "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Adj Close": adj_close,
+            "Volume": np.r_[np.full(5, 4000), np.full(5, 3000)],
+            "Dividends": np.r_[0, 0, 0, 0.24, 0, 0, 0, 0, 0, 0],
+            "Stock Splits": np.r_[0, 0, 0, 0, 0, 4.0, 0, 0, 0, 0],
+        }, index=index)
+        self.actions = self.frame.loc[(self.frame["Dividends"] > 0) | (self.frame["Stock Splits"] > 0),
+                                      ["Dividends", "Stock Splits"]]
+
+    def history(self, start=None, end=None, auto_adjust=True):
+        assert auto_adjust is False
+        return self.frame
+
+
+class TestYahooActions:
+    """Tests del ajuste de los históricos de Yahoo, que ya vienen ajustados por splits."""
+
+    def test_only_dividends_in_split_adjusted_basis(self):
+        """Yahoo solo aporta los dividendos, en la base de sus precios ya ajustados por splits."""
+        table = yahoo_actions(FakeYahooTicker(), "AAA", "2024-01-01", "2024-12-31")
+        assert table["split"].tolist() == [1.0]
+        assert table["dividend"].tolist() == pytest.approx([0.24])
+
+    def test_adjusted_history_matches_adj_close(self, tmp_path, monkeypatch):
+        """El histórico ajustado reproduce el Adj Close de Yahoo y no vuelve a dividir por el split."""
+        fake = FakeYahooTicker()
+        monkeypatch.setattr(yahoo_extractor.yf, "Ticker", lambda ticker: fake)
+        previous = set_output_manager(OutputManager(str(tmp_path)))
+        try:
+            extractor = YahooFinanceExtractor()
+            bars = extractor.get_historical_prices("AAA", "2024-01-01", "2024-01-13")
+            adjusted = adjust_ohlcv(bars, extractor.get_corporate_actions("AAA", "2024-01-01", "2024-01-13"))
+        finally:
+            set_output_manager(previous)
+        np.testing.assert_allclose(adjusted["close"], fake.frame["Adj Close"], rtol=1e-12)
+        np.testing.assert_allclose(adjusted["volume"], fake.frame["Volume"])
+
+
+class TestAdjustOhlcv:
+    """Tests del ajuste vectorizado y de las actualizaciones incrementales."""
+
+    def test_split_and_dividend(self):
+        """Los precios anteriores a cada fecha ex se multiplican por su factor; el volumen por el split."""
+        actions = action_table(pd.Series([1.0], index=[DATES[8]]), pd.Series([4.0], index=[DATES[5]]), "AAA")
+        adjusted = adjust_ohlcv(make_bars(), actions)
+        dividend_factor = 1 - 1.0 / 25.0
+        np.testing.assert_allclose(adjusted["close"], np.r_[np.full(8, 25.0 * dividend_factor), np.full(2, 25.0)])
+        np.testing.assert_allclose(adjusted["volume"], 4000.0)
+        np.testing.assert_allclose(adjusted["adj_factor"].iloc[0], dividend_factor / 4)
+        assert adjusted["adj_factor"].iloc[-1] == 1.0
+
+    def test_universe_matches_per_ticker(self):
+        """El ajuste de un universo desordenado coincide con el de cada ticker por separado."""
+        df = make_ohlcv_frame(5_000, n_tickers=5, nan_fraction=0.0, duplicate_fraction=0.0)
+        actions = make_corporate_actions(df)
+        adjusted = adjust_ohlcv(df, actions)
+        for ticker, group in df.groupby("ticker"):
+            single = adjust_ohlcv(group, actions[actions["ticker"] == ticker])
+            np.testing.assert_allclose(adjusted.loc[group.index, "close"], single["close"], rtol=1e-12)
+
+    def test_incremental_matches_full(self):
+        """Aplicar solo las acciones nuevas sobre el histórico ajustado equivale a ajustar desde cero."""
+        df = make_ohlcv_frame(5_000, n_tickers=5, nan_fraction=0.0, duplicate_fraction=0.0)
+        actions = make_corporate_actions(df, seed=1)
+        applied = actions.iloc[::2]
+        adjusted = adjust_ohlcv(df, applied)
+        changed = actions.copy()
+        changed.loc[changed.index[0], "dividend"] += 0.25
+        incremental = adjust_ohlcv(adjusted, changed, applied=applied)
+        full = adjust_ohlcv(df, changed)
+        for col in ("open", "close", "volume", "adj_factor"):
+            np.testing.assert_allclose(incremental[col], full[col], rtol=1e-10)
+        np.testing.assert_allclose(unadjust_ohlcv(full, changed)["close"], df["close"], rtol=1e-10)
+
+    def test_adjusted_history_requires_applied(self):
+        """Ajustar dos veces sin indicar las acciones aplicadas es un error."""
+        actions = action_table(splits=pd.Series([4.0], index=[DATES[5]]), ticker="AAA")
+        adjusted = adjust_ohlcv(make_bars(), actions)
+        with pytest.raises(ValueError):
+            adjust_ohlcv(adjusted, actions)
+        same = adjust_ohlcv(adjusted, actions, applied=actions)
+        pd.testing.assert_frame_equal(same, adjusted)
+
+    def test_actions_without_ticker(self):
+        """Acciones sin ticker valen para un histórico de un ticker y no para varios."""
+        actions = action_table(splits=pd.Series([4.0], index=[DATES[5]]))
+        assert adjust_ohlcv(make_bars(), actions)["close"].iloc[0] == 25.0
+        with pytest.raises(ValueError):
+            adjust_ohlcv(pd.concat([make_bars("AAA"), make_bars("BBB")]), actions)
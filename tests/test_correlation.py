@@ -0,0 +1,88 @@
+"""
+Tests unitarios para el motor de correlaciones (analytics.correlation).
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.analytics.correlation import (
+    log_returns, correlation_matrix, covariance_matrix, iter_correlation_tiles, ledoit_wolf, cov_to_corr,
+    top_k_pairs, ewma_weights,
+)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    r = rng.normal(0, 0.01, (400, 30))
+    r[:, 1] += r[:, 0]
+    r[:, 2] -= 2 * r[:, 3]
+    r[rng.random(r.shape) < 0.15] = np.nan
+    return r
+
+
+class TestCorrelation:
+    """Tests de correlación pairwise-complete, por bloques, EWMA, Ledoit-Wolf y top-k."""
+
+    def test_log_returns_alignment(self):
+        """Un cierre ausente invalida los dos rendimientos que lo usan."""
+        closes = np.array([[100, 10], [110, np.nan], [121, 12]], dtype=float)
+        r = log_returns(closes)
+        assert r.shape == (2, 2)
+        assert np.allclose(r[:, 0], np.log(1.1))
+        assert np.isnan(r[:, 1]).all()
+
+    def test_matches_pandas_pairwise(self, returns):
+        expected = pd.DataFrame(returns).corr().to_numpy()
+        assert np.allclose(correlation_matrix(returns), expected, equal_nan=True)
+        assert np.allclose(covariance_matrix(returns), pd.DataFrame(returns).cov().to_numpy(), equal_nan=True)
+
+    def test_blockwise_equals_full(self, returns):
+        full = correlation_matrix(returns)
+        out = np.empty((30, 30), dtype=np.float32)
+        tiled = correlation_matrix(returns, block_size=7, out=out)
+        assert tiled is out
+        assert np.allclose(tiled, full, atol=1e-6)
+        tiles = list(iter_correlation_tiles(returns, block_size=10, upper=True))
+        assert len(tiles) == 6
+        for rows, cols, tile in tiles:
+            assert np.allclose(tile, full[rows, cols])
+
+    def test_min_periods(self, returns):
+        returns = returns.copy()
+        returns[50:, 5] = np.nan
+        corr = correlation_matrix(returns, min_periods=100)
+        assert np.isnan(corr[5]).all()
+        assert not np.isnan(corr[6, 7])
+
+    def test_ewma(self, returns):
+        """Con una vida media enorme la EWMA tiende a la correlación muestral."""
+        w = ewma_weights(5, 1)
+        assert w[-1] == 1 and np.isclose(w[-2], 0.5)
+        ewma = correlation_matrix(returns, halflife=1e9)
+        assert np.allclose(ewma, correlation_matrix(returns), atol=1e-6)
+        recent = correlation_matrix(returns, halflife=20)
+        assert np.allclose(np.diag(recent), 1.0)
+        with pytest.raises(ValueError):
+            ewma_weights(5, 0)
+
+    def test_ledoit_wolf(self):
+        """El shrinkage está en [0, 1] y mejora el condicionamiento con pocas observaciones."""
+        x = np.random.default_rng(1).normal(size=(40, 30))
+        cov, shrinkage = ledoit_wolf(x)
+        assert 0 < shrinkage <= 1
+        assert np.allclose(cov, cov.T)
+        sample = np.cov(x, rowvar=False)
+        assert np.linalg.cond(cov) < np.linalg.cond(sample)
+        assert np.allclose(np.diag(cov_to_corr(cov)), 1.0)
+
+    def test_top_k_pairs(self, returns):
+        full = correlation_matrix(returns)
+        iu = np.triu_indices(30, 1)
+        labels = [f"T{i}" for i in range(30)]
+        for absolute in (False, True):
+            scores = np.abs(full[iu]) if absolute else full[iu]
+            expected = np.sort(scores)[::-1][:4]
+            pairs = top_k_pairs(returns, k=4, block_size=8, absolute=absolute)
+            got = np.array([abs(v) if absolute else v for _, _, v in pairs])
+            assert np.allclose(got, expected)
+        assert top_k_pairs(returns, k=1, labels=labels)[0][:2] == ("T0", "T1")
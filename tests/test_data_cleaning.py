@@ -4,7 +4,7 @@ Tests unitarios para el módulo data_cleaning.
 import pytest
 import pandas as pd
 import numpy as np
-from src.utils.data_cleaning import clean_dataframe, check_temporal_consistency
+from src.utils.data_cleaning import clean_dataframe, clean_universe, check_temporal_consistency
 
 
 class TestDataCleaning:
@@ -99,3 +99,62 @@ class TestDataCleaning:
         result = check_temporal_consistency(df)
         # Puede ser True o False dependiendo de la implementación
         assert isinstance(result, bool)
+
+
+class TestCleanUniverse:
+    """Tests de la limpieza en una pasada de DataFrames con varios tickers."""
+
+    @pytest.fixture
+    def universe(self):
+        return pd.DataFrame({
+            'date': ['2023-01-02', '2023-01-01', '2023-01-01', '2023-01-02', '2023-01-01', '2023-01-03'],
+            'close': [np.nan, 10.0, 20.0, 21.0, 10.5, np.nan],
+            'volume': [100.0, 100.0, 200.0, 200.0, 999.0, 300.0],
+            'ticker': ['AAA', 'AAA', 'BBB', 'BBB', 'AAA', 'CCC'],
+        })
+
+    def test_dedup_sort_and_fill_within_ticker(self, universe):
+        cleaned = clean_universe(universe, downcast=False)
+        assert list(cleaned['ticker']) == ['AAA', 'AAA', 'BBB', 'BBB', 'CCC']
+        assert list(cleaned['date']) == ['2023-01-01', '2023-01-02', '2023-01-01', '2023-01-02', '2023-01-03']
+        # Se conserva la primera fila de cada (ticker, fecha) y el relleno no cruza tickers
+        assert cleaned['close'].iloc[0] == 10.0
+        assert cleaned['close'].iloc[1] == 10.0
+        assert np.isnan(cleaned['close'].iloc[4])
+        assert list(cleaned.index) == list(range(5))
+
+    def test_matches_groupwise_pandas(self):
+        from tests.synthetic import make_ohlcv_frame
+        df = make_ohlcv_frame(20_000, n_tickers=7, nan_fraction=0.05)
+        expected = df.drop_duplicates(subset=['ticker', 'date']).sort_values(['ticker', 'date'], kind='stable')
+        expected = expected.reset_index(drop=True)
+        values = ['open', 'high', 'low', 'close', 'volume']
+        expected[values] = expected.groupby('ticker')[values].ffill()
+        expected[values] = expected.groupby('ticker')[values].bfill()
+        pd.testing.assert_frame_equal(clean_universe(df, downcast=False), expected)
+
+    def test_downcast(self, universe):
+        cleaned = clean_universe(universe)
+        assert isinstance(cleaned['ticker'].dtype, pd.CategoricalDtype)
+        assert cleaned['close'].dtype == np.float32
+        assert cleaned['volume'].dtype == np.uint16
+        assert list(cleaned['ticker'].astype(str)) == ['AAA', 'AAA', 'BBB', 'BBB', 'CCC']
+
+    def test_downcast_keeps_whole_unit_prices_float(self):
+        """Los cierres en unidades enteras (yenes) quedan en float32 y sus diferencias no desbordan."""
+        df = pd.DataFrame({'date': [1, 2, 3, 4], 'close': [7203.0, 7223.0, 7167.0, 7101.0],
+                           'volume': [100.0, 200.0, 300.0, 400.0], 'ticker': ['7203.T'] * 4})
+        cleaned = clean_universe(df)
+        assert cleaned['close'].dtype == np.float32
+        assert cleaned['volume'].dtype == np.uint16
+        np.testing.assert_array_equal(np.diff(cleaned['close'].to_numpy()), [20.0, -56.0, -66.0])
+
+    def test_already_clean_reuses_columns(self):
+        df = pd.DataFrame({'date': [1, 2, 1], 'close': [1.0, 2.0, 3.0], 'ticker': ['A', 'A', 'B']})
+        cleaned = clean_universe(df, downcast=False)
+        assert np.shares_memory(cleaned['close'].to_numpy(), df['close'].to_numpy())
+
+    def test_clean_dataframe_multi_ticker(self, universe):
+        """clean_dataframe no rellena un ticker con valores de otro."""
+        cleaned = clean_dataframe(universe)
+        assert np.isnan(cleaned.loc[cleaned['ticker'] == 'CCC', 'close']).all()
@@ -0,0 +1,76 @@
+"""
+Tests unitarios para la reducción de puntos de los gráficos (visualizations.decimation).
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from src.visualizations.decimation import (
+    minmax_indices, lttb_indices, decimate, decimate_paths, fan_chart_bands, draw_fan_chart,
+)
+from src.visualizations.render import paths_collection
+
+
+@pytest.fixture
+def series():
+    return 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 10_000))
+
+
+class TestDecimation:
+    """Tests de minmax, LTTB y fan chart."""
+
+    def test_minmax_keeps_extremes(self, series):
+        """Se conservan el primer y último punto y el mínimo y máximo global."""
+        idx = minmax_indices(series, 100)
+        assert len(idx) <= 2 * 100 + 2
+        assert np.all(np.diff(idx) > 0)
+        assert idx[0] == 0 and idx[-1] == len(series) - 1
+        assert series.argmin() in idx and series.argmax() in idx
+
+    def test_minmax_2d(self, series):
+        paths = np.stack([series, -series])
+        idx = minmax_indices(paths, 50)
+        assert idx.shape[0] == 2
+        for row, path in zip(idx, paths):
+            assert path.argmin() in row and path.argmax() in row
+
+    def test_lttb(self, series):
+        idx = lttb_indices(np.arange(len(series)), series, 500)
+        assert len(idx) == 500
+        assert idx[0] == 0 and idx[-1] == len(series) - 1
+        assert np.all(np.diff(idx) > 0)
+
+    def test_decimate_dates_and_short_series(self, series):
+        """Con fechas funciona igual, y las series cortas no se tocan."""
+        dates = pd.date_range("2000-01-01", periods=len(series)).to_numpy()
+        for method in ("minmax", "lttb"):
+            x, y = decimate(dates, series, 200, method=method)
+            assert len(x) == len(y) <= 2 * 200 + 2
+            assert np.issubdtype(x.dtype, np.datetime64)
+        days = [d.date() for d in pd.date_range("2000-01-01", periods=len(series))]
+        x, y = decimate(days, series, 200, method="lttb")  # lista de date, como en plot_price_series
+        assert len(x) == len(y) == 2 * 200 and x[0] == days[0] and x[-1] == days[-1]
+        x, y = decimate(dates[:100], series[:100], 200)
+        assert len(y) == 100
+        with pytest.raises(ValueError):
+            decimate(dates, series, 200, method="otro")
+
+    def test_decimated_paths_collection(self, series):
+        """Con width_px cada segmento tiene como mucho ~2 puntos por píxel."""
+        paths = np.stack([series + i for i in range(20)])
+        x, y = decimate_paths(paths, 100)
+        assert x.shape == y.shape and x.shape[1] <= 202
+        assert np.allclose(y, np.take_along_axis(paths, x, axis=1))
+        collection = paths_collection(paths, width_px=100)
+        assert len(collection.get_segments()) == 20
+        assert all(len(s) <= 202 for s in collection.get_segments())
+
+    def test_fan_chart(self):
+        paths = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, (2000, 500)), axis=1))
+        x, bands = fan_chart_bands(paths, width_px=100)
+        assert bands.shape == (5, len(x)) and len(x) <= 100
+        assert np.all(np.diff(bands, axis=0) >= 0)
+        fig = Figure()
+        ax = fig.subplots()
+        draw_fan_chart(ax, paths, width_px=100)
+        assert len(ax.collections) == 2 and len(ax.lines) == 1
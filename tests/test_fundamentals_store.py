@@ -0,0 +1,157 @@
+"""
+Tests unitarios para el almacén versionado de fundamentales y su descarga con sellos del proveedor.
+"""
+import json
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from src.extractors.yahoo_fundamentals import FundamentalsFetcher
+from src.utils.fundamentals_store import FundamentalsStore, flatten_section, statement_frame
+
+
+def make_statement(periods=("2023-09-30", "2022-09-30"), scale=1.0):
+    """Estado financiero sintético: partidas x fechas de cierre (la más reciente primero)."""
+    columns = pd.to_datetime(list(periods))
+    data = {col: [100.0 * scale * (i + 1), np.nan if i else 40.0 * scale] for i, col in enumerate(columns)}
+    return pd.DataFrame(data, index=["Total Revenue", "Net Income"])
+
+
+class FakeTicker:
+    """Objeto de Yahoo mínimo que cuenta los accesos a los estados financieros."""
+    def __init__(self, info, statement):
+        self.info = info
+        self.fast_info = {"lastPrice": info.get("currentPrice")}
+        self.statement = statement
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name in ("financials", "balancesheet", "cashflow"):
+            self.calls.append(name)
+            return self.statement
+        raise AttributeError(name)
+
+
+class TestFundamentalsStore:
+    """Tests de instantáneas diferenciales y consultas en una fecha."""
+
+    def test_flatten_and_rebuild_statement(self):
+        """Un estado financiero se aplana a partida|fecha y se reconstruye sin los nulos."""
+        statement = make_statement()
+        flat = flatten_section(statement)
+        assert flat["Total Revenue|2023-09-30"] == 100.0
+        assert "Net Income|2022-09-30" not in flat
+        rebuilt = statement_frame(flat)
+        assert list(rebuilt.columns) == list(statement.columns)
+        pd.testing.assert_frame_equal(rebuilt.loc[statement.index], statement, check_freq=False)
+
+    def test_only_changed_fields_are_stored(self, tmp_path):
+        """La segunda instantánea solo guarda los campos cambiados y los eliminados."""
+        store = FundamentalsStore(str(tmp_path))
+        store.put("AAA", {"info": {"trailingPE": 20.0, "sector": "Tech", "beta": 1.1}}, as_of="2024-01-02")
+        entry = store.put("AAA", {"info": {"trailingPE": 21.5, "sector": "Tech"}}, as_of="2024-01-03")
+        assert entry["set"] == {"info": {"trailingPE": 21.5}}
+        assert entry["unset"] == {"info": ["beta"]}
+        lines = (tmp_path / "AAA" / "log.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2 and "  " not in lines[1]
+        assert store.latest("AAA") == {"info": {"trailingPE": 21.5, "sector": "Tech"}}
+
+    def test_point_in_time_queries(self, tmp_path):
+        """value y snapshot devuelven el estado vigente en cada fecha, también entre instantáneas."""
+        store = FundamentalsStore(str(tmp_path))
+        for day, pe in (("2024-01-02", 20.0), ("2024-01-05", 20.0), ("2024-01-10", 25.0)):
+            store.put("AAA", {"info": {"trailingPE": pe, "sector": "Tech"}}, as_of=day)
+        assert store.value("AAA", "trailingPE", "2024-01-01") is None
+        assert store.value("AAA", "trailingPE", "2024-01-09") == 20.0
+        assert store.value("AAA", "trailingPE", "2024-01-10") == 25.0
+        assert store.value("AAA", "trailingPE") == 25.0
+        assert store.snapshot("AAA", "2024-01-07") == {"info": {"trailingPE": 20.0, "sector": "Tech"}}
+        history = store.history("AAA", "trailingPE")
+        assert list(history.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-10"]
+
+    def test_same_day_snapshots_are_merged(self, tmp_path):
+        """Dos capturas el mismo día dejan una sola instantánea con el último estado."""
+        store = FundamentalsStore(str(tmp_path))
+        store.put("AAA", {"info": {"trailingPE": 20.0, "beta": 1.0}}, as_of="2024-01-02")
+        store.put("AAA", {"info": {"trailingPE": 21.0, "beta": 1.0, "new": 1}}, as_of="2024-01-03")
+        store.put("AAA", {"info": {"trailingPE": 22.0}}, as_of="2024-01-03")
+        assert store.dates("AAA") == ["2024-01-02", "2024-01-03"]
+        assert store.latest("AAA") == {"info": {"trailingPE": 22.0}}
+        assert store.value("AAA", "trailingPE", "2024-01-03") == 22.0
+        assert store.value("AAA", "beta", "2024-01-03") is None
+        assert store.value("AAA", "beta", "2024-01-02") == 1.0
+
+    def test_out_of_order_snapshot_raises(self, tmp_path):
+        """No se admiten instantáneas anteriores a la última."""
+        store = FundamentalsStore(str(tmp_path))
+        store.put("AAA", {"info": {"trailingPE": 20.0}}, as_of="2024-01-05")
+        with pytest.raises(ValueError):
+            store.put("AAA", {"info": {"trailingPE": 19.0}}, as_of="2024-01-02")
+
+    def test_index_is_rebuilt_from_log(self, tmp_path):
+        """Sin index.json ni latest.json las consultas se responden reconstruyéndolos del registro."""
+        store = FundamentalsStore(str(tmp_path))
+        store.put("AAA", {"info": {"trailingPE": 20.0}}, as_of="2024-01-02", stamps={"info": 1})
+        store.put("AAA", {"info": {"trailingPE": 25.0}}, as_of="2024-01-10", stamps={"info": 1})
+        os.remove(tmp_path / "AAA" / "index.json")
+        (tmp_path / "AAA" / "latest.json").write_text("{", encoding="utf-8")
+        fresh = FundamentalsStore(str(tmp_path))
+        assert fresh.value("AAA", "trailingPE", "2024-01-05") == 20.0
+        assert fresh.stale("AAA", {"info": 1}, as_of="2024-01-10") == []
+        assert fresh.tickers() == ["AAA"]
+
+
+class TestFundamentalsFetcher:
+    """Tests de la descarga con sellos del proveedor."""
+
+    def test_statements_skipped_while_stamp_unchanged(self, tmp_path):
+        """Los estados no se vuelven a pedir mientras no cambie lastFiscalYearEnd ni caduquen."""
+        store = FundamentalsStore(str(tmp_path))
+        fetcher = FundamentalsFetcher(store, max_age_days=30, ticker_factory=lambda t: None)
+        info = {"trailingPE": 20.0, "currentPrice": 100.0, "lastFiscalYearEnd": 1696032000}
+        first = FakeTicker(info, make_statement())
+        fetcher.fetch("AAA", first, as_of="2024-01-02")
+        assert sorted(first.calls) == ["balancesheet", "cashflow", "financials"]
+
+        second = FakeTicker({**info, "trailingPE": 21.0}, make_statement(scale=2.0))
+        result = fetcher.fetch("AAA", second, as_of="2024-01-03")
+        assert second.calls == []
+        assert result["financials"].loc["Total Revenue"].iloc[0] == 100.0
+        assert store.value("AAA", "trailingPE", "2024-01-02") == 20.0
+
+        new_year = FakeTicker({**info, "lastFiscalYearEnd": 1727654400},
+                              make_statement(("2024-09-30", "2023-09-30")))
+        fetcher.fetch("AAA", new_year, as_of="2024-01-04")
+        assert len(new_year.calls) == 3
+        entry = json.loads((tmp_path / "AAA" / "log.jsonl").read_text(encoding="utf-8").splitlines()[-1])
+        assert "Total Revenue|2024-09-30" in entry["set"]["financials"]
+
+        expired = FakeTicker({**info, "lastFiscalYearEnd": 1727654400}, make_statement())
+        fetcher.fetch("AAA", expired, as_of="2024-03-01")
+        assert len(expired.calls) == 3
+
+    def test_failed_statement_keeps_previous(self, tmp_path):
+        """Un estado vacío no borra el guardado y se vuelve a pedir en la siguiente ejecución."""
+        store = FundamentalsStore(str(tmp_path))
+        fetcher = FundamentalsFetcher(store, ticker_factory=lambda t: None)
+        fetcher.fetch("AAA", FakeTicker({"trailingPE": 20.0, "currentPrice": 1.0}, make_statement()),
+                      as_of="2024-01-02")
+        empty = FakeTicker({"trailingPE": 20.0, "currentPrice": 1.0, "lastFiscalYearEnd": 1},
+                           pd.DataFrame())
+        result = fetcher.fetch("AAA", empty, as_of="2024-01-03")
+        assert result["cashflow"].loc["Total Revenue"].iloc[0] == 100.0
+        assert store.stale("AAA", {"cashflow": 1}, as_of="2024-01-03") == ["cashflow"]
+
+    def test_extractor_store_under_output_dir(self, tmp_path, monkeypatch):
+        """Sin FUNDAMENTALS_STORE_DIR, el almacén cuelga de la carpeta de outputs de la ejecución."""
+        from src.extractors import yahoo_extractor
+        from src.utils.output_manager import OutputManager, set_output_manager
+        info = {"trailingPE": 20.0, "currentPrice": 100.0}
+        monkeypatch.setattr(yahoo_extractor, "FUNDAMENTALS_STORE_DIR", "")
+        monkeypatch.setattr(yahoo_extractor.yf, "Ticker", lambda ticker: FakeTicker(info, make_statement()))
+        previous = set_output_manager(OutputManager(str(tmp_path)))
+        try:
+            assert yahoo_extractor.YahooFinanceExtractor().get_fundamentals("AAA") == info
+        finally:
+            set_output_manager(previous)
+        assert FundamentalsStore(str(tmp_path / "fundamentals")).tickers() == ["AAA"]
@@ -0,0 +1,106 @@
+"""
+Tests unitarios para los indicadores técnicos por panel (fecha x ticker) con actualización incremental.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.analytics.indicators import FIELDS, IndicatorEngine, Panel, compute_indicators
+from tests.synthetic import make_ohlcv_frame, make_portfolio
+
+
+def make_panel(n_dates=300, n_tickers=4, seed=0):
+    """Panel sintético con huecos interiores y un ticker que empieza más tarde."""
+    df = make_ohlcv_frame(n_dates * n_tickers, n_tickers=n_tickers, nan_fraction=0.0,
+                          duplicate_fraction=0.0, seed=seed)
+    df = df[~((df["ticker"] == "SYN1") & (df["date"] < pd.Timestamp("1990-03-01")))]
+    df.loc[df.sample(frac=0.02, random_state=seed).index, "close"] = np.nan
+    return df, Panel.from_frame(df)
+
+
+def reference(close: pd.Series, high: pd.Series, low: pd.Series, volume: pd.Series) -> dict:
+    """Indicadores de un ticker calculados con pandas."""
+    price = close.ffill()
+    wilder = dict(alpha=1 / 14, adjust=False)
+    change = price.diff()
+    gains = change.clip(lower=0).ewm(**wilder).mean()
+    losses = (-change).clip(lower=0).ewm(**wilder).mean()
+    rsi = (100 - 100 / (1 + gains / losses)).where(change.notna().cumsum() >= 14)
+    line = price.ewm(span=12, adjust=False).mean() - price.ewm(span=26, adjust=False).mean()
+    signal = line.ewm(span=9, adjust=False).mean()
+    prev = price.shift()
+    true_range = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    true_range[(high - low).isna()] = np.nan
+    atr = true_range.ewm(**wilder).mean().where(true_range.notna().cumsum() >= 14)
+    obv = (np.sign(price.diff()) * volume).fillna(0).cumsum().where(price.notna())
+    return {
+        "sma_20": price.rolling(20).mean(), "ema_20": price.ewm(span=20, adjust=False).mean(),
+        "rsi_14": rsi, "macd": line, "macd_signal": signal, "macd_hist": line - signal,
+        "bb_upper": price.rolling(20).mean() + 2 * price.rolling(20).std(ddof=0), "atr_14": atr, "obv": obv,
+    }
+
+
+class TestIndicatorEngine:
+    """Tests de los indicadores vectorizados frente a pandas y de su memoización."""
+
+    def test_matches_pandas(self):
+        """Todos los indicadores coinciden con su cálculo por ticker con pandas."""
+        _, panel = make_panel()
+        engine = IndicatorEngine(panel)
+        line, sig, hist = engine.macd()
+        _, upper, _ = engine.bollinger()
+        ours = {"sma_20": engine.sma(20), "ema_20": engine.ema(20), "rsi_14": engine.rsi(14), "macd": line,
+                "macd_signal": sig, "macd_hist": hist, "bb_upper": upper, "atr_14": engine.atr(14),
+                "obv": engine.obv()}
+        for j, ticker in enumerate(panel.tickers):
+            fields = {name: pd.Series(panel[name][:, j]) for name in ("close", "high", "low", "volume")}
+            expected = reference(fields["close"], fields["high"].ffill(), fields["low"].ffill(), fields["volume"])
+            for name, values in ours.items():
+                np.testing.assert_allclose(values[:, j], expected[name].to_numpy(), rtol=1e-9, atol=1e-9,
+                                           err_msg=f"{name} de {ticker}")
+
+    def test_intermediates_are_memoized(self):
+        """El MACD reutiliza las EMA ya calculadas y pedir dos veces un indicador no lo recalcula."""
+        _, panel = make_panel(n_dates=50)
+        engine = IndicatorEngine(panel)
+        ema = engine.ema(12)
+        keys = len(engine._rows)
+        engine.macd()
+        assert len(engine._rows) == keys + 4  # EMA de 26, línea, señal e histograma
+        assert engine.ema(12) is not ema and np.shares_memory(engine.ema(12), ema)
+        with pytest.raises(ValueError):
+            ema[0, 0] = 1.0
+
+    def test_append_matches_batch(self):
+        """Añadir barras una a una (con una intradía sustituida) equivale a recalcular el panel completo."""
+        _, panel = make_panel(n_dates=120)
+        split = 80
+        head = Panel(panel.dates[:split], panel.tickers, {f: panel[f][:split] for f in FIELDS})
+        engine = IndicatorEngine(head)
+        engine.latest()
+        for t in range(split, len(panel.dates)):
+            if t == split + 5:
+                engine.append(panel.dates[t], {f: panel[f][t] * 1.05 for f in FIELDS})
+            engine.append(panel.dates[t], {f: panel[f][t] for f in FIELDS})
+        batch = IndicatorEngine(panel)
+        pd.testing.assert_frame_equal(engine.latest(), batch.latest(), rtol=1e-10)
+        np.testing.assert_allclose(engine.rsi(), batch.rsi(), rtol=1e-10)
+        assert len(engine) == len(panel.dates)
+
+    def test_append_out_of_order_raises(self):
+        """No se admiten barras anteriores a la última."""
+        _, panel = make_panel(n_dates=30)
+        engine = IndicatorEngine(panel)
+        with pytest.raises(ValueError):
+            engine.append(panel.dates[0], {"close": np.ones(len(panel.tickers))})
+
+    def test_from_series_and_compute_indicators(self):
+        """Un Panel de PriceSeries y compute_indicators dan una fila por ticker con sus últimos valores."""
+        portfolio = make_portfolio(3, n_points=60)
+        panel = Panel.from_series(portfolio.assets)
+        assert panel.tickers == ["SYN0", "SYN1", "SYN2"] and panel["close"].shape == (60, 3)
+        df = pd.concat([pd.DataFrame({"date": [p.date for p in s.data], "close": [p.close for p in s.data],
+                                      "ticker": s.symbol}) for s in portfolio.assets])
+        latest = compute_indicators(df)
+        assert list(latest.index) == panel.tickers
+        assert "atr_14" not in latest.columns
+        np.testing.assert_allclose(latest["sma_20"], IndicatorEngine(panel).sma(20)[-1])
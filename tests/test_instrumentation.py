@@ -0,0 +1,71 @@
+"""
+Tests unitarios para la instrumentación de ejecuciones (utils.instrumentation).
+"""
+import json
+import threading
+import pytest
+from src.utils.instrumentation import (
+    Instrumentation, set_instrumentation, span, count, ticker_context, instrumented, load_hook, peak_rss_bytes,
+)
+
+
+@pytest.fixture
+def instrumentation():
+    inst = Instrumentation()
+    previous = set_instrumentation(inst)
+    yield inst
+    set_instrumentation(previous)
+
+
+class TestInstrumentation:
+    """Tests de spans, contadores, tickers por hilo, informe y hooks."""
+
+    def test_spans_and_counters(self, instrumentation):
+        @instrumented("work")
+        def work(n):
+            return sum(range(n))
+
+        with ticker_context("AAA"):
+            work(10_000)
+            with span("download"):
+                count("bytes_downloaded", 100, stage="download")
+        work(10)
+        stages = instrumentation.stages
+        assert stages["work"]["count"] == 2
+        assert stages["download"]["bytes_downloaded"] == 100
+        assert instrumentation.tickers["AAA"]["work"]["count"] == 1
+        assert instrumentation.counters["bytes_downloaded"] == 100
+        assert stages["work"]["wall_s"] >= 0 and stages["work"]["cpu_s"] >= 0
+
+    def test_ticker_context_per_thread(self, instrumentation):
+        """Cada hilo asigna sus spans a su propio ticker."""
+        def worker(symbol):
+            with ticker_context(symbol):
+                for _ in range(50):
+                    with span("analyze"):
+                        pass
+        threads = [threading.Thread(target=worker, args=(s,)) for s in ("A", "B", "C")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert instrumentation.stages["analyze"]["count"] == 150
+        assert all(instrumentation.tickers[s]["analyze"]["count"] == 50 for s in ("A", "B", "C"))
+
+    def test_report_and_hooks(self, instrumentation, tmp_path):
+        received = []
+        instrumentation.add_hook(received.append)
+        instrumentation.add_hook(lambda report: 1 / 0)  # un hook roto no interrumpe la ejecución
+        instrumentation.record("render", 0.5, 0.25, bytes_written=10)
+        report = instrumentation.write_report(tmp_path / "run_report.json")
+        instrumentation.emit(report)
+        assert received == [report]
+        assert json.loads((tmp_path / "run_report.json").read_text()) == report
+        assert report["stages"]["render"] == {"count": 1, "wall_s": 0.5, "cpu_s": 0.25, "bytes_written": 10}
+        rss = peak_rss_bytes()
+        assert rss is None or rss > 0
+
+    def test_load_hook(self):
+        assert load_hook("json:dumps") is json.dumps
+        with pytest.raises(ValueError):
+            load_hook("json.dumps")
@@ -1,8 +1,19 @@
 """
 Tests unitarios para el módulo main.
 """
+import os
+import sys
+import json
+import subprocess
 import pytest
-from src.main import print_separator, print_title, EXTRACTORS
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+from src.main import (
+    print_separator, print_title, EXTRACTORS, load_config, resolve_extractor, run, main,
+    EXIT_OK, EXIT_PARTIAL, EXIT_FAILURE,
+)
 
 
 class TestMain:
@@ -28,6 +39,17 @@ class TestMain:
         assert all(len(item) == 2 for item in EXTRACTORS)  # (nombre, clase)
         assert all(hasattr(item[1], 'get_historical_prices') for item in EXTRACTORS)
     
+    def test_lazy_startup(self):
+        """Importar src.main no carga pandas, matplotlib ni los extractores (y sus dependencias)."""
+        script = (
+            "import sys, src.main as m\n"
+            "heavy = ['pandas', 'matplotlib', 'yfinance', 'requests', 'numba', 'src.extractors.yahoo_enriched']\n"
+            "print([h for h in heavy if h in sys.modules], [e.loaded for _, e in m.EXTRACTORS])\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "[] [False, False, False, False]"
+
     @pytest.mark.slow
     @pytest.mark.integration
     def test_main_function_exists(self):
@@ -37,3 +59,288 @@ class TestMain:
         """
         from src.main import main
         assert callable(main)
+
+
+class FakeExtractor:
+    """Extractor sin red que devuelve datos sintéticos."""
+    def get_historical_prices(self, ticker, start, end):
+        if ticker == "FAIL":
+            raise RuntimeError("error de descarga")
+        dates = pd.date_range("2023-01-02", periods=30, freq="B")
+        closes = 100 + np.arange(30) * (1 + len(ticker) * 0.1)
+        return pd.DataFrame({
+            "date": dates.date, "open": closes, "high": closes, "low": closes,
+            "close": closes, "volume": 1000.0, "ticker": ticker,
+        })
+
+
+class TestBatchMode:
+    """Tests de la configuración por línea de comandos y del modo batch."""
+
+    def test_load_config_defaults(self):
+        config = load_config([])
+        assert config.symbols
+        assert config.batch is False
+        assert config.plots is True
+
+    def test_load_config_cli_and_file(self, tmp_path):
+        symbols_file = tmp_path / "symbols.txt"
+        symbols_file.write_text("aapl\n# comentario\nmsft, nflx\naapl\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"mc_days": 10, "extractor": "finnhub", "plots": True}))
+        config = load_config(["--batch", "--config", str(config_file), "--symbols-file", str(symbols_file),
+                              "--no-plots", "--mc-simulations", "50"])
+        assert config.symbols == ["AAPL", "MSFT", "NFLX"]
+        assert config.batch is True
+        assert config.plots is False
+        assert config.mc_days == 10
+        assert config.mc_simulations == 50
+        assert config.extractor == "finnhub"
+
+    def test_load_config_unknown_option(self, tmp_path):
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"foo": 1}))
+        with pytest.raises(ValueError, match="Opciones desconocidas"):
+            load_config(["--config", str(config_file)])
+
+    def test_resolve_extractor(self):
+        assert resolve_extractor("2") is EXTRACTORS[1][1]
+        assert resolve_extractor("finnhub") is EXTRACTORS[3][1]
+        with pytest.raises(ValueError):
+            resolve_extractor("9")
+
+    def test_batch_requires_extractor(self):
+        assert main(["--batch", "--symbols", "AAPL"]) == EXIT_FAILURE
+
+    def test_run_batch(self, tmp_path):
+        """El modo batch no bloquea, genera outputs y devuelve un resumen con código de salida."""
+        config = load_config(["--batch", "--symbols", "AAA,BBBB,FAIL", "--output-dir", str(tmp_path),
+                              "--mc-simulations", "20", "--mc-days", "5", "--seed", "1"])
+        summary = run(config, FakeExtractor())
+        assert summary["symbols_ok"] == ["AAA", "BBBB"]
+        assert "FAIL" in summary["symbols_failed"]
+        assert summary["exit_code"] == EXIT_PARTIAL
+        assert all(os.path.exists(path) for path in summary["outputs"])
+        assert any(path.endswith("portfolio_montecarlo.png") for path in summary["outputs"])
+        with open(os.path.join(summary["output_dir"], "run_summary.json"), encoding="utf-8") as f:
+            assert json.load(f)["exit_code"] == EXIT_PARTIAL
+        # La caché de simulaciones va bajo la carpeta de outputs de la ejecución
+        assert os.listdir(tmp_path / ".cache" / "simulations")
+
+    def test_run_unseeded_reuses_simulations(self, tmp_path, monkeypatch):
+        """Sin semilla se sortea una por ejecución: la cartera reutiliza las simulaciones sin tocar el disco."""
+        from src.simulation.models import GBMModel
+        calls = []
+        simulate = GBMModel.simulate
+        monkeypatch.setattr(GBMModel, "simulate", lambda self, *a, **k: calls.append(1) or simulate(self, *a, **k))
+        config = load_config(["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path),
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0"])
+        summary = run(config, FakeExtractor())
+        assert config.seed is None and isinstance(summary["montecarlo_seed"], int)
+        assert len(calls) == 2
+        assert not os.path.exists(tmp_path / ".cache" / "simulations")
+
+    def test_run_batch_without_plots(self, tmp_path):
+        config = load_config(["--batch", "--symbols", "AAA", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0"])
+        summary = run(config, FakeExtractor())
+        assert summary["exit_code"] == EXIT_OK
+        assert not any(path.endswith(".png") for path in summary["outputs"])
+
+    def test_run_validation(self, tmp_path):
+        """Cada ticker recibe una puntuación de calidad; --no-validate desactiva la validación."""
+        argv = ["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path), "--no-plots",
+                "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0", "--no-incremental"]
+        summary = run(load_config(argv + ["--repair-data"]), FakeExtractor())
+        assert set(summary["data_quality"]) == {"AAA", "BBBB"}
+        assert all(0 <= score <= 1 for score in summary["data_quality"].values())
+        config = load_config(argv + ["--no-validate"])
+        assert not config.validate and not config.repair_data
+        assert "data_quality" not in run(config, FakeExtractor())
+
+    def test_gaps_start_at_listing(self, tmp_path):
+        """Un ticker que empieza a cotizar después de --start solo informa de sus huecos interiores."""
+        class ListingExtractor(FakeExtractor):
+            def get_historical_prices(self, ticker, start, end):
+                df = super().get_historical_prices(ticker, start, end)
+                if ticker == "NEW":  # cotiza desde el 17 de enero y le falta el 1 de febrero
+                    dates = pd.to_datetime(df["date"])
+                    df = df[(dates >= "2023-01-17") & (dates != "2023-02-01")].reset_index(drop=True)
+                return df
+
+        config = load_config(["--batch", "--symbols", "AAA,NEW", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0",
+                              "--no-incremental", "--start", "2023-01-02", "--end", "2023-02-11"])
+        summary = run(config, ListingExtractor())
+        assert summary["missing_sessions"] == {"NEW": 1}
+        gaps = pd.read_csv(os.path.join(summary["output_dir"], "data_gaps.csv"))
+        assert gaps["ticker"].tolist() == ["NEW"]
+
+    def test_incremental_history_csv(self, tmp_path, monkeypatch):
+        """Con la caché, el CSV del histórico tiene todo el rango aunque solo se descargue el tramo nuevo."""
+        from src.utils.output_manager import get_output_manager
+
+        class SavingExtractor(FakeExtractor):
+            def get_historical_prices(self, ticker, start, end):
+                df = super().get_historical_prices(ticker, start, end)
+                dates = pd.to_datetime(df["date"])
+                df = df[(dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))].reset_index(drop=True)
+                get_output_manager().save_dataframe(df, f"{ticker}_historical.csv")
+                return df
+
+        argv = ["--batch", "--symbols", "AAA", "--output-dir", str(tmp_path), "--no-plots", "--mc-simulations",
+                "20", "--mc-days", "5", "--render-workers", "0", "--start", "2023-01-02"]
+        monkeypatch.setattr("src.utils.output_manager.OUTPUTS_DATE_FORMAT", "run1")
+        run(load_config(argv + ["--end", "2023-01-21"]), SavingExtractor())
+        monkeypatch.setattr("src.utils.output_manager.OUTPUTS_DATE_FORMAT", "run2")
+        second = run(load_config(argv + ["--end", "2023-02-11"]), SavingExtractor())
+        saved = pd.read_csv(os.path.join(second["output_dir"], "AAA_historical.csv"))
+        assert len(saved) == 30
+
+    def test_run_adjusted_close(self, tmp_path):
+        """Un split se ajusta antes de validar; con --no-adjusted-close el salto queda en cuarentena."""
+        from src.utils.corporate_actions import action_table
+
+        class SplitExtractor(FakeExtractor):
+            def get_historical_prices(self, ticker, start, end):
+                df = super().get_historical_prices(ticker, start, end)
+                df.loc[20:, ["open", "high", "low", "close"]] /= 4
+                return df
+
+            def get_corporate_actions(self, ticker, start, end):
+                return action_table(splits=pd.Series([4.0], index=[pd.Timestamp("2023-01-30")]), ticker=ticker)
+
+        argv = ["--batch", "--symbols", "AAA", "--output-dir", str(tmp_path), "--no-plots",
+                "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0", "--no-incremental"]
+        adjusted = run(load_config(argv), SplitExtractor())
+        assert adjusted["data_quality"]["AAA"] == 1.0
+        raw = run(load_config(argv + ["--no-adjusted-close"]), SplitExtractor())
+        assert raw["data_quality"]["AAA"] < 1.0
+
+    def test_run_indicators(self, tmp_path):
+        """--indicators guarda los últimos indicadores técnicos de cada ticker en indicators.csv."""
+        config = load_config(["--batch", "--symbols", "AAA,BBB", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0", "--indicators"])
+        summary = run(config, FakeExtractor())
+        assert summary["indicators"] == 2
+        indicators = pd.read_csv(os.path.join(summary["output_dir"], "indicators.csv"))
+        assert indicators["ticker"].tolist() == ["AAA", "BBB"]
+        assert indicators[["sma_20", "rsi_14", "macd", "atr_14", "obv"]].notna().all().all()
+
+    def test_run_sec_filings(self, tmp_path, monkeypatch):
+        """--sec-filings consulta EDGAR para todos los tickers en una llamada y guarda sec_filings.csv."""
+        from src.utils.sec_edgar import EdgarClient, Filing
+        calls = []
+
+        def filings_many(self, tickers, forms=None, limit=None):
+            calls.append(list(tickers))
+            return [Filing("AAA", 1, "10-K", "0000000001-24-000001", "2024-02-01", "2023-12-31", "a.htm")], \
+                {"BBBB": "sin CIK en SEC"}
+
+        monkeypatch.setattr("src.main.SEC_USER_AGENT", "test test@example.com")
+        monkeypatch.setattr(EdgarClient, "filings_many", filings_many)
+        config = load_config(["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0", "--sec-filings"])
+        summary = run(config, FakeExtractor())
+        assert calls == [["AAA", "BBBB"]]
+        assert summary["sec_filings"] == {"AAA": 1}
+        assert pd.read_csv(os.path.join(summary["output_dir"], "sec_filings.csv"))["form"].tolist() == ["10-K"]
+
+    def test_run_sec_items(self, tmp_path, monkeypatch):
+        """--sec-items extrae los Items del último filing de cada formulario y los lista en sec_items.csv."""
+        from src.utils.sec_edgar import EdgarClient, Filing
+        from src.utils.sec_documents import ExtractionResult, FilingProcessor
+        filings = [Filing("AAA", 1, form, f"0000000001-24-00000{i}", "2024-02-01", "", "a.htm")
+                   for i, form in enumerate(["10-Q", "10-K", "10-Q"])]
+        processed = []
+
+        def process(self, filing):
+            processed.append(filing.accession_number)
+            return ExtractionResult(filing.accession_number, {item: f"{item}.txt.gz" for item in self.items})
+
+        monkeypatch.setattr("src.main.SEC_USER_AGENT", "test test@example.com")
+        monkeypatch.setattr(EdgarClient, "filings_many", lambda self, tickers, forms=None: (filings, {}))
+        monkeypatch.setattr(FilingProcessor, "process", process)
+        config = load_config(["--batch", "--symbols", "AAA", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0",
+                              "--sec-filings", "--sec-items", "1a,7"])
+        summary = run(config, FakeExtractor())
+        assert sorted(processed) == ["0000000001-24-000000", "0000000001-24-000001"]
+        assert summary["sec_items"] == 4
+
+    def test_run_sec_items_shared_cik(self, tmp_path, monkeypatch):
+        """Dos clases de acciones con el mismo CIK descargan su presentación común una sola vez."""
+        from src.utils.sec_edgar import EdgarClient, Filing
+        from src.utils.sec_documents import ExtractionResult, FilingProcessor
+        filings = [Filing(ticker, 1, "10-K", "0000000001-24-000001", "2024-02-01", "", "a.htm")
+                   for ticker in ("AAA", "BBB")]
+        processed = []
+
+        def process(self, filing):
+            processed.append(filing.accession_number)
+            return ExtractionResult(filing.accession_number, {item: f"{item}.txt.gz" for item in self.items})
+
+        monkeypatch.setattr("src.main.SEC_USER_AGENT", "test test@example.com")
+        monkeypatch.setattr(EdgarClient, "filings_many", lambda self, tickers, forms=None: (filings, {}))
+        monkeypatch.setattr(FilingProcessor, "process", process)
+        config = load_config(["--batch", "--symbols", "AAA,BBB", "--output-dir", str(tmp_path), "--no-plots",
+                              "--mc-simulations", "20", "--mc-days", "5", "--render-workers", "0",
+                              "--sec-filings", "--sec-items", "1a"])
+        summary = run(config, FakeExtractor())
+        assert processed == ["0000000001-24-000001"]
+        items = pd.read_csv(os.path.join(summary["output_dir"], "sec_items.csv"))
+        assert items["ticker"].tolist() == ["AAA", "BBB"]
+
+    def test_run_analytics_workers(self, tmp_path):
+        """Con analytics_workers el Monte Carlo por ticker se hace en procesos y se guardan las métricas."""
+        config = load_config(["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path),
+                              "--mc-simulations", "20", "--mc-days", "5", "--seed", "1", "--render-workers", "0",
+                              "--analytics-workers", "2", "--no-incremental"])
+        summary = run(config, FakeExtractor())
+        assert summary["exit_code"] == EXIT_OK
+        assert any(path.endswith("AAA_BBBB_montecarlo_grouped.png") for path in summary["outputs"])
+        metrics = pd.read_csv(os.path.join(summary["output_dir"], "ticker_metrics.csv"))
+        assert list(metrics["symbol"]) == ["AAA", "BBBB"]
+        assert (metrics["n_obs"] == 30).all()
+        assert metrics["mc_p50"].notna().all()
+
+    def test_run_report(self, tmp_path):
+        """run_report.json recoge tiempos por etapa y ticker y se entrega a los hooks."""
+        received = []
+        config = load_config(["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path),
+                              "--mc-simulations", "20", "--mc-days", "5", "--seed", "1", "--render-workers", "0"])
+        summary = run(config, FakeExtractor(), metrics_hooks=[received.append])
+        with open(os.path.join(summary["output_dir"], "run_report.json"), encoding="utf-8") as f:
+            report = json.load(f)
+        assert received == [report]
+        for stage in ("download", "to_price_series", "model", "correlation", "render", "write"):
+            assert report["stages"][stage]["count"] >= 1
+        assert report["tickers"]["AAA"]["download"]["rows_downloaded"] > 0
+        assert report["counters"]["bytes_written"] > 0
+        assert report["stages"]["render"]["bytes_written"] > 0
+
+    def test_incremental_rerun(self, tmp_path, monkeypatch):
+        """Una re-ejecución sin cambios no descarga ni vuelve a generar gráficos y reportes."""
+        calls = []
+
+        class CountingExtractor(FakeExtractor):
+            def get_historical_prices(self, ticker, start, end):
+                calls.append(ticker)
+                return super().get_historical_prices(ticker, start, end)
+
+        argv = ["--batch", "--symbols", "AAA,BBBB", "--output-dir", str(tmp_path), "--mc-simulations", "20",
+                "--mc-days", "5", "--seed", "1", "--render-workers", "0", "--end", "2024-01-01"]
+        monkeypatch.setattr("src.utils.output_manager.OUTPUTS_DATE_FORMAT", "run1")
+        first = run(load_config(argv), CountingExtractor())
+        assert sorted(calls) == ["AAA", "BBBB"]
+        assert first["artifacts_reused"] == 0
+        monkeypatch.setattr("src.utils.output_manager.OUTPUTS_DATE_FORMAT", "run2")
+        second = run(load_config(argv), CountingExtractor())
+        assert len(calls) == 2
+        assert second["artifacts_reused"] == 5
+        pngs = [p for p in second["outputs"] if p.endswith((".png", ".md"))]
+        assert all(os.path.samefile(p, os.path.join(first["output_dir"], os.path.basename(p))) for p in pngs)
+        monkeypatch.setattr("src.utils.output_manager.OUTPUTS_DATE_FORMAT", "run3")
+        third = run(load_config(argv + ["--no-incremental"]), CountingExtractor())
+        assert len(calls) == 4
+        assert "artifacts_reused" not in third
@@ -0,0 +1,63 @@
+"""
+Tests unitarios para el manifiesto de ejecuciones y la caché de precios.
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+from src.utils.manifest import RunManifest, content_hash, link_artifact
+from src.utils.price_cache import PriceCache
+
+
+def make_frame(n=10, shift=0.0):
+    return pd.DataFrame({"date": pd.date_range("2024-01-01", periods=n), "close": np.arange(n) + shift})
+
+
+class TestManifest:
+    """Tests del manifiesto de artefactos y de la caché de históricos."""
+
+    def test_content_hash(self):
+        assert content_hash(make_frame()) == content_hash(make_frame())
+        assert content_hash(make_frame()) != content_hash(make_frame(shift=0.5))
+        assert content_hash("a", {"x": 1, "y": 2}) == content_hash("a", {"y": 2, "x": 1})
+        assert content_hash(np.arange(3)) != content_hash(np.arange(4))
+
+    def test_reuse_links_unchanged_artifacts(self, tmp_path):
+        run1, run2 = tmp_path / "run1", tmp_path / "run2"
+        run1.mkdir(); run2.mkdir()
+        artifact = run1 / "plot.png"
+        artifact.write_bytes(b"png")
+        manifest = RunManifest(str(tmp_path / "run_manifest.json"))
+        assert manifest.set_input("AAA", "h1")
+        manifest.record("plot.png", "k1", str(artifact))
+        manifest.save()
+
+        manifest = RunManifest(str(tmp_path / "run_manifest.json"))
+        assert not manifest.set_input("AAA", "h1")
+        assert manifest.reuse("plot.png", "otra", str(run2 / "plot.png")) is None
+        path = manifest.reuse("plot.png", "k1", str(run2 / "plot.png"))
+        assert path == str(run2 / "plot.png")
+        assert os.path.samefile(path, artifact)
+        assert manifest.reused == [path]
+        # Si el artefacto desaparece hay que regenerarlo
+        os.remove(path); os.remove(artifact)
+        assert manifest.lookup("plot.png", "k1") is None
+
+    def test_link_same_path(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("x")
+        assert link_artifact(str(path), str(path)) == str(path)
+        assert path.read_text() == "x"
+
+    def test_price_cache(self, tmp_path):
+        cache = PriceCache(str(tmp_path), ttl_minutes=0)
+        assert cache.get("src", "AAA", "2024-01-01", "2024-02-01") is None
+        cache.put("src", "AAA", "2024-01-01", "2024-02-01", make_frame())
+        pd.testing.assert_frame_equal(cache.get("src", "AAA", "2024-01-01", "2024-02-01"), make_frame())
+        assert cache.get("otro", "AAA", "2024-01-01", "2024-02-01") is None
+        # Un rango que incluye hoy caduca según el TTL
+        today = pd.Timestamp.today().strftime("%Y-%m-%d")
+        cache.put("src", "AAA", "2024-01-01", today, make_frame())
+        time.sleep(0.01)
+        assert cache.get("src", "AAA", "2024-01-01", today) is None
+        assert (cache.hits, cache.misses) == (1, 3)
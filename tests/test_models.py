@@ -0,0 +1,89 @@
+"""
+Tests unitarios para los modelos estocásticos de simulation.models.
+"""
+import pytest
+import numpy as np
+from datetime import date, timedelta
+from src.simulation.models import (
+    GBMModel, MertonJumpModel, GARCHModel, HestonModel, get_model, HAS_NUMBA,
+)
+from src.simulation.montecarlo import MonteCarloSimulator
+from src.models.price_series import PriceSeries, PricePoint
+
+
+@pytest.fixture
+def log_returns():
+    """Rendimientos logarítmicos sintéticos con algunos saltos."""
+    rng = np.random.default_rng(0)
+    r = rng.normal(0.0005, 0.01, 1000)
+    r[::100] -= 0.08
+    return r
+
+
+@pytest.fixture
+def sample_price_series(log_returns):
+    closes = 100 * np.exp(np.cumsum(log_returns))
+    data = [
+        PricePoint(date(2020, 1, 1) + timedelta(days=i), c, c, c, c, 1000.0)
+        for i, c in enumerate(closes)
+    ]
+    return PriceSeries(symbol="TEST", currency="USD", data=data)
+
+
+ALL_MODELS = [GBMModel(), MertonJumpModel(), GARCHModel(backend="numpy"), HestonModel(backend="numpy")]
+
+
+class TestModels:
+    """Tests para los kernels de simulación."""
+
+    @pytest.mark.parametrize("model", ALL_MODELS, ids=lambda m: type(m).__name__)
+    def test_simulate_shape(self, model, log_returns):
+        """Todos los modelos devuelven (n, d+1) con precios positivos partiendo de S0."""
+        fitted = model.fit(log_returns)
+        paths = fitted.simulate(50.0, 200, 30, np.random.default_rng(1))
+        assert paths.shape == (200, 31)
+        assert np.all(paths[:, 0] == 50.0)
+        assert np.all(paths > 0)
+
+    def test_fit_keeps_explicit_params(self, log_returns):
+        """fit() solo estima los parámetros que están a None."""
+        fitted = GBMModel(mu=0.001).fit(log_returns)
+        assert fitted.mu == 0.001
+        assert abs(fitted.sigma - np.std(log_returns)) < 1e-12
+
+    def test_merton_detects_jumps(self, log_returns):
+        """Merton identifica los saltos y reduce la sigma difusiva."""
+        fitted = MertonJumpModel().fit(log_returns)
+        assert fitted.jump_intensity > 0
+        assert fitted.jump_mean < 0
+        assert fitted.sigma < np.std(log_returns)
+
+    def test_garch_requires_stationarity(self, log_returns):
+        with pytest.raises(ValueError, match="alpha \\+ beta < 1"):
+            GARCHModel(alpha=0.5, beta=0.6).fit(log_returns)
+
+    @pytest.mark.skipif(not HAS_NUMBA, reason="numba no instalado")
+    @pytest.mark.parametrize("cls", [GARCHModel, HestonModel])
+    def test_numba_matches_numpy(self, cls, log_returns):
+        """El kernel JIT y el de NumPy dan el mismo resultado con los mismos números aleatorios."""
+        a = cls(backend="numpy").fit(log_returns).simulate(10.0, 50, 20, np.random.default_rng(3))
+        b = cls(backend="numba").fit(log_returns).simulate(10.0, 50, 20, np.random.default_rng(3))
+        assert np.allclose(a, b)
+
+    @pytest.mark.skipif(HAS_NUMBA, reason="numba instalado")
+    def test_numba_backend_unavailable(self, log_returns):
+        with pytest.raises(ValueError, match="numba"):
+            GARCHModel(backend="numba").fit(log_returns).simulate(10.0, 5, 5, np.random.default_rng())
+
+    def test_get_model(self):
+        assert isinstance(get_model("Heston", rho=-0.5), HestonModel)
+        with pytest.raises(ValueError, match="Modelo no válido"):
+            get_model("foo")
+
+    @pytest.mark.parametrize("model", ALL_MODELS, ids=lambda m: type(m).__name__)
+    def test_simulator_with_model(self, model, sample_price_series):
+        """MonteCarloSimulator acepta cualquier modelo y es reproducible con semilla."""
+        a = MonteCarloSimulator(n_simulations=20, n_days=10, model=model, seed=5).simulate_price_series(sample_price_series)
+        b = MonteCarloSimulator(n_simulations=20, n_days=10, model=model, seed=5).simulate_price_series(sample_price_series)
+        assert a.shape == (20, 11)
+        assert np.array_equal(a, b)
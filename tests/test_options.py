@@ -0,0 +1,163 @@
+"""
+Tests unitarios para las cadenas de opciones: Black-Scholes vectorizado, descarga, almacén y superficies.
+"""
+from types import SimpleNamespace
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from src.analytics.options import build_surfaces, enrich_chain, volatility_surface
+from src.extractors.yahoo_options import OptionChainFetcher, chain_frame, to_expiry_dict
+from src.simulation.black_scholes import bs_price, greeks, implied_volatility
+from src.utils.options_store import OptionChainStore
+
+AS_OF = "2024-01-02"
+EXPIRIES = ["2024-02-16", "2024-03-15", "2024-06-21"]
+
+
+def make_chain(ticker="AAA", spot=100.0, vol=0.3, rate=0.03):
+    """Cadena sintética con precios Black-Scholes (sonrisa de volatilidad) y bid/ask alrededor."""
+    rows = []
+    for expiry in EXPIRIES:
+        T = (np.datetime64(expiry) - np.datetime64(AS_OF)).astype(float) / 365
+        strikes = np.arange(70.0, 135.0, 5.0)
+        sigma = vol + 0.2 * np.log(strikes / spot) ** 2
+        for kind in ("call", "put"):
+            price = bs_price(spot, strikes, T, sigma, kind, r=rate)
+            rows.append(pd.DataFrame({"contractSymbol": [f"{ticker}{expiry}{kind[0]}{k:g}" for k in strikes],
+                                      "strike": strikes, "bid": price - 0.01, "ask": price + 0.01,
+                                      "lastPrice": price, "volume": 10.0, "openInterest": 100.0,
+                                      "impliedVolatility": sigma}).assign(kind=kind, expiry=expiry))
+    frames = [chain_frame(ticker, expiry, g[g["kind"] == "call"], g[g["kind"] == "put"], spot)
+              for expiry, g in pd.concat(rows).groupby("expiry")]
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestBlackScholes:
+    """Tests de precios, griegas y volatilidad implícita vectorizados."""
+
+    def test_put_call_parity(self):
+        K = np.array([80.0, 100.0, 120.0])
+        call = bs_price(100.0, K, 0.5, 0.25, "call", r=0.05, q=0.01)
+        put = bs_price(100.0, K, 0.5, 0.25, "put", r=0.05, q=0.01)
+        np.testing.assert_allclose(call - put, 100 * np.exp(-0.005) - K * np.exp(-0.025))
+
+    def test_implied_volatility_roundtrip(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        K, T, sigma = rng.uniform(60, 160, n), rng.uniform(0.02, 2, n), rng.uniform(0.05, 1.2, n)
+        kind = np.where(rng.random(n) < 0.5, "call", "put")
+        price = bs_price(100.0, K, T, sigma, kind, r=0.03)
+        iv = implied_volatility(price, 100.0, K, T, kind, r=0.03)
+        vega = greeks(100.0, K, T, sigma, kind, r=0.03)["vega"]
+        identifiable = vega > 1e-2
+        np.testing.assert_allclose(iv[identifiable], sigma[identifiable], rtol=1e-5)
+        np.testing.assert_allclose(bs_price(100.0, K, T, iv, kind, r=0.03)[~np.isnan(iv)],
+                                   price[~np.isnan(iv)], rtol=1e-5, atol=1e-9)
+
+    def test_implied_volatility_outside_bounds(self):
+        iv = implied_volatility([0.5, 150.0, 5.0, 5.0], 100.0, [50.0, 100.0, 100.0, 100.0], [1.0, 1.0, 0.0, 1.0])
+        assert np.isnan(iv[:3]).all() and iv[3] > 0
+        with pytest.raises(ValueError):
+            implied_volatility(5.0, 100.0, 100.0, 1.0, kind="straddle")
+
+    def test_greeks_match_finite_differences(self):
+        K, T, sigma, h = np.array([90.0, 110.0]), 0.75, 0.3, 1e-4
+        for kind in ("call", "put"):
+            g = greeks(100.0, K, T, sigma, kind, r=0.04, q=0.01)
+            price = lambda S=100.0, t=T, s=sigma, r=0.04: bs_price(S, K, t, s, kind, r=r, q=0.01)
+            np.testing.assert_allclose(g["delta"], (price(S=100 + h) - price(S=100 - h)) / (2 * h), rtol=1e-5)
+            np.testing.assert_allclose(g["vega"], (price(s=sigma + h) - price(s=sigma - h)) / (2 * h), rtol=1e-5)
+            np.testing.assert_allclose(g["theta"], -(price(t=T + h) - price(t=T - h)) / (2 * h), rtol=1e-5)
+            np.testing.assert_allclose(g["rho"], (price(r=0.04 + h) - price(r=0.04 - h)) / (2 * h), rtol=1e-5)
+
+
+class FakeTicker:
+    """Objeto con la interfaz de yf.Ticker usada por OptionChainFetcher."""
+    def __init__(self, symbol, fail=()):
+        self.symbol = symbol
+        self.chain = make_chain(symbol)
+        self.options = tuple(EXPIRIES)
+        self.fail = fail
+        self.threads = set()
+
+    def option_chain(self, expiry):
+        self.threads.add(threading.get_ident())
+        if expiry in self.fail:
+            raise RuntimeError("timeout")
+        rows = self.chain[self.chain["expiry"] == np.datetime64(expiry)]
+        to_yahoo = lambda df: df.rename(columns={"contract": "contractSymbol", "last_price": "lastPrice",
+                                                 "open_interest": "openInterest", "yahoo_iv": "impliedVolatility"})
+        return SimpleNamespace(calls=to_yahoo(rows[rows["kind"] == "call"]), puts=to_yahoo(rows[rows["kind"] == "put"]),
+                               underlying={"regularMarketPrice": 100.0})
+
+
+class TestFetchAndStore:
+    """Tests de la descarga de todos los vencimientos y del almacén columnar."""
+
+    def test_fetch_all_expirations(self):
+        tickers = {"AAA": FakeTicker("AAA"), "BBB": FakeTicker("BBB", fail=("2024-03-15",)), "CCC": None}
+
+        def factory(symbol):
+            if tickers[symbol] is None:
+                return SimpleNamespace(options=())
+            return tickers[symbol]
+
+        chains, errors = OptionChainFetcher(max_workers=4, ticker_factory=factory).fetch_many(["AAA", "BBB", "CCC"])
+        assert sorted(chains["AAA"]["expiry"].astype(str).unique()) == EXPIRIES
+        assert len(chains["BBB"]) == 2 * len(chains["AAA"]) // 3
+        assert list(errors) == ["CCC"]
+        assert (chains["AAA"]["underlying_price"] == 100.0).all()
+
+    def test_ticker_objects_per_thread(self):
+        """Cada objeto de Yahoo se usa desde un único hilo."""
+        created = []
+
+        def factory(symbol):
+            created.append(FakeTicker(symbol))
+            return created[-1]
+
+        chains, errors = OptionChainFetcher(max_workers=4, ticker_factory=factory).fetch_many(["AAA", "BBB"])
+        assert not errors and sorted(chains["AAA"]["expiry"].astype(str).unique()) == EXPIRIES
+        assert all(len(t.threads) <= 1 for t in created)
+
+    def test_store_roundtrip(self, tmp_path):
+        store = OptionChainStore(str(tmp_path))
+        chain = make_chain()
+        store.put("aaa", chain, as_of="2024-01-02")
+        store.put("AAA", chain.head(3), as_of="2024-01-05")
+        assert store.tickers() == ["AAA"] and store.snapshots("AAA") == ["2024-01-02", "2024-01-05"]
+        loaded = store.get("AAA", as_of="2024-01-03")
+        pd.testing.assert_frame_equal(loaded, chain, check_dtype=False)
+        assert loaded["expiry"].dtype.kind == "M"
+        assert list(store.get("AAA", columns=["strike", "kind"]).columns) == ["strike", "kind"]
+        assert len(store.get("AAA")) == 3 and store.get("AAA", as_of="2023-12-31") is None
+
+
+class TestSurfaces:
+    """Tests de volatilidad implícita y griegas por cadena y de las superficies."""
+
+    def test_enrich_chain_recovers_smile(self):
+        enriched = enrich_chain(make_chain(), rate=0.03, as_of=AS_OF)
+        expected = 0.3 + 0.2 * np.log(enriched["strike"] / 100.0) ** 2
+        np.testing.assert_allclose(enriched["iv"], expected, atol=2e-3)
+        calls = enriched[enriched["kind"] == "call"]
+        assert ((calls["delta"] > 0) & (calls["delta"] < 1)).all()
+        assert (enriched["gamma"] > 0).all()
+
+    def test_volatility_surface(self):
+        enriched = enrich_chain(make_chain(), rate=0.03, as_of=AS_OF)
+        surface = volatility_surface(enriched)
+        assert surface.shape == (3, 13)
+        grid = volatility_surface(enriched, moneyness=[0.5, 0.9, 1.0, 1.1])
+        assert np.isnan(grid[0.5]).all()
+        np.testing.assert_allclose(grid[1.0], 0.3, atol=2e-3)
+
+    def test_build_surfaces_and_expiry_dict(self):
+        surfaces = build_surfaces({"AAA": make_chain("AAA"), "BBB": make_chain("BBB", vol=0.5)}, rate=0.03,
+                                  as_of=AS_OF, moneyness=[1.0])
+        assert set(surfaces) == {"AAA", "BBB"}
+        np.testing.assert_allclose(surfaces["BBB"][1.0], 0.5, atol=2e-3)
+        options = to_expiry_dict(make_chain())
+        assert list(options) == EXPIRIES
+        assert {"strike", "bid", "ask", "lastPrice"} <= set(options[EXPIRIES[0]]["calls"].columns)
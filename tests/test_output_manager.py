@@ -5,7 +5,8 @@ import pytest
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.utils.output_manager import OutputManager
+from src.utils.output_manager import OutputManager, get_output_manager, set_output_manager
+from src.visualizations.render import render_figure
 
 
 class TestOutputManager:
@@ -60,3 +61,26 @@ class TestOutputManager:
         # Verificar que contiene el formato de fecha esperado
         assert "outputs" in om.base_dir.lower()
 
+    def test_shared_output_manager(self, tmp_path):
+        """El OutputManager compartido se crea una vez y puede fijarse por ejecución."""
+        om = OutputManager(str(tmp_path))
+        previous = set_output_manager(om)
+        try:
+            assert get_output_manager() is om
+            assert get_output_manager() is get_output_manager()
+            assert om.base_path == str(tmp_path)
+            assert os.path.dirname(om.base_dir) == str(tmp_path)
+        finally:
+            set_output_manager(previous)
+
+    def test_rewrite_does_not_touch_linked_artifact(self, tmp_path):
+        """Reescribir un artefacto enlazado (hard link) de otra ejecución no modifica el original."""
+        om = OutputManager(str(tmp_path))
+        for name, write in (("data.csv", lambda: om.save_dataframe(pd.DataFrame({"x": [1]}), "data.csv")),
+                            ("plot.png", lambda: render_figure(om.get_path("plot.png"), (2, 2), lambda fig: None))):
+            original = tmp_path / f"previous_{name}"
+            original.write_bytes(b"old")
+            os.link(original, om.get_path(name))
+            write()
+            assert original.read_bytes() == b"old"
+            assert not os.path.samefile(original, om.get_path(name))
@@ -0,0 +1,108 @@
+"""
+Tests unitarios para el análisis por ticker en procesos (analytics.parallel).
+"""
+import math
+from datetime import date, timedelta
+import pytest
+import numpy as np
+from src.analytics.parallel import ParallelAnalytics, SharedArray, attach, series_metrics, METRICS
+from src.models.portfolio import Portfolio
+from src.models.price_series import PriceSeries, PricePoint
+from src.simulation.cache import SimulationCache
+from src.simulation.montecarlo import MonteCarloSimulator
+
+
+@pytest.fixture
+def portfolio():
+    rng = np.random.default_rng(0)
+    assets = []
+    for i, symbol in enumerate(["AAA", "BBB", "CCC", "DDD"]):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120 - 20 * i)))
+        start = date(2023, 1, 1) + timedelta(days=7 * i)
+        data = [PricePoint(start + timedelta(days=k), c, c, c, c, 1000.0) for k, c in enumerate(closes)]
+        assets.append(PriceSeries(symbol, "USD", data))
+    return Portfolio(name="Test", assets=assets)
+
+
+class TestParallelAnalytics:
+    """Tests de métricas y Monte Carlo por ticker sobre memoria compartida."""
+
+    def test_shared_array_roundtrip(self):
+        source = np.arange(12, dtype=float).reshape(3, 4)
+        shared = SharedArray(source.shape, source=source)
+        try:
+            shm, view = attach(shared.spec)
+            view[0, 0] = -1
+            assert shared.array[0, 0] == -1
+            assert np.array_equal(view[1:], source[1:])
+            del view
+            shm.close()
+        finally:
+            shared.close()
+
+    def test_series_metrics_match_price_series(self, portfolio):
+        for asset in portfolio.assets:
+            closes = np.array([p.close for p in asset.data])
+            days = np.array([p.date for p in asset.data], dtype="datetime64[D]").astype(np.int64)
+            metrics = series_metrics(closes, days)
+            expected = [len(asset.data), asset.data[-1].close, asset.mean(), asset.stdev(), asset.total_return(),
+                        asset.annualized_return(), asset.volatility(), asset.max_drawdown()]
+            assert np.allclose(metrics, expected)
+
+    def test_short_series(self):
+        metrics = series_metrics(np.array([5.0]), np.array([0]))
+        assert metrics[0] == 1 and metrics[1] == 5.0
+        assert math.isnan(metrics[3]) and math.isnan(metrics[6])
+
+    def test_inline_matches_simulator(self, portfolio):
+        """Con semilla, las trayectorias por ticker son las de MonteCarloSimulator."""
+        dates, closes = portfolio.aligned_closes()
+        symbols = [a.symbol for a in portfolio.assets]
+        result = ParallelAnalytics(processes=0, n_simulations=30, n_days=10, seed=7, keep_paths=30).run(
+            symbols, dates, closes)
+        sim = MonteCarloSimulator(n_simulations=30, n_days=10, seed=7)
+        for j, asset in enumerate(portfolio.assets):
+            expected = sim.simulate_price_series(asset)
+            assert np.array_equal(result.simulations[j], expected)
+            assert result.metric("mc_mean")[j] == pytest.approx(expected[:, -1].mean())
+        assert list(result.to_frame().columns) == list(METRICS)
+        assert result.to_frame().loc["DDD", "n_obs"] == 60
+
+    def test_processes_match_inline(self, portfolio):
+        dates, closes = portfolio.aligned_closes()
+        symbols = [a.symbol for a in portfolio.assets]
+        kwargs = dict(n_simulations=20, n_days=5, seed=3, keep_paths=4)
+        inline = ParallelAnalytics(processes=0, **kwargs).run(symbols, dates, closes)
+        pooled = ParallelAnalytics(processes=2, **kwargs).run(symbols, dates, closes)
+        assert np.allclose(inline.metrics, pooled.metrics, equal_nan=True)
+        assert np.array_equal(inline.simulations, pooled.simulations)
+
+    def test_unseeded_workers_draw_independent_paths(self):
+        """Sin semilla, cada trabajador usa su propio generador: tickers iguales no repiten trayectorias."""
+        closes = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.02, 60)))
+        dates = [date(2023, 1, 1) + timedelta(days=k) for k in range(len(closes))]
+        symbols = [f"S{j}" for j in range(8)]
+        result = ParallelAnalytics(processes=2, n_simulations=10, n_days=5, keep_paths=10).run(
+            symbols, dates, np.tile(closes[:, None], (1, len(symbols))))
+        finals = {tuple(result.simulations[j, :, -1]) for j in range(len(symbols))}
+        assert len(finals) == len(symbols)
+
+    def test_cache_feeds_portfolio_simulation(self, portfolio):
+        """Las trayectorias completas quedan en la caché y la simulación de la cartera las reutiliza."""
+        dates, closes = portfolio.aligned_closes()
+        cache = SimulationCache()
+        ParallelAnalytics(processes=0, n_simulations=20, n_days=5, seed=3, keep_paths=20, cache=cache).run(
+            [a.symbol for a in portfolio.assets], dates, closes)
+        portfolio.monte_carlo_simulation(n_simulations=20, n_days=5, seed=3, cache=cache)
+        assert cache.hits == len(portfolio.assets)
+
+    def test_without_montecarlo(self, portfolio):
+        dates, closes = portfolio.aligned_closes()
+        result = ParallelAnalytics(processes=0, monte_carlo=False, keep_paths=10).run(
+            [a.symbol for a in portfolio.assets], dates, closes)
+        assert result.simulations is None
+        assert np.isnan(result.metric("mc_p50")).all()
+
+    def test_invalid_shape(self):
+        with pytest.raises(ValueError):
+            ParallelAnalytics(processes=0).run(["A", "B"], [date(2024, 1, 1)], np.ones((1, 3)))
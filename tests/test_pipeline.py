@@ -0,0 +1,67 @@
+"""
+Tests unitarios para el pipeline por etapas (utils.pipeline).
+"""
+import threading
+import time
+import pytest
+from src.utils.pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+    """Tests para la clase Pipeline."""
+
+    def test_run_all_items(self):
+        """Todos los elementos atraviesan todas las etapas."""
+        pipeline = Pipeline([
+            Stage("double", lambda x: x * 2, workers=3),
+            Stage("inc", lambda x: x + 1, workers=2),
+        ])
+        assert sorted(pipeline.run(range(20))) == sorted(x * 2 + 1 for x in range(20))
+
+    def test_none_drops_item(self):
+        pipeline = Pipeline([Stage("even", lambda x: x if x % 2 == 0 else None, workers=2)])
+        assert sorted(pipeline.run(range(10))) == [0, 2, 4, 6, 8]
+
+    def test_errors_are_recorded(self):
+        """Un error en una etapa descarta el elemento sin detener el pipeline."""
+        def fail_on_three(x):
+            if x == 3:
+                raise RuntimeError("fallo")
+            return x
+        pipeline = Pipeline([Stage("check", fail_on_three, workers=2)])
+        assert sorted(pipeline.run(range(5))) == [0, 1, 2, 4]
+        assert len(pipeline.errors) == 1
+        assert pipeline.errors[0][0] == "check" and pipeline.errors[0][1] == 3
+
+    def test_stages_overlap(self):
+        """Las etapas trabajan a la vez: el tiempo total se acerca al de la etapa más lenta."""
+        def slow(x):
+            time.sleep(0.02)
+            return x
+        pipeline = Pipeline([Stage("a", slow, workers=1), Stage("b", slow, workers=1)])
+        t0 = time.perf_counter()
+        pipeline.run(range(10))
+        elapsed = time.perf_counter() - t0
+        assert elapsed < 0.35  # en serie serían ~0.4s
+
+    def test_backpressure(self):
+        """Con colas acotadas la etapa rápida no se adelanta más que el tamaño de cola."""
+        produced = []
+        lock = threading.Lock()
+
+        def fast(x):
+            with lock:
+                produced.append(x)
+            return x
+
+        pipeline = Pipeline([Stage("fast", fast, workers=1, queue_size=1)], output_queue_size=1)
+        it = pipeline.iter(range(100))
+        next(it)
+        time.sleep(0.05)
+        with lock:
+            assert len(produced) <= 4
+        assert len(list(it)) == 99
+
+    def test_requires_stages(self):
+        with pytest.raises(ValueError):
+            Pipeline([])
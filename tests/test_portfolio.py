@@ -1,6 +1,7 @@
 """
 Tests unitarios para el módulo Portfolio.
 """
+import math
 import pytest
 from datetime import date
 from src.models.portfolio import Portfolio
@@ -101,3 +102,14 @@ class TestPortfolio:
         assert simulations.shape[0] == 10
         assert simulations.shape[1] == 6
 
+    def test_aligned_closes(self, sample_portfolio):
+        """Test de la alineación de cierres por fecha."""
+        sample_portfolio.assets[1].data.append(
+            PricePoint(date(2023, 1, 4), 209.0, 212.0, 208.0, 211.0, 2300000.0)
+        )
+        dates, closes = sample_portfolio.aligned_closes()
+        assert dates == [date(2023, 1, 1), date(2023, 1, 2), date(2023, 1, 3), date(2023, 1, 4)]
+        assert closes.shape == (4, 2)
+        assert closes[0, 0] == 103.0 and closes[0, 1] == 203.0
+        assert math.isnan(closes[3, 0])
+        assert closes[3, 1] == 211.0
@@ -0,0 +1,110 @@
+"""
+Tests unitarios para la valoración de payoffs (simulation.pricing).
+"""
+import math
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from src.simulation.pricing import (
+    OptionPricer, EuropeanOption, AsianOption, BarrierOption, LookbackOption,
+)
+from src.simulation.black_scholes import greeks
+from src.simulation.models import GBMModel
+from src.models.price_series import PriceSeries, PricePoint
+
+SIGMA = 0.02  # volatilidad diaria
+RATE = 0.05
+
+
+def black_scholes_call(S, K, sigma_annual, r, T):
+    d1 = (math.log(S / K) + (r + 0.5 * sigma_annual**2) * T) / (sigma_annual * math.sqrt(T))
+    d2 = d1 - sigma_annual * math.sqrt(T)
+    N = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    return S * N(d1) - K * math.exp(-r * T) * N(d2), N(d1)
+
+
+@pytest.fixture
+def pricer():
+    return OptionPricer(model=GBMModel(sigma=SIGMA), rate=RATE, n_simulations=40000, seed=1)
+
+
+class TestPayoffs:
+    """Tests de los payoffs sobre trayectorias fijas."""
+
+    @pytest.fixture
+    def paths(self):
+        return np.array([
+            [100.0, 110.0, 120.0, 105.0],
+            [100.0, 90.0, 80.0, 95.0],
+        ])
+
+    def test_european(self, paths):
+        assert np.allclose(EuropeanOption(100.0, "call")(paths), [5.0, 0.0])
+        assert np.allclose(EuropeanOption(100.0, "put")(paths), [0.0, 5.0])
+
+    def test_european_vector_of_strikes(self, paths):
+        values = EuropeanOption(np.array([90.0, 100.0]), "call")(paths)
+        assert values.shape == (2, 2)
+        assert np.allclose(values, [[15.0, 5.0], [5.0, 0.0]])
+
+    def test_asian(self, paths):
+        assert np.allclose(AsianOption(100.0, "call")(paths), [(110 + 120 + 105) / 3 - 100, 0.0])
+
+    def test_barrier(self, paths):
+        assert np.allclose(BarrierOption(100.0, 115.0, "call", "up-and-out")(paths), [0.0, 0.0])
+        assert np.allclose(BarrierOption(100.0, 115.0, "call", "up-and-in")(paths), [5.0, 0.0])
+        assert np.allclose(BarrierOption(100.0, 85.0, "put", "down-and-in")(paths), [0.0, 5.0])
+
+    def test_lookback(self, paths):
+        assert np.allclose(LookbackOption("call")(paths), [5.0, 15.0])
+        assert np.allclose(LookbackOption("put", strike=100.0)(paths), [0.0, 20.0])
+
+    def test_invalid_kind(self, paths):
+        with pytest.raises(ValueError, match="Tipo de opción no válido"):
+            EuropeanOption(100.0, "foo")(paths)
+
+
+class TestOptionPricer:
+    """Tests de OptionPricer."""
+
+    def test_european_matches_black_scholes(self, pricer):
+        n_days = 126
+        result = pricer.price(100.0, EuropeanOption(100.0, "call"), n_days, greeks=True)
+        bs, bs_delta = black_scholes_call(100.0, 100.0, SIGMA * math.sqrt(252), RATE, n_days / 252)
+        assert abs(result.price - bs) < 4 * result.stderr
+        assert abs(result.greeks["delta"] - bs_delta) < 0.02
+        assert result.greeks["gamma"] > 0
+        # Vega por 1.0 de volatilidad anual, comparable con la analítica
+        bs_vega = greeks(100.0, 100.0, n_days / 252, SIGMA * math.sqrt(252), r=RATE)["vega"]
+        assert result.greeks["vega"] == pytest.approx(float(bs_vega), rel=0.05)
+
+    def test_chunked_equals_single_block(self):
+        """Valorar por bloques da el mismo resultado que en un único bloque."""
+        payoff = AsianOption(100.0, "call")
+        single = OptionPricer(GBMModel(sigma=SIGMA), n_simulations=1000, seed=3).price(100.0, payoff, 20)
+        chunked = OptionPricer(GBMModel(sigma=SIGMA), n_simulations=1000, chunk_size=100, seed=3).price(100.0, payoff, 20)
+        assert single.n_paths == chunked.n_paths == 1000
+        assert abs(single.price - chunked.price) < 5 * single.stderr
+
+    def test_custom_payoff(self, pricer):
+        """Cualquier función sobre las trayectorias sirve como payoff."""
+        result = pricer.price(100.0, lambda paths: paths[:, -1], 252)
+        # Bajo la medida neutral al riesgo el forward descontado vale S0
+        assert abs(result.price - 100.0) < 4 * result.stderr
+
+    def test_price_chains(self):
+        closes = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, SIGMA, 300)))
+        data = [PricePoint(date(2023, 1, 1) + timedelta(days=i), c, c, c, c, 1.0) for i, c in enumerate(closes)]
+        ps = PriceSeries(symbol="TEST", currency="USD", data=data)
+        chain = pd.DataFrame({"strike": [90.0, 100.0, 110.0], "bid": [12.0, 5.0, 0.0], "ask": [13.0, 6.0, 1.0],
+                              "lastPrice": [12.4, 5.6, 0.7]})
+        options = {"2024-03-15": {"calls": chain, "puts": chain}, "2024-06-21": {"calls": chain, "puts": chain}}
+        pricer = OptionPricer(rate=RATE, n_simulations=2000, seed=0)
+        result = pricer.price_chains(ps, options, valuation_date=date(2024, 1, 2))
+        assert len(result) == 12
+        assert set(result["kind"]) == {"call", "put"}
+        assert result.loc[0, "market_price"] == 12.5
+        assert result.loc[2, "market_price"] == 0.7
+        calls = result[(result["kind"] == "call") & (result["expiry"] == "2024-03-15")]
+        assert np.all(np.diff(calls["model_price"]) < 0)
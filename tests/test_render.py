@@ -0,0 +1,56 @@
+"""
+Tests unitarios para el servicio de renderizado (visualizations.render).
+"""
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from src.visualizations.render import (
+    RenderService, render_figure, paths_collection, draw_history_group, draw_paths_group,
+    draw_simulation, draw_correlation,
+)
+
+
+@pytest.fixture
+def simulations():
+    return 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, (300, 50)), axis=1))
+
+
+class TestRender:
+    """Tests de las funciones de dibujo y del RenderService."""
+
+    def test_paths_collection(self, simulations):
+        """Las trayectorias se agrupan en una única LineCollection rasterizada."""
+        collection = paths_collection(simulations, max_paths=100)
+        assert len(collection.get_segments()) == 100
+        assert collection.get_rasterized()
+        assert np.allclose(collection.get_segments()[3][:, 1], simulations[3])
+
+    def test_render_figures(self, tmp_path, simulations):
+        dates = pd.date_range("2023-01-01", periods=50).to_numpy()
+        cases = [
+            ("history.png", (12, 4), draw_history_group, [("A", dates, simulations[0]), ("B", dates, simulations[1])]),
+            ("paths.png", (12, 4), draw_paths_group, [("A", simulations), ("B", simulations)]),
+            ("sim.png", (12, 6), draw_simulation, simulations, "Cartera"),
+            ("corr.png", (8, 6), draw_correlation, np.eye(3), ["A", "B", "C"]),
+        ]
+        for filename, figsize, draw, *args in cases:
+            path = render_figure(str(tmp_path / filename), figsize, draw, *args)
+            assert os.path.getsize(path) > 0
+
+    def test_render_service_inline(self, tmp_path, simulations):
+        with RenderService(processes=0) as service:
+            future = service.submit(render_figure, str(tmp_path / "a.png"), (6, 4), draw_simulation, simulations, "T")
+            assert future.done()
+        assert os.path.exists(tmp_path / "a.png")
+
+    @pytest.mark.slow
+    def test_render_service_process_pool(self, tmp_path, simulations):
+        """Los renderizados en el pool de procesos generan los PNG y se recogen los errores."""
+        service = RenderService(processes=2)
+        for i in range(3):
+            service.submit(render_figure, str(tmp_path / f"p{i}.png"), (6, 4), draw_simulation, simulations, f"T{i}")
+        service.submit(render_figure, str(tmp_path / "missing" / "x.png"), (6, 4), draw_simulation, simulations, "T")
+        paths, errors = service.close()
+        assert sorted(os.path.basename(p) for p in paths) == ["p0.png", "p1.png", "p2.png"]
+        assert len(errors) == 1
@@ -0,0 +1,78 @@
+"""
+Tests unitarios para el motor de reportes de carteras (analytics.report).
+"""
+import json
+import statistics
+import pytest
+import numpy as np
+from src.analytics.report import ReportEngine, asset_metrics
+from src.models.portfolio import Portfolio
+from src.models.price_series import PriceSeries
+from tests.synthetic import make_price_series
+
+
+@pytest.fixture
+def assets():
+    return [make_price_series(50 + 10 * i, symbol=f"A{i}", seed=i) for i in range(6)]
+
+
+class TestReportEngine:
+    """Tests de métricas en una pasada, agregación por cartera, formatos y lotes."""
+
+    def test_asset_metrics_match_statistics(self, assets):
+        assets = assets + [PriceSeries("VACIO", "USD", [])]
+        n, mean, m2 = asset_metrics(assets)
+        for asset, k, m, s2 in zip(assets[:-1], n, mean, m2):
+            closes = [p.close for p in asset.data]
+            assert k == len(closes)
+            assert m == pytest.approx(statistics.mean(closes))
+            assert (s2 / (k - 1)) ** 0.5 == pytest.approx(statistics.stdev(closes))
+        assert n[-1] == 0
+        chunked = asset_metrics(assets, chunk_points=100)
+        for got, expected in zip(chunked, (n, mean, m2)):
+            np.testing.assert_allclose(got, expected, equal_nan=True)
+
+    def test_portfolio_metrics(self, assets):
+        portfolio = Portfolio("P", assets)
+        report = ReportEngine().report(portfolio)
+        assert report.mean == pytest.approx(portfolio.mean())
+        assert report.volatility == pytest.approx(portfolio.volatility())
+        assert [a.symbol for a in report.assets] == [a.symbol for a in assets]
+
+    def test_formats(self, assets):
+        portfolio = Portfolio("P <1>", assets[:2] + [PriceSeries("X", "USD", [])])
+        report = ReportEngine().report(portfolio)
+        md = report.render("markdown")
+        assert md.startswith("# Reporte de Cartera: P <1>")
+        assert "**ADVERTENCIA:** El activo X tiene pocos datos." in md
+        assert "P &lt;1&gt;" in report.render("html")
+        data = json.loads(report.render("json"))
+        assert data["assets"][2]["stdev"] is None
+        with pytest.raises(ValueError):
+            report.render("pdf")
+        assert "no contiene activos" in Portfolio("vacía").report(show=False)
+
+    def test_batch_shares_asset_metrics(self, assets, tmp_path, monkeypatch):
+        """Cada activo se calcula una sola vez aunque aparezca en varias carteras."""
+        calls = []
+        import src.analytics.report as report_module
+        original = report_module.asset_metrics
+        monkeypatch.setattr(report_module, "asset_metrics", lambda a: calls.append(len(a)) or original(a))
+        portfolios = [Portfolio(f"P{i}", assets[i:i + 3]) for i in range(4)]
+        engine = ReportEngine()
+        texts = engine.render_batch(portfolios)
+        engine.report(portfolios[0])
+        assert calls == [6]
+        assert texts["P1"] == portfolios[1].report(show=False)
+        paths = engine.write_batch(portfolios, tmp_path, formats=("markdown", "json"))
+        assert len(paths) == 8 and all(p.endswith((".md", ".json")) for p in paths)
+
+    def test_edited_bars_are_recomputed(self, assets):
+        """Editar un cierre sin cambiar la longitud de los datos invalida las métricas del activo."""
+        engine = ReportEngine()
+        portfolio = Portfolio("P", assets[:2])
+        before = engine.report(portfolio).assets[0].mean
+        assets[0].data[0].close += 1000.0
+        after = engine.report(portfolio)
+        assert after.assets[0].mean == pytest.approx(before + 1000.0 / len(assets[0].data))
+        assert after.mean == pytest.approx(portfolio.mean())
@@ -0,0 +1,133 @@
+"""
+Tests unitarios para la descarga en streaming y la extracción de Items de presentaciones de EDGAR.
+"""
+import gzip
+import os
+import pytest
+from src.utils.sec_documents import FilingProcessor, extract
+from src.utils.sec_edgar import Filing
+
+FORM = """<html><body>
+<div><b>TABLE OF CONTENTS</b></div>
+<table><tr><td>Item 1A.</td><td>Risk Factors</td><td>12</td></tr>
+<tr><td>Item 7.</td><td>Management&#8217;s Discussion</td><td>30</td></tr></table>
+<ix:header><ix:hidden>Item 7. oculto</ix:hidden></ix:header>
+<p style="font-weight:bold">ITEM&nbsp;1A. RISK
+FACTORS</p>
+<p>Our business is subject to many risks.</p>
+<p>Item 1A risks also include competition &amp; regulation.</p>
+<p>ITEM 1B. UNRESOLVED STAFF COMMENTS</p><p>None.</p>
+<p>Item 7. Management's Discussion and Analysis</p>
+<p>Revenue grew.</p>
+<p>Item 7A. Quantitative and Qualitative Disclosures</p><p>Rates.</p>
+</body></html>"""
+
+EXHIBIT = "Subsidiaries of the registrant:\n  Sub One LLC\n  Sub Two Ltd\n"
+
+
+def make_filing(path, form=FORM, binary_lines=2000):
+    parts = [
+        "<SEC-DOCUMENT>0000000001-24-000001.txt : 20240201\n<SEC-HEADER>\nCONFORMED SUBMISSION TYPE: 10-K\n</SEC-HEADER>\n",
+        "<DOCUMENT>\n<TYPE>10-K\n<SEQUENCE>1\n<FILENAME>form.htm\n<TEXT>\n", form, "\n</TEXT>\n</DOCUMENT>\n",
+        "<DOCUMENT>\n<TYPE>GRAPHIC\n<SEQUENCE>2\n<FILENAME>logo.jpg\n<TEXT>\nbegin 644 logo.jpg\n",
+        "M" + "A" * 60 + "\n" * 1, ("M" + "B" * 60 + "\n") * binary_lines, "end\n</TEXT>\n</DOCUMENT>\n",
+        "<DOCUMENT>\n<TYPE>EX-21\n<SEQUENCE>3\n<FILENAME>ex21.txt\n<TEXT>\n", EXHIBIT, "</TEXT>\n</DOCUMENT>\n",
+        "</SEC-DOCUMENT>\n",
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+    return path
+
+
+def read(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+class TestExtract:
+    """Tests del recorrido del SGML y de la división en Items."""
+
+    def test_items_and_documents(self, tmp_path):
+        raw = make_filing(tmp_path / "f.txt")
+        items, documents = extract(str(raw), str(tmp_path / "out"), items=("1a", "7"), documents=("EX-21",))
+        assert set(items) == {"1A", "7"}
+        risk = read(items["1A"])
+        assert risk.startswith("ITEM 1A. RISK FACTORS\n")
+        assert "competition & regulation" in risk and "UNRESOLVED" not in risk
+        assert read(items["7"]).splitlines() == ["Item 7. Management's Discussion and Analysis", "Revenue grew."]
+        assert "Sub Two Ltd" in read(documents["EX-21"])
+        # Solo quedan los ficheros definitivos (los candidatos del índice se descartan)
+        assert sorted(os.listdir(tmp_path / "out")) == ["EX-21.txt.gz", "item_1A.txt.gz", "item_7.txt.gz"]
+
+    def test_small_line_limit(self, tmp_path):
+        """Con líneas partidas en trozos de 16 bytes el resultado es el mismo."""
+        raw = make_filing(tmp_path / "f.txt", form=FORM.replace("\n", " "))
+        full, _ = extract(str(raw), str(tmp_path / "a"), items=("7",))
+        small, _ = extract(str(raw), str(tmp_path / "b"), items=("7",), max_line=16)
+        assert read(full["7"]) == read(small["7"])
+
+    def test_plain_text_form(self, tmp_path):
+        form = "ITEM 1A. RISK FACTORS\nPlain risks.\nITEM 2. PROPERTIES\nOffices.\n"
+        raw = make_filing(tmp_path / "f.txt", form=form)
+        items, _ = extract(str(raw), str(tmp_path / "out"), items=("1A",))
+        assert read(items["1A"]) == "ITEM 1A. RISK FACTORS\nPlain risks.\n"
+
+
+class FakeStream:
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, path):
+        self.path = path
+        self.urls = []
+
+    def get(self, url, stream=False):
+        assert stream
+        self.urls.append(url)
+        with open(self.path, "rb") as f:
+            return FakeStream(f.read())
+
+
+class TestFilingProcessor:
+    """Tests de la descarga por bloques y la reutilización de extracciones."""
+
+    @pytest.fixture
+    def filing(self):
+        return Filing("AAA", 1, "10-K", "0000000001-24-000001", "2024-02-01", "2023-12-31", "form.htm")
+
+    def test_process_and_reuse(self, tmp_path, filing):
+        client = FakeClient(make_filing(tmp_path / "source.txt"))
+        processor = FilingProcessor(client, str(tmp_path / "filings"), items=("1A",), chunk_size=1000)
+        result = processor.process(filing)
+        assert result.bytes_downloaded == os.path.getsize(tmp_path / "source.txt")
+        assert "Our business" in result.read("1a")
+        folder = processor.folder(filing)
+        assert sorted(os.listdir(folder)) == ["extraction.json", "item_1A.txt.gz"]
+        again = processor.process(filing)
+        assert again.cached and again.items == result.items and len(client.urls) == 1
+        # Otros Items: se vuelve a procesar
+        FilingProcessor(client, str(tmp_path / "filings"), items=("7",)).process(filing)
+        assert len(client.urls) == 2
+
+    def test_process_many_collects_errors(self, tmp_path, filing):
+        client = FakeClient(str(tmp_path / "missing.txt"))
+        results, errors = FilingProcessor(client, str(tmp_path)).process_many([filing])
+        assert results == [] and list(errors) == [filing.accession_number]
+
+    def test_process_many_dedupes_accessions(self, tmp_path, filing):
+        """Una presentación repetida (clases de acciones con el mismo CIK) se descarga una sola vez."""
+        client = FakeClient(make_filing(tmp_path / "source.txt"))
+        processor = FilingProcessor(client, str(tmp_path / "filings"), items=("1A",), max_workers=2)
+        results, errors = processor.process_many([filing, filing])
+        assert errors == {} and len(results) == 1 and len(client.urls) == 1
+        assert sorted(os.listdir(processor.folder(filing))) == ["extraction.json", "item_1A.txt.gz"]
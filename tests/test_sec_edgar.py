@@ -0,0 +1,126 @@
+"""
+Tests unitarios para el cliente de SEC EDGAR (sin red: sesión HTTP simulada).
+"""
+import threading
+import pytest
+from src.utils.sec_edgar import CikIndex, EdgarClient, RateLimiter, TICKERS_URL
+
+TICKERS = {
+    "fields": ["cik", "name", "ticker", "exchange"],
+    "data": [[320193, "Apple Inc.", "AAPL", "Nasdaq"], [1067983, "Berkshire Hathaway", "BRK-B", "NYSE"],
+             [1067983, "Berkshire Hathaway", "BRK-A", "NYSE"], [789019, "Microsoft", "MSFT", "Nasdaq"]],
+}
+
+
+def _submissions(cik):
+    return {"cik": str(cik), "filings": {"recent": {
+        "form": ["8-K", "10-Q", "10-K", "10-Q"],
+        "accessionNumber": [f"0000{cik}-24-00000{i}" for i in range(4)],
+        "filingDate": ["2024-11-01", "2024-08-01", "2024-02-01", "2023-11-01"],
+        "reportDate": ["", "2024-06-30", "2023-12-31", "2023-09-30"],
+        "primaryDocument": ["a.htm", "b.htm", "c.htm", "d.htm"],
+    }}}
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = {"Retry-After": "0"}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, fail=()):
+        self.urls = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        assert headers["User-Agent"]
+        with self.lock:
+            self.urls.append(url)
+        if url == TICKERS_URL:
+            return FakeResponse(TICKERS)
+        cik = int(url.rsplit("CIK", 1)[1].split(".")[0])
+        if cik in self.fail:
+            return FakeResponse({}, 404)
+        return FakeResponse(_submissions(cik))
+
+
+@pytest.fixture
+def client(tmp_path):
+    return EdgarClient("test test@example.com", cache_dir=str(tmp_path), session=FakeSession(), rate=1000)
+
+
+class TestCikIndex:
+    """Tests del índice ticker -> CIK en caché."""
+
+    def test_lookup_and_cache(self, client, tmp_path):
+        assert client.cik("aapl") == 320193
+        assert client.cik("BRK.B") == 1067983
+        assert client.cik("ZZZZ") is None
+        assert client.session.urls == [TICKERS_URL]
+        # Otro cliente reutiliza el fichero sin descargar
+        other = EdgarClient("test test@example.com", cache_dir=str(tmp_path), session=FakeSession())
+        assert len(other.index) == 4 and other.session.urls == []
+
+    def test_expired_cache_is_refreshed(self, tmp_path):
+        calls = []
+        index = CikIndex(str(tmp_path / "tickers.json"), lambda: calls.append(1) or TICKERS, ttl_hours=0)
+        index.cik("AAPL")
+        CikIndex(str(tmp_path / "tickers.json"), lambda: calls.append(1) or TICKERS, ttl_hours=0).cik("AAPL")
+        assert len(calls) == 2
+
+    def test_user_agent_required(self):
+        with pytest.raises(ValueError):
+            EdgarClient("", session=FakeSession())
+
+
+class TestEdgarClient:
+    """Tests de consulta de filings."""
+
+    def test_filings(self, client):
+        filings = client.filings("AAPL", forms=("10-K", "10-Q"))
+        assert [f.form for f in filings] == ["10-Q", "10-K", "10-Q"]
+        assert filings[1].report_date == "2023-12-31"
+        assert filings[1].text_url == ("https://www.sec.gov/Archives/edgar/data/320193/"
+                                       "000032019324000002/0000320193-24-000002.txt")
+        assert len(client.filings("AAPL", forms=("10-Q",), limit=1)) == 1
+        with pytest.raises(ValueError):
+            client.filings("ZZZZ")
+
+    def test_filings_many(self, client):
+        client.session.fail.add(789019)
+        filings, errors = client.filings_many(["AAPL", "BRK-A", "BRK-B", "MSFT", "ZZZZ"], forms=("10-K",))
+        assert [f.ticker for f in filings] == ["AAPL", "BRK-A", "BRK-B"]
+        assert set(errors) == {"MSFT", "ZZZZ"}
+        # BRK-A y BRK-B comparten CIK: una sola consulta de submissions
+        assert sum("CIK0001067983" in url for url in client.session.urls) == 1
+        frame = EdgarClient.to_frame(filings)
+        assert list(frame["ticker"]) == ["AAPL", "BRK-A", "BRK-B"]
+        assert frame["url"].str.endswith("c.htm").all()
+
+    def test_retry_on_rate_limit(self, client):
+        responses = [FakeResponse({}, 429), FakeResponse({"ok": True})]
+        client.session.get = lambda url, **kwargs: responses.pop(0)
+        assert client.get_json("https://data.sec.gov/x") == {"ok": True}
+
+
+class TestRateLimiter:
+    """Tests del espaciado de peticiones."""
+
+    def test_slots_are_spaced(self):
+        now, waits = [0.0], []
+        limiter = RateLimiter(10, clock=lambda: now[0], sleep=waits.append)
+        for _ in range(4):
+            limiter.wait()
+        assert waits == pytest.approx([0.1, 0.2, 0.3])
+        with pytest.raises(ValueError):
+            RateLimiter(0)
@@ -0,0 +1,118 @@
+"""
+Tests unitarios para la caché de simulaciones (SimulationCache).
+"""
+import os
+import sys
+import pytest
+import numpy as np
+from datetime import date
+from src.simulation.cache import SimulationCache, hash_array, simulation_key
+from src.simulation.models import GBMModel
+from src.simulation.montecarlo import MonteCarloSimulator
+from src.models.price_series import PriceSeries, PricePoint
+from src.models.portfolio import Portfolio
+
+
+@pytest.fixture
+def sample_price_series():
+    """Fixture con una serie de precios de ejemplo."""
+    data = [
+        PricePoint(date(2023, 1, 1), 100.0, 105.0, 99.0, 103.0, 1000000.0),
+        PricePoint(date(2023, 1, 2), 103.0, 108.0, 102.0, 106.0, 1100000.0),
+        PricePoint(date(2023, 1, 3), 106.0, 110.0, 105.0, 104.0, 1200000.0),
+        PricePoint(date(2023, 1, 4), 109.0, 112.0, 108.0, 111.0, 1300000.0),
+    ]
+    return PriceSeries(symbol="AAPL", currency="USD", data=data)
+
+
+class TestSimulationCache:
+    """Tests para la clase SimulationCache."""
+
+    def test_key_depends_on_inputs(self):
+        """La clave cambia con los datos, el modelo, el horizonte, las trayectorias o la semilla."""
+        h = hash_array([1.0, 2.0, 3.0])
+        base = simulation_key(h, GBMModel(), 252, 100, 1)
+        assert base == simulation_key(h, GBMModel(), 252, 100, 1)
+        assert base != simulation_key(hash_array([1.0, 2.0, 3.5]), GBMModel(), 252, 100, 1)
+        assert base != simulation_key(h, GBMModel(sigma=0.2), 252, 100, 1)
+        assert base != simulation_key(h, GBMModel(), 126, 100, 1)
+        assert base != simulation_key(h, GBMModel(), 252, 50, 1)
+        assert base != simulation_key(h, GBMModel(), 252, 100, 2)
+
+    def test_memory_lru(self):
+        """El nivel en memoria expulsa la entrada menos usada."""
+        cache = SimulationCache(max_entries=2)
+        cache.put("a", np.zeros(3))
+        cache.put("b", np.ones(3))
+        assert cache.get("a") is not None
+        cache.put("c", np.ones(3))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_concurrent_access(self):
+        """Hilos que leen y guardan a la vez (con expulsiones continuas) no rompen el LRU ni los contadores."""
+        from concurrent.futures import ThreadPoolExecutor
+        cache = SimulationCache(max_entries=4)
+
+        def work(worker):
+            for i in range(2_000):
+                key = f"k{(i + worker) % 16}"
+                if cache.get(key) is None:
+                    cache.put(key, np.zeros(2))
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # cambios de hilo muy frecuentes para provocar las carreras
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(work, range(8)))
+        finally:
+            sys.setswitchinterval(interval)
+        assert cache.hits + cache.misses == 16_000
+        assert len(cache._memory) <= 4
+
+    def test_returned_arrays_are_read_only(self):
+        cache = SimulationCache()
+        arr = cache.put("a", np.zeros(3))
+        with pytest.raises(ValueError):
+            arr[0] = 1.0
+
+    def test_disk_tier(self, tmp_path):
+        """Una caché nueva sobre el mismo directorio recupera los resultados guardados."""
+        SimulationCache(disk_dir=str(tmp_path)).put("k", np.arange(5.0))
+        other = SimulationCache(disk_dir=str(tmp_path))
+        assert np.array_equal(other.get("k"), np.arange(5.0))
+
+    def test_disk_size_limit(self, tmp_path):
+        """El nivel en disco no supera el tamaño máximo configurado."""
+        cache = SimulationCache(disk_dir=str(tmp_path), max_disk_bytes=3000)
+        for i in range(5):
+            cache.put(f"k{i}", np.zeros(200))
+        total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+        assert total <= 3000
+        assert os.path.exists(tmp_path / "k4.npy")
+
+    def test_simulator_uses_cache(self, sample_price_series):
+        """Una petición idéntica devuelve el mismo array sin volver a simular."""
+        cache = SimulationCache()
+        sim = MonteCarloSimulator(n_simulations=20, n_days=10, seed=3, cache=cache)
+        first = sim.simulate_price_series(sample_price_series)
+        second = MonteCarloSimulator(n_simulations=20, n_days=10, seed=3, cache=cache).simulate_price_series(sample_price_series)
+        assert second is first
+        assert cache.hits == 1 and cache.misses == 1
+
+    def test_no_cache_without_seed(self, sample_price_series):
+        """Sin semilla los resultados no son reproducibles y no se cachean."""
+        cache = SimulationCache()
+        sim = MonteCarloSimulator(n_simulations=20, n_days=10, cache=cache)
+        sim.simulate_price_series(sample_price_series)
+        assert cache.hits == 0 and cache.misses == 0
+
+    def test_portfolio_reuses_asset_paths(self, sample_price_series):
+        """La simulación de la cartera reutiliza las trayectorias por activo ya cacheadas."""
+        cache = SimulationCache()
+        single = MonteCarloSimulator(n_simulations=20, n_days=10, seed=3, cache=cache).simulate_price_series(sample_price_series)
+        portfolio = Portfolio(name="Test", assets=[sample_price_series])
+        total = portfolio.monte_carlo_simulation(n_simulations=20, n_days=10, seed=3, cache=cache)
+        assert cache.hits == 1
+        assert np.array_equal(total, single)
@@ -0,0 +1,103 @@
+"""
+Tests unitarios para la validación de calidad de datos OHLCV.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.validation import Rule, Validator, default_rules, group_median, validate_ohlcv
+
+
+def _bars(ticker, n=100, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-01", periods=n),
+        "ticker": ticker,
+        "open": close * (1 + rng.normal(0, 0.002, n)),
+        "high": close * 1.02,
+        "low": close * 0.98,
+        "close": close,
+        "volume": rng.integers(1_000, 10_000, n).astype(float),
+    })
+
+
+@pytest.fixture
+def frame():
+    """Dos tickers con incidencias inyectadas en AAA; BBB está limpio."""
+    aaa = _bars("AAA", seed=1)
+    aaa.loc[10, "low"] = aaa.loc[10, "high"] * 1.1        # low > high
+    aaa.loc[20, "close"] = np.nan                          # cierre ausente
+    aaa.loc[30, ["open", "high", "low", "close"]] *= 5     # pico que se revierte
+    aaa.loc[40, "volume"] = -5                             # volumen negativo
+    aaa.loc[50, ["open", "high", "low", "close"]] = 0.0    # precios no positivos
+    aaa.loc[60:70, ["open", "high", "low", "close"]] = aaa.loc[60, "close"]  # cierres repetidos
+    return pd.concat([aaa, _bars("BBB", seed=2)], ignore_index=True)
+
+
+class TestRules:
+    """Tests de detección de cada regla."""
+
+    def test_each_rule_flags_injected_rows(self, frame):
+        _, report = validate_ohlcv(frame)
+        assert np.flatnonzero(report.mask("ohlc_inconsistent")).tolist() == [10]
+        assert np.flatnonzero(report.mask("missing_close")).tolist() == [20]
+        assert np.flatnonzero(report.mask("price_spike")).tolist() == [30]
+        assert np.flatnonzero(report.mask("negative_volume")).tolist() == [40]
+        assert np.flatnonzero(report.mask("non_positive_price")).tolist() == [50]
+        assert np.flatnonzero(report.mask("stale_close")).tolist() == list(range(61, 71))
+        assert not report.flagged[100:].any()
+
+    def test_non_reverting_jump_is_not_a_spike(self):
+        df = _bars("AAA", seed=3)
+        df.loc[50:, ["open", "high", "low", "close"]] /= 4  # split sin ajustar
+        _, report = validate_ohlcv(df)
+        assert np.flatnonzero(report.mask("price_jump")).tolist() == [50]
+        assert not report.mask("price_spike").any()
+
+    def test_invalid_repair(self):
+        with pytest.raises(ValueError):
+            Rule("x", lambda bars: None, repair="borrar")
+        with pytest.raises(ValueError):
+            Validator(default_rules() + default_rules())
+
+    def test_group_median(self):
+        values = np.array([5.0, 1.0, 3.0, -2.0, 8.0])
+        median, counts = group_median(values, np.array([0, 0, 0, 2, 2]), 3)
+        np.testing.assert_array_equal(median, [3.0, np.nan, 3.0])
+        assert counts.tolist() == [3, 0, 2]
+
+
+class TestReport:
+    """Tests de puntuaciones, cuarentena y reparación."""
+
+    def test_scores_and_quarantine(self, frame):
+        _, report = validate_ohlcv(frame)
+        scores = report.scores.set_index("ticker")
+        assert report.score("BBB") == 1.0
+        assert 0 < report.score("AAA") < 1
+        assert scores.loc["AAA", "flagged"] == report.flagged[:100].sum()
+        assert len(report.quarantine) == report.flagged.sum()
+        assert report.quarantine.loc[10, "rules"] == "ohlc_inconsistent"
+        assert report.to_dict()["violations"]["price_spike"] == 1
+
+    def test_repair(self, frame):
+        repaired, report = validate_ohlcv(frame, repair=True)
+        assert repaired.loc[10, "low"] <= min(repaired.loc[10, "open"], repaired.loc[10, "close"])
+        assert repaired.loc[10, "high"] >= repaired.loc[10, "low"]
+        assert repaired.loc[30, "close"] == repaired.loc[29, "close"]
+        assert repaired.loc[20, "close"] == repaired.loc[19, "close"]
+        assert repaired.loc[40, "volume"] == repaired.loc[39, "volume"]
+        # Reglas sin reparación: los datos quedan como estaban
+        pd.testing.assert_series_equal(repaired.loc[60:70, "close"], frame.loc[60:70, "close"])
+        assert "stale_close" not in report.repaired
+        _, after = validate_ohlcv(repaired)
+        assert not after.mask("ohlc_inconsistent").any() and not after.mask("price_spike").any()
+        # El DataFrame original no se modifica
+        assert frame.loc[10, "low"] > frame.loc[10, "high"]
+
+    def test_row_order_does_not_matter(self, frame):
+        shuffled = frame.sample(frac=1, random_state=0)
+        repaired, report = validate_ohlcv(shuffled, repair=True)
+        _, expected = validate_ohlcv(frame)
+        pd.testing.assert_index_equal(report.quarantine.sort_index().index, expected.quarantine.index)
+        pd.testing.assert_frame_equal(repaired.sort_index(), validate_ohlcv(frame, repair=True)[0])